@@ -19,3 +19,32 @@ export function initSocket() {
 export function useSocket() {
 	return socket
 }
+
+// Realtime dashboard deltas published by hooks_realtime (event `re_studio_dashboard_delta`).
+// Subscribes to the doctype rooms, passes every delta to `onDelta` and calls
+// `onReconnect` after a reconnect so the caller can do one full refresh.
+export function subscribeDashboardDeltas({
+	doctypes = ["Booking", "Service", "Service Package"],
+	onDelta,
+	onReconnect,
+} = {}) {
+	if (!socket) return () => {}
+
+	const subscribe = () => doctypes.forEach((doctype) => socket.emit("doctype_subscribe", doctype))
+	// Deltas of one server transaction arrive together as { batch: [...] }
+	const handleDelta = (message) => onDelta && (message.batch || [message]).forEach(onDelta)
+	const handleReconnect = () => {
+		subscribe()
+		onReconnect && onReconnect()
+	}
+
+	subscribe()
+	socket.on("re_studio_dashboard_delta", handleDelta)
+	socket.io.on("reconnect", handleReconnect)
+
+	return () => {
+		socket.off("re_studio_dashboard_delta", handleDelta)
+		socket.io.off("reconnect", handleReconnect)
+		doctypes.forEach((doctype) => socket.emit("doctype_unsubscribe", doctype))
+	}
+}
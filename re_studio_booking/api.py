@@ -132,14 +132,9 @@ def get_available_time_slots(date, service_id=None, service_type='service'):
         except:
             date_str = date  # Use as-is if conversion fails
         
-        # Generate all possible time slots (9 AM to 9 PM)
-        all_slots = []
-        for hour in range(9, 22):  # 9 AM to 9 PM
-            all_slots.append(f"{hour:02d}:00")
-        
-        # Try to get existing bookings for the date
         # Check if Booking doctype exists first
         if not frappe.db.exists("DocType", "Booking"):
+            all_slots = [f"{hour:02d}:00" for hour in range(9, 22)]
             return {
                 'success': True,
                 'available_slots': all_slots,
@@ -147,27 +142,18 @@ def get_available_time_slots(date, service_id=None, service_type='service'):
                 'total_slots': len(all_slots)
             }
         
-        # Get existing bookings
-        existing_bookings = frappe.db.sql("""
-            SELECT start_time, end_time, name 
-            FROM `tabBooking` 
-            WHERE DATE(booking_date) = %s 
-            AND status NOT IN ('Cancelled')
-        """, (date_str,), as_dict=True)
+        from re_studio_booking.re_studio_booking.doctype.booking.booking_slots import SlotGrid, minutes_to_time
+        from re_studio_booking.re_studio_booking.doctype.general_settings.general_settings_cache import get_studio_settings_snapshot
         
-        # Extract booked times
-        booked_times = []
-        for booking in existing_bookings:
-            if booking.start_time:
-                # Convert time to string format HH:MM
-                if isinstance(booking.start_time, str):
-                    time_str = booking.start_time[:5]  # HH:MM format
-                else:
-                    time_str = booking.start_time.strftime('%H:%M')
-                booked_times.append(time_str)
+        # Slots of time_slot_duration minutes inside the studio business hours
+        settings = get_studio_settings_snapshot()
+        slot_minutes = settings.time_slot_duration or 60
+        grid = SlotGrid([date_str], working_days_only=False, settings=settings).get_grid(date_str)
+        states = grid.slot_states(slot_minutes)
         
-        # Remove booked slots
-        available_slots = [slot for slot in all_slots if slot not in booked_times]
+        all_slots = [minutes_to_time(start)[:5] for start, _free in states]
+        available_slots = [minutes_to_time(start)[:5] for start, free in states if free]
+        booked_times = [minutes_to_time(start)[:5] for start, free in states if not free]
         
         return {
             'success': True,
@@ -190,6 +176,45 @@ def get_available_time_slots(date, service_id=None, service_type='service'):
             'error': str(e)
         }
 
+@frappe.whitelist()
+def get_available_slots_for_range(start_date=None, days=7, photographers=None, slot_minutes=None, step_minutes=None):
+    """
+    Available slots for several days (week view) in one call.
+    Returns the studio slots of every day and, if photographers are given,
+    the slots where each photographer and the studio are both free.
+    """
+    from frappe.utils import cint, nowdate
+    from re_studio_booking.re_studio_booking.doctype.booking.booking_slots import SlotGrid, date_range
+    from re_studio_booking.re_studio_booking.doctype.general_settings.general_settings_cache import get_studio_settings_snapshot
+    
+    photographers = frappe.parse_json(photographers) if isinstance(photographers, str) else photographers
+    if isinstance(photographers, str):
+        photographers = [photographers]
+    
+    settings = get_studio_settings_snapshot()
+    slot_minutes = cint(slot_minutes) or settings.time_slot_duration or 60
+    step_minutes = cint(step_minutes) or slot_minutes
+    dates = date_range(start_date or nowdate(), min(cint(days) or 7, 31))
+    
+    grid = SlotGrid(dates, photographers=photographers or [], settings=settings)
+    availability = grid.availability(slot_minutes, step_minutes)
+    
+    return {
+        'success': True,
+        'slot_minutes': slot_minutes,
+        'step_minutes': step_minutes,
+        'business_hours': settings.get_business_hours(),
+        'days': [
+            {
+                'date': day,
+                'is_working_day': grid.get_grid(day).is_open(),
+                'available_slots': day_slots['studio'],
+                'photographers': day_slots['photographers']
+            }
+            for day, day_slots in availability.items()
+        ]
+    }
+
 @frappe.whitelist()
 def get_service_details(service_id, service_type='service'):
     """
@@ -222,93 +247,59 @@ def get_service_details(service_id, service_type='service'):
         return {}
 
 @frappe.whitelist()
-def get_calendar_availability(start_date, end_date):
+def get_calendar_availability(start_date, end_date, photographers=None, by_photographer=False):
     """
-    Get calendar availability for date range showing available, booked, and partially booked days
+    Get calendar availability for date range showing available, booked, and partially booked days.
+    Booked / remaining minutes and utilisation per day come from one GROUP BY query
+    (cached per range until a Booking is saved or deleted).
     """
     try:
-        from datetime import datetime, timedelta
-        from frappe.utils import getdate
-        
-        # Parse dates
-        start = getdate(start_date)
-        end = getdate(end_date)
+        from frappe.utils import cint
+        from re_studio_booking.re_studio_booking.doctype.booking.booking_availability import get_calendar_capacity
+        from re_studio_booking.re_studio_booking.doctype.general_settings.general_settings_cache import get_studio_settings_snapshot
+        
+        photographers = frappe.parse_json(photographers) if isinstance(photographers, str) else photographers
+        if isinstance(photographers, str):
+            photographers = [photographers]
+        
+        settings = get_studio_settings_snapshot()
+        slot_minutes = settings.time_slot_duration or 60
+        capacity = get_calendar_capacity(
+            start_date, end_date,
+            photographers=photographers or None,
+            by_photographer=cint(by_photographer),
+            settings=settings
+        )
         
-        # Initialize calendar data
         calendar_data = {}
-        current_date = start
-        
-        # Generate all dates in range
-        while current_date <= end:
-            date_str = current_date.strftime('%Y-%m-%d')
-            calendar_data[date_str] = {
-                'status': 'available',
-                'bookings_count': 0,
-                'total_slots': 13,  # 9 AM to 9 PM = 13 slots
-                'available_slots': 13
-            }
-            current_date += timedelta(days=1)
-        
-        # Try to get bookings if Booking doctype exists
-        if frappe.db.exists("DocType", "Booking"):
-            # Get all bookings in the date range using SQL
-            bookings = frappe.db.sql("""
-                SELECT DATE(booking_date) as booking_date, status 
-                FROM `tabBooking` 
-                WHERE DATE(booking_date) BETWEEN %s AND %s 
-                AND status NOT IN ('Cancelled')
-            """, (start_date, end_date), as_dict=True)
+        for date_str, day in capacity.items():
+            data = dict(day)
+            data['total_slots'] = day['open_minutes'] // slot_minutes
+            data['available_slots'] = day['remaining_minutes'] // slot_minutes
             
-            # Process bookings
-            for booking in bookings:
-                booking_date_str = str(booking.booking_date)
-                if booking_date_str in calendar_data:
-                    calendar_data[booking_date_str]['bookings_count'] += 1
-                    calendar_data[booking_date_str]['available_slots'] -= 1
-        
-        # Determine status for each day
-        for date_str, data in calendar_data.items():
-            if data['available_slots'] <= 0:
+            if not day['is_working_day']:
+                data['status'] = 'closed'
+            elif data['available_slots'] <= 0:
                 data['status'] = 'fully_booked'
-            elif data['available_slots'] >= 10:  # Most slots available (10+ out of 13)
+            elif day['utilisation'] <= 0.25:
                 data['status'] = 'available'
             else:
-                data['status'] = 'partially_booked'  # Some bookings but still has available slots
+                data['status'] = 'partially_booked'
+            calendar_data[date_str] = data
         
         return {
             'success': True,
+            'slot_minutes': slot_minutes,
             'calendar_data': calendar_data
         }
         
     except Exception as e:
-        # Fallback: return all days as available
-        from datetime import datetime, timedelta
-        try:
-            start = datetime.strptime(start_date, '%Y-%m-%d')
-            end = datetime.strptime(end_date, '%Y-%m-%d')
-            calendar_data = {}
-            current_date = start
-            
-            while current_date <= end:
-                date_str = current_date.strftime('%Y-%m-%d')
-                calendar_data[date_str] = {
-                    'status': 'available',
-                    'bookings_count': 0,
-                    'total_slots': 13,
-                    'available_slots': 13
-                }
-                current_date += timedelta(days=1)
-                
-            return {
-                'success': True,
-                'calendar_data': calendar_data
-            }
-        except:
-            return {
-                'success': False,
-                'calendar_data': {},
-                'error': str(e)
-            }
+        frappe.log_error(f"Error getting calendar availability: {str(e)}")
+        return {
+            'success': False,
+            'calendar_data': {},
+            'error': str(e)
+        }
 
 @frappe.whitelist()
 def get_photographer_discounted_hourly_price(photographer: str, service: str):
@@ -509,30 +500,33 @@ def get_available_photographers(date=None, service_id=None):
             'success': True,
             'photographers': photographers
         }
+    except Exception as e:
+        frappe.log_error(f"Error getting available photographers: {str(e)}")
+        return {
+            'success': False,
+            'photographers': [],
+            'error': str(e)
+        }
 
 @frappe.whitelist(allow_guest=True)
 def get_bookings(date=None, photographer=None):
-    """Return existing bookings (basic fields) for a given date (and optional photographer) to display on public booking page."""
+    """Return existing bookings (basic fields) for a given date (and optional photographer) to display on public booking page.
+    Service bookings and package booking dates come from the shared availability source."""
     try:
         if not date:
             return { 'success': True, 'bookings': [] }
-        filters = { 'booking_date': date, 'docstatus': ['!=', 2] }
-        if photographer:
-            filters['photographer'] = photographer
-        rows = frappe.get_all(
-            'Booking',
-            filters=filters,
-            fields=['name','booking_type','service','service_package','start_time','end_time','status','photographer'] ,
-            order_by='start_time'
-        )
+        from re_studio_booking.re_studio_booking.doctype.booking.booking_availability import get_booked_intervals, time_to_seconds
+        intervals = get_booked_intervals([date], photographers=[photographer] if photographer else None)
+        # لا نعرض اسم العميل في الصفحة العامة
+        rows = [{
+            'name': row.name,
+            'booking_type': row.booking_type,
+            'start_time': row.start_time,
+            'end_time': row.end_time,
+            'status': row.status,
+            'photographer': row.photographer
+        } for row in sorted(intervals, key=lambda r: time_to_seconds(r.start_time) or 0)]
         return { 'success': True, 'bookings': rows }
     except Exception as e:
         frappe.log_error(f"Error getting bookings: {str(e)}")
         return { 'success': False, 'bookings': [], 'error': str(e) }
-    except Exception as e:
-        frappe.log_error(f"Error getting available photographers: {str(e)}")
-        return {
-            'success': False,
-            'photographers': [],
-            'error': str(e)
-        }
\ No newline at end of file
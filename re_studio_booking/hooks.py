@@ -246,6 +246,19 @@ desk_sidebar_items = {
 # 	],
 # }
 
+scheduler_events = {
+    # Retries and anything left in the Booking Email queue
+    "all": [
+        "re_studio_booking.re_studio_booking.doctype.booking_email.booking_email.process_email_queue"
+    ],
+    "daily": [
+        # Consolidated invoice journals (only when enabled in General Settings)
+        "re_studio_booking.re_studio_booking.doctype.invoice_journal_batch.invoice_journal_batch.post_pending_invoice_journals",
+        # Paid / Partially Paid / Overdue for all open invoices, without re-saving them
+        "re_studio_booking.re_studio_booking.utils.invoice_status.update_invoice_statuses"
+    ],
+}
+
 # Testing
 # -------
 
@@ -326,14 +339,42 @@ desk_sidebar_items = {
 # ---------------
 
 doc_events = {
+    "Booking": {
+        "on_update": [
+            "re_studio_booking.re_studio_booking.utils.response_cache.invalidate_response_cache",
+            "re_studio_booking.re_studio_booking.hooks_realtime.on_booking_update"
+        ],
+        "on_trash": [
+            "re_studio_booking.re_studio_booking.utils.response_cache.invalidate_response_cache",
+            "re_studio_booking.re_studio_booking.hooks_realtime.on_booking_trash"
+        ]
+    },
+    "Photographer": {
+        "on_update": "re_studio_booking.re_studio_booking.utils.response_cache.invalidate_response_cache",
+        "on_trash": "re_studio_booking.re_studio_booking.utils.response_cache.invalidate_response_cache"
+    },
     "Service": {
         "after_insert": "re_studio_booking.re_studio_booking.hooks_realtime.on_service_update",
-        "on_update": "re_studio_booking.re_studio_booking.hooks_realtime.on_service_update",
+        "on_update": [
+            "re_studio_booking.re_studio_booking.hooks_realtime.on_service_update",
+            "re_studio_booking.re_studio_booking.utils.response_cache.invalidate_response_cache"
+        ],
+        "on_trash": [
+            "re_studio_booking.re_studio_booking.utils.response_cache.invalidate_response_cache",
+            "re_studio_booking.re_studio_booking.hooks_realtime.on_active_doc_trash"
+        ],
         "validate": "re_studio_booking.re_studio_booking.hooks_realtime.validate_service_deactivation"
     },
     "Service Package": {
         "after_insert": "re_studio_booking.re_studio_booking.hooks_realtime.on_service_package_update",
-        "on_update": "re_studio_booking.re_studio_booking.hooks_realtime.on_service_package_update",
+        "on_update": [
+            "re_studio_booking.re_studio_booking.hooks_realtime.on_service_package_update",
+            "re_studio_booking.re_studio_booking.utils.response_cache.invalidate_response_cache"
+        ],
+        "on_trash": [
+            "re_studio_booking.re_studio_booking.utils.response_cache.invalidate_response_cache",
+            "re_studio_booking.re_studio_booking.hooks_realtime.on_active_doc_trash"
+        ],
         "validate": "re_studio_booking.re_studio_booking.hooks_realtime.validate_package_deactivation"
     },
     "Terms and Conditions": {
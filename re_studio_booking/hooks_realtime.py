@@ -4,37 +4,36 @@
 import frappe
 from frappe import _
 
+from re_studio_booking.re_studio_booking.utils.realtime_publisher import queue_realtime
+from re_studio_booking.re_studio_booking.utils.response_cache import cached_response
+
 def on_service_update(doc, method):
     """Hook called when Service document is updated"""
-    # Emit real-time event for service updates
-    frappe.publish_realtime(
-        event='service_updated',
-        message={
+    # Queued until commit; repeated saves of the same service send only the latest state
+    queue_realtime(
+        'service_updated',
+        {
             'service': doc.name,
             'is_active': doc.is_active,
             'service_name': doc.service_name
         },
-        user=frappe.session.user
+        user=frappe.session.user,
+        key=doc.name
     )
-    
-    # Log the update for debugging
-    frappe.logger().info(f"Service {doc.name} updated - Active: {doc.is_active}")
 
 def on_service_package_update(doc, method):
     """Hook called when Service Package document is updated"""
-    # Emit real-time event for package updates
-    frappe.publish_realtime(
-        event='package_updated',
-        message={
+    # Queued until commit; repeated saves of the same package send only the latest state
+    queue_realtime(
+        'package_updated',
+        {
             'package': doc.name,
             'is_active': doc.is_active,
             'package_name': doc.package_name_en
         },
-        user=frappe.session.user
+        user=frappe.session.user,
+        key=doc.name
     )
-    
-    # Log the update for debugging
-    frappe.logger().info(f"Package {doc.name} updated - Active: {doc.is_active}")
 
 def validate_service_deactivation(doc, method):
     """Validate service deactivation and show warnings"""
@@ -69,24 +68,40 @@ def validate_package_deactivation(doc, method):
             )
 
 @frappe.whitelist()
+@cached_response(tags=("service",), per_user=False)
 def get_realtime_stats():
-    """Get current statistics for real-time updates"""
+    """Get current statistics for real-time updates
+
+    One grouped count per doctype, cached until a Service / Service Package
+    changes; clients keep the numbers current from the dashboard deltas.
+    """
+    services = _count_by_active("Service")
+    packages = _count_by_active("Service Package")
     stats = {
         'services': {
-            'total': frappe.db.count("Service"),
-            'active': frappe.db.count("Service", {"is_active": 1}),
-            'inactive': frappe.db.count("Service", {"is_active": 0})
+            'total': services[0] + services[1],
+            'active': services[1],
+            'inactive': services[0]
         },
         'packages': {
-            'total': frappe.db.count("Service Package"),
-            'active': frappe.db.count("Service Package", {"is_active": 1}),
+            'total': packages[0] + packages[1],
+            'active': packages[1],
             'featured': 0,  # No featured field in Service Package doctype
-            'inactive': frappe.db.count("Service Package", {"is_active": 0})
+            'inactive': packages[0]
         }
     }
     
     return stats
 
+def _count_by_active(doctype):
+    """{0: inactive count, 1: active count}"""
+    counts = {0: 0, 1: 0}
+    for is_active, count in frappe.db.sql(
+        f"SELECT is_active, COUNT(*) FROM `tab{doctype}` GROUP BY is_active"
+    ):
+        counts[1 if is_active else 0] += count
+    return counts
+
 @frappe.whitelist()
 def toggle_service_status(service_name, is_active):
     """Toggle service active status"""
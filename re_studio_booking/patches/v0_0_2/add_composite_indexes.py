@@ -0,0 +1,15 @@
+# Copyright (c) 2025, Masar Digital Group and contributors
+# For license information, please see license.txt
+
+from re_studio_booking.re_studio_booking.utils.performance import ensure_composite_indexes
+
+
+def execute():
+    """
+    Create composite indexes for Booking, Package Booking Date, GL Entry,
+    Shift Transaction and Booking Notification matching the filters used by
+    availability checks, dashboards and reports:
+    (booking_date, status), (photographer, booking_date), (parent),
+    (booking_date, start_time, end_time) ...
+    """
+    ensure_composite_indexes()
@@ -0,0 +1,15 @@
+# Copyright (c) 2025, Masar Digital Group and contributors
+# For license information, please see license.txt
+
+import frappe
+
+from re_studio_booking.re_studio_booking.doctype.account_balance_snapshot.account_balance_snapshot import (
+    rebuild_balance_snapshots,
+)
+
+
+def execute():
+    """Fill Account Balance Snapshot from the existing GL Entries"""
+    frappe.reload_doc("re_studio_booking", "doctype", "gl_entry")
+    frappe.reload_doc("re_studio_booking", "doctype", "account_balance_snapshot")
+    rebuild_balance_snapshots(commit=False)
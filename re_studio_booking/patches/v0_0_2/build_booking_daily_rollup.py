@@ -0,0 +1,12 @@
+# Copyright (c) 2025, Masar Digital Group and contributors
+# For license information, please see license.txt
+
+import frappe
+
+from re_studio_booking.re_studio_booking.doctype.booking_daily_rollup.booking_daily_rollup import rebuild_booking_rollup
+
+
+def execute():
+    """Fill Booking Daily Rollup from the existing bookings"""
+    frappe.reload_doc("re_studio_booking", "doctype", "booking_daily_rollup")
+    rebuild_booking_rollup(commit=False)
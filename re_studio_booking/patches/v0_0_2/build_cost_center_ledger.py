@@ -0,0 +1,14 @@
+# Copyright (c) 2025, Masar Digital Group and contributors
+# For license information, please see license.txt
+
+import frappe
+
+from re_studio_booking.re_studio_booking.doctype.cost_center_ledger_entry.cost_center_ledger_entry import (
+    check_cost_center_ledger,
+)
+
+
+def execute():
+    """Build Cost Center Ledger Entry from the existing shifts and transfers"""
+    frappe.reload_doc("re_studio_booking", "doctype", "cost_center_ledger_entry")
+    check_cost_center_ledger(repair=True)
@@ -0,0 +1,14 @@
+# Copyright (c) 2025, Masar Digital Group and contributors
+# For license information, please see license.txt
+
+import frappe
+
+from re_studio_booking.re_studio_booking.doctype.booking_notification_counter.booking_notification_counter import (
+    rebuild_unread_counters,
+)
+
+
+def execute():
+    """Fill Booking Notification Counter from the existing unread notifications"""
+    frappe.reload_doc("re_studio_booking", "doctype", "booking_notification_counter")
+    rebuild_unread_counters()
@@ -0,0 +1,32 @@
+# Copyright (c) 2025, Masar Digital Group and contributors
+# For license information, please see license.txt
+
+import frappe
+
+
+def execute():
+    """Fill Booking Invoice.posted_amount for invoices that already have a journal entry"""
+    frappe.reload_doc("re_studio_booking", "doctype", "booking_invoice")
+
+    # posted in consolidated batches: the amounts recorded in the posted batches
+    frappe.db.sql("""
+        UPDATE `tabBooking Invoice` bi
+        INNER JOIN (
+            SELECT item.invoice, SUM(item.amount) AS amount
+            FROM `tabInvoice Journal Batch Item` item
+            INNER JOIN `tabInvoice Journal Batch` batch ON batch.name = item.parent
+            WHERE batch.status = 'Posted'
+            GROUP BY item.invoice
+        ) posted ON posted.invoice = bi.name
+        SET bi.posted_amount = posted.amount
+    """)
+
+    # posted with a journal entry of their own: the whole paid amount
+    frappe.db.sql("""
+        UPDATE `tabBooking Invoice` bi
+        INNER JOIN `tabJournal Entry` je ON je.name = bi.journal_entry AND je.docstatus = 1
+        SET bi.posted_amount = bi.paid_amount
+        WHERE NOT EXISTS (
+            SELECT 1 FROM `tabInvoice Journal Batch` batch WHERE batch.journal_entry = bi.journal_entry
+        )
+    """)
@@ -226,13 +226,32 @@ class AdminDashboardUtils {
         });
     }
     
-    // Auto-refresh data
-    setupAutoRefresh(interval = 300000) { // Default 5 minutes
-        setInterval(() => {
-            if (window.current_admin_dashboard && $('.nav-item.active').data('section') === 'dashboard') {
-                window.current_admin_dashboard.load_dashboard_data();
+    // Realtime dashboard deltas (replaces the polling timer)
+    // The server publishes `re_studio_dashboard_delta` to the doctype rooms on every
+    // Booking / Service / Service Package change; the open dashboard applies it locally.
+    // A full reload only happens after a reconnect, since deltas may have been missed.
+    setupRealtimeUpdates(doctypes = ['Booking', 'Service', 'Service Package']) {
+        if (!frappe.realtime) return;
+        
+        const subscribe = () => doctypes.forEach(doctype => frappe.realtime.doctype_subscribe(doctype));
+        subscribe();
+        
+        frappe.realtime.on('re_studio_dashboard_delta', (message) => {
+            if (window.current_admin_dashboard && window.current_admin_dashboard.apply_delta) {
+                // Deltas of one transaction arrive together as {batch: [...]}
+                (message.batch || [message]).forEach(delta => window.current_admin_dashboard.apply_delta(delta));
             }
-        }, interval);
+        });
+        
+        const socket = frappe.realtime.socket;
+        if (socket && socket.io) {
+            socket.io.on('reconnect', () => {
+                subscribe();
+                if (window.current_admin_dashboard) {
+                    window.current_admin_dashboard.load_dashboard_data();
+                }
+            });
+        }
     }
     
     // Responsive sidebar toggle
@@ -266,7 +285,7 @@ class AdminDashboardUtils {
     init() {
         this.initializeTooltips();
         this.setupKeyboardShortcuts();
-        this.setupAutoRefresh();
+        this.setupRealtimeUpdates();
         this.setupResponsiveSidebar();
         
         // Show keyboard shortcuts help
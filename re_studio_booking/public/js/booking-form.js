@@ -166,6 +166,11 @@ class ModernCalendar {
                     title = 'محجوز بالكامل';
                     classes += ' disabled';
                     break;
+                case 'closed':
+                    availabilityClass = 'booked';
+                    title = 'يوم عطلة';
+                    classes += ' disabled';
+                    break;
                 default:
                     availabilityClass = 'loading';
                     title = 'جاري التحميل...';
@@ -303,6 +308,11 @@ class ModernCalendar {
                         dayElement.title = 'محجوز بالكامل';
                         dayElement.onclick = null;
                         break;
+                    case 'closed':
+                        dayElement.classList.add('booked', 'disabled');
+                        dayElement.title = 'يوم عطلة';
+                        dayElement.onclick = null;
+                        break;
                 }
                 
                 // Update availability indicator
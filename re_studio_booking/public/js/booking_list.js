@@ -27,22 +27,26 @@ frappe.listview_settings['Booking'] = {
         // Add bulk actions
         if (frappe.user.has_role(['System Manager', 'Re Studio Manager'])) {
             listview.page.add_menu_item(__('تأكيد الحجوزات المحددة'), function() {
-                listview.call_for_selected_items('re_studio_booking.re_studio_booking.doctype.booking.booking.bulk_update_status', {
-                    status: 'Confirmed'
-                });
+                bulk_update_booking_status(listview, 'Confirmed');
             });
             
             listview.page.add_menu_item(__('إكمال الحجوزات المحددة'), function() {
-                listview.call_for_selected_items('re_studio_booking.re_studio_booking.doctype.booking.booking.bulk_update_status', {
-                    status: 'Completed'
-                });
+                bulk_update_booking_status(listview, 'Completed');
             });
             
             listview.page.add_menu_item(__('إلغاء الحجوزات المحددة'), function() {
-                listview.call_for_selected_items('re_studio_booking.re_studio_booking.doctype.booking.booking.bulk_update_status', {
-                    status: 'Cancelled'
-                });
+                bulk_update_booking_status(listview, 'Cancelled');
             });
+            
+            // Large selections run in the background; the server reports progress
+            // (frappe.publish_progress) and the final summary on this event
+            if (!listview.bulk_status_listener) {
+                listview.bulk_status_listener = true;
+                frappe.realtime.on('booking_bulk_status_done', function(result) {
+                    show_bulk_status_summary(result);
+                    listview.refresh();
+                });
+            }
         }
     },
     
@@ -194,4 +198,65 @@ frappe.listview_settings['Booking'] = {
             </div>
         `);
     }
-};
\ No newline at end of file
+};
+
+function bulk_update_booking_status(listview, status) {
+    let names = listview.get_checked_items(true);
+    if (!names.length) {
+        frappe.msgprint(__('يرجى تحديد حجز واحد على الأقل'));
+        return;
+    }
+    
+    frappe.confirm(
+        __('تغيير حالة {0} حجز إلى {1}؟', [names.length, __(status)]),
+        function() {
+            frappe.call({
+                method: 're_studio_booking.re_studio_booking.doctype.booking.booking.bulk_update_status',
+                args: {
+                    names: names,
+                    status: status
+                },
+                freeze: names.length <= 200,
+                callback: function(r) {
+                    if (!r.message) return;
+                    
+                    if (r.message.queued) {
+                        frappe.show_alert({message: r.message.message, indicator: 'blue'});
+                        listview.clear_checked_items();
+                        return;
+                    }
+                    
+                    show_bulk_status_summary(r.message);
+                    listview.clear_checked_items();
+                    listview.refresh();
+                }
+            });
+        }
+    );
+}
+
+function show_bulk_status_summary(result) {
+    if (!result.success && result.success !== undefined) {
+        frappe.msgprint({message: result.message, indicator: 'red'});
+        return;
+    }
+    
+    let skipped = result.skipped || [];
+    if (!skipped.length) {
+        frappe.show_alert({message: __('تم تحديث {0} حجز', [result.updated]), indicator: 'green'});
+        return;
+    }
+    
+    let rows = skipped.map(row => `<tr><td>${row.name}</td><td>${row.reason}</td></tr>`).join('');
+    frappe.msgprint({
+        title: __('نتيجة التحديث المجمع'),
+        indicator: 'orange',
+        message: `
+            <p>${__('تم تحديث {0} حجز، وتم تجاهل {1}', [result.updated, skipped.length])}</p>
+            <table class="table table-bordered table-sm">
+                <thead><tr><th>${__('الحجز')}</th><th>${__('السبب')}</th></tr></thead>
+                <tbody>${rows}</tbody>
+            </table>
+        `
+    });
+}
@@ -75,6 +75,49 @@ re_studio_booking = {
     // Create a new booking
     createNewBooking: function() {
         frappe.new_doc('Booking');
+    },
+    
+    // Streaming export as a background job (Booking Export):
+    // shows the progress and opens the file when it is ready
+    startExport: function(exportType, fileFormat, filters) {
+        frappe.call({
+            method: 're_studio_booking.re_studio_booking.doctype.booking_export.booking_export.start_export',
+            args: {
+                export_type: exportType,
+                file_format: fileFormat || 'CSV',
+                filters: filters || {}
+            },
+            callback: function(r) {
+                if (!r.message) return;
+                
+                const exportName = r.message.name;
+                const title = __('تصدير {0}', [__(exportType)]);
+                frappe.show_progress(title, 0, 100, __('في الانتظار...'));
+                
+                const onProgress = function(data) {
+                    if (data.name !== exportName) return;
+                    
+                    if (data.status === 'Running') {
+                        frappe.show_progress(title, data.progress, 100, __('{0} من {1} صف', [data.rows, data.total]));
+                        return;
+                    }
+                    
+                    frappe.realtime.off('booking_export_progress', onProgress);
+                    frappe.hide_progress();
+                    if (data.status === 'Completed') {
+                        frappe.msgprint({
+                            title: title,
+                            indicator: 'green',
+                            message: __('تم تصدير {0} صف.', [data.rows]) +
+                                ` <a href="${encodeURI(data.file_url)}" target="_blank">${__('تحميل الملف')}</a>`
+                        });
+                    } else {
+                        frappe.msgprint({title: title, indicator: 'red', message: data.error || __('فشل التصدير')});
+                    }
+                };
+                frappe.realtime.on('booking_export_progress', onProgress);
+            }
+        });
     }
 };
 
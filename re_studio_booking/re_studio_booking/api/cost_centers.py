@@ -12,6 +12,8 @@ from frappe import _
 from frappe.utils import flt, now_datetime, nowdate
 from frappe.model.document import Document
 
+from re_studio_booking.re_studio_booking.doctype.shift.shift import post_shift_transaction
+
 
 @frappe.whitelist()
 def open_shift(cost_center_name, expected_opening_balance=None):
@@ -88,16 +90,9 @@ def add_shift_transaction(shift_name, trx_type, payment_method, amount,
 	if not frappe.has_permission("Shift", "write"):
 		frappe.throw(_("ليس لديك صلاحية تعديل الوردية"))
 	
-	# Get shift
-	shift = frappe.get_doc("Shift", shift_name)
-	
-	# Check if can add transaction
-	can_add, message = shift.can_add_transaction()
-	if not can_add:
-		frappe.throw(_(message))
-	
-	# Add transaction
-	row = shift.add_transaction(
+	# Add transaction (single row insert; the shift is locked, not loaded and re-saved)
+	row = post_shift_transaction(
+		shift_name,
 		trx_type=trx_type,
 		payment_method=payment_method,
 		amount=flt(amount),
@@ -195,30 +190,29 @@ def create_shift_closing_journal(shift):
 		"doctype": "Journal Entry",
 		"voucher_type": "Journal Entry",
 		"posting_date": nowdate(),
-		"company": cost_center.company,
-		"user_remark": f"فرق إغلاق الوردية {shift.name} - الفرق: {difference}",
-		"accounts": []
+		"remarks": f"فرق إغلاق الوردية {shift.name} - الفرق: {difference}",
+		"entries": []
 	})
 	
 	if difference > 0:
 		# Actual is more than theoretical (Cash Over)
-		je.append("accounts", {
+		je.append("entries", {
 			"account": cost_center.default_account,
-			"debit_in_account_currency": abs(difference)
+			"debit": abs(difference)
 		})
-		je.append("accounts", {
+		je.append("entries", {
 			"account": difference_account,
-			"credit_in_account_currency": abs(difference)
+			"credit": abs(difference)
 		})
 	else:
 		# Actual is less than theoretical (Cash Short)
-		je.append("accounts", {
+		je.append("entries", {
 			"account": difference_account,
-			"debit_in_account_currency": abs(difference)
+			"debit": abs(difference)
 		})
-		je.append("accounts", {
+		je.append("entries", {
 			"account": cost_center.default_account,
-			"credit_in_account_currency": abs(difference)
+			"credit": abs(difference)
 		})
 	
 	je.insert()
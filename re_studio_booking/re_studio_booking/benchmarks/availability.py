@@ -0,0 +1,179 @@
+# Copyright (c) 2023, MASAR TEAM and contributors
+# For license information, please see license.txt
+
+"""
+Benchmark: availability check on booking save
+
+Compares the interval-index path of validate_availability with the previous
+per-slot query path for package bookings with 1, 10 and 50 dates.
+
+Run:
+	bench --site <site> execute re_studio_booking.re_studio_booking.benchmarks.availability.run
+
+All synthetic rows are inserted inside a transaction that is rolled back.
+"""
+
+import time
+from contextlib import contextmanager
+
+import frappe
+from frappe.utils import add_days, nowdate
+
+from re_studio_booking.re_studio_booking.doctype.booking.booking_validations import validate_availability
+
+PREFIX = "BENCH-AV"
+PHOTOGRAPHERS = 5
+
+
+def run(days=60, bookings_per_day=10, repeat=5):
+	"""Seed a busy calendar, time both paths and print a summary table."""
+	try:
+		_seed(days, bookings_per_day)
+		results = []
+		for dates_count in (1, 10, 50):
+			doc = _make_package_booking(dates_count)
+			legacy_time, legacy_queries = _measure(lambda: _legacy_validate_availability(doc), repeat)
+			index_time, index_queries = _measure(lambda: validate_availability(doc), repeat)
+			results.append((dates_count, legacy_time, legacy_queries, index_time, index_queries))
+
+		print(f"{'dates':>6} | {'legacy ms':>10} | {'queries':>7} | {'index ms':>9} | {'queries':>7}")
+		for dates_count, legacy_time, legacy_queries, index_time, index_queries in results:
+			print(
+				f"{dates_count:>6} | {legacy_time * 1000:>10.2f} | {legacy_queries:>7} | "
+				f"{index_time * 1000:>9.2f} | {index_queries:>7}"
+			)
+		return results
+	finally:
+		frappe.db.rollback()
+
+
+def _seed(days, bookings_per_day):
+	"""Insert Service bookings and Package Booking Date rows for every day."""
+	start = add_days(nowdate(), 1)
+	bookings = []
+	package_dates = []
+	for day in range(days):
+		booking_date = add_days(start, day)
+		for slot in range(bookings_per_day):
+			hour = 9 + slot
+			photographer = f"{PREFIX}-PH-{slot % PHOTOGRAPHERS}"
+			name = f"{PREFIX}-{day}-{slot}"
+			if slot % 2:
+				bookings.append((
+					name, "Service", booking_date, f"{hour:02d}:00:00", f"{hour:02d}:45:00",
+					"Confirmed", photographer, f"Client {name}"
+				))
+			else:
+				bookings.append((name, "Package", None, None, None, "Confirmed", photographer, f"Client {name}"))
+				package_dates.append((
+					f"{name}-D", name, "Booking", "package_booking_dates",
+					booking_date, f"{hour:02d}:00:00", f"{hour:02d}:45:00"
+				))
+		# حجوزات ملغاة في نفس وقت الحجز المختبر: لا تسبب تعارضاً لكنها تُقرأ في المسار القديم
+		for slot in range(3):
+			name = f"{PREFIX}-{day}-X{slot}"
+			bookings.append((name, "Package", None, None, None, "Cancelled", f"{PREFIX}-PH-0", f"Client {name}"))
+			package_dates.append((
+				f"{name}-D", name, "Booking", "package_booking_dates",
+				booking_date, "22:00:00", "23:00:00"
+			))
+
+	frappe.db.bulk_insert(
+		"Booking",
+		["name", "booking_type", "booking_date", "start_time", "end_time", "status", "photographer", "client_name"],
+		bookings
+	)
+	frappe.db.bulk_insert(
+		"Package Booking Date",
+		["name", "parent", "parenttype", "parentfield", "booking_date", "start_time", "end_time"],
+		package_dates
+	)
+
+
+def _make_package_booking(dates_count):
+	"""An unsaved package booking whose slots only overlap cancelled rows, so every check runs to the end."""
+	start = add_days(nowdate(), 1)
+	return frappe.get_doc({
+		"doctype": "Booking",
+		"booking_type": "Package",
+		"photographer": f"{PREFIX}-PH-0",
+		"package_booking_dates": [
+			{"booking_date": add_days(start, i), "start_time": "22:00:00", "end_time": "23:00:00"}
+			for i in range(dates_count)
+		]
+	})
+
+
+@contextmanager
+def _count_queries(counter):
+	original_sql = frappe.db.sql
+
+	def counting_sql(*args, **kwargs):
+		counter[0] += 1
+		return original_sql(*args, **kwargs)
+
+	frappe.db.sql = counting_sql
+	try:
+		yield
+	finally:
+		frappe.db.sql = original_sql
+
+
+def _measure(fn, repeat):
+	"""Best wall time of `repeat` runs and the number of queries of one run."""
+	counter = [0]
+	with _count_queries(counter):
+		fn()
+	best = None
+	for _ in range(repeat):
+		started = time.perf_counter()
+		fn()
+		elapsed = time.perf_counter() - started
+		best = elapsed if best is None else min(best, elapsed)
+	return best, counter[0]
+
+
+# ============ Previous implementation (reference only) ============
+
+def _legacy_validate_availability(booking_doc):
+	for row in booking_doc.package_booking_dates:
+		_legacy_check_single_date_availability(booking_doc, row.booking_date, row.start_time, row.end_time)
+
+
+def _legacy_check_single_date_availability(booking_doc, check_date, check_start, check_end):
+	"""Query pattern of validate_availability before the interval index."""
+	if getattr(booking_doc, 'photographer', None):
+		if frappe.get_all("Booking", filters=[
+			["booking_type", "=", "Service"],
+			["booking_date", "=", check_date],
+			["photographer", "=", booking_doc.photographer],
+			["status", "not in", ["Cancelled"]],
+			["name", "!=", booking_doc.name or "new"],
+			["start_time", "<", check_end],
+			["end_time", ">", check_start]
+		]):
+			return True
+
+		for pkg_date in frappe.get_all("Package Booking Date", filters=[
+			["booking_date", "=", check_date],
+			["start_time", "<", check_end],
+			["end_time", ">", check_start]
+		], fields=["parent"]):
+			frappe.db.get_value("Booking", pkg_date.parent, ["photographer", "status", "name"], as_dict=True)
+
+	if frappe.get_all("Booking", filters=[
+		["booking_type", "=", "Service"],
+		["booking_date", "=", check_date],
+		["status", "not in", ["Cancelled"]],
+		["name", "!=", booking_doc.name or "new"],
+		["start_time", "<", check_end],
+		["end_time", ">", check_start]
+	]):
+		return True
+
+	for pkg_date in frappe.get_all("Package Booking Date", filters=[
+		["booking_date", "=", check_date],
+		["start_time", "<", check_end],
+		["end_time", ">", check_start]
+	], fields=["parent"]):
+		frappe.db.get_value("Booking", pkg_date.parent, ["status", "client_name"], as_dict=True)
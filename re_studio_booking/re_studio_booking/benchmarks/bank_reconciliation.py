@@ -0,0 +1,158 @@
+# Copyright (c) 2023, MASAR TEAM and contributors
+# For license information, please see license.txt
+
+"""
+Benchmark: bank reconciliation engine (utils/bank_reconciliation.py)
+
+Seeds 100k GL Entries for a synthetic bank account, builds a 100k line CSV
+statement (most lines match by amount within a few days, some by reference,
+some not at all), then times parsing, import, the first reconciliation and an
+incremental second run that only sees the lines left unmatched. The in-memory
+matcher is also compared with a nested scan on a sample.
+
+Run:
+	bench --site <site> execute re_studio_booking.re_studio_booking.benchmarks.bank_reconciliation.run
+	bench --site <site> execute re_studio_booking.re_studio_booking.benchmarks.bank_reconciliation.run --kwargs "{'rows': 10000}"
+
+All synthetic rows are inserted inside a transaction that is rolled back.
+"""
+
+import random
+import time
+
+import frappe
+from frappe.utils import add_days, getdate
+
+from re_studio_booking.re_studio_booking.utils.bank_reconciliation import (
+	DATE_TOLERANCE,
+	amount_key,
+	import_statement,
+	match_lines,
+	parse_statement,
+	reconcile_bank_account,
+)
+
+BANK_ACCOUNT = "BENCH-BR"
+CHUNK = 10_000
+
+
+def run(rows=100_000, days=365, sample=2_000):
+	"""Seed, time every phase and print a summary table."""
+	random.seed(7)
+	try:
+		entries = _seed_entries(rows, days)
+		content = _make_statement(entries)
+		results = []
+
+		started = time.perf_counter()
+		transactions = parse_statement(content, "bench.csv")
+		results.append(("parse CSV", time.perf_counter() - started, len(transactions)))
+
+		started = time.perf_counter()
+		imported = import_statement(BANK_ACCOUNT, transactions, "bench.csv")
+		results.append(("import lines", time.perf_counter() - started, imported))
+
+		started = time.perf_counter()
+		first = reconcile_bank_account(BANK_ACCOUNT)
+		results.append(("reconcile (all lines)", time.perf_counter() - started, first["matched"]))
+
+		started = time.perf_counter()
+		second = reconcile_bank_account(BANK_ACCOUNT)
+		results.append(("reconcile (incremental)", time.perf_counter() - started, second["lines"]))
+
+		lines = [
+			{"name": str(i), "transaction_date": t["transaction_date"], "amount": t["amount"], "reference": t["reference"]}
+			for i, t in enumerate(transactions[:sample])
+		]
+		sample_entries = entries[:sample]
+		started = time.perf_counter()
+		match_lines(lines, sample_entries)
+		results.append((f"match_lines ({sample} x {sample})", time.perf_counter() - started, sample))
+		started = time.perf_counter()
+		_nested_scan(lines, sample_entries)
+		results.append((f"nested scan ({sample} x {sample})", time.perf_counter() - started, sample))
+
+		print(f"{'phase':<32} | {'seconds':>8} | {'rows':>8}")
+		for label, elapsed, count in results:
+			print(f"{label:<32} | {elapsed:>8.3f} | {count:>8}")
+		print(f"matched {first['matched']} of {first['lines']} lines, {first['unmatched']} left for the next run")
+		return results
+	finally:
+		frappe.db.rollback()
+
+
+def _seed_entries(rows, days):
+	"""GL Entries of the bank account: amounts repeat often so buckets hold several entries."""
+	start = getdate("2030-01-01")
+	entries = []
+	batch = []
+	for i in range(rows):
+		amount = random.choice((1, -1)) * random.randint(100, 50_000) / 100.0
+		entry = {
+			"name": f"{BANK_ACCOUNT}-GL-{i}",
+			"posting_date": add_days(start, random.randint(0, days)),
+			"amount": amount,
+			"reference": f"INV-{i}" if i % 10 >= 5 else None,
+		}
+		entries.append(entry)
+		batch.append((
+			entry["name"], entry["posting_date"], "Bank", BANK_ACCOUNT,
+			max(amount, 0), max(-amount, 0), "Journal Entry" if entry["reference"] else None, entry["reference"],
+		))
+		if len(batch) >= CHUNK:
+			_flush(batch)
+			batch = []
+	_flush(batch)
+	return entries
+
+
+def _flush(batch):
+	if batch:
+		frappe.db.bulk_insert(
+			"GL Entry",
+			["name", "posting_date", "account", "bank_account", "debit", "credit", "reference_doctype", "reference_name"],
+			batch
+		)
+
+
+def _make_statement(entries):
+	"""
+	One line per entry: 70% same amount within the date window, 20% carrying
+	the reference (date further away), 10% unrelated amounts
+	"""
+	out = ["Date,Description,Reference,Amount"]
+	for i, entry in enumerate(entries):
+		kind = i % 10
+		if kind < 7:
+			line_date = add_days(entry["posting_date"], random.randint(-DATE_TOLERANCE, DATE_TOLERANCE))
+			reference, amount = "", entry["amount"]
+		elif kind < 9 and entry["reference"]:
+			line_date = add_days(entry["posting_date"], random.randint(-15, 15))
+			reference, amount = entry["reference"], entry["amount"]
+		else:
+			line_date = entry["posting_date"]
+			reference, amount = "", 999_999 + i / 100.0
+		out.append(f"{line_date},Line {i},{reference},{amount:.2f}")
+	return "\n".join(out)
+
+
+# ============ Previous approach (reference only) ============
+
+def _nested_scan(lines, entries):
+	"""For every line, scan all entries for the closest open one with the same amount."""
+	used = set()
+	matches = []
+	for line in lines:
+		day = getdate(line["transaction_date"]).toordinal()
+		cents = amount_key(line["amount"])
+		best = None
+		for entry in entries:
+			if entry["name"] in used or amount_key(entry["amount"]) != cents:
+				continue
+			distance = abs(getdate(entry["posting_date"]).toordinal() - day)
+			if distance <= DATE_TOLERANCE and (best is None or distance < best[0]):
+				best = (distance, entry["name"])
+		if best:
+			used.add(best[1])
+			matches.append((line["name"], best[1]))
+	return matches
@@ -0,0 +1,146 @@
+# Copyright (c) 2023, MASAR TEAM and contributors
+# For license information, please see license.txt
+
+"""
+Benchmark: composite indexes (patches/v0_0_2/add_composite_indexes)
+
+Seeds a synthetic dataset (500k bookings by default), prints the EXPLAIN plan
+and best timing of the hot availability / dashboard / report queries without
+the composite indexes, then again after ensure_composite_indexes().
+
+Run on a development site only (index DDL commits implicitly):
+	bench --site <site> execute re_studio_booking.re_studio_booking.benchmarks.indexes.run
+	bench --site <site> execute re_studio_booking.re_studio_booking.benchmarks.indexes.run --kwargs "{'bookings': 50000}"
+
+Synthetic rows are deleted at the end.
+"""
+
+import random
+import time
+
+import frappe
+from frappe.utils import add_days, nowdate
+
+from re_studio_booking.re_studio_booking.utils.performance import (
+	drop_composite_indexes,
+	ensure_composite_indexes,
+)
+
+PREFIX = "BENCH-IX"
+CHUNK = 10_000
+
+QUERIES = {
+	"availability (date, time)": """
+		SELECT name FROM `tabBooking`
+		WHERE booking_type = 'Service' AND booking_date = %(day)s
+			AND start_time < '12:00:00' AND end_time > '11:00:00'
+			AND IFNULL(status, '') != 'Cancelled'
+	""",
+	"dashboard (date range, status)": """
+		SELECT COUNT(*), SUM(total_amount) FROM `tabBooking`
+		WHERE booking_date BETWEEN %(day)s AND %(day_end)s AND status = 'Confirmed'
+	""",
+	"photographer schedule": """
+		SELECT name, start_time, end_time FROM `tabBooking`
+		WHERE photographer = %(photographer)s AND booking_date BETWEEN %(day)s AND %(day_end)s
+	""",
+	"package dates (date, time)": """
+		SELECT pbd.parent FROM `tabPackage Booking Date` pbd
+		INNER JOIN `tabBooking` b ON b.name = pbd.parent
+		WHERE pbd.booking_date = %(day)s
+			AND pbd.start_time < '12:00:00' AND pbd.end_time > '11:00:00'
+	""",
+}
+
+
+def run(bookings=500_000, days=730, photographers=40, repeat=5):
+	"""Seed, measure without and with composite indexes, clean up."""
+	try:
+		_seed(bookings, days, photographers)
+		values = {
+			"day": add_days(nowdate(), days // 2),
+			"day_end": add_days(nowdate(), days // 2 + 30),
+			"photographer": f"{PREFIX}-PH-1",
+		}
+
+		drop_composite_indexes()
+		before = _measure_all(values, repeat)
+		ensure_composite_indexes()
+		after = _measure_all(values, repeat)
+
+		for label in QUERIES:
+			print(f"\n=== {label} ===")
+			for title, result in (("before", before[label]), ("after", after[label])):
+				print(f"  {title:<6} {result['ms']:>9.2f} ms")
+				for plan in result["plan"]:
+					print(f"         table={plan.get('table')} type={plan.get('type')} key={plan.get('key')} rows={plan.get('rows')}")
+		return {"before": before, "after": after}
+	finally:
+		_cleanup()
+
+
+def _seed(bookings, days, photographers):
+	start = nowdate()
+	rng = random.Random(42)
+	statuses = ["Confirmed", "Confirmed", "Confirmed", "Completed", "Cancelled"]
+	booking_rows = []
+	package_rows = []
+	for i in range(bookings):
+		hour = rng.randint(9, 20)
+		booking_date = add_days(start, rng.randint(0, days - 1))
+		name = f"{PREFIX}-{i}"
+		photographer = f"{PREFIX}-PH-{rng.randint(0, photographers - 1)}"
+		if i % 4:
+			booking_rows.append((
+				name, "Service", booking_date, f"{hour:02d}:00:00", f"{hour + 1:02d}:00:00",
+				rng.choice(statuses), photographer, rng.randint(100, 5000)
+			))
+		else:
+			booking_rows.append((name, "Package", booking_date, None, None, rng.choice(statuses), photographer, rng.randint(1000, 20000)))
+			package_rows.append((
+				f"{name}-D", name, "Booking", "package_booking_dates",
+				booking_date, f"{hour:02d}:00:00", f"{hour + 1:02d}:00:00"
+			))
+
+		if len(booking_rows) >= CHUNK:
+			_flush(booking_rows, package_rows)
+	_flush(booking_rows, package_rows)
+
+
+def _flush(booking_rows, package_rows):
+	if booking_rows:
+		frappe.db.bulk_insert(
+			"Booking",
+			["name", "booking_type", "booking_date", "start_time", "end_time", "status", "photographer", "total_amount"],
+			booking_rows
+		)
+	if package_rows:
+		frappe.db.bulk_insert(
+			"Package Booking Date",
+			["name", "parent", "parenttype", "parentfield", "booking_date", "start_time", "end_time"],
+			package_rows
+		)
+	frappe.db.commit()
+	booking_rows.clear()
+	package_rows.clear()
+
+
+def _measure_all(values, repeat):
+	results = {}
+	for label, query in QUERIES.items():
+		plan = frappe.db.sql(f"EXPLAIN {query}", values, as_dict=True)
+		best = None
+		for _ in range(repeat):
+			started = time.perf_counter()
+			frappe.db.sql(query, values)
+			elapsed = time.perf_counter() - started
+			best = elapsed if best is None else min(best, elapsed)
+		results[label] = {"ms": best * 1000, "plan": plan}
+	return results
+
+
+def _cleanup():
+	frappe.db.rollback()
+	frappe.db.sql("DELETE FROM `tabPackage Booking Date` WHERE name LIKE %s", (f"{PREFIX}-%",))
+	frappe.db.sql("DELETE FROM `tabBooking` WHERE name LIKE %s", (f"{PREFIX}-%",))
+	frappe.db.commit()
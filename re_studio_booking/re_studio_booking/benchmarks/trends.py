@@ -0,0 +1,91 @@
+# Copyright (c) 2023, MASAR TEAM and contributors
+# For license information, please see license.txt
+
+"""
+Benchmark: booking trends gap-filling
+
+Compares the previous gap-filling loop (a linear next() scan over the grouped
+rows for every chart point) with utils.time_series.build_series (dict keyed by
+bucket) on a synthetic 3-year daily range.
+
+Run:
+	bench --site <site> execute re_studio_booking.re_studio_booking.benchmarks.trends.run
+
+No database access: the rows are generated in memory, so it also runs with
+plain `python -m re_studio_booking.re_studio_booking.benchmarks.trends`.
+"""
+
+import random
+import time
+from datetime import date, timedelta
+
+from re_studio_booking.re_studio_booking.utils.time_series import DAILY, MONTHLY, WEEKLY, build_series
+
+
+def run(years=3, fill_ratio=0.7, repeat=5):
+	"""Time both paths for every granularity and print a summary table."""
+	start = date(2022, 1, 1)
+	end = start + timedelta(days=365 * years - 1)
+	rows = _make_rows(start, end, fill_ratio)
+
+	print(f"range: {start} .. {end} ({(end - start).days + 1} days, {len(rows)} rows)")
+	print(f"{'granularity':>11} | {'points':>6} | {'legacy ms':>10} | {'series ms':>10} | {'speedup':>7}")
+	for granularity in (DAILY, WEEKLY, MONTHLY):
+		series = build_series(rows, start, end, granularity, "rollup_date", ("booking_count", "revenue"))
+		legacy = _legacy_daily(rows, start, end) if granularity == DAILY else None
+		if legacy is not None:
+			assert legacy["bookings"] == series["booking_count"], "daily series mismatch"
+
+		legacy_time = _measure(lambda: _legacy_daily(rows, start, end), repeat) if granularity == DAILY else None
+		series_time = _measure(
+			lambda: build_series(rows, start, end, granularity, "rollup_date", ("booking_count", "revenue")),
+			repeat
+		)
+		legacy_cell = f"{legacy_time:>10.2f}" if legacy_time is not None else f"{'-':>10}"
+		speedup = f"{legacy_time / series_time:>6.0f}x" if legacy_time else f"{'-':>7}"
+		print(f"{granularity:>11} | {len(series['labels']):>6} | {legacy_cell} | {series_time:>10.2f} | {speedup}")
+
+
+def _make_rows(start, end, fill_ratio):
+	rng = random.Random(42)
+	rows = []
+	day = start
+	while day <= end:
+		if rng.random() < fill_ratio:
+			count = rng.randint(1, 8)
+			rows.append({"rollup_date": day, "booking_count": count, "revenue": count * 750.0})
+		day += timedelta(days=1)
+	return rows
+
+
+def _legacy_daily(rows, start, end):
+	"""The gap-filling loop that get_booking_trends used before build_series (daily branch)"""
+	trends = [
+		{"date_group": row["rollup_date"].strftime("%Y-%m-%d"), "booking_count": row["booking_count"], "revenue": row["revenue"]}
+		for row in rows
+	]
+	labels, bookings, revenue = [], [], []
+	current = start
+	while current <= end:
+		current_str = current.strftime("%Y-%m-%d")
+		data_for_date = next((t for t in trends if t["date_group"] == current_str), None)
+		labels.append(current.strftime("%d %b"))
+		bookings.append(data_for_date["booking_count"] if data_for_date else 0)
+		revenue.append(float(data_for_date["revenue"]) if data_for_date else 0)
+		current += timedelta(days=1)
+	return {"labels": labels, "bookings": bookings, "revenue": revenue}
+
+
+def _measure(fn, repeat):
+	"""Best wall time in milliseconds over `repeat` runs"""
+	best = None
+	for _ in range(repeat):
+		started = time.perf_counter()
+		fn()
+		elapsed = (time.perf_counter() - started) * 1000
+		best = elapsed if best is None else min(best, elapsed)
+	return best
+
+
+if __name__ == "__main__":
+	run()
@@ -0,0 +1,232 @@
+# Copyright (c) 2025, Masar Digital Group and contributors
+# For license information, please see license.txt
+
+"""
+Account Balance Snapshot
+مجاميع مدين / دائن قيود GL Entry لكل شهر بمفتاح (الحساب، مركز التكلفة، الطرف، الحساب البنكي)
+
+الرصيد في أي تاريخ = مجموع أشهر الجدول قبل شهر التاريخ + قيود GL من بداية ذلك الشهر فقط،
+أي عمل بعدد الأشهر بدلاً من عدد القيود. الجدول يُحدّث تزايدياً عند كتابة قيود GL
+(GLEntry.on_update / on_trash ومحرك الترحيل بالجملة عبر apply_gl_entries).
+"""
+
+import hashlib
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import add_days, flt, getdate, now
+
+SNAPSHOT_DOCTYPE = "Account Balance Snapshot"
+KEY_FIELDS = ("account", "cost_center", "party_type", "party", "bank_account")
+
+
+class AccountBalanceSnapshot(Document):
+	pass
+
+
+# ============ Incremental Update ============
+
+def get_period_start(posting_date):
+	return getdate(posting_date).replace(day=1)
+
+
+def apply_gl_entries(entries, sign=1):
+	"""
+	إضافة (أو طرح بـ sign=-1) قيود GL للجدول بجملة واحدة
+
+	Args:
+		entries: صفوف أو مستندات GL Entry (posting_date، KEY_FIELDS، debit، credit)
+		sign: 1 للقيود الجديدة، -1 للقيود المحذوفة
+	"""
+	delta = {}
+	for entry in entries:
+		key = (get_period_start(entry.get("posting_date")),) + tuple(entry.get(field) or "" for field in KEY_FIELDS)
+		totals = delta.setdefault(key, [0.0, 0.0])
+		totals[0] += sign * flt(entry.get("debit"))
+		totals[1] += sign * flt(entry.get("credit"))
+	apply_snapshot_delta(delta)
+
+
+def apply_snapshot_delta(delta):
+	"""
+	إضافة الفروق بـ INSERT ... ON DUPLICATE KEY UPDATE ثم حذف الصفوف التي أصبحت صفراً
+
+	Args:
+		delta: {(period_start, *KEY_FIELDS): [debit, credit]}
+	"""
+	delta = {key: totals for key, totals in delta.items() if abs(totals[0]) >= 0.005 or abs(totals[1]) >= 0.005}
+	if not delta:
+		return
+
+	timestamp = now()
+	user = frappe.session.user if getattr(frappe, "session", None) else "Administrator"
+	names = []
+	values = []
+	for key, totals in delta.items():
+		name = get_snapshot_name(key)
+		names.append(name)
+		values.extend([name, timestamp, timestamp, user, user, *key, totals[0], totals[1]])
+
+	placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"] * len(delta))
+	frappe.db.sql(f"""
+		INSERT INTO `tabAccount Balance Snapshot`
+			(name, creation, modified, owner, modified_by,
+			period_start, account, cost_center, party_type, party, bank_account,
+			debit, credit)
+		VALUES {placeholders}
+		ON DUPLICATE KEY UPDATE
+			debit = debit + VALUES(debit),
+			credit = credit + VALUES(credit),
+			modified = VALUES(modified),
+			modified_by = VALUES(modified_by)
+	""", values)
+
+	frappe.db.sql("""
+		DELETE FROM `tabAccount Balance Snapshot`
+		WHERE name IN %(names)s AND ABS(debit) < 0.005 AND ABS(credit) < 0.005
+	""", {"names": names})
+
+
+def get_snapshot_name(key):
+	"""اسم ثابت للصف مشتق من المفتاح (نفس صيغة rebuild_balance_snapshots)"""
+	return hashlib.md5("\x1f".join(str(part or "") for part in key).encode()).hexdigest()
+
+
+# ============ Balances ============
+
+def get_balances_before(date, filters=None, group_by=("account",), keys=None):
+	"""
+	مجاميع مدين / دائن قبل التاريخ (بدون يوم التاريخ نفسه) باستعلام واحد:
+	صفوف الجدول للأشهر السابقة + قيود GL من بداية شهر التاريخ حتى اليوم السابق له
+
+	Args:
+		date: التاريخ
+		filters: {field: value} من KEY_FIELDS
+		group_by: حقول التجميع من KEY_FIELDS (فارغة = مجموع واحد)
+		keys: قصر النتيجة على مفاتيح تجميع محددة [(value, ...)]
+
+	Returns:
+		dict: {group key tuple: {"debit", "credit"}}
+	"""
+	filters = filters or {}
+	group_by = tuple(group_by or ())
+	for field in tuple(filters) + group_by:
+		if field not in KEY_FIELDS:
+			frappe.throw(_("الحقل {0} ليس من مفاتيح أرصدة الحسابات").format(field))
+
+	period_start = get_period_start(date)
+	values = {"period_start": period_start, "date": getdate(date)}
+	snapshot_conditions = ["period_start < %(period_start)s"]
+	entry_conditions = ["posting_date >= %(period_start)s", "posting_date < %(date)s"]
+
+	for field, value in filters.items():
+		if value:
+			values[field] = value
+			snapshot_conditions.append(f"{field} = %({field})s")
+			entry_conditions.append(f"IFNULL({field}, '') = %({field})s")
+
+	if group_by and keys is not None:
+		if not keys:
+			return {}
+		values["group_keys"] = [tuple(key) for key in keys] if len(group_by) > 1 else [key[0] for key in keys]
+		snapshot_key = f"({', '.join(group_by)})" if len(group_by) > 1 else group_by[0]
+		entry_key = ", ".join(f"IFNULL({field}, '')" for field in group_by)
+		entry_key = f"({entry_key})" if len(group_by) > 1 else entry_key
+		snapshot_conditions.append(f"{snapshot_key} IN %(group_keys)s")
+		entry_conditions.append(f"{entry_key} IN %(group_keys)s")
+
+	key_select = ", ".join(f"{field} AS {field}" for field in group_by)
+	entry_key_select = ", ".join(f"IFNULL({field}, '') AS {field}" for field in group_by)
+	rows = frappe.db.sql(f"""
+		SELECT {key_select + ", " if key_select else ""}SUM(debit) AS debit, SUM(credit) AS credit
+		FROM (
+			SELECT {key_select + ", " if key_select else ""}debit, credit
+			FROM `tabAccount Balance Snapshot`
+			WHERE {" AND ".join(snapshot_conditions)}
+			UNION ALL
+			SELECT {entry_key_select + ", " if entry_key_select else ""}debit, credit
+			FROM `tabGL Entry`
+			WHERE {" AND ".join(entry_conditions)}
+		) balances
+		{"GROUP BY " + ", ".join(group_by) if group_by else ""}
+	""", values, as_dict=True)
+
+	return {
+		tuple(row[field] or "" for field in group_by): {"debit": flt(row.debit), "credit": flt(row.credit)}
+		for row in rows
+		if row.debit is not None or row.credit is not None
+	}
+
+
+def get_balances_as_of(date, filters=None, group_by=("account",), keys=None):
+	"""مجاميع مدين / دائن حتى نهاية يوم التاريخ"""
+	return get_balances_before(add_days(getdate(date), 1), filters, group_by, keys)
+
+
+@frappe.whitelist()
+def get_account_balance(account, date=None, cost_center=None, party_type=None, party=None, bank_account=None):
+	"""
+	رصيد حساب في تاريخ (افتراضياً اليوم)
+
+	Returns:
+		dict: {account, date, debit, credit, balance}
+	"""
+	frappe.has_permission("GL Entry", "read", throw=True)
+	date = getdate(date)
+	filters = {"account": account, "cost_center": cost_center, "party_type": party_type,
+		"party": party, "bank_account": bank_account}
+	totals = get_balances_as_of(date, filters, group_by=()).get((), {"debit": 0.0, "credit": 0.0})
+	return {
+		"account": account,
+		"date": date,
+		"debit": totals["debit"],
+		"credit": totals["credit"],
+		"balance": totals["debit"] - totals["credit"]
+	}
+
+
+# ============ Full Rebuild ============
+
+def rebuild_balance_snapshots(commit=True):
+	"""
+	إعادة بناء الجدول بالكامل من GL Entry باستعلام تجميعي واحد
+
+	Run:
+		bench --site <site> execute re_studio_booking.re_studio_booking.doctype.account_balance_snapshot.account_balance_snapshot.rebuild_balance_snapshots
+
+	Returns:
+		dict: عدد صفوف الجدول
+	"""
+	frappe.db.sql("DELETE FROM `tabAccount Balance Snapshot`")
+	# name بنفس صيغة get_snapshot_name: md5 للمفتاح مفصولاً بالحرف 0x1f
+	frappe.db.sql("""
+		INSERT INTO `tabAccount Balance Snapshot`
+			(name, creation, modified, owner, modified_by,
+			period_start, account, cost_center, party_type, party, bank_account,
+			debit, credit)
+		SELECT
+			MD5(CONCAT_WS(CHAR(31 USING utf8mb4), period_start, account, cost_center, party_type, party, bank_account)),
+			%(now)s, %(now)s, 'Administrator', 'Administrator',
+			period_start, account, cost_center, party_type, party, bank_account,
+			debit, credit
+		FROM (
+			SELECT
+				DATE_FORMAT(posting_date, '%%Y-%%m-01') AS period_start,
+				IFNULL(account, '') AS account,
+				IFNULL(cost_center, '') AS cost_center,
+				IFNULL(party_type, '') AS party_type,
+				IFNULL(party, '') AS party,
+				IFNULL(bank_account, '') AS bank_account,
+				SUM(debit) AS debit,
+				SUM(credit) AS credit
+			FROM `tabGL Entry`
+			GROUP BY 1, 2, 3, 4, 5, 6
+			HAVING ABS(SUM(debit)) >= 0.005 OR ABS(SUM(credit)) >= 0.005
+		) months
+	""", {"now": now()})
+
+	if commit:
+		frappe.db.commit()
+
+	return {"rows": frappe.db.count(SNAPSHOT_DOCTYPE)}
@@ -0,0 +1,108 @@
+# Copyright (c) 2025, Re Studio and Contributors
+# See license.txt
+
+import datetime
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from re_studio_booking.re_studio_booking.doctype.account_balance_snapshot.account_balance_snapshot import (
+	apply_gl_entries,
+	get_account_balance,
+	get_snapshot_name
+)
+
+
+class TestAccountBalanceSnapshot(FrappeTestCase):
+	def test_entries_are_aggregated_per_month(self):
+		entries = [
+			frappe._dict(posting_date="2025-03-02", account="Cash", debit=100, credit=0),
+			frappe._dict(posting_date="2025-03-28", account="Cash", debit=50, credit=0),
+			frappe._dict(posting_date="2025-04-01", account="Cash", debit=0, credit=30),
+		]
+		with patch.object(frappe.db, "sql") as sql:
+			apply_gl_entries(entries)
+
+		# one upsert + one cleanup of zeroed rows
+		self.assertEqual(sql.call_count, 2)
+		values = sql.call_args_list[0][0][1]
+		# (name, creation, modified, owner, modified_by, period_start, *KEY_FIELDS, debit, credit) per row
+		rows = {values[i + 5]: (values[i + 11], values[i + 12]) for i in range(0, len(values), 13)}
+		self.assertEqual(rows, {
+			datetime.date(2025, 3, 1): (150.0, 0.0),
+			datetime.date(2025, 4, 1): (0.0, 30.0),
+		})
+
+	def test_cancelling_entries_subtracts(self):
+		entry = frappe._dict(posting_date="2025-03-02", account="Cash", debit=100, credit=0)
+		with patch.object(frappe.db, "sql") as sql:
+			apply_gl_entries([entry], sign=-1)
+		values = sql.call_args_list[0][0][1]
+		self.assertEqual((values[11], values[12]), (-100.0, 0.0))
+
+	def test_no_movement_no_query(self):
+		entries = [
+			frappe._dict(posting_date="2025-03-02", account="Cash", debit=100, credit=0),
+			frappe._dict(posting_date="2025-03-05", account="Cash", debit=-100, credit=0),
+		]
+		with patch.object(frappe.db, "sql") as sql:
+			apply_gl_entries(entries)
+		sql.assert_not_called()
+
+	def test_snapshot_name_is_deterministic(self):
+		key = (datetime.date(2025, 3, 1), "Cash", "", "", "", "")
+		self.assertEqual(get_snapshot_name(key), get_snapshot_name(key))
+		self.assertNotEqual(get_snapshot_name(key), get_snapshot_name((datetime.date(2025, 4, 1),) + key[1:]))
+
+
+class TestAccountBalanceSnapshotRoundTrip(FrappeTestCase):
+	"""GL Entries inserted, edited and deleted through the document hooks; balances read back"""
+
+	def setUp(self):
+		if not frappe.db.exists("Currency", "SAR"):
+			frappe.get_doc({"doctype": "Currency", "currency_name": "SAR", "enabled": 1}).insert(ignore_permissions=True)
+		self.account = f"_Test Snapshot {frappe.generate_hash(length=6)}"
+		frappe.get_doc({
+			"doctype": "Account", "account_name": self.account, "account_type": "Asset", "currency": "SAR"
+		}).insert(ignore_permissions=True)
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def post(self, posting_date, debit=0, credit=0):
+		return frappe.get_doc({
+			"doctype": "GL Entry", "posting_date": posting_date, "account": self.account, "debit": debit, "credit": credit
+		}).insert(ignore_permissions=True)
+
+	def assert_balance(self, date):
+		"""the snapshot-based balance equals a plain SUM over the entries"""
+		expected = frappe.db.sql("""
+			SELECT IFNULL(SUM(debit), 0), IFNULL(SUM(credit), 0) FROM `tabGL Entry`
+			WHERE account = %s AND posting_date <= %s
+		""", (self.account, date))[0]
+		balance = get_account_balance(self.account, date)
+		self.assertEqual((balance["debit"], balance["credit"]), (float(expected[0]), float(expected[1])))
+		return balance["balance"]
+
+	def test_balances_follow_insert_edit_and_delete(self):
+		self.post("2030-01-05", debit=100)
+		moved = self.post("2030-01-20", debit=40)
+		self.post("2030-02-10", credit=30)
+		deleted = self.post("2030-03-01", debit=7)
+
+		self.assertEqual(self.assert_balance("2030-01-31"), 140)
+		self.assertEqual(self.assert_balance("2030-02-15"), 110)
+		self.assertEqual(frappe.db.count("Account Balance Snapshot", {"account": self.account}), 3)
+
+		# edit: the old values leave their month, the new ones enter theirs
+		moved.posting_date = "2030-02-20"
+		moved.debit = 55
+		moved.save(ignore_permissions=True)
+		self.assertEqual(self.assert_balance("2030-01-31"), 100)
+		self.assertEqual(self.assert_balance("2030-02-28"), 125)
+
+		deleted.delete(ignore_permissions=True)
+		self.assertEqual(self.assert_balance("2030-03-31"), 125)
+		# January and February are left; March has no movement any more
+		self.assertEqual(frappe.db.count("Account Balance Snapshot", {"account": self.account}), 2)
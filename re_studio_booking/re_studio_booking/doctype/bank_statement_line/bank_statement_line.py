@@ -0,0 +1,16 @@
+# Copyright (c) 2025, Masar Digital Group and contributors
+# For license information, please see license.txt
+
+"""
+Bank Statement Line
+سطور كشف الحساب البنكي المستوردة (CSV / OFX) وحالة مطابقتها مع قيود GL Entry
+
+الاستيراد والمطابقة في utils/bank_reconciliation.py؛ اسم السطر بصمة لمحتواه
+فإعادة استيراد نفس الملف لا تكرر السطور، وgl_entry فريد فلا يُطابق القيد مرتين.
+"""
+
+from frappe.model.document import Document
+
+
+class BankStatementLine(Document):
+	pass
@@ -5,7 +5,7 @@ import frappe
 from frappe.model.document import Document
 from frappe import _
 from datetime import datetime, timedelta
-from frappe.utils import flt
+from frappe.utils import cint, flt
 import json
 
 # استيراد دوال المساعدة من booking_utils
@@ -22,6 +22,40 @@ from .booking_validations import (
 	validate_package_hours
 )
 
+# محرك التسعير (تحميل الأسعار وخصومات المصور دفعة واحدة)
+from .booking_pricing import get_pricing_engine, reset_pricing_engine
+
+# خرائط الدقائق لحساب الفترات المتاحة
+from .booking_slots import get_day_slots
+
+# سعة التقويم المخزنة (تُحذف عند تعديل أي حجز)
+from .booking_availability import clear_calendar_capacity_cache
+
+# تغيير الحالة المجمع (تحديث بالجملة بدلاً من حفظ كل حجز)
+from .booking_bulk import (
+	BULK_STATUS_INLINE_LIMIT,
+	bulk_update_booking_status,
+	validate_target_status
+)
+
+# طابور بريد التأكيد وإشعارات المدراء
+from re_studio_booking.re_studio_booking.doctype.booking_email.booking_email import (
+	has_confirmation_recipient,
+	queue_booking_confirmation
+)
+
+# الجدول التجميعي اليومي للوحات التحكم والتقارير
+from re_studio_booking.re_studio_booking.doctype.booking_daily_rollup.booking_daily_rollup import (
+	remove_booking_from_rollup,
+	update_booking_rollup
+)
+
+# نسخة General Settings المخزنة (لكل طلب + Redis)
+from re_studio_booking.re_studio_booking.doctype.general_settings.general_settings_cache import (
+	DEFAULT_DEPOSIT_PERCENTAGE,
+	get_studio_settings_snapshot
+)
+
 # استيراد دوال الحسابات من booking_calculations
 from .booking_calculations import (
 	calculate_deposit_amount,
@@ -131,43 +165,25 @@ class Booking(Document):
 	def on_trash(self):
 		"""منع حذف الحجز إذا كان مدفوعاً بالكامل (ما عدا Administrator)"""
 		check_deletion_permission(self)
+		clear_calendar_capacity_cache()
+		remove_booking_from_rollup(self)
 
 	def before_cancel(self):
 		"""منع إلغاء الحجز إذا كان مدفوعاً بالكامل (ما عدا Administrator)"""
 		check_deletion_permission(self)
 
 	def on_update(self):
-		"""إرسال تأكيد الحجز بعد التحويل إلى Confirmed مرة واحدة"""
-		if getattr(self, 'status', None) == 'Confirmed' and not getattr(self, 'confirmation_sent', False):
-			self.send_confirmation()
-			self.confirmation_sent = 1
+		"""إضافة تأكيد الحجز لطابور البريد بعد التحويل إلى Confirmed مرة واحدة"""
+		clear_calendar_capacity_cache()
+		update_booking_rollup(self)
+		# الإرسال و confirmation_sent يتمان في المهمة الخلفية (Booking Email)
+		if getattr(self, 'status', None) == 'Confirmed' and not getattr(self, 'confirmation_sent', False) \
+				and has_confirmation_recipient(self):
+			queue_booking_confirmation(self.name)
 
 	def send_confirmation(self):
-		"""إرسال بريد تأكيد الحجز للعميل"""
-		if not getattr(self, 'client', None):
-			return
-		client_email = frappe.db.get_value("Client", self.client, "email_id")
-		if not client_email:
-			return
-		
-		# التحقق من وجود حساب بريد صادر قبل الإرسال
-		try:
-			frappe.sendmail(
-				recipients=[client_email],
-				subject=_("تأكيد الحجز - {0}").format(self.name),
-				message=(
-					"""<p>مرحباً،</p>
-					<p>تم تأكيد حجزك رقم {0} في تاريخ {1} الساعة {2}.</p>
-					<p>نشكرك على اختيار Re Studio.</p>
-					""".format(self.name, getattr(self, 'booking_date', ''), getattr(self, 'start_time', ''))
-				)
-			)
-		except Exception as e:
-			# تسجيل الخطأ دون إيقاف عملية الحفظ
-			frappe.log_error(
-				message=f"فشل إرسال بريد تأكيد الحجز {self.name}: {str(e)}",
-				title="خطأ في إرسال البريد الإلكتروني"
-			)
+		"""إضافة بريد تأكيد الحجز لطابور الإرسال (يُرسل في الخلفية مع إعادة المحاولة)"""
+		queue_booking_confirmation(self.name, force=True)
 
 	def _deduplicate_selected_services(self):
 		"""دمج الصفوف المكررة لنفس الخدمة داخل selected_services_table."""
@@ -265,25 +281,24 @@ class Booking(Document):
 		base_sum = 0.0
 		discounted_sum = 0.0
 
+		# أسعار الخدمات وخصم المصور دفعة واحدة
+		reset_pricing_engine(self)
+		engine = get_pricing_engine(self, package_services)
+
 		photographer_discount = 0
 		photographer_services = {}
 		if getattr(self, 'photographer', None) and getattr(self, 'photographer_b2b', False):
 			try:
-				photographer_doc = frappe.get_doc('Photographer', self.photographer)
-				photographer_discount = flt(photographer_doc.discount_percentage or 0)
-				for ps in photographer_doc.get('services', []):
-					photographer_services[ps.service] = {
-						'discounted_price': flt(ps.get('discounted_price') or 0),
-						'base_price': flt(ps.get('base_price') or 0),
-						'allow_discount': ps.get('allow_discount', 0)
-					}
+				photographer_pricing = engine.get_photographer_pricing(self.photographer)
+				photographer_discount = flt(photographer_pricing['discount_percentage'] or 0)
+				photographer_services = photographer_pricing['services']
 			except Exception as err:
 				frappe.log_error(f"Error fetching photographer discount: {str(err)}")
 
 		for service in package_services:
 			qty = float(service.quantity or 1)
 			try:
-				base_price = flt(frappe.db.get_value("Service", service.service, "price") or 0)
+				base_price = flt(engine.get_service_price(service.service) or 0)
 			except Exception:
 				base_price = 0
 
@@ -371,23 +386,7 @@ class Booking(Document):
 		"""تعيين نسبة العربون الافتراضية دائماً من General Settings فقط (حقل عربي: 'نسبة العربون (%)').
 		لا يتم أخذ أي نسبة من الباقة الآن بناءً على طلبك. إذا لم توجد قيمة في الإعدادات يتم fallback = 30.
 		لا نعدل إن وُجدت قيمة حالية (قد تكون محقونة مسبقاً)."""
-		if getattr(self, 'deposit_percentage', None) not in (None, ""):
-			return
-		try:
-			settings = frappe.db.get_singles_dict('General Settings') if frappe.db.exists('DocType', 'General Settings') else {}
-			val = None
-			# الأولوية للحقل العربي المذكور
-			for key in ('نسبة العربون (%)', 'deposit_percentage', 'نسبة_العربون_%'):
-				if key in settings and settings.get(key) is not None:
-					val = settings.get(key)
-					break
-			if val is not None:
-				self.deposit_percentage = flt(val)
-		except Exception:
-			pass
-		# fallback النهائي لو ظل فارغ
-		if getattr(self, 'deposit_percentage', None) in (None, ""):
-			self.deposit_percentage = 30
+		set_default_deposit_percentage(self)
 
 	def calculate_package_totals(self):
 		"""Delegate package total computation to shared helper."""
@@ -420,13 +419,15 @@ class Booking(Document):
 		if not hasattr(self, 'booking_service_items') or not self.booking_service_items:
 			return
 
+		engine = get_pricing_engine(self)
+
 		photographer_discount_pct = 0
 		allowed_services = set()
 		if getattr(self, 'photographer_b2b', False) and getattr(self, 'photographer', None):
 			try:
-				photographer_discount_pct = flt(frappe.db.get_value("Photographer", self.photographer, "discount_percentage") or 0)
-				photographer_services = frappe.get_all("Photographer Service", filters={"parent": self.photographer, "is_active": 1}, fields=["service"])
-				allowed_services = {ps.service for ps in photographer_services}
+				photographer_pricing = engine.get_photographer_pricing(self.photographer)
+				photographer_discount_pct = flt(photographer_pricing['discount_percentage'] or 0)
+				allowed_services = photographer_pricing['active_services']
 			except Exception:
 				photographer_discount_pct = 0
 
@@ -440,7 +441,7 @@ class Booking(Document):
 			base_price = flt(row.service_price) if flt(getattr(row, 'service_price', 0)) else 0
 			if base_price == 0:
 				try:
-					base_price = flt(frappe.db.get_value("Service", row.service, "price") or 0)
+					base_price = flt(engine.get_service_price(row.service) or 0)
 				except Exception:
 					base_price = 0
 			row.service_price = base_price
@@ -509,14 +510,9 @@ def debug_deposit_calculation(booking: str):
 
 	doc = frappe.get_doc('Booking', booking)
 
-	settings = frappe.db.get_singles_dict('General Settings') if frappe.db.exists('DocType', 'General Settings') else {}
-	deposit_pct = None
-	for key in ('نسبة العربون (%)', 'deposit_percentage', 'نسبة_العربون_%'):
-		if key in settings and settings.get(key) is not None:
-			deposit_pct = float(settings.get(key))
-			break
+	deposit_pct = get_studio_settings_snapshot().deposit_percentage
 	if deposit_pct is None:
-		deposit_pct = 30.0
+		deposit_pct = float(DEFAULT_DEPOSIT_PERCENTAGE)
 
 	if doc.booking_type == 'Service':
 		basis_amount = float(getattr(doc, 'total_amount', 0) or 0)
@@ -680,32 +676,57 @@ def create_booking_quotation(booking):
 
 @frappe.whitelist()
 def send_booking_confirmation(booking):
-	"""Send booking confirmation"""
+	"""Queue the booking confirmation (re-sends even if it was sent before)"""
 	try:
-		booking_doc = frappe.get_doc("Booking", booking)
-		booking_doc.send_confirmation()
-		return {"success": True, "message": _("تم إرسال تأكيد الحجز بنجاح")}
+		frappe.has_permission("Booking", "write", booking, throw=True)
+		queue_booking_confirmation(booking, force=True)
+		return {"success": True, "message": _("تمت إضافة تأكيد الحجز لطابور الإرسال")}
 	except Exception as e:
 		frappe.log_error(f"Error sending booking confirmation: {str(e)}")
 		return {"success": False, "message": _("خطأ في إرسال تأكيد الحجز: {0}").format(str(e))}
 
 @frappe.whitelist()
 def bulk_update_status(names, status):
-	"""Bulk update booking status"""
+	"""
+	Bulk update booking status (set-based, see booking_bulk)
+
+	Large selections run as a background job that reports progress and
+	publishes booking_bulk_status_done to the user when finished.
+	"""
+	if isinstance(names, str):
+		names = json.loads(names)
+
+	validate_target_status(status)
+	frappe.has_permission("Booking", "write", throw=True)
+
+	if len(names) > BULK_STATUS_INLINE_LIMIT:
+		frappe.enqueue(
+			"re_studio_booking.re_studio_booking.doctype.booking.booking_bulk.run_bulk_status_job",
+			queue="long",
+			timeout=3600,
+			names=names,
+			status=status
+		)
+		return {
+			"success": True,
+			"queued": True,
+			"message": _("جاري تحديث {0} حجز في الخلفية").format(len(names))
+		}
+
 	try:
-		updated_count = 0
-		for name in names:
-			booking_doc = frappe.get_doc("Booking", name)
-			booking_doc.status = status
-			booking_doc.save()
-			updated_count += 1
-		
-		frappe.db.commit()
-		return {"success": True, "message": _("تم تحديث {0} حجز").format(updated_count)}
+		result = bulk_update_booking_status(names, status)
+	except frappe.PermissionError:
+		raise
 	except Exception as e:
 		frappe.log_error(f"Error bulk updating status: {str(e)}")
 		return {"success": False, "message": _("خطأ في التحديث المجمع: {0}").format(str(e))}
 
+	result.update({
+		"success": True,
+		"message": _("تم تحديث {0} حجز").format(result["updated"])
+	})
+	return result
+
 @frappe.whitelist()
 def get_events(start, end, filters=None):
 	"""Get calendar events"""
@@ -822,57 +843,23 @@ def validate_booking_date(booking_date):
 		return {"valid": False, "message": _("خطأ في التحقق من التاريخ")}
 
 @frappe.whitelist()
-def get_available_time_slots(booking_date, service=None, photographer=None):
+def get_available_time_slots(booking_date, service=None, photographer=None, slot_minutes=30, step_minutes=None):
 	"""
 	Get available time slots for a specific date
-	Considers existing bookings and their durations to prevent overlaps
+	Slots cover the studio business hours and must not overlap any existing booking
+	(Service + Package dates) of the photographer, or of the studio if no photographer is given
 	"""
 	try:
-		from datetime import datetime, timedelta
-		
-		# Get existing bookings for the date
-		filters = {
-			"booking_date": booking_date,
-			"status": ["not in", ["Cancelled", "Rejected"]]
-		}
-		
-		# If photographer is specified, filter by photographer
-		if photographer:
-			filters["photographer"] = photographer
-		
-		existing_bookings = frappe.get_all(
-			"Booking",
-			filters=filters,
-			fields=["start_time", "end_time", "duration"]
+		return get_day_slots(
+			booking_date,
+			length=cint(slot_minutes) or 30,
+			step=cint(step_minutes) or None,
+			photographer=photographer,
+			studio_exclusive=False,
+			working_days_only=False,
+			exclude_statuses=("Cancelled", "Rejected")
 		)
 		
-		# Generate all possible time slots (9 AM to 9 PM, every 30 minutes)
-		all_slots = []
-		for hour in range(9, 21):  # 9 AM to 9 PM
-			all_slots.append(f"{hour:02d}:00:00")
-			all_slots.append(f"{hour:02d}:30:00")
-		
-		# Create set of blocked time slots
-		blocked_slots = set()
-		
-		for booking in existing_bookings:
-			if booking.start_time and booking.end_time:
-				# Convert to datetime for comparison
-				start = datetime.strptime(str(booking.start_time), "%H:%M:%S")
-				end = datetime.strptime(str(booking.end_time), "%H:%M:%S")
-				
-				# Block all slots that overlap with this booking
-				for slot in all_slots:
-					slot_time = datetime.strptime(slot, "%H:%M:%S")
-					# Slot is blocked if it falls within the booking period
-					if start <= slot_time < end:
-						blocked_slots.add(slot)
-		
-		# Return available slots
-		available_slots = [slot for slot in all_slots if slot not in blocked_slots]
-		
-		return available_slots
-		
 	except Exception as e:
 		frappe.log_error(f"Error getting available time slots: {str(e)}", "Booking Time Slots Error")
 		# Return default slots on error
@@ -1275,37 +1262,7 @@ def handle_photographer_b2b_change(booking_name=None, photographer=None, is_b2b=
 @frappe.whitelist()
 def get_studio_working_days():
 	"""جلب أيام العمل للاستديو من General Settings"""
-	try:
-		if not frappe.db.exists('DocType', 'General Settings'):
-			return get_default_studio_working_days()
-		
-		settings = frappe.get_single('General Settings')
-		working_days = []
-		
-		# خريطة أيام العمل
-		days_mapping = {
-			'sunday_working': 'Sunday',
-			'monday_working': 'Monday', 
-			'tuesday_working': 'Tuesday',
-			'wednesday_working': 'Wednesday',
-			'thursday_working': 'Thursday',
-			'friday_working': 'Friday',
-			'saturday_working': 'Saturday'
-		}
-		
-		for field_name, day_name in days_mapping.items():
-			if hasattr(settings, field_name) and getattr(settings, field_name):
-				working_days.append(day_name)
-		
-		# إذا لم توجد إعدادات، استخدم الافتراضي
-		if not working_days:
-			working_days = get_default_studio_working_days()
-		
-		return working_days
-		
-	except Exception as e:
-		frappe.logger().error(f"Error getting studio working days: {str(e)}")
-		return get_default_studio_working_days()
+	return list(get_studio_settings_snapshot().working_days)
 
 def get_default_studio_working_days():
 	"""أيام العمل الافتراضية للاستديو (كل الأيام عدا الجمعة)"""
@@ -1314,22 +1271,7 @@ def get_default_studio_working_days():
 @frappe.whitelist()
 def get_studio_business_hours():
 	"""جلب ساعات العمل للاستديو من General Settings"""
-	try:
-		if not frappe.db.exists('DocType', 'General Settings'):
-			return get_default_studio_business_hours()
-		
-		settings = frappe.get_single('General Settings')
-		
-		business_hours = {
-			'opening_time': getattr(settings, 'opening_time', None) or '09:00:00',
-			'closing_time': getattr(settings, 'closing_time', None) or '17:00:00'
-		}
-		
-		return business_hours
-		
-	except Exception as e:
-		frappe.logger().error(f"Error getting studio business hours: {str(e)}")
-		return get_default_studio_business_hours()
+	return get_studio_settings_snapshot().get_business_hours()
 
 def get_default_studio_business_hours():
 	"""ساعات العمل الافتراضية للاستديو"""
@@ -1356,8 +1298,9 @@ def is_studio_working_day(date_str):
 @frappe.whitelist()
 def get_studio_settings():
 	"""جلب جميع إعدادات الاستديو من General Settings"""
-	working_days = get_studio_working_days()
-	business_hours = get_studio_business_hours()
+	settings = get_studio_settings_snapshot()
+	working_days = list(settings.working_days)
+	business_hours = settings.get_business_hours()
 	
 	return {
 		'working_days': working_days,
@@ -0,0 +1,398 @@
+# Copyright (c) 2023, MASAR TEAM and contributors
+# For license information, please see license.txt
+
+"""
+Booking Availability Index
+فهرس فترات الحجز في الذاكرة للتحقق من التعارضات (الاستديو والمصور)
+"""
+
+from bisect import bisect_left
+from datetime import timedelta
+
+import frappe
+from frappe.utils import getdate, to_timedelta
+
+from re_studio_booking.re_studio_booking.utils.response_cache import get_tag_version, invalidate_tags
+
+
+# ============ Time Helpers ============
+
+def time_to_seconds(value):
+	"""
+	تحويل قيمة وقت (timedelta / time / نص) إلى عدد الثواني من بداية اليوم
+
+	Args:
+		value: قيمة الوقت كما تأتي من قاعدة البيانات أو من المستند
+
+	Returns:
+		int: عدد الثواني أو None إذا كانت القيمة فارغة
+	"""
+	if value in (None, ""):
+		return None
+	if hasattr(value, "hour") and not isinstance(value, timedelta):
+		return value.hour * 3600 + value.minute * 60 + value.second
+	if isinstance(value, str):
+		value = to_timedelta(value)
+	return int(value.total_seconds())
+
+
+# ============ Interval Index ============
+
+class BookingIntervalIndex:
+	"""
+	فهرس فترات الحجز لكل يوم (للاستديو) ولكل (يوم، مصور)
+
+	كل قائمة مرتبة حسب وقت البداية مع أقصى وقت نهاية تراكمي،
+	لذلك يتم الإجابة على سؤال التداخل ببحث ثنائي بدون أي استعلام إضافي.
+	"""
+
+	def __init__(self, rows=None):
+		self._studio = {}
+		self._photographer = {}
+		self._frozen = None
+		for row in (rows or []):
+			self.add(row)
+
+	def add(self, row):
+		"""
+		إضافة فترة حجز للفهرس
+
+		Args:
+			row: dict يحتوي على name, client_name, photographer, booking_date,
+				start_time, end_time, source (Service / Package)
+		"""
+		start = time_to_seconds(row.get("start_time"))
+		end = time_to_seconds(row.get("end_time"))
+		if start is None or end is None or not row.get("booking_date"):
+			return
+		day = getdate(row.get("booking_date"))
+		entry = (start, end, row)
+		self._studio.setdefault(day, []).append(entry)
+		if row.get("photographer"):
+			self._photographer.setdefault((day, row.get("photographer")), []).append(entry)
+		self._frozen = None
+
+	def find_studio_conflicts(self, check_date, check_start, check_end):
+		"""
+		جميع الحجوزات المتداخلة مع الفترة المطلوبة في الاستديو
+
+		Returns:
+			list: صفوف الحجوزات المتعارضة (Service أولاً ثم Package)
+		"""
+		return self._find("studio", getdate(check_date), check_start, check_end)
+
+	def find_photographer_conflicts(self, check_date, photographer, check_start, check_end):
+		"""
+		جميع حجوزات المصور المتداخلة مع الفترة المطلوبة
+
+		Returns:
+			list: صفوف الحجوزات المتعارضة (Service أولاً ثم Package)
+		"""
+		if not photographer:
+			return []
+		return self._find("photographer", (getdate(check_date), photographer), check_start, check_end)
+
+	def _find(self, scope, key, check_start, check_end):
+		self._freeze()
+		bucket = self._frozen[scope].get(key)
+		if not bucket:
+			return []
+
+		start = time_to_seconds(check_start)
+		end = time_to_seconds(check_end)
+		if start is None or end is None:
+			return []
+
+		starts, max_ends, entries = bucket
+		conflicts = []
+		# كل الفترات التي تبدأ قبل نهاية الفترة المطلوبة مرشحة للتداخل
+		i = bisect_left(starts, end) - 1
+		while i >= 0 and max_ends[i] > start:
+			if entries[i][1] > start:
+				conflicts.append(entries[i][2])
+			i -= 1
+
+		conflicts.sort(key=lambda r: (r.get("source") == "Package", time_to_seconds(r.get("start_time"))))
+		return conflicts
+
+	def _freeze(self):
+		"""ترتيب القوائم وحساب أقصى وقت نهاية تراكمي (مرة واحدة بعد آخر إضافة)"""
+		if self._frozen is not None:
+			return
+		self._frozen = {}
+		for scope, buckets in (("studio", self._studio), ("photographer", self._photographer)):
+			frozen = {}
+			for key, entries in buckets.items():
+				entries = sorted(entries, key=lambda e: (e[0], e[1]))
+				max_ends = []
+				current = -1
+				for entry in entries:
+					current = max(current, entry[1])
+					max_ends.append(current)
+				frozen[key] = ([e[0] for e in entries], max_ends, entries)
+			self._frozen[scope] = frozen
+
+
+# ============ Booked Intervals Queries ============
+
+def get_booked_intervals(dates, photographers=None, exclude_booking=None, exclude_statuses=("Cancelled",)):
+	"""
+	جميع فترات الحجز (حجوزات الخدمات + تواريخ الباقات) للتواريخ المطلوبة
+	مصدر موحد للتوفر تستخدمه شاشات الحجز والتقويم والتحقق
+
+	Args:
+		dates: قائمة التواريخ
+		photographers: قائمة المصورين (اختياري) - تتم التصفية في SQL
+		exclude_booking: اسم حجز يتم استبعاده (الحجز الحالي)
+		exclude_statuses: الحالات التي لا تحجز الوقت
+
+	Returns:
+		list: صفوف (name, client_name, photographer, booking_type, status,
+			booking_date, start_time, end_time, source) مرتبة حسب التاريخ والوقت
+	"""
+	dates = sorted({str(getdate(d)) for d in (dates or []) if d})
+	if not dates:
+		return []
+
+	conditions = ["{t}.booking_date IN %(dates)s"]
+	values = {"dates": dates}
+	if photographers:
+		conditions.append("b.photographer IN %(photographers)s")
+		values["photographers"] = list(photographers)
+
+	return _query_booked_intervals(conditions, values, exclude_booking, exclude_statuses)
+
+
+def get_conflicting_bookings(check_date, check_start, check_end, photographer=None, exclude_booking=None):
+	"""
+	الحجوزات المتعارضة فعلياً مع فترة محددة (التداخل والحالة والمصور في SQL)
+
+	Args:
+		check_date: التاريخ
+		check_start: وقت البداية
+		check_end: وقت النهاية
+		photographer: لحصر التعارض في حجوزات مصور معين (اختياري)
+		exclude_booking: اسم الحجز الحالي
+
+	Returns:
+		list: الصفوف المتعارضة مع اسم العميل (Service أولاً ثم Package)
+	"""
+	conditions = [
+		"{t}.booking_date = %(check_date)s",
+		"{t}.start_time < %(check_end)s",
+		"{t}.end_time > %(check_start)s"
+	]
+	values = {
+		"check_date": str(getdate(check_date)),
+		"check_start": str(check_start),
+		"check_end": str(check_end)
+	}
+	if photographer:
+		conditions.append("b.photographer = %(photographer)s")
+		values["photographer"] = photographer
+
+	return _query_booked_intervals(conditions, values, exclude_booking, ("Cancelled",))
+
+
+def _query_booked_intervals(conditions, values, exclude_booking=None, exclude_statuses=("Cancelled",)):
+	"""
+	تنفيذ استعلام موحد (UNION ALL) على tabBooking و tabPackage Booking Date
+
+	كل شرط يستخدم {t} كبديل للجدول الذي يحمل التاريخ والوقت
+	(b لحجوزات الخدمات و pbd لتواريخ الباقات).
+	"""
+	union = _booked_intervals_union(conditions, values, exclude_booking, exclude_statuses)
+	return frappe.db.sql(f"""
+		{union}
+		ORDER BY booking_date, source DESC, start_time
+	""", values, as_dict=True)
+
+
+def _booked_intervals_union(conditions, values, exclude_booking=None, exclude_statuses=("Cancelled",)):
+	"""نص استعلام UNION ALL لفترات الحجز (يضيف قيم الشروط المشتركة إلى values)"""
+	common = ["b.docstatus < 2"]
+	if exclude_statuses:
+		common.append("IFNULL(b.status, '') NOT IN %(exclude_statuses)s")
+		values["exclude_statuses"] = list(exclude_statuses)
+	if exclude_booking:
+		common.append("b.name != %(exclude_booking)s")
+		values["exclude_booking"] = exclude_booking
+
+	service_where = " AND ".join(["b.booking_type = 'Service'"] + common + [c.format(t="b") for c in conditions])
+	package_where = " AND ".join(["pbd.parenttype = 'Booking'"] + common + [c.format(t="pbd") for c in conditions])
+
+	return f"""
+		SELECT
+			b.name, b.client_name, b.photographer, b.booking_type, b.status,
+			b.booking_date, b.start_time, b.end_time,
+			'Service' AS source
+		FROM `tabBooking` b
+		WHERE {service_where}
+		UNION ALL
+		SELECT
+			b.name, b.client_name, b.photographer, b.booking_type, b.status,
+			pbd.booking_date, pbd.start_time, pbd.end_time,
+			'Package' AS source
+		FROM `tabPackage Booking Date` pbd
+		INNER JOIN `tabBooking` b ON b.name = pbd.parent
+		WHERE {package_where}
+	"""
+
+
+def build_interval_index(dates, exclude_booking=None):
+	"""
+	بناء فهرس الفترات لكل التواريخ المطلوبة باستعلام واحد
+	(حجوزات الخدمات + تواريخ الباقات، بدون الحجوزات الملغاة)
+
+	Args:
+		dates: قائمة التواريخ المطلوب التحقق منها
+		exclude_booking: اسم الحجز الحالي لاستبعاده من التعارضات
+
+	Returns:
+		BookingIntervalIndex
+	"""
+	return BookingIntervalIndex(get_booked_intervals(dates, exclude_booking=exclude_booking or "new"))
+
+
+# ============ Calendar Capacity ============
+
+CALENDAR_CACHE_PREFIX = "re_studio_booking:calendar_availability"
+CALENDAR_CACHE_TTL = 3600
+# إصدار نتائج السعة: يتغير عند أي تعديل فتصبح كل المفاتيح السابقة غير مستخدمة (بدون مسح Redis)
+CALENDAR_CACHE_TAG = "calendar_capacity"
+
+
+def get_booked_minutes_by_day(start_date, end_date, opening, closing, photographers=None, exclude_statuses=("Cancelled",)):
+	"""
+	الدقائق المحجوزة لكل (يوم، مصور) داخل ساعات العمل باستعلام GROUP BY واحد
+	على حجوزات الخدمات وتواريخ الباقات
+
+	Args:
+		start_date: بداية الفترة
+		end_date: نهاية الفترة
+		opening: وقت الافتتاح بالثواني
+		closing: وقت الإغلاق بالثواني
+		photographers: حصر النتيجة في مصورين محددين (اختياري)
+		exclude_statuses: الحالات التي لا تحجز الوقت
+
+	Returns:
+		list: صفوف (booking_date, photographer, booked_seconds, bookings_count)
+	"""
+	conditions = ["{t}.booking_date BETWEEN %(start_date)s AND %(end_date)s"]
+	values = {
+		"start_date": str(getdate(start_date)),
+		"end_date": str(getdate(end_date)),
+		"opening": opening,
+		"closing": closing
+	}
+	if photographers:
+		conditions.append("b.photographer IN %(photographers)s")
+		values["photographers"] = list(photographers)
+
+	union = _booked_intervals_union(conditions, values, exclude_statuses=exclude_statuses)
+	return frappe.db.sql(f"""
+		SELECT
+			x.booking_date,
+			x.photographer,
+			SUM(GREATEST(
+				LEAST(TIME_TO_SEC(x.end_time), %(closing)s) - GREATEST(TIME_TO_SEC(x.start_time), %(opening)s),
+				0
+			)) AS booked_seconds,
+			COUNT(*) AS bookings_count
+		FROM ({union}) x
+		WHERE x.start_time IS NOT NULL AND x.end_time IS NOT NULL
+		GROUP BY x.booking_date, x.photographer
+	""", values, as_dict=True)
+
+
+def get_calendar_capacity(start_date, end_date, photographers=None, by_photographer=False, settings=None):
+	"""
+	السعة اليومية للتقويم: الدقائق المحجوزة والمتبقية ونسبة الإشغال لكل يوم
+	(ولكل مصور عند الطلب)، مع تخزين النتيجة لكل فترة حتى يتم تعديل أي حجز
+
+	الحجوزات المتداخلة تُجمع دقائقها، لذلك الإشغال محدود بـ 100%.
+
+	Args:
+		start_date: بداية الفترة
+		end_date: نهاية الفترة
+		photographers: حصر الحساب في مصورين محددين (اختياري)
+		by_photographer: إرجاع تفاصيل كل مصور داخل كل يوم
+		settings: StudioSettings (افتراضياً النسخة المخزنة)
+
+	Returns:
+		dict: {date: {is_working_day, open_minutes, booked_minutes, remaining_minutes,
+			utilisation, bookings_count, photographers?}}
+	"""
+	from re_studio_booking.re_studio_booking.doctype.general_settings.general_settings_cache import get_studio_settings_snapshot
+
+	settings = settings or get_studio_settings_snapshot()
+	start = getdate(start_date)
+	end = getdate(end_date)
+	photographers = sorted(photographers or [])
+	cache_key = _calendar_cache_key(start, end, photographers, by_photographer)
+
+	cached = frappe.cache().get_value(cache_key)
+	if cached is not None:
+		return cached
+
+	opening = time_to_seconds(settings.opening_time) or 0
+	closing = time_to_seconds(settings.closing_time) or 0
+	open_minutes = max(closing - opening, 0) // 60
+	working_days = set(settings.working_days)
+
+	rows = get_booked_minutes_by_day(start, end, opening, closing, photographers) if start <= end else []
+	by_day = {}
+	for row in rows:
+		by_day.setdefault(str(getdate(row.booking_date)), []).append(row)
+
+	calendar = {}
+	day = start
+	while day <= end:
+		day_str = str(day)
+		day_open = open_minutes if day.strftime('%A') in working_days else 0
+		day_rows = by_day.get(day_str, [])
+		booked = sum(int(r.booked_seconds or 0) for r in day_rows) // 60
+		entry = _capacity(day_open, booked)
+		entry["is_working_day"] = bool(day_open)
+		entry["bookings_count"] = sum(int(r.bookings_count or 0) for r in day_rows)
+		if by_photographer:
+			per_photographer = {}
+			for r in day_rows:
+				if r.photographer:
+					per_photographer[r.photographer] = per_photographer.get(r.photographer, 0) + int(r.booked_seconds or 0) // 60
+			entry["photographers"] = {
+				photographer: _capacity(day_open, booked_minutes)
+				for photographer, booked_minutes in sorted(per_photographer.items())
+			}
+			for photographer in photographers:
+				entry["photographers"].setdefault(photographer, _capacity(day_open, 0))
+		calendar[day_str] = entry
+		day += timedelta(days=1)
+
+	frappe.cache().set_value(cache_key, calendar, expires_in_sec=CALENDAR_CACHE_TTL)
+	return calendar
+
+
+def _capacity(open_minutes, booked_minutes):
+	booked_minutes = min(booked_minutes, open_minutes)
+	return {
+		"open_minutes": open_minutes,
+		"booked_minutes": booked_minutes,
+		"remaining_minutes": open_minutes - booked_minutes,
+		"utilisation": round(booked_minutes / open_minutes, 4) if open_minutes else 0
+	}
+
+
+def _calendar_cache_key(start, end, photographers, by_photographer):
+	scope = ",".join(photographers) if photographers else "studio"
+	version = get_tag_version(CALENDAR_CACHE_TAG)
+	return f"{CALENDAR_CACHE_PREFIX}:{version}:{start}:{end}:{scope}:{int(bool(by_photographer))}"
+
+
+def clear_calendar_capacity_cache():
+	"""
+	إبطال كل نتائج السعة المخزنة (بعد حفظ أو حذف حجز أو تعديل الإعدادات)
+
+	تغيير الإصدار كتابة مفتاح واحد بدل مسح المفاتيح بنمط (KEYS)؛ النتائج القديمة تنتهي بـ CALENDAR_CACHE_TTL
+	"""
+	invalidate_tags(CALENDAR_CACHE_TAG)
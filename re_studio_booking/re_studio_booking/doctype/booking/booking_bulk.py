@@ -0,0 +1,302 @@
+# Copyright (c) 2023, MASAR TEAM and contributors
+# For license information, please see license.txt
+
+"""
+Booking Bulk Status
+تغيير حالة عدد كبير من الحجوزات دون حفظ كل حجز على حدة:
+- قواعد الانتقال والصلاحيات تُفحص مرة واحدة لكل دفعة
+- الصفوف تُقفل وتُعاد قراءتها قبل التحديث، ثم UPDATE واحد لكل (دفعة، حالة سابقة)
+- صفوف Version و Comment تُدرج دفعة واحدة
+- الجدول التجميعي والذاكرة المؤقتة وتحديثات اللوحات تُحدّث مرة لكل دفعة
+- البريد والإشعارات تُضاف لطابور Booking Email وتُرسل في الخلفية
+"""
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt, now
+
+from .booking_availability import clear_calendar_capacity_cache
+from re_studio_booking.re_studio_booking.doctype.booking_email.booking_email import (
+	get_confirmation_entry,
+	get_notification_entry,
+	queue_emails
+)
+from re_studio_booking.re_studio_booking.doctype.booking_daily_rollup.booking_daily_rollup import (
+	apply_rollup_delta,
+	attach_booking_children,
+	diff_contributions,
+	get_booking_contributions
+)
+from re_studio_booking.re_studio_booking.hooks_realtime import publish_booking_delta
+from re_studio_booking.re_studio_booking.utils.response_cache import invalidate_tags
+
+BULK_STATUS_CHUNK_SIZE = 200
+
+# عدد الحجوزات الذي يُنفذ مباشرة في الطلب؛ الأكبر يُرسل كمهمة خلفية
+BULK_STATUS_INLINE_LIMIT = 200
+
+# الانتقالات المسموحة: الحالة الحالية -> الحالات الجديدة
+STATUS_TRANSITIONS = {
+	"": ("Confirmed", "Cancelled"),
+	"Confirmed": ("Completed", "Cancelled"),
+	"Completed": ("Confirmed",),
+	"Cancelled": (),
+}
+
+BOOKING_FIELDS = [
+	"name", "docstatus", "status", "booking_type", "client", "photographer",
+	"booking_date", "start_time", "end_time",
+	"total_amount", "total_amount_package", "paid_amount", "confirmation_sent"
+]
+
+
+# ============ Entry Point ============
+
+def bulk_update_booking_status(names, status, chunk_size=BULK_STATUS_CHUNK_SIZE, commit=True):
+	"""
+	تغيير حالة مجموعة حجوزات على دفعات
+
+	Args:
+		names: أسماء الحجوزات
+		status: الحالة الجديدة
+		chunk_size: حجم الدفعة
+		commit: حفظ المعاملة بعد كل دفعة
+
+	Returns:
+		dict: {updated, skipped: [{name, reason}], total}
+	"""
+	validate_target_status(status)
+	frappe.has_permission("Booking", "write", throw=True)
+
+	names = list(dict.fromkeys(n for n in (names or []) if n))
+	result = {"updated": 0, "skipped": [], "total": len(names)}
+	if not names:
+		return result
+
+	for start in range(0, len(names), chunk_size):
+		chunk = names[start:start + chunk_size]
+		allowed, skipped = check_chunk(chunk, status)
+		result["skipped"].extend(skipped)
+		if allowed:
+			applied, changed = apply_status_chunk(allowed, status)
+			result["skipped"].extend(changed)
+			queue_status_side_effects(applied, status)
+			result["updated"] += len(applied)
+
+		if commit:
+			frappe.db.commit()
+
+		done = min(start + chunk_size, len(names))
+		frappe.publish_progress(
+			done * 100 / len(names),
+			title=_("تحديث حالة الحجوزات"),
+			description=_("{0} من {1}").format(done, len(names))
+		)
+
+	# مرة واحدة لكل العملية بدلاً من مرة لكل حجز
+	clear_calendar_capacity_cache()
+	invalidate_tags("booking")
+	return result
+
+
+# ============ Rules (once per chunk) ============
+
+def validate_target_status(status):
+	"""الحالة الجديدة يجب أن تكون من خيارات حقل status"""
+	options = (frappe.get_meta("Booking").get_field("status").options or "").split("\n")
+	if not status or status not in options:
+		frappe.throw(_("حالة غير صالحة: {0}").format(status))
+
+
+def check_chunk(names, status):
+	"""
+	فحص دفعة حجوزات باستعلام واحد
+
+	- frappe.get_list يطبق صلاحيات المستخدم (الحجوزات غير المسموحة لا تُرجع)
+	- قواعد الانتقال وقاعدة الحجوزات المدفوعة بالكامل (نفس check_deletion_permission) تُفحص في الذاكرة
+
+	Returns:
+		tuple: (الصفوف المسموح تحديثها، [{name, reason}] للصفوف المتجاهلة)
+	"""
+	rows = frappe.get_list(
+		"Booking",
+		filters={"name": ["in", names]},
+		fields=BOOKING_FIELDS,
+		limit_page_length=0
+	)
+	by_name = {row.name: row for row in rows}
+	is_admin = frappe.session.user == "Administrator"
+
+	allowed = []
+	skipped = []
+	for name in names:
+		row = by_name.get(name)
+		reason = None
+		if row is None:
+			reason = _("غير موجود أو لا توجد صلاحية")
+		elif row.docstatus == 2:
+			reason = _("الحجز ملغي")
+		elif (row.status or "") == status:
+			reason = _("الحالة بالفعل {0}").format(status)
+		elif status not in STATUS_TRANSITIONS.get(row.status or "", ()):
+			reason = _("لا يمكن الانتقال من {0} إلى {1}").format(row.status or "-", status)
+		elif status == "Cancelled" and not is_admin and is_fully_paid(row):
+			reason = _("لا يمكن إلغاء حجز مدفوع بالكامل")
+
+		if reason:
+			skipped.append({"name": name, "reason": reason})
+		else:
+			allowed.append(row)
+	return allowed, skipped
+
+
+def is_fully_paid(row):
+	"""حجز خدمة مدفوع بالكامل (نفس شرط check_deletion_permission)"""
+	if row.booking_type != "Service":
+		return False
+	paid_amount = flt(row.paid_amount)
+	total_amount = flt(row.total_amount)
+	return paid_amount > 0 and total_amount > 0 and abs(paid_amount - total_amount) < 0.01
+
+
+# ============ Set-based Update ============
+
+def lock_chunk(rows):
+	"""
+	إعادة قراءة الدفعة مع قفل صفوفها (SELECT ... FOR UPDATE)
+
+	الحجوزات التي تغيرت حالتها (أو أُلغيت) بين الفحص والقفل تُستبعد، والباقي يُعاد
+	بقيمه الحالية فيُبنى عليها السجل والجدول التجميعي والإشعارات
+
+	Returns:
+		tuple: (الصفوف المقفلة، [{name, reason}] للصفوف التي تغيرت)
+	"""
+	checked = {row.name: row for row in rows}
+	fields = ", ".join(f"`{field}`" for field in BOOKING_FIELDS)
+	locked = {
+		row.name: row
+		for row in frappe.db.sql(f"""
+			SELECT {fields} FROM `tabBooking`
+			WHERE name IN %(names)s AND docstatus < 2
+			ORDER BY name
+			FOR UPDATE
+		""", {"names": list(checked)}, as_dict=True)
+	}
+
+	current = []
+	changed = []
+	for name, row in checked.items():
+		locked_row = locked.get(name)
+		if locked_row and (locked_row.status or "") == (row.status or ""):
+			current.append(locked_row)
+		else:
+			changed.append({"name": name, "reason": _("تغيرت حالة الحجز أثناء التحديث")})
+	return current, changed
+
+
+def apply_status_chunk(rows, status):
+	"""
+	تطبيق الحالة على دفعة مسموحة: UPDATE لكل حالة سابقة، Version و Comment بالجملة،
+	وفرق الجدول التجميعي مرة واحدة
+
+	Args:
+		rows: صفوف check_chunk المسموحة
+		status: الحالة الجديدة
+
+	Returns:
+		tuple: (الصفوف المحدّثة، [{name, reason}] للصفوف التي تغيرت بعد الفحص)
+	"""
+	timestamp = now()
+	user = frappe.session.user
+
+	# السجل والجدول التجميعي والإشعارات تُبنى فقط على الصفوف المقفلة بحالتها المفحوصة
+	rows, changed = lock_chunk(rows)
+	if not rows:
+		return rows, changed
+
+	by_old_status = {}
+	for row in rows:
+		by_old_status.setdefault(row.status or "", []).append(row.name)
+
+	for old_status, names in by_old_status.items():
+		frappe.db.sql("""
+			UPDATE `tabBooking`
+			SET status = %(status)s, modified = %(modified)s, modified_by = %(user)s
+			WHERE name IN %(names)s AND IFNULL(status, '') = %(old_status)s AND docstatus < 2
+		""", {"status": status, "modified": timestamp, "user": user, "names": names, "old_status": old_status})
+
+	insert_audit_rows(rows, status, timestamp, user)
+
+	# فرق الجدول التجميعي وتحديث اللوحات لكل الدفعة
+	attach_booking_children(rows)
+	delta = {}
+	for row in rows:
+		new_row = frappe._dict(row, status=status)
+		for key, measures in diff_contributions(get_booking_contributions(new_row), get_booking_contributions(row)).items():
+			entry = delta.setdefault(key, [0, 0, 0.0, 0])
+			for i, value in enumerate(measures):
+				entry[i] += value
+	apply_rollup_delta(delta)
+	publish_booking_delta(frappe._dict(doctype="Booking", name="bulk_update_status"), delta)
+	return rows, changed
+
+
+def insert_audit_rows(rows, status, timestamp, user):
+	"""صفوف Version (سجل التغييرات) و Comment (سطر في النشاط) لكل حجز بإدراج واحد"""
+	versions = []
+	comments = []
+	for row in rows:
+		old_status = row.status or ""
+		versions.append((
+			frappe.generate_hash(length=10), timestamp, timestamp, user, user,
+			"Booking", row.name,
+			frappe.as_json({"changed": [["status", old_status, status]], "added": [], "removed": [], "row_changed": []})
+		))
+		comments.append((
+			frappe.generate_hash(length=10), timestamp, timestamp, user, user,
+			"Info", "Booking", row.name, user,
+			_("تغيير الحالة من {0} إلى {1} (تحديث مجمع)").format(old_status or "-", status)
+		))
+
+	frappe.db.bulk_insert(
+		"Version",
+		["name", "creation", "modified", "owner", "modified_by", "ref_doctype", "docname", "data"],
+		versions
+	)
+	frappe.db.bulk_insert(
+		"Comment",
+		["name", "creation", "modified", "owner", "modified_by",
+			"comment_type", "reference_doctype", "reference_name", "comment_email", "content"],
+		comments
+	)
+
+
+# ============ Side Effects (background) ============
+
+def queue_status_side_effects(rows, status):
+	"""
+	بريد التأكيد وإشعارات المدراء عبر طابور Booking Email (إدراج واحد لكل الدفعة،
+	والإرسال في المهمة الخلفية بعد حفظ المعاملة)
+	"""
+	if status not in ("Confirmed", "Cancelled") or not rows:
+		return
+
+	if status == "Confirmed":
+		title, message, notification_type, priority = _("Booking Confirmed"), _("Booking {0} has been confirmed"), "Booking Confirmed", "Medium"
+	else:
+		title, message, notification_type, priority = _("Booking Cancelled"), _("Booking {0} has been cancelled"), "Booking Cancelled", "High"
+
+	entries = [
+		get_notification_entry(row.name, notification_type, title, message.format(row.name), priority)
+		for row in rows
+	]
+	if status == "Confirmed":
+		entries.extend(get_confirmation_entry(row.name) for row in rows if not cint(row.confirmation_sent))
+	queue_emails(entries)
+
+
+def run_bulk_status_job(names, status):
+	"""تنفيذ التحديث المجمع كمهمة خلفية ثم إبلاغ المستخدم بالنتيجة"""
+	result = bulk_update_booking_status(names, status)
+	frappe.publish_realtime("booking_bulk_status_done", result, user=frappe.session.user)
+	return result
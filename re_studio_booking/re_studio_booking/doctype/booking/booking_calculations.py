@@ -11,6 +11,12 @@ from frappe import _
 from frappe.utils import flt, time_diff_in_seconds
 from datetime import datetime, timedelta
 
+from .booking_pricing import get_pricing_engine, reset_pricing_engine
+from re_studio_booking.re_studio_booking.doctype.general_settings.general_settings_cache import (
+	DEFAULT_DEPOSIT_PERCENTAGE,
+	get_studio_settings_snapshot
+)
+
 
 # ============ Deposit Calculations ============
 
@@ -48,13 +54,7 @@ def calculate_deposit_amount(booking_doc):
 		
 		# إذا لم تكن النسبة محددة، استخدم القيمة الافتراضية
 		if deposit_percentage <= 0:
-			deposit_percentage = 30  # افتراضي 30%
-			try:
-				general_settings = frappe.get_single('General Settings')
-				if hasattr(general_settings, 'default_deposit_percentage') and general_settings.default_deposit_percentage:
-					deposit_percentage = float(general_settings.default_deposit_percentage)
-			except:
-				pass
+			deposit_percentage = get_studio_settings_snapshot().default_deposit_percentage or DEFAULT_DEPOSIT_PERCENTAGE
 		
 		# 3. حساب العربون من النسبة
 		computed_deposit = round(basis * deposit_percentage / 100.0, 2)
@@ -64,18 +64,7 @@ def calculate_deposit_amount(booking_doc):
 			computed_deposit = basis
 		
 		# 5. جلب الحد الأدنى لمبلغ الحجز من General Settings
-		min_deposit = 0.0
-		try:
-			if frappe.db.exists('DocType', 'General Settings'):
-				settings = frappe.db.get_singles_dict('General Settings') or {}
-				# البحث في أسماء مختلفة للحقل
-				for key in ('الحد الأدنى لمبلغ الحجز', 'minimum_booking_amount', 'min_booking_amount'):
-					if key in settings and settings.get(key) not in (None, ""):
-						min_deposit = float(settings.get(key) or 0)
-						break
-		except Exception as e:
-			frappe.logger().debug(f"خطأ في جلب الحد الأدنى: {str(e)}")
-			min_deposit = 0.0
+		min_deposit = get_studio_settings_snapshot().minimum_booking_amount
 		
 		# 6. تطبيق الحد الأدنى (إذا كان العربون المحسوب أقل)
 		if min_deposit > 0:
@@ -118,20 +107,9 @@ def set_default_deposit_percentage(booking_doc):
 	"""
 	if getattr(booking_doc, 'deposit_percentage', None) not in (None, ""):
 		return
-	try:
-		settings = frappe.db.get_singles_dict('General Settings') if frappe.db.exists('DocType', 'General Settings') else {}
-		val = None
-		for key in ('نسبة العربون (%)', 'deposit_percentage', 'نسبة_العربون_%'):
-			if key in settings and settings.get(key) is not None:
-				val = settings.get(key)
-				break
-		if val is not None:
-			booking_doc.deposit_percentage = flt(val)
-	except Exception:
-		pass
+	deposit_percentage = get_studio_settings_snapshot().deposit_percentage
 	# fallback النهائي
-	if getattr(booking_doc, 'deposit_percentage', None) in (None, ""):
-		booking_doc.deposit_percentage = 30
+	booking_doc.deposit_percentage = DEFAULT_DEPOSIT_PERCENTAGE if deposit_percentage is None else deposit_percentage
 
 
 # ============ Time Calculations ============
@@ -271,14 +249,17 @@ def calculate_service_totals(booking_doc):
 	if booking_doc.booking_type != "Service" or not hasattr(booking_doc, 'selected_services_table'):
 		return
 	
+	# تحميل أسعار كل الخدمات دفعة واحدة
+	engine = get_pricing_engine(booking_doc)
+	
 	# اجلب خصم المصور فقط إن كان B2B
 	photographer_discount_pct = 0
 	allowed_services = set()
 	if getattr(booking_doc, 'photographer_b2b', False) and getattr(booking_doc, 'photographer', None):
 		try:
-			photographer_discount_pct = float(frappe.db.get_value("Photographer", booking_doc.photographer, "discount_percentage") or 0)
-			photographer_services = frappe.get_all("Photographer Service", filters={"parent": booking_doc.photographer, "is_active": 1}, fields=["service"])
-			allowed_services = {ps.service for ps in photographer_services}
+			photographer_pricing = engine.get_photographer_pricing(booking_doc.photographer)
+			photographer_discount_pct = float(photographer_pricing['discount_percentage'] or 0)
+			allowed_services = photographer_pricing['active_services']
 		except Exception:
 			photographer_discount_pct = 0
 	
@@ -303,7 +284,7 @@ def calculate_service_totals(booking_doc):
 		if not getattr(service_item, 'service', None):
 			continue
 		try:
-			base_price = float(frappe.db.get_value("Service", service_item.service, "price") or 0)
+			base_price = float(engine.get_service_price(service_item.service) or 0)
 		except Exception:
 			base_price = 0
 		
@@ -419,6 +400,9 @@ def recompute_pricing(booking_doc):
 	Args:
 		booking_doc: مستند الحجز
 	"""
+	# ذاكرة أسعار جديدة لكل إعادة حساب (تُستخدم أيضاً في calculate_booking_total بعدها)
+	reset_pricing_engine(booking_doc)
+	
 	if booking_doc.booking_type == 'Service':
 		_build_service_rows(booking_doc)
 		calculate_service_totals(booking_doc)
@@ -453,21 +437,19 @@ def _build_package_rows(booking_doc):
 	package_doc = frappe.get_doc("Package", booking_doc.package)
 	package_services = package_doc.package_services or []
 	
+	# تحميل أسعار كل خدمات الباقة باستعلام واحد
+	engine = get_pricing_engine(booking_doc, package_services)
+	
 	# تحديد ما إذا كان هناك خصم للمصور
 	photographer_discount = 0
 	photographer_services = {}
 	
 	if getattr(booking_doc, 'photographer', None) and getattr(booking_doc, 'photographer_b2b', False):
 		try:
-			photographer_doc = frappe.get_doc('Photographer', booking_doc.photographer)
-			photographer_discount = flt(photographer_doc.discount_percentage or 0)
-			# جلب الخدمات مع السعر المخصوم من جدول خدمات المصور
-			for ps in photographer_doc.get('services', []):
-				photographer_services[ps.service] = {
-					'discounted_price': flt(ps.get('discounted_price') or 0),
-					'base_price': flt(ps.get('base_price') or 0),
-					'allow_discount': ps.get('allow_discount', 0)
-				}
+			# نسبة الخصم والخدمات مع السعر المخصوم من جدول خدمات المصور (استعلام واحد)
+			photographer_pricing = engine.get_photographer_pricing(booking_doc.photographer)
+			photographer_discount = flt(photographer_pricing['discount_percentage'] or 0)
+			photographer_services = photographer_pricing['services']
 		except Exception as e:
 			frappe.log_error(f"Error fetching photographer discount: {str(e)}")
 	
@@ -479,7 +461,7 @@ def _build_package_rows(booking_doc):
 		# Get base price from Service master
 		base_price = 0
 		try:
-			base_price = flt(frappe.db.get_value("Service", service.service, "price") or 0)
+			base_price = flt(engine.get_service_price(service.service) or 0)
 		except Exception:
 			base_price = 0
 		
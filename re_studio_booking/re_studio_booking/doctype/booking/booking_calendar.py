@@ -5,6 +5,8 @@ import frappe
 from frappe.utils import getdate, nowdate, add_days, format_date, format_time, get_datetime
 from frappe.utils.data import get_time
 
+from .booking_availability import get_booked_intervals
+
 @frappe.whitelist()
 def get_calendar_events(start, end, filters=None):
     """Get events for the calendar view
@@ -113,16 +115,11 @@ def get_photographer_availability(date, photographer=None):
             fields=["name", "full_name"]
         )
     
-    # Get existing bookings for the date
-    bookings = frappe.get_all(
-        "Booking",
-        filters={
-            "booking_date": date,
-            "status": ["not in", ["Cancelled"]],
-            "photographer": ["in", [p.name for p in photographers]] if photographers else ""
-        },
-        fields=["photographer", "start_time", "end_time"]
-    )
+    # Get existing bookings (Service + Package dates) for the date
+    bookings = get_booked_intervals(
+        [date],
+        photographers=[p.name for p in photographers]
+    ) if photographers else []
     
     # Check photographer availability
     availability = {}
@@ -155,7 +152,7 @@ def get_photographer_availability(date, photographer=None):
                         "start": format_time(current_time),
                         "end": format_time(slot["start"])
                     })
-                current_time = slot["end"]
+                current_time = max(current_time, slot["end"])
             
             # Add final slot if needed
             if current_time < business_end:
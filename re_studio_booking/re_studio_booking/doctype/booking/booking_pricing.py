@@ -0,0 +1,140 @@
+# Copyright (c) 2023, MASAR TEAM and contributors
+# For license information, please see license.txt
+
+"""
+Booking Pricing Engine
+تحميل أسعار الخدمات وخصومات المصور دفعة واحدة لكل الحجز
+بدلاً من استعلام لكل صف في جداول الخدمات
+"""
+
+import frappe
+from frappe.utils import flt
+
+
+class PricingEngine:
+	"""
+	ذاكرة مؤقتة لأسعار الخدمات وبيانات خصم المصور خلال عملية حساب واحدة
+
+	- أسعار الخدمات: استعلام واحد لكل مجموعة خدمات جديدة
+	- بيانات المصور: استعلام واحد (نسبة الخصم + صفوف Photographer Service)
+	"""
+
+	def __init__(self):
+		self._prices = {}
+		self._photographers = {}
+
+	# ------------------------ Service Prices ------------------------ #
+	def load_service_prices(self, services):
+		"""
+		تحميل أسعار مجموعة خدمات باستعلام واحد (الخدمات غير المحملة فقط)
+
+		Args:
+			services: قائمة أكواد الخدمات
+		"""
+		missing = {s for s in (services or []) if s and s not in self._prices}
+		if not missing:
+			return
+		for row in frappe.get_all("Service", filters={"name": ["in", list(missing)]}, fields=["name", "price"]):
+			self._prices[row.name] = row.price
+		# الخدمات غير الموجودة تعامل كسعر صفر (مثل get_value التي ترجع None)
+		for service in missing:
+			self._prices.setdefault(service, None)
+
+	def get_service_price(self, service):
+		"""
+		السعر الأساسي للخدمة كما يرجعه frappe.db.get_value("Service", service, "price")
+		"""
+		if service not in self._prices:
+			self.load_service_prices([service])
+		return self._prices.get(service)
+
+	# ------------------------ Photographer ------------------------ #
+	def get_photographer_pricing(self, photographer):
+		"""
+		نسبة خصم المصور وصفوف خدماته باستعلام واحد
+
+		Returns:
+			dict: {
+				discount_percentage: نسبة الخصم العامة,
+				services: {service: {discounted_price, base_price, allow_discount}} (كل الصفوف),
+				active_services: مجموعة الخدمات المفعلة (is_active = 1)
+			}
+		"""
+		if photographer in self._photographers:
+			return self._photographers[photographer]
+
+		allow_discount_column = (
+			"ps.allow_discount"
+			if frappe.get_meta("Photographer Service").has_field("allow_discount")
+			else "0"
+		)
+		rows = frappe.db.sql(f"""
+			SELECT
+				p.discount_percentage,
+				ps.service, ps.discounted_price, ps.base_price, ps.is_active,
+				{allow_discount_column} AS allow_discount
+			FROM `tabPhotographer` p
+			LEFT JOIN `tabPhotographer Service` ps
+				ON ps.parent = p.name AND ps.parenttype = 'Photographer' AND ps.parentfield = 'services'
+			WHERE p.name = %s
+			ORDER BY ps.idx
+		""", (photographer,), as_dict=True)
+
+		pricing = {
+			"discount_percentage": rows[0].discount_percentage if rows else None,
+			"services": {},
+			"active_services": set()
+		}
+		for row in rows:
+			if not row.service:
+				continue
+			pricing["services"][row.service] = {
+				"discounted_price": flt(row.discounted_price or 0),
+				"base_price": flt(row.base_price or 0),
+				"allow_discount": row.allow_discount
+			}
+			if row.is_active == 1:
+				pricing["active_services"].add(row.service)
+
+		self._photographers[photographer] = pricing
+		return pricing
+
+
+def collect_service_codes(booking_doc, package_services=None):
+	"""
+	جمع كل أكواد الخدمات المستخدمة في الحجز (الباقة + الجداول)
+
+	Args:
+		booking_doc: مستند الحجز
+		package_services: صفوف خدمات الباقة (Package Service Item) إن كانت محملة
+	"""
+	services = set()
+	for row in (package_services or []):
+		services.add(getattr(row, 'service', None))
+	for table in ('package_services_table', 'selected_services_table', 'booking_service_items'):
+		for row in (getattr(booking_doc, table, None) or []):
+			services.add(getattr(row, 'service', None))
+	services.discard(None)
+	return services
+
+
+def get_pricing_engine(booking_doc, package_services=None):
+	"""
+	محرك التسعير الخاص بالحجز (يُنشأ مرة واحدة لكل عملية حساب ويُحفظ في flags)
+	مع تحميل أسعار كل خدمات الحجز مسبقاً باستعلام واحد
+
+	Args:
+		booking_doc: مستند الحجز
+		package_services: صفوف خدمات الباقة لتضمينها في التحميل المسبق
+	"""
+	engine = booking_doc.flags.get('pricing_engine')
+	if engine is None:
+		engine = PricingEngine()
+		booking_doc.flags.pricing_engine = engine
+	engine.load_service_prices(collect_service_codes(booking_doc, package_services))
+	return engine
+
+
+def reset_pricing_engine(booking_doc):
+	"""حذف الذاكرة المؤقتة للتسعير (بداية كل validate / recompute)"""
+	booking_doc.flags.pricing_engine = None
@@ -0,0 +1,274 @@
+# Copyright (c) 2023, MASAR TEAM and contributors
+# For license information, please see license.txt
+
+"""
+Booking Slot Grid
+تمثيل اليوم كخريطة دقائق (bytearray بطول 1440) لحساب الفترات المتاحة
+لأي طول فترة وأي خطوة، لعدة أيام وعدة مصورين باستعلام واحد
+"""
+
+from datetime import timedelta
+
+from frappe.utils import getdate
+
+from .booking_availability import get_booked_intervals, time_to_seconds
+from re_studio_booking.re_studio_booking.doctype.general_settings.general_settings_cache import get_studio_settings_snapshot
+
+MINUTES_PER_DAY = 24 * 60
+FREE = 1
+BUSY = 0
+
+
+# ============ Minute Helpers ============
+
+def time_to_minutes(value):
+	"""تحويل قيمة وقت إلى عدد الدقائق من بداية اليوم (None إذا كانت فارغة)"""
+	seconds = time_to_seconds(value)
+	if seconds is None:
+		return None
+	return min(max(seconds // 60, 0), MINUTES_PER_DAY)
+
+
+def minutes_to_time(minutes):
+	"""تحويل عدد الدقائق إلى نص HH:MM:SS"""
+	return f"{minutes // 60:02d}:{minutes % 60:02d}:00"
+
+
+# ============ Day Grid ============
+
+class DayGrid:
+	"""
+	خريطة دقائق ليوم واحد: 1 = متاح، 0 = مغلق أو محجوز
+
+	الحجز يتم بإسناد شريحة (slice) والبحث عن الفترات الحرة يتم عبر
+	bytearray.find على مستوى C، لذلك لا توجد حلقة لكل دقيقة في Python.
+	"""
+
+	__slots__ = ('opening', 'closing', 'minutes')
+
+	def __init__(self, opening, closing):
+		self.opening = opening
+		self.closing = closing
+		self.minutes = bytearray(MINUTES_PER_DAY)
+		if closing > opening:
+			self.minutes[opening:closing] = b'\x01' * (closing - opening)
+
+	def copy(self):
+		grid = DayGrid.__new__(DayGrid)
+		grid.opening = self.opening
+		grid.closing = self.closing
+		grid.minutes = bytearray(self.minutes)
+		return grid
+
+	def is_open(self):
+		return self.closing > self.opening
+
+	def block(self, start, end):
+		"""حجز الدقائق [start, end)"""
+		start = max(start, 0)
+		end = min(end, MINUTES_PER_DAY)
+		if end > start:
+			self.minutes[start:end] = bytes(end - start)
+
+	def intersect(self, other):
+		"""حجز كل دقيقة محجوزة في خريطة أخرى"""
+		for start, end in other.busy_runs():
+			self.block(start, end)
+
+	def free_runs(self):
+		"""الفترات الحرة المتصلة كقائمة (start, end)"""
+		return self._runs(FREE)
+
+	def busy_runs(self):
+		"""الفترات المحجوزة داخل ساعات العمل كقائمة (start, end)"""
+		return [
+			(max(start, self.opening), min(end, self.closing))
+			for start, end in self._runs(BUSY)
+			if end > self.opening and start < self.closing
+		]
+
+	def _runs(self, value):
+		other = bytes([1 - value])
+		target = bytes([value])
+		runs = []
+		pos = self.minutes.find(target)
+		while pos != -1:
+			end = self.minutes.find(other, pos)
+			if end == -1:
+				end = MINUTES_PER_DAY
+			runs.append((pos, end))
+			pos = self.minutes.find(target, end)
+		return runs
+
+	def free_minutes(self):
+		return self.minutes.count(FREE)
+
+	def free_slots(self, length, step=None):
+		"""
+		بدايات كل الفترات المتاحة بطول length دقيقة
+
+		الفترات تبدأ من وقت الافتتاح كل step دقيقة ويجب أن تكون كاملة داخل فترة حرة.
+
+		Args:
+			length: طول الفترة بالدقائق
+			step: الخطوة بين بدايات الفترات (افتراضياً = length)
+
+		Returns:
+			list: بدايات الفترات بالدقائق
+		"""
+		step = step or length
+		if length <= 0 or step <= 0:
+			return []
+		slots = []
+		for run_start, run_end in self.free_runs():
+			# أول بداية محاذاة للخطوة داخل الفترة الحرة
+			offset = (run_start - self.opening) % step
+			first = run_start if offset == 0 else run_start + step - offset
+			last = run_end - length
+			if first <= last:
+				slots.extend(range(first, last + 1, step))
+		return slots
+
+	def slot_states(self, length, step=None):
+		"""
+		كل الفترات المرشحة خلال ساعات العمل مع حالة التوفر
+
+		Returns:
+			list: (بداية الفترة بالدقائق، متاحة؟)
+		"""
+		step = step or length
+		if length <= 0 or step <= 0:
+			return []
+		free = set(self.free_slots(length, step))
+		return [(start, start in free) for start in range(self.opening, self.closing - length + 1, step)]
+
+
+# ============ Slot Grid (many days / photographers) ============
+
+class SlotGrid:
+	"""
+	خرائط الدقائق لعدة أيام ولعدة مصورين من استعلام واحد (get_booked_intervals)
+
+	- الخريطة بدون مصور (None) تمثل الاستديو: كل الحجوزات تحجزها
+	- خريطة المصور تحجزها حجوزات هذا المصور فقط، ومع studio_exclusive
+	  تحجزها أيضاً كل حجوزات الاستديو (نفس قواعد validate_availability)
+	"""
+
+	def __init__(self, dates, photographers=None, studio_exclusive=True, working_days_only=True,
+			exclude_booking=None, exclude_statuses=("Cancelled",), settings=None, rows=None):
+		"""
+		Args:
+			dates: قائمة التواريخ
+			photographers: قائمة المصورين (اختياري)
+			studio_exclusive: حجوزات أي مصور تشغل الاستديو بالكامل
+			working_days_only: الأيام غير العاملة تكون مغلقة بالكامل
+			exclude_booking: حجز يتم تجاهله (الحجز الحالي عند التعديل)
+			exclude_statuses: الحالات التي لا تحجز الوقت
+			settings: StudioSettings (افتراضياً النسخة المخزنة)
+			rows: صفوف الفترات إن كانت محملة مسبقاً (بدلاً من الاستعلام)
+		"""
+		settings = settings or get_studio_settings_snapshot()
+		self.dates = sorted({getdate(d) for d in (dates or []) if d})
+		self.photographers = list(photographers or [])
+		self.studio_exclusive = studio_exclusive
+		self.opening = time_to_minutes(settings.opening_time)
+		self.closing = time_to_minutes(settings.closing_time)
+		self.buffer = settings.booking_buffer_time or 0
+		working_days = set(settings.working_days) if working_days_only else None
+
+		if rows is None:
+			# مع studio_exclusive نحتاج كل حجوزات اليوم وليس حجوزات المصورين فقط
+			query_photographers = None if (studio_exclusive or not self.photographers) else self.photographers
+			rows = get_booked_intervals(
+				self.dates, photographers=query_photographers,
+				exclude_booking=exclude_booking, exclude_statuses=exclude_statuses
+			) if self.dates else []
+
+		self._grids = {}
+		for day in self.dates:
+			is_open = working_days is None or day.strftime('%A') in working_days
+			base = DayGrid(self.opening, self.closing) if is_open else DayGrid(0, 0)
+			self._grids[(day, None)] = base
+			for photographer in self.photographers:
+				self._grids[(day, photographer)] = base.copy()
+
+		for row in rows:
+			self._add(row)
+
+		if studio_exclusive:
+			for day in self.dates:
+				studio = self._grids[(day, None)]
+				for photographer in self.photographers:
+					self._grids[(day, photographer)].intersect(studio)
+
+	def _add(self, row):
+		start = time_to_minutes(row.get("start_time"))
+		end = time_to_minutes(row.get("end_time"))
+		if start is None or end is None or not row.get("booking_date"):
+			return
+		day = getdate(row.get("booking_date"))
+		end = end + self.buffer
+		studio = self._grids.get((day, None))
+		if studio is not None:
+			studio.block(start, end)
+		photographer_grid = self._grids.get((day, row.get("photographer")))
+		if photographer_grid is not None and row.get("photographer"):
+			photographer_grid.block(start, end)
+
+	def get_grid(self, day, photographer=None):
+		return self._grids.get((getdate(day), photographer))
+
+	def free_slots(self, day, length, step=None, photographer=None):
+		"""بدايات الفترات المتاحة كنصوص HH:MM:SS ليوم واحد"""
+		grid = self.get_grid(day, photographer)
+		if grid is None:
+			return []
+		return [minutes_to_time(m) for m in grid.free_slots(length, step)]
+
+	def availability(self, length, step=None):
+		"""
+		الفترات المتاحة لكل يوم (وللاستديو ولكل مصور)
+
+		Returns:
+			dict: {date: {"studio": [...], "photographers": {photographer: [...]}}}
+		"""
+		result = {}
+		for day in self.dates:
+			result[str(day)] = {
+				"studio": self.free_slots(day, length, step),
+				"photographers": {
+					photographer: self.free_slots(day, length, step, photographer)
+					for photographer in self.photographers
+				}
+			}
+		return result
+
+
+def get_day_slots(booking_date, length=None, step=None, photographer=None, studio_exclusive=True,
+		working_days_only=True, exclude_statuses=("Cancelled",)):
+	"""
+	الفترات المتاحة ليوم واحد (اختصار لـ SlotGrid)
+
+	Args:
+		booking_date: التاريخ
+		length: طول الفترة بالدقائق (افتراضياً time_slot_duration من الإعدادات)
+		step: الخطوة بين البدايات (افتراضياً = length)
+		photographer: لحساب التوفر لمصور محدد
+
+	Returns:
+		list: بدايات الفترات المتاحة HH:MM:SS
+	"""
+	settings = get_studio_settings_snapshot()
+	length = length or settings.time_slot_duration or 60
+	grid = SlotGrid(
+		[booking_date], photographers=[photographer] if photographer else None,
+		studio_exclusive=studio_exclusive, working_days_only=working_days_only,
+		exclude_statuses=exclude_statuses, settings=settings
+	)
+	return grid.free_slots(booking_date, length, step, photographer)
+
+
+def date_range(start_date, days):
+	"""قائمة days تاريخ متتالي بدءاً من start_date"""
+	start = getdate(start_date)
+	return [start + timedelta(days=i) for i in range(max(int(days or 0), 0))]
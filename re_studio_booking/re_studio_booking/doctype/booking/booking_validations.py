@@ -11,6 +11,8 @@ from frappe import _
 from frappe.utils import getdate, nowdate, flt
 from datetime import datetime
 
+from .booking_availability import build_interval_index, get_conflicting_bookings
+
 
 # ============ Date Validations ============
 
@@ -172,17 +174,24 @@ def validate_availability(booking_doc):
 	if not dates_to_check:
 		return
 	
+	# بناء فهرس الفترات لكل التواريخ باستعلام واحد ثم التحقق في الذاكرة
+	index = build_interval_index(
+		[date_slot['date'] for date_slot in dates_to_check],
+		exclude_booking=booking_doc.name
+	)
+	
 	# التحقق من كل تاريخ
 	for date_slot in dates_to_check:
 		_check_single_date_availability(
 			booking_doc, 
 			date_slot['date'], 
 			date_slot['start'], 
-			date_slot['end']
+			date_slot['end'],
+			index=index
 		)
 
 
-def _check_single_date_availability(booking_doc, check_date, check_start, check_end):
+def _check_single_date_availability(booking_doc, check_date, check_start, check_end, index=None):
 	"""
 	التحقق من توفر تاريخ ووقت محدد
 	
@@ -191,81 +200,46 @@ def _check_single_date_availability(booking_doc, check_date, check_start, check_
 		check_date: التاريخ المراد التحقق منه
 		check_start: وقت البداية
 		check_end: وقت النهاية
+		index: فهرس الفترات (BookingIntervalIndex) - عند عدم تمريره يتم الاستعلام
+			عن التعارضات الفعلية لهذه الفترة فقط
 	"""
+	exclude_booking = booking_doc.name or "new"
+	
 	# التحقق الأول: تعارض مع نفس المصور (إذا تم تحديد مصور)
 	if getattr(booking_doc, 'photographer', None):
-		existing_photographer_bookings = frappe.get_all(
-			"Booking",
-			filters=[
-				["booking_type", "=", "Service"],  # Service bookings
-				["booking_date", "=", check_date],
-				["photographer", "=", booking_doc.photographer],
-				["status", "not in", ["Cancelled"]],
-				["name", "!=", booking_doc.name or "new"],
-				["start_time", "<", check_end],
-				["end_time", ">", check_start]
-			]
-		)
+		if index is not None:
+			photographer_conflicts = index.find_photographer_conflicts(
+				check_date, booking_doc.photographer, check_start, check_end
+			)
+		else:
+			photographer_conflicts = get_conflicting_bookings(
+				check_date, check_start, check_end,
+				photographer=booking_doc.photographer,
+				exclude_booking=exclude_booking
+			)
 		
-		if existing_photographer_bookings:
+		if photographer_conflicts:
 			frappe.throw(_(
 				f"⚠️ المصور محجوز في هذا الوقت!<br><br>"
 				f"<b>التاريخ:</b> {check_date}<br>"
 				f"<b>الوقت:</b> {check_start} - {check_end}<br><br>"
 				f"الرجاء اختيار مصور آخر أو وقت آخر."
 			))
-		
-		# تحقق من Package bookings للمصور
-		photographer_package_bookings = frappe.get_all(
-			"Package Booking Date",
-			filters=[
-				["booking_date", "=", check_date],
-				["start_time", "<", check_end],
-				["end_time", ">", check_start]
-			],
-			fields=["parent", "booking_date", "start_time", "end_time"]
+	
+	# التحقق الثاني: تعارض في الاستديو (Service ثم Package)
+	if index is not None:
+		studio_conflicts = index.find_studio_conflicts(check_date, check_start, check_end)
+	else:
+		studio_conflicts = get_conflicting_bookings(
+			check_date, check_start, check_end, exclude_booking=exclude_booking
 		)
-		
-		for pkg_date in photographer_package_bookings:
-			# تحقق من أن الحجز ليس ملغي وله نفس المصور
-			booking = frappe.db.get_value(
-				"Booking",
-				pkg_date.parent,
-				["photographer", "status", "name"],
-				as_dict=True
-			)
-			if (booking and 
-				booking.photographer == booking_doc.photographer and 
-				booking.status != "Cancelled" and
-				booking.name != (booking_doc.name or "new")):
-				frappe.throw(_(
-					f"⚠️ المصور محجوز في هذا الوقت!<br><br>"
-					f"<b>التاريخ:</b> {check_date}<br>"
-					f"<b>الوقت:</b> {check_start} - {check_end}<br><br>"
-					f"الرجاء اختيار مصور آخر أو وقت آخر."
-				))
-	
-	# التحقق الثاني: تعارض في الاستديو
-	# 1. تحقق من Service bookings
-	existing_studio_bookings = frappe.get_all(
-		"Booking",
-		filters=[
-			["booking_type", "=", "Service"],
-			["booking_date", "=", check_date],
-			["status", "not in", ["Cancelled"]],
-			["name", "!=", booking_doc.name or "new"],
-			["start_time", "<", check_end],
-			["end_time", ">", check_start]
-		],
-		fields=["name", "client_name", "booking_date", "start_time", "end_time"]
-	)
 	
-	if existing_studio_bookings:
-		conflict = existing_studio_bookings[0]
+	if studio_conflicts:
+		conflict = studio_conflicts[0]
 		frappe.throw(_(
 			f"⚠️ الاستديو محجوز في هذا الوقت!<br><br>"
 			f"<b>الحجز المتعارض:</b> {conflict.get('name')}<br>"
-			f"<b>العميل:</b> {conflict.get('client_name', 'غير محدد')}<br>"
+			f"<b>العميل:</b> {conflict.get('client_name') or 'غير محدد'}<br>"
 			f"<b>التاريخ:</b> {conflict.get('booking_date')}<br>"
 			f"<b>الوقت:</b> {conflict.get('start_time')} - {conflict.get('end_time')}<br><br>"
 			f"<b>الحجز الجديد:</b><br>"
@@ -273,40 +247,6 @@ def _check_single_date_availability(booking_doc, check_date, check_start, check_
 			f"<b>الوقت:</b> {check_start} - {check_end}<br><br>"
 			f"الرجاء اختيار وقت آخر."
 		), title=_("خطأ - الاستديو محجوز"))
-	
-	# 2. تحقق من Package bookings
-	package_bookings = frappe.get_all(
-		"Package Booking Date",
-		filters=[
-			["booking_date", "=", check_date],
-			["start_time", "<", check_end],
-			["end_time", ">", check_start]
-		],
-		fields=["parent", "booking_date", "start_time", "end_time"]
-	)
-	
-	for pkg_date in package_bookings:
-		# تحقق من أن الحجز ليس ملغي وليس نفس الحجز
-		booking_status = frappe.db.get_value(
-			"Booking",
-			pkg_date.parent,
-			["status", "client_name"],
-			as_dict=True
-		)
-		if (booking_status and 
-			booking_status.status != "Cancelled" and
-			pkg_date.parent != (booking_doc.name or "new")):
-			frappe.throw(_(
-				f"⚠️ الاستديو محجوز في هذا الوقت!<br><br>"
-				f"<b>الحجز المتعارض:</b> {pkg_date.parent}<br>"
-				f"<b>العميل:</b> {booking_status.get('client_name', 'غير محدد')}<br>"
-				f"<b>التاريخ:</b> {pkg_date.booking_date}<br>"
-				f"<b>الوقت:</b> {pkg_date.start_time} - {pkg_date.end_time}<br><br>"
-				f"<b>الحجز الجديد:</b><br>"
-				f"<b>التاريخ:</b> {check_date}<br>"
-				f"<b>الوقت:</b> {check_start} - {check_end}<br><br>"
-				f"الرجاء اختيار وقت آخر."
-			), title=_("خطأ - الاستديو محجوز"))
 
 
 # ============ Hours Validation ============
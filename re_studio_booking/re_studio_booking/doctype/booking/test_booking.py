@@ -2,8 +2,294 @@
 # See license.txt
 
 # import frappe
+import datetime
+from contextlib import nullcontext
+from unittest.mock import patch
+
+import frappe
 from frappe.tests.utils import FrappeTestCase
+from frappe.utils import flt
+
+from re_studio_booking.re_studio_booking.doctype.booking.booking_availability import (
+	BookingIntervalIndex,
+	_calendar_cache_key,
+	clear_calendar_capacity_cache
+)
+from re_studio_booking.re_studio_booking.doctype.booking import booking_pricing
+from re_studio_booking.re_studio_booking.doctype.booking import booking_bulk
+from re_studio_booking.re_studio_booking.doctype.booking.booking_bulk import check_chunk
+from re_studio_booking.re_studio_booking.doctype.booking.booking_calculations import (
+	calculate_booking_total,
+	recompute_pricing
+)
+from re_studio_booking.re_studio_booking.doctype.booking.booking_slots import SlotGrid
+from re_studio_booking.re_studio_booking.doctype.general_settings.general_settings_cache import StudioSettings
 
 
 class TestBooking(FrappeTestCase):
 	pass
+
+
+class TestBookingIntervalIndex(FrappeTestCase):
+	def setUp(self):
+		self.index = BookingIntervalIndex([
+			{"name": "B-1", "photographer": "P-1", "booking_date": "2030-01-01",
+				"start_time": "10:00:00", "end_time": "12:00:00", "source": "Package"},
+			{"name": "B-2", "photographer": "P-2", "booking_date": "2030-01-01",
+				"start_time": "09:00:00", "end_time": "09:30:00", "source": "Service"},
+			{"name": "B-3", "photographer": "P-1", "booking_date": "2030-01-02",
+				"start_time": "10:00:00", "end_time": "11:00:00", "source": "Service"},
+		])
+
+	def test_studio_overlap(self):
+		conflicts = self.index.find_studio_conflicts("2030-01-01", "11:30:00", "13:00:00")
+		self.assertEqual([c["name"] for c in conflicts], ["B-1"])
+
+	def test_touching_intervals_do_not_conflict(self):
+		self.assertEqual(self.index.find_studio_conflicts("2030-01-01", "12:00:00", "13:00:00"), [])
+		self.assertEqual(self.index.find_studio_conflicts("2030-01-01", "09:30:00", "10:00:00"), [])
+
+	def test_long_interval_found_behind_later_starts(self):
+		conflicts = self.index.find_studio_conflicts("2030-01-01", "09:15:00", "11:00:00")
+		self.assertEqual([c["name"] for c in conflicts], ["B-2", "B-1"])
+
+	def test_photographer_scope(self):
+		self.assertEqual(self.index.find_photographer_conflicts("2030-01-01", "P-2", "10:00:00", "11:00:00"), [])
+		conflicts = self.index.find_photographer_conflicts("2030-01-02", "P-1", "10:30:00", "10:45:00")
+		self.assertEqual([c["name"] for c in conflicts], ["B-3"])
+
+
+class TestSlotGrid(FrappeTestCase):
+	def setUp(self):
+		# 2030-01-04 is a Friday (closed by default)
+		self.settings = StudioSettings(opening_time="09:00:00", closing_time="13:00:00")
+		self.grid = SlotGrid(
+			["2030-01-01", "2030-01-04"], photographers=["P-1", "P-2"], settings=self.settings,
+			rows=[
+				{"photographer": "P-1", "booking_date": "2030-01-01", "start_time": "10:00:00", "end_time": "11:00:00"},
+				{"photographer": "P-2", "booking_date": "2030-01-01", "start_time": "12:15:00", "end_time": "12:30:00"},
+			]
+		)
+
+	def test_slots_follow_business_hours_and_bookings(self):
+		self.assertEqual(
+			self.grid.free_slots("2030-01-01", 60),
+			["09:00:00", "11:00:00"]
+		)
+
+	def test_step_shorter_than_slot(self):
+		self.assertEqual(
+			self.grid.free_slots("2030-01-01", 60, 30),
+			["09:00:00", "11:00:00"]
+		)
+		self.assertEqual(
+			self.grid.free_slots("2030-01-01", 30, 15)[-3:],
+			["11:30:00", "11:45:00", "12:30:00"]
+		)
+
+	def test_photographer_grids(self):
+		grid = SlotGrid(
+			["2030-01-01"], photographers=["P-1", "P-2"], studio_exclusive=False, settings=self.settings,
+			rows=[{"photographer": "P-1", "booking_date": "2030-01-01", "start_time": "10:00:00", "end_time": "11:00:00"}]
+		)
+		self.assertEqual(grid.free_slots("2030-01-01", 60, photographer="P-1"), ["09:00:00", "11:00:00", "12:00:00"])
+		self.assertEqual(len(grid.free_slots("2030-01-01", 60, photographer="P-2")), 4)
+		# with studio_exclusive every booking blocks every photographer
+		self.assertEqual(self.grid.free_slots("2030-01-01", 60, photographer="P-2"), ["09:00:00", "11:00:00"])
+
+	def test_non_working_day_is_closed(self):
+		self.assertFalse(self.grid.get_grid("2030-01-04").is_open())
+		self.assertEqual(self.grid.free_slots("2030-01-04", 30), [])
+
+
+class TestBulkStatusRules(FrappeTestCase):
+	def check(self, rows, names, status, user="test@example.com"):
+		defaults = {"docstatus": 0, "booking_type": "Service", "paid_amount": 0, "total_amount": 100}
+		rows = [frappe._dict(defaults, **row) for row in rows]
+		with patch("frappe.get_list", return_value=rows), patch.object(frappe.session, "user", user):
+			allowed, skipped = check_chunk(names, status)
+		return [row.name for row in allowed], {row["name"] for row in skipped}
+
+	def test_transitions(self):
+		allowed, skipped = self.check(
+			[{"name": "B-1", "status": "Confirmed"}, {"name": "B-2", "status": "Cancelled"}, {"name": "B-3", "status": "Completed"}],
+			["B-1", "B-2", "B-3"], "Completed"
+		)
+		self.assertEqual(allowed, ["B-1"])
+		self.assertEqual(skipped, {"B-2", "B-3"})
+
+	def test_missing_or_forbidden_rows_are_skipped(self):
+		allowed, skipped = self.check([{"name": "B-1", "status": "Confirmed"}], ["B-1", "B-9"], "Cancelled")
+		self.assertEqual(allowed, ["B-1"])
+		self.assertEqual(skipped, {"B-9"})
+
+	def test_fully_paid_service_cannot_be_cancelled(self):
+		rows = [{"name": "B-1", "status": "Confirmed", "paid_amount": 100}]
+		self.assertEqual(self.check(rows, ["B-1"], "Cancelled")[0], [])
+		self.assertEqual(self.check(rows, ["B-1"], "Cancelled", user="Administrator")[0], ["B-1"])
+
+
+class TestBulkStatusConcurrentChange(FrappeTestCase):
+	"""A booking whose status changes between check_chunk and the update is left alone"""
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def seed_booking(self):
+		# inserted directly: only the columns the bulk update reads matter here
+		booking = frappe.get_doc({
+			"doctype": "Booking",
+			"name": f"_T-BULK-{frappe.generate_hash(length=8)}",
+			"status": "Confirmed",
+			"booking_type": "Service",
+			"booking_date": "2030-01-15"
+		})
+		booking.db_insert()
+		return booking.name
+
+	def test_only_locked_rows_get_audit_and_side_effects(self):
+		kept, changed = self.seed_booking(), self.seed_booking()
+
+		def check_then_change(names, status):
+			result = check_chunk(names, status)
+			# another request completes the booking after it was checked
+			frappe.db.sql("UPDATE `tabBooking` SET status = 'Completed' WHERE name = %s", changed)
+			return result
+
+		with patch.object(booking_bulk, "check_chunk", side_effect=check_then_change):
+			result = booking_bulk.bulk_update_booking_status([kept, changed], "Cancelled", commit=False)
+
+		self.assertEqual(result["updated"], 1)
+		self.assertEqual([row["name"] for row in result["skipped"]], [changed])
+		self.assertEqual(frappe.db.get_value("Booking", kept, "status"), "Cancelled")
+		self.assertEqual(frappe.db.get_value("Booking", changed, "status"), "Completed")
+		for doctype, filters in (
+			("Version", {"ref_doctype": "Booking", "docname": changed}),
+			("Comment", {"reference_doctype": "Booking", "reference_name": changed}),
+			("Booking Email", {"booking": changed})
+		):
+			self.assertEqual(frappe.db.count(doctype, filters), 0)
+		self.assertEqual(frappe.db.count("Version", {"ref_doctype": "Booking", "docname": kept}), 1)
+		self.assertTrue(frappe.db.count("Booking Email", {"booking": kept}))
+
+
+class TestCalendarCapacityCache(FrappeTestCase):
+	def key(self):
+		return _calendar_cache_key(datetime.date(2030, 1, 1), datetime.date(2030, 1, 31), [], False)
+
+	def test_clear_bumps_the_version_without_scanning(self):
+		before = self.key()
+		self.assertEqual(self.key(), before)
+
+		with patch.object(frappe.cache(), "delete_keys") as delete_keys:
+			clear_calendar_capacity_cache()
+		delete_keys.assert_not_called()
+		self.assertNotEqual(self.key(), before)
+
+
+class LegacyPricing:
+	"""الاستعلامات السابقة لكل صف (get_value / get_doc / get_all) بنفس واجهة PricingEngine"""
+
+	def load_service_prices(self, services):
+		pass
+
+	def get_service_price(self, service):
+		return frappe.db.get_value("Service", service, "price")
+
+	def get_photographer_pricing(self, photographer):
+		photographer_doc = frappe.get_doc("Photographer", photographer)
+		active = frappe.get_all("Photographer Service", filters={"parent": photographer, "is_active": 1}, fields=["service"])
+		return {
+			"discount_percentage": frappe.db.get_value("Photographer", photographer, "discount_percentage"),
+			"services": {
+				ps.service: {
+					"discounted_price": flt(ps.get("discounted_price") or 0),
+					"base_price": flt(ps.get("base_price") or 0),
+					"allow_discount": ps.get("allow_discount", 0)
+				}
+				for ps in photographer_doc.get("services", [])
+			},
+			"active_services": {ps.service for ps in active}
+		}
+
+
+class TestPricingEngineMatchesLegacy(FrappeTestCase):
+	"""المحرك يعطي نفس إجماليات الاستعلامات السابقة لكل صف، بما فيها خصم المصور"""
+
+	def setUp(self):
+		suffix = frappe.generate_hash(length=6)
+		self.services = [f"_Test Pricing {suffix} {i}" for i in range(3)]
+		# الخدمة الثالثة غير موجودة: سعرها صفر في المسارين
+		for service, price in zip(self.services, (100.5, 250, None)):
+			if price is not None:
+				self.seed("Service", service, service_name_en=service, price=price)
+
+		self.photographer = self.seed("Photographer", f"_Test Pricing {suffix}", first_name=f"_Test Pricing {suffix}", discount_percentage=15)
+		self.seed_child("Photographer Service", self.photographer, "Photographer", "services", [
+			{"service": self.services[0], "base_price": 100.5, "discounted_price": 80, "is_active": 1},
+			{"service": self.services[1], "base_price": 250, "discounted_price": 0, "is_active": 0},
+		])
+
+		self.package = self.seed("Package", f"_Test Pricing {suffix}", package_name=f"_Test Pricing {suffix}", total_hours=4)
+		self.seed_child("Package Service Item", self.package, "Package", "package_services", [
+			{"service": self.services[0], "quantity": 2, "package_price": 0},
+			{"service": self.services[1], "quantity": 1, "package_price": 200},
+			{"service": self.services[2], "quantity": 1, "package_price": 35},
+		])
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def seed(self, doctype, name, **values):
+		# إدراج مباشر: الاختبار يحتاج الأعمدة التي يقرأها التسعير فقط
+		frappe.get_doc({"doctype": doctype, "name": name, **values}).db_insert()
+		return name
+
+	def seed_child(self, doctype, parent, parenttype, parentfield, rows):
+		for idx, row in enumerate(rows, 1):
+			frappe.get_doc({
+				"doctype": doctype, "parent": parent, "parenttype": parenttype, "parentfield": parentfield,
+				"idx": idx, **row
+			}).db_insert()
+
+	def price(self, legacy, **values):
+		booking = frappe.get_doc({
+			"doctype": "Booking",
+			"photographer": self.photographer,
+			"photographer_b2b": 1,
+			**values
+		})
+		with patch.object(booking_pricing, "PricingEngine", LegacyPricing) if legacy else nullcontext():
+			recompute_pricing(booking)
+			calculate_booking_total(booking)
+		return booking
+
+	def test_service_booking_totals(self):
+		rows = [{"service": service, "mount": mount} for service, mount in zip(self.services, (3, 2, 1))]
+		legacy = self.price(True, booking_type="Service", selected_services_table=rows)
+		engine = self.price(False, booking_type="Service", selected_services_table=rows)
+
+		fields = ("service", "service_price", "discounted_price", "total_amount")
+		self.assertEqual(
+			[[row.get(field) for field in fields] for row in engine.selected_services_table],
+			[[row.get(field) for field in fields] for row in legacy.selected_services_table]
+		)
+		self.assertEqual((engine.base_amount, engine.total_amount), (legacy.base_amount, legacy.total_amount))
+		# خصم المصور طُبق فعلاً على الخدمة المفعلة
+		self.assertNotEqual(engine.selected_services_table[0].total_amount, 3 * 100.5)
+
+	def test_package_booking_totals(self):
+		legacy = self.price(True, booking_type="Package", package=self.package)
+		engine = self.price(False, booking_type="Package", package=self.package)
+
+		fields = ("service", "quantity", "base_price", "package_price", "amount")
+		self.assertEqual(
+			[[row.get(field) for field in fields] for row in engine.package_services_table],
+			[[row.get(field) for field in fields] for row in legacy.package_services_table]
+		)
+		self.assertEqual(
+			(engine.base_amount_package, engine.total_amount_package),
+			(legacy.base_amount_package, legacy.total_amount_package)
+		)
+		# السعر المخصوم من جدول المصور استُخدم للخدمة الأولى
+		self.assertEqual(engine.package_services_table[0].package_price, 80)
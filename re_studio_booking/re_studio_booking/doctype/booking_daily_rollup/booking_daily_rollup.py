@@ -0,0 +1,355 @@
+# Copyright (c) 2025, Masar Digital Group and contributors
+# For license information, please see license.txt
+
+"""
+Booking Daily Rollup
+جدول تجميعي يومي للحجوزات والإيرادات بمفتاح (التاريخ، المصور، الخدمة، الحالة)
+يتم تحديثه تزايدياً من Booking.on_update / on_trash وتقرأ منه لوحات التحكم والتقارير
+"""
+
+import hashlib
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import flt, getdate, now
+
+from re_studio_booking.re_studio_booking.doctype.booking.booking_availability import time_to_seconds
+from re_studio_booking.re_studio_booking.utils.response_cache import invalidate_tags
+
+ROLLUP_DOCTYPE = "Booking Daily Rollup"
+KEY_FIELDS = ("rollup_date", "photographer", "service", "status")
+MEASURE_FIELDS = ("booking_count", "service_count", "revenue", "booked_minutes")
+
+
+class BookingDailyRollup(Document):
+	pass
+
+
+# ============ Booking Contributions ============
+
+def get_booking_contributions(booking):
+	"""
+	مساهمة حجز واحد في الجدول التجميعي
+
+	- booking_count: 1 في أول تاريخ للحجز وأول خدمة فيه (الحجز يُحسب مرة واحدة)
+	- service_count: 1 لكل خدمة مختلفة في الحجز
+	- revenue: إجمالي الحجز موزع على الخدمات حسب مبالغ صفوفها
+	- booked_minutes: مدة كل تاريخ (تاريخ الخدمة أو تواريخ الباقة) على أول خدمة
+
+	Args:
+		booking: مستند Booking أو dict بنفس الحقول مع الجداول الفرعية
+
+	Returns:
+		dict: {(rollup_date, photographer, service, status): [booking_count, service_count, revenue, booked_minutes]}
+	"""
+	if not booking:
+		return {}
+
+	status = booking.get("status") or ""
+	photographer = booking.get("photographer") or ""
+
+	if booking.get("booking_type") == "Package":
+		total = flt(booking.get("total_amount_package"))
+		line_rows = [(row.get("service"), flt(row.get("amount"))) for row in (booking.get("package_services_table") or [])]
+		intervals = [
+			(row.get("booking_date"), row.get("start_time"), row.get("end_time"))
+			for row in (booking.get("package_booking_dates") or [])
+		]
+	else:
+		total = flt(booking.get("total_amount"))
+		line_rows = [(row.get("service"), flt(row.get("total_amount"))) for row in (booking.get("selected_services_table") or [])]
+		intervals = [(booking.get("booking_date"), booking.get("start_time"), booking.get("end_time"))]
+
+	intervals = [(str(getdate(d)), start, end) for d, start, end in intervals if d]
+	if not intervals:
+		return {}
+
+	# دمج صفوف الخدمة المكررة مع الحفاظ على ترتيب أول ظهور
+	lines = {}
+	for service, amount in line_rows:
+		lines[service or ""] = lines.get(service or "", 0) + amount
+	if not lines:
+		lines[""] = total
+
+	primary_date = min(d for d, _start, _end in intervals)
+	line_sum = sum(lines.values())
+	contributions = {}
+
+	for i, (service, amount) in enumerate(lines.items()):
+		entry = contributions.setdefault((primary_date, photographer, service, status), [0, 0, 0.0, 0])
+		if i == 0:
+			entry[0] += 1
+		entry[1] += 1
+		entry[2] += total * amount / line_sum if line_sum else total / len(lines)
+
+	first_service = next(iter(lines))
+	for day, start, end in intervals:
+		start_seconds = time_to_seconds(start)
+		end_seconds = time_to_seconds(end)
+		if start_seconds is None or end_seconds is None:
+			continue
+		entry = contributions.setdefault((day, photographer, first_service, status), [0, 0, 0.0, 0])
+		entry[3] += max(end_seconds - start_seconds, 0) // 60
+
+	return contributions
+
+
+def diff_contributions(new, old):
+	"""الفرق بين مساهمتين (new - old) بدون المفاتيح التي لم تتغير"""
+	delta = {}
+	for key in set(new) | set(old):
+		values = [
+			n - o for n, o in zip(new.get(key, (0, 0, 0.0, 0)), old.get(key, (0, 0, 0.0, 0)))
+		]
+		values[2] = round(values[2], 6)
+		if any(values):
+			delta[key] = values
+	return delta
+
+
+# ============ Incremental Maintenance ============
+
+def update_booking_rollup(booking):
+	"""تطبيق فرق الحجز بعد الحفظ (الحالة الجديدة - الحالة قبل الحفظ)"""
+	delta = diff_contributions(
+		get_booking_contributions(booking),
+		get_booking_contributions(booking.get_doc_before_save())
+	)
+	apply_rollup_delta(delta)
+
+
+def remove_booking_from_rollup(booking):
+	"""طرح مساهمة الحجز عند حذفه"""
+	apply_rollup_delta(diff_contributions({}, get_booking_contributions(booking)))
+
+
+def apply_rollup_delta(delta):
+	"""
+	إضافة الفروق للجدول بـ INSERT ... ON DUPLICATE KEY UPDATE ثم حذف الصفوف التي أصبحت صفراً
+
+	Args:
+		delta: {key: [booking_count, service_count, revenue, booked_minutes]}
+	"""
+	if not delta:
+		return
+
+	timestamp = now()
+	user = frappe.session.user if getattr(frappe, "session", None) else "Administrator"
+	names = []
+	values = []
+	for key, measures in delta.items():
+		name = get_rollup_name(key)
+		names.append(name)
+		values.extend([name, timestamp, timestamp, user, user, *key, *measures])
+
+	placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"] * len(delta))
+	frappe.db.sql(f"""
+		INSERT INTO `tabBooking Daily Rollup`
+			(name, creation, modified, owner, modified_by,
+			rollup_date, photographer, service, status,
+			booking_count, service_count, revenue, booked_minutes)
+		VALUES {placeholders}
+		ON DUPLICATE KEY UPDATE
+			booking_count = booking_count + VALUES(booking_count),
+			service_count = service_count + VALUES(service_count),
+			revenue = revenue + VALUES(revenue),
+			booked_minutes = booked_minutes + VALUES(booked_minutes),
+			modified = VALUES(modified),
+			modified_by = VALUES(modified_by)
+	""", values)
+
+	frappe.db.sql("""
+		DELETE FROM `tabBooking Daily Rollup`
+		WHERE name IN %(names)s
+			AND booking_count = 0 AND service_count = 0
+			AND ABS(revenue) < 0.005 AND booked_minutes = 0
+	""", {"names": names})
+
+
+def get_rollup_name(key):
+	"""اسم ثابت للصف مشتق من المفتاح (يجعل name هو المفتاح الفريد)"""
+	return hashlib.md5("\x1f".join(str(part or "") for part in key).encode()).hexdigest()
+
+
+# ============ Full Rebuild ============
+
+def rebuild_booking_rollup(chunk_size=1000, commit=True):
+	"""
+	إعادة بناء الجدول التجميعي بالكامل من الحجوزات
+
+	يقرأ الحجوزات على دفعات (keyset على name) مع جداولها الفرعية بثلاثة استعلامات لكل دفعة.
+
+	Run:
+		bench --site <site> execute re_studio_booking.re_studio_booking.doctype.booking_daily_rollup.booking_daily_rollup.rebuild_booking_rollup
+
+	Returns:
+		dict: عدد الحجوزات وعدد صفوف الجدول التجميعي
+	"""
+	totals = {}
+	bookings_count = 0
+	last_name = ""
+
+	while True:
+		bookings = frappe.db.sql("""
+			SELECT
+				name, booking_type, status, photographer,
+				booking_date, start_time, end_time,
+				total_amount, total_amount_package
+			FROM `tabBooking`
+			WHERE docstatus < 2 AND name > %s
+			ORDER BY name
+			LIMIT %s
+		""", (last_name, int(chunk_size)), as_dict=True)
+		if not bookings:
+			break
+
+		attach_booking_children(bookings)
+		for booking in bookings:
+			for key, measures in get_booking_contributions(booking).items():
+				entry = totals.setdefault(key, [0, 0, 0.0, 0])
+				for i, value in enumerate(measures):
+					entry[i] += value
+
+		bookings_count += len(bookings)
+		last_name = bookings[-1].name
+
+	frappe.db.sql("DELETE FROM `tabBooking Daily Rollup`")
+	timestamp = now()
+	frappe.db.bulk_insert(
+		ROLLUP_DOCTYPE,
+		["name", "creation", "modified", "owner", "modified_by", *KEY_FIELDS, *MEASURE_FIELDS],
+		[
+			(get_rollup_name(key), timestamp, timestamp, "Administrator", "Administrator", *key,
+				measures[0], measures[1], round(measures[2], 6), measures[3])
+			for key, measures in totals.items()
+		]
+	)
+
+	if commit:
+		frappe.db.commit()
+
+	# الاستجابات المخزنة للوحات التحكم مبنية على الجدول القديم
+	invalidate_tags("booking")
+
+	return {"bookings": bookings_count, "rows": len(totals)}
+
+
+def attach_booking_children(bookings):
+	"""تحميل الجداول الفرعية اللازمة للمساهمات لدفعة حجوزات"""
+	by_name = {}
+	for booking in bookings:
+		booking.selected_services_table = []
+		booking.package_services_table = []
+		booking.package_booking_dates = []
+		by_name[booking.name] = booking
+
+	values = {"parents": list(by_name)}
+	children = (
+		("selected_services_table", "Booking Service Item", "service, total_amount"),
+		("package_services_table", "Booking Package Service", "service, amount"),
+		("package_booking_dates", "Package Booking Date", "booking_date, start_time, end_time"),
+	)
+	for fieldname, doctype, columns in children:
+		for row in frappe.db.sql(f"""
+			SELECT parent, {columns}
+			FROM `tab{doctype}`
+			WHERE parenttype = 'Booking' AND parentfield = %(fieldname)s AND parent IN %(parents)s
+			ORDER BY parent, idx
+		""", dict(values, fieldname=fieldname), as_dict=True):
+			by_name[row.parent][fieldname].append(row)
+
+
+@frappe.whitelist()
+def enqueue_rebuild():
+	"""إعادة البناء كمهمة خلفية (لمدير النظام)"""
+	frappe.only_for("System Manager")
+	frappe.enqueue(
+		"re_studio_booking.re_studio_booking.doctype.booking_daily_rollup.booking_daily_rollup.rebuild_booking_rollup",
+		queue="long",
+		job_id="booking_daily_rollup_rebuild",
+		deduplicate=True
+	)
+	return _("Booking Daily Rollup rebuild queued")
+
+
+# ============ Queries ============
+
+def get_rollup_totals(group_by=(), from_date=None, to_date=None, filters=None, order_by=None, limit=None):
+	"""
+	مجاميع الجدول التجميعي مجمعة حسب أي من حقول المفتاح
+
+	Args:
+		group_by: حقول التجميع من KEY_FIELDS (فارغ = إجمالي واحد)
+		from_date / to_date: حدود التاريخ (اختياري)
+		filters: {field: value | [values] | ("not in", [values])} على حقول المفتاح
+		order_by: مثل "booking_count desc" (حقل مفتاح أو مقياس فقط)
+		limit: عدد الصفوف
+
+	Returns:
+		list: صفوف بحقول التجميع + booking_count, service_count, revenue, booked_minutes
+	"""
+	group_by = [field for field in (group_by or ()) if field in KEY_FIELDS]
+	conditions = ["1=1"]
+	values = {}
+	if from_date:
+		conditions.append("rollup_date >= %(from_date)s")
+		values["from_date"] = getdate(from_date)
+	if to_date:
+		conditions.append("rollup_date <= %(to_date)s")
+		values["to_date"] = getdate(to_date)
+	for field, value in (filters or {}).items():
+		if field not in KEY_FIELDS:
+			continue
+		if isinstance(value, tuple) and len(value) == 2 and value[0] == "not in":
+			conditions.append(f"`{field}` NOT IN %({field})s")
+			values[field] = list(value[1])
+		elif isinstance(value, (list, tuple)):
+			conditions.append(f"`{field}` IN %({field})s")
+			values[field] = list(value)
+		else:
+			conditions.append(f"`{field}` = %({field})s")
+			values[field] = value
+
+	select = ", ".join([f"`{field}`" for field in group_by] + [
+		"IFNULL(SUM(booking_count), 0) AS booking_count",
+		"IFNULL(SUM(service_count), 0) AS service_count",
+		"IFNULL(SUM(revenue), 0) AS revenue",
+		"IFNULL(SUM(booked_minutes), 0) AS booked_minutes"
+	])
+	group_clause = f"GROUP BY {', '.join(f'`{field}`' for field in group_by)}" if group_by else ""
+
+	order_clause = ""
+	if order_by:
+		field, _sep, direction = order_by.partition(" ")
+		if field in group_by or field in MEASURE_FIELDS:
+			order_clause = f"ORDER BY `{field}` {'DESC' if direction.strip().lower() == 'desc' else 'ASC'}"
+	limit_clause = f"LIMIT {int(limit)}" if limit else ""
+
+	return frappe.db.sql(f"""
+		SELECT {select}
+		FROM `tabBooking Daily Rollup`
+		WHERE {' AND '.join(conditions)}
+		{group_clause}
+		{order_clause}
+		{limit_clause}
+	""", values, as_dict=True)
+
+
+def get_booking_date_bounds(filters):
+	"""
+	حدود التاريخ من فلتر booking_date بصيغة التقارير
+	({'booking_date': ['between', [from, to]]} أو ['=', date])
+
+	Returns:
+		tuple: (from_date, to_date) أو (None, None)
+	"""
+	value = (filters or {}).get("booking_date")
+	if isinstance(value, (list, tuple)) and len(value) == 2:
+		if value[0] == "between":
+			return value[1][0], value[1][1]
+		if value[0] == "=":
+			return value[1], value[1]
+	elif value:
+		return value, value
+	return None, None
@@ -0,0 +1,53 @@
+# Copyright (c) 2025, Masar Digital Group and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from re_studio_booking.re_studio_booking.doctype.booking_daily_rollup.booking_daily_rollup import (
+	diff_contributions,
+	get_booking_contributions
+)
+
+
+class TestBookingDailyRollup(FrappeTestCase):
+	def test_service_booking_contributions(self):
+		booking = frappe._dict(
+			booking_type="Service", status="Confirmed", photographer="P-1",
+			booking_date="2030-01-01", start_time="10:00:00", end_time="11:30:00",
+			total_amount=300,
+			selected_services_table=[
+				frappe._dict(service="S-1", total_amount=100),
+				frappe._dict(service="S-2", total_amount=200),
+			]
+		)
+		contributions = get_booking_contributions(booking)
+		self.assertEqual(contributions[("2030-01-01", "P-1", "S-1", "Confirmed")], [1, 1, 100.0, 90])
+		self.assertEqual(contributions[("2030-01-01", "P-1", "S-2", "Confirmed")], [0, 1, 200.0, 0])
+
+	def test_package_booking_counted_once(self):
+		booking = frappe._dict(
+			booking_type="Package", status="Confirmed", photographer="",
+			total_amount_package=500,
+			package_services_table=[frappe._dict(service="S-1", amount=0)],
+			package_booking_dates=[
+				frappe._dict(booking_date="2030-01-03", start_time="09:00:00", end_time="10:00:00"),
+				frappe._dict(booking_date="2030-01-02", start_time="09:00:00", end_time="11:00:00"),
+			]
+		)
+		contributions = get_booking_contributions(booking)
+		self.assertEqual(contributions[("2030-01-02", "", "S-1", "Confirmed")], [1, 1, 500.0, 120])
+		self.assertEqual(contributions[("2030-01-03", "", "S-1", "Confirmed")], [0, 0, 0.0, 60])
+
+	def test_status_change_moves_totals(self):
+		booking = frappe._dict(
+			booking_type="Service", status="Confirmed", photographer="P-1",
+			booking_date="2030-01-01", start_time="10:00:00", end_time="11:00:00", total_amount=100
+		)
+		before = get_booking_contributions(booking)
+		after = get_booking_contributions(frappe._dict(booking, status="Completed"))
+		self.assertEqual(diff_contributions(after, before), {
+			("2030-01-01", "P-1", "", "Completed"): [1, 1, 100.0, 60],
+			("2030-01-01", "P-1", "", "Confirmed"): [-1, -1, -100.0, -60],
+		})
+		self.assertEqual(diff_contributions(before, before), {})
@@ -0,0 +1,341 @@
+# Copyright (c) 2025, Masar Digital Group and contributors
+# For license information, please see license.txt
+
+"""
+Booking Email Queue
+طابور خلفي لبريد تأكيد الحجز وإشعارات المدراء:
+- الحفظ يضيف صفاً فقط (بدون SMTP أو استعلامات إضافية داخل الطلب)
+- صف واحد لكل مفتاح (منع التكرار لكل حجز ونوع)
+- المعالجة على دفعات؛ البريد يُسلّم لـ frappe.sendmail (Email Queue في Frappe يتولى
+  حساب البريد الصادر والاتصال والسجل وإعادة المحاولة عند الإرسال)
+- إعادة المحاولة بتأخير متزايد ثم Failed بعد MAX_ATTEMPTS إذا فشل التسليم لـ Email Queue
+- confirmation_sent يُحدّث فقط بعد نجاح التسليم (مع modified للحجز)
+"""
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import add_to_date, cint, now, now_datetime
+
+EMAIL_DOCTYPE = "Booking Email"
+CONFIRMATION = "Confirmation"
+MANAGER_NOTIFICATION = "Manager Notification"
+
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 60
+BATCH_SIZE = 50
+WORKER_JOB_ID = "booking_email_queue"
+
+QUEUE_FIELDS = ("email_type", "booking", "dedupe_key", "notification_type", "subject", "message", "priority")
+
+# آخر خطأ لصف Failed بلا مستلم: نهائي لمفتاحه (لا يُضاف صف جديد ما لم يكن resend)
+NO_RECIPIENT_ERROR = "لا يوجد بريد للمستلم"
+
+# صفوف Sending أقدم من هذا تعتبر من معالج توقف وتعاد للطابور
+STALE_SENDING_MINUTES = 15
+
+
+class BookingEmail(Document):
+	pass
+
+
+# ============ Queueing (inside the request) ============
+
+def queue_booking_confirmation(booking, force=False):
+	"""
+	إضافة بريد تأكيد الحجز للطابور
+
+	Args:
+		booking: اسم الحجز
+		force: إعادة الإرسال حتى لو أُرسل التأكيد من قبل
+
+	Returns:
+		int: عدد الصفوف المضافة (0 إذا كان مكرراً)
+	"""
+	return queue_emails([get_confirmation_entry(booking)], resend=force)
+
+
+def queue_manager_notification(booking, notification_type, title, message, priority="Medium"):
+	"""
+	إضافة إشعار المدراء للطابور (مرة واحدة لكل حجز ونوع إشعار)
+
+	Returns:
+		int: عدد الصفوف المضافة (0 إذا كان مكرراً)
+	"""
+	return queue_emails([get_notification_entry(booking, notification_type, title, message, priority)])
+
+
+def has_confirmation_recipient(booking):
+	"""هل للحجز بريد عميل (في الحجز أو في سجل العميل)؛ بدونه لا يُضاف التأكيد للطابور"""
+	if (booking.get("client_email") or "").strip():
+		return True
+	return bool(booking.get("client") and (frappe.db.get_value("Client", booking.client, "email_id") or "").strip())
+
+
+def get_confirmation_entry(booking):
+	return {"email_type": CONFIRMATION, "booking": booking, "dedupe_key": f"{CONFIRMATION}:{booking}"}
+
+
+def get_notification_entry(booking, notification_type, title, message, priority="Medium"):
+	return {
+		"email_type": MANAGER_NOTIFICATION,
+		"booking": booking,
+		"dedupe_key": f"{MANAGER_NOTIFICATION}:{booking}:{notification_type}",
+		"notification_type": notification_type,
+		"subject": title,
+		"message": message,
+		"priority": priority
+	}
+
+
+def queue_emails(entries, resend=False):
+	"""
+	إضافة عدة صفوف للطابور باستعلام فحص واحد وإدراج واحد
+
+	المفتاح الموجود (Queued / Sending، و Sent أو Failed بلا مستلم ما لم يكن resend) لا يُضاف مرة أخرى.
+
+	Args:
+		entries: قيم الصفوف (get_confirmation_entry / get_notification_entry)
+		resend: السماح بإضافة مفتاح سبق إرساله
+
+	Returns:
+		int: عدد الصفوف المضافة
+	"""
+	entries = list({entry["dedupe_key"]: entry for entry in entries}.values())
+	if not entries:
+		return 0
+
+	final = "" if resend else "OR status = 'Sent' OR (status = 'Failed' AND last_error = %(no_recipient)s)"
+	existing = set(frappe.db.sql_list(f"""
+		SELECT dedupe_key FROM `tabBooking Email`
+		WHERE dedupe_key IN %(keys)s AND (status IN ('Queued', 'Sending') {final})
+	""", {"keys": [entry["dedupe_key"] for entry in entries], "no_recipient": NO_RECIPIENT_ERROR}))
+	entries = [entry for entry in entries if entry["dedupe_key"] not in existing]
+	if not entries:
+		return 0
+
+	timestamp = now()
+	user = frappe.session.user
+	frappe.db.bulk_insert(
+		EMAIL_DOCTYPE,
+		["name", "creation", "modified", "owner", "modified_by", "status", "attempts", *QUEUE_FIELDS],
+		[
+			(frappe.generate_hash(length=10), timestamp, timestamp, user, user, "Queued", 0,
+				*(entry.get(field) for field in QUEUE_FIELDS))
+			for entry in entries
+		]
+	)
+	enqueue_worker()
+	return len(entries)
+
+
+def enqueue_worker():
+	"""تشغيل المعالج بعد حفظ المعاملة (مهمة واحدة مهما كان عدد الصفوف)"""
+	frappe.enqueue(
+		"re_studio_booking.re_studio_booking.doctype.booking_email.booking_email.process_email_queue",
+		queue="short",
+		job_id=WORKER_JOB_ID,
+		deduplicate=True,
+		enqueue_after_commit=True
+	)
+
+
+# ============ Worker ============
+
+def process_email_queue(batch_size=BATCH_SIZE, max_batches=20):
+	"""
+	معالجة الصفوف المستحقة على دفعات (من المهمة الخلفية و scheduler)
+
+	Returns:
+		dict: {sent, retried, failed}
+	"""
+	totals = {"sent": 0, "retried": 0, "failed": 0}
+	requeue_stale_rows()
+	for _batch in range(max_batches):
+		rows = claim_batch(batch_size)
+		if not rows:
+			break
+		for key, value in process_batch(rows).items():
+			totals[key] += value
+		frappe.db.commit()
+	return totals
+
+
+def requeue_stale_rows():
+	"""إعادة صفوف Sending العالقة (معالج توقف أثناء الإرسال) إلى Queued"""
+	frappe.db.sql("""
+		UPDATE `tabBooking Email` SET status = 'Queued'
+		WHERE status = 'Sending' AND modified < %s
+	""", (add_to_date(now_datetime(), minutes=-STALE_SENDING_MINUTES),))
+
+
+def claim_batch(batch_size):
+	"""
+	حجز دفعة صفوف مستحقة (Queued و next_attempt <= الآن) وتحويلها إلى Sending
+
+	SKIP LOCKED يسمح بتشغيل أكثر من معالج دون إرسال نفس الصف مرتين.
+	"""
+	rows = frappe.db.sql("""
+		SELECT name, email_type, booking, notification_type, subject, message, priority, attempts
+		FROM `tabBooking Email`
+		WHERE status = 'Queued' AND (next_attempt IS NULL OR next_attempt <= %s)
+		ORDER BY creation
+		LIMIT %s
+		FOR UPDATE SKIP LOCKED
+	""", (now(), int(batch_size)), as_dict=True)
+	if rows:
+		frappe.db.sql("""
+			UPDATE `tabBooking Email` SET status = 'Sending', modified = %(now)s
+			WHERE name IN %(names)s
+		""", {"now": now(), "names": [row.name for row in rows]})
+		frappe.db.commit()
+	return rows
+
+
+def process_batch(rows):
+	"""إرسال دفعة واحدة وتحديث حالة كل صف"""
+	results = {}
+	confirmations = [row for row in rows if row.email_type == CONFIRMATION]
+	notifications = [row for row in rows if row.email_type == MANAGER_NOTIFICATION]
+
+	if confirmations:
+		results.update(send_confirmations(confirmations))
+	if notifications:
+		results.update(create_manager_notifications(notifications))
+
+	return record_results(rows, results)
+
+
+def send_confirmations(rows):
+	"""
+	بناء رسائل التأكيد لكل الدفعة باستعلام واحد وتسليمها لـ Email Queue
+
+	Returns:
+		dict: {row name: None (نجاح) | نص الخطأ | False (لا يوجد مستلم)}
+	"""
+	bookings = {
+		booking.name: booking
+		for booking in frappe.db.sql("""
+			SELECT b.name, b.booking_date, b.start_time, b.client_email, c.email_id AS client_email_id
+			FROM `tabBooking` b
+			LEFT JOIN `tabClient` c ON c.name = b.client
+			WHERE b.name IN %(names)s
+		""", {"names": [row.booking for row in rows]}, as_dict=True)
+	}
+
+	results = {}
+	for row in rows:
+		booking = bookings.get(row.booking)
+		recipients = get_confirmation_recipients(booking) if booking else []
+		if not recipients:
+			# لا يوجد بريد للعميل: لا إعادة محاولة (نفس سلوك send_confirmation)
+			results[row.name] = False
+			continue
+		row.recipients = recipients
+		# نقطة حفظ لكل صف حتى لا يبقى صف Email Queue نصف مكتمل عند الفشل
+		frappe.db.savepoint("booking_email_confirmation")
+		try:
+			frappe.sendmail(
+				recipients=recipients,
+				subject=_("تأكيد الحجز - {0}").format(booking.name),
+				message=get_confirmation_message(booking),
+				reference_doctype="Booking",
+				reference_name=booking.name,
+				now=False
+			)
+			results[row.name] = None
+		except Exception as e:
+			frappe.db.rollback(save_point="booking_email_confirmation")
+			results[row.name] = str(e)
+	return results
+
+
+def get_confirmation_recipients(booking):
+	"""بريد العميل من الحجز ومن سجل العميل بدون تكرار"""
+	recipients = []
+	for email in (booking.client_email_id, booking.client_email):
+		email = (email or "").strip()
+		if email and email.lower() not in [r.lower() for r in recipients]:
+			recipients.append(email)
+	return recipients
+
+
+def get_confirmation_message(booking):
+	return """<p>مرحباً،</p>
+		<p>تم تأكيد حجزك رقم {0} في تاريخ {1} الساعة {2}.</p>
+		<p>نشكرك على اختيار Re Studio.</p>
+	""".format(booking.name, booking.booking_date or "", booking.start_time or "")
+
+
+def create_manager_notifications(rows):
+	"""إشعارات المدراء داخل النظام: قائمة المدراء تُقرأ مرة واحدة لكل الدفعة وإدراج واحد لكل صف"""
+	from re_studio_booking.re_studio_booking.doctype.booking_notification.booking_notification import (
+		create_notifications,
+		get_manager_users
+	)
+
+	managers = get_manager_users()
+	results = {}
+	for row in rows:
+		# نقطة حفظ لكل صف حتى لا تتكرر إشعارات نصف مكتملة عند إعادة المحاولة
+		frappe.db.savepoint("booking_email_notification")
+		try:
+			create_notifications(
+				managers,
+				title=row.subject,
+				message=row.message,
+				notification_type=row.notification_type,
+				booking=row.booking,
+				priority=row.priority
+			)
+			row.recipients = managers
+			results[row.name] = None
+		except Exception as e:
+			frappe.db.rollback(save_point="booking_email_notification")
+			results[row.name] = str(e)
+	return results
+
+
+def record_results(rows, results):
+	"""
+	حفظ نتيجة كل صف: Sent، أو Queued مع موعد المحاولة التالية، أو Failed
+
+	Returns:
+		dict: {sent, retried, failed}
+	"""
+	totals = {"sent": 0, "retried": 0, "failed": 0}
+	timestamp = now()
+	confirmed = []
+
+	for row in rows:
+		error = results.get(row.name, _("لم تتم المعالجة"))
+		attempts = cint(row.attempts) + 1
+		values = {
+			"attempts": attempts,
+			"recipients": "\n".join(row.get("recipients") or []),
+			"modified": timestamp
+		}
+		if error is None:
+			values.update(status="Sent", sent_on=timestamp, last_error=None, next_attempt=None)
+			totals["sent"] += 1
+			if row.email_type == CONFIRMATION:
+				confirmed.append(row.booking)
+		elif error is False or attempts >= MAX_ATTEMPTS:
+			values.update(status="Failed", last_error=NO_RECIPIENT_ERROR if error is False else error)
+			totals["failed"] += 1
+		else:
+			values.update(status="Queued", last_error=error, next_attempt=get_next_attempt(attempts))
+			totals["retried"] += 1
+		frappe.db.set_value(EMAIL_DOCTYPE, row.name, values, update_modified=False)
+
+	if confirmed:
+		# modified يتغير أيضاً: نموذج مفتوح قبل الإرسال يفشل في check_if_latest بدل أن يعيد confirmation_sent = 0
+		frappe.db.sql("""
+			UPDATE `tabBooking` SET confirmation_sent = 1, modified = %(modified)s WHERE name IN %(names)s
+		""", {"names": confirmed, "modified": timestamp})
+	return totals
+
+
+def get_next_attempt(attempts, base=RETRY_BASE_SECONDS):
+	"""موعد المحاولة التالية: base * 2^(attempts - 1) ثانية (60، 120، 240، ...)"""
+	return add_to_date(now_datetime(), seconds=base * (2 ** max(attempts - 1, 0)))
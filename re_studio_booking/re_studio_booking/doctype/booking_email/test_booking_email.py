@@ -0,0 +1,183 @@
+# Copyright (c) 2025, Masar Digital Group and Contributors
+# See license.txt
+
+import socketserver
+import threading
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from re_studio_booking.re_studio_booking.doctype.booking_email.booking_email import (
+	CONFIRMATION,
+	RETRY_BASE_SECONDS,
+	get_confirmation_recipients,
+	get_next_attempt,
+	has_confirmation_recipient,
+	process_batch,
+	queue_booking_confirmation,
+	record_results
+)
+
+
+class FakeSMTPHandler(socketserver.StreamRequestHandler):
+	"""خادم SMTP محلي بسيط: يسجل الرسائل المستلمة لكل اتصال"""
+
+	def reply(self, line):
+		self.wfile.write((line + "\r\n").encode())
+
+	def handle(self):
+		self.server.connections += 1
+		self.reply("220 fake-smtp ready")
+		while True:
+			line = self.rfile.readline().decode(errors="replace").strip()
+			if not line:
+				return
+			command = line.split(" ", 1)[0].upper()
+			if command in ("EHLO", "HELO"):
+				self.reply("250 fake-smtp")
+			elif command in ("MAIL", "RCPT", "RSET", "NOOP"):
+				self.reply("250 OK")
+			elif command == "DATA":
+				self.reply("354 End data with <CR><LF>.<CR><LF>")
+				data = []
+				while True:
+					chunk = self.rfile.readline()
+					if chunk in (b".\r\n", b".\n", b""):
+						break
+					data.append(chunk)
+				self.server.messages.append(b"".join(data).decode(errors="replace"))
+				self.reply("250 queued")
+			elif command == "QUIT":
+				self.reply("221 bye")
+				return
+			else:
+				self.reply("502 not implemented")
+
+
+class FakeSMTPServer(socketserver.ThreadingTCPServer):
+	daemon_threads = True
+	allow_reuse_address = True
+
+	def __init__(self):
+		super().__init__(("127.0.0.1", 0), FakeSMTPHandler)
+		self.messages = []
+		self.connections = 0
+
+
+class TestBookingEmail(FrappeTestCase):
+	def test_retry_backoff(self):
+		first = get_next_attempt(1)
+		third = get_next_attempt(3)
+		delay = (third - first).total_seconds()
+		self.assertAlmostEqual(delay, RETRY_BASE_SECONDS * 3, delta=2)
+
+	def test_recipients_are_deduplicated(self):
+		booking = type("Row", (), {"client_email_id": "a@example.com", "client_email": " A@example.com "})()
+		self.assertEqual(get_confirmation_recipients(booking), ["a@example.com"])
+
+
+class TestBookingEmailDelivery(FrappeTestCase):
+	"""Confirmations go through Frappe's Email Queue, delivered by a test Email Account on a local SMTP server"""
+
+	def setUp(self):
+		self.server = FakeSMTPServer()
+		self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+		self.thread.start()
+		frappe.get_doc({
+			"doctype": "Email Account",
+			"email_account_name": "_Test Booking Email",
+			"email_id": "booking-test@example.com",
+			"enable_outgoing": 1,
+			"default_outgoing": 1,
+			"smtp_server": "127.0.0.1",
+			"smtp_port": self.server.server_address[1],
+			"no_smtp_authentication": 1
+		}).insert(ignore_permissions=True)
+		self.flags = {flag: frappe.flags.get(flag) for flag in ("mute_emails", "testing_email")}
+		frappe.flags.mute_emails = False
+		frappe.flags.testing_email = True
+
+	def tearDown(self):
+		frappe.flags.update(self.flags)
+		self.server.shutdown()
+		self.server.server_close()
+		frappe.db.rollback()
+
+	def queued_rows(self, booking):
+		return frappe.db.sql("""
+			SELECT name, email_type, booking, notification_type, subject, message, priority, attempts
+			FROM `tabBooking Email`
+			WHERE booking = %s AND status = 'Queued'
+		""", booking, as_dict=True)
+
+	def test_confirmation_is_delivered_through_the_email_account(self):
+		booking = frappe.get_doc({
+			"doctype": "Booking",
+			"name": f"_T-BE-{frappe.generate_hash(length=8)}",
+			"status": "Confirmed",
+			"client_email": "client@example.com"
+		})
+		# inserted directly: only the columns the queue reads and writes matter here
+		booking.db_insert()
+		queue_booking_confirmation(booking.name)
+
+		totals = process_batch(self.queued_rows(booking.name))
+		self.assertEqual(totals, {"sent": 1, "retried": 0, "failed": 0})
+		self.assertEqual(frappe.db.get_value("Booking", booking.name, "confirmation_sent"), 1)
+
+		email_queue = frappe.get_all(
+			"Email Queue", filters={"reference_doctype": "Booking", "reference_name": booking.name}, pluck="name"
+		)
+		self.assertEqual(len(email_queue), 1)
+		frappe.get_doc("Email Queue", email_queue[0]).send()
+
+		self.assertEqual(frappe.db.get_value("Email Queue", email_queue[0], "status"), "Sent")
+		self.assertEqual(len(self.server.messages), 1)
+		self.assertIn("client@example.com", self.server.messages[0])
+
+
+class TestBookingEmailQueue(FrappeTestCase):
+	"""Queue rows and their effect on the Booking, against the database"""
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def seed_booking(self, **values):
+		# inserted directly: only the columns the queue reads and writes matter here
+		booking = frappe.get_doc({
+			"doctype": "Booking",
+			"name": f"_T-BE-{frappe.generate_hash(length=8)}",
+			"status": "Confirmed",
+			**values
+		})
+		booking.db_insert()
+		return booking.name
+
+	def test_sent_confirmation_invalidates_stale_forms(self):
+		booking = self.seed_booking(client_email="client@example.com")
+		stale = frappe.get_doc("Booking", booking)
+
+		row = frappe._dict(name="_T-BE-ROW", email_type=CONFIRMATION, booking=booking, attempts=0)
+		totals = record_results([row], {row.name: None})
+
+		self.assertEqual(totals["sent"], 1)
+		self.assertEqual(frappe.db.get_value("Booking", booking, "confirmation_sent"), 1)
+		self.assertNotEqual(str(frappe.db.get_value("Booking", booking, "modified")), str(stale.modified))
+		# the form opened before the worker ran can no longer write confirmation_sent = 0 back
+		with self.assertRaises(frappe.TimestampMismatchError):
+			stale.save()
+
+	def test_no_recipient_failure_is_final(self):
+		booking = self.seed_booking()
+		self.assertFalse(has_confirmation_recipient(frappe.get_doc("Booking", booking)))
+
+		self.assertEqual(queue_booking_confirmation(booking), 1)
+		row = frappe.db.get_value("Booking Email", {"booking": booking}, ["name", "attempts"], as_dict=True)
+		row.update(email_type=CONFIRMATION, booking=booking)
+		record_results([row], {row.name: False})
+		self.assertEqual(frappe.db.get_value("Booking Email", row.name, "status"), "Failed")
+
+		# later saves of the booking do not add a row per save
+		self.assertEqual(queue_booking_confirmation(booking), 0)
+		self.assertEqual(frappe.db.count("Booking Email", {"booking": booking}), 1)
+		self.assertEqual(queue_booking_confirmation(booking, force=True), 1)
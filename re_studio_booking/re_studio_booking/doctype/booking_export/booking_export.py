@@ -0,0 +1,350 @@
+# Copyright (c) 2025, Masar Digital Group and contributors
+# For license information, please see license.txt
+
+"""
+Booking Export
+تصدير الحجوزات وقيود دفتر الأستاذ (CSV / XLSX) كمهمة خلفية:
+- الاستعلام يُبنى بـ frappe.get_list (نفس صلاحيات المستخدم) ويُقرأ بمؤشر من جهة الخادم
+- الصفوف تُكتب للملف دفعة بعد دفعة، فالذاكرة ثابتة مهما كان عدد الصفوف
+- التقدم يُرسل عبر realtime والملف يُرفق بسجل Booking Export
+"""
+
+import csv
+import datetime
+import hashlib
+import json
+import os
+from itertools import islice
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import cint, now
+
+EXPORT_DOCTYPE = "Booking Export"
+PROGRESS_EVENT = "booking_export_progress"
+CHUNK_SIZE = 5000
+
+# حد صفوف ورقة Excel (بدون سطر العناوين)؛ الصفوف الزائدة تُكتب في ورقة جديدة
+XLSX_SHEET_ROWS = 1048575
+
+# مصادر التصدير: الأعمدة (fieldname, label) وحقل التاريخ والفلاتر المسموحة
+EXPORT_SOURCES = {
+	"Bookings": {
+		"doctype": "Booking",
+		"date_field": "booking_date",
+		"filters": ("photographer", "status", "booking_type", "client"),
+		"order_by": "booking_date asc, name asc",
+		"columns": (
+			("name", "Booking"),
+			("booking_date", "Date"),
+			("start_time", "Start Time"),
+			("end_time", "End Time"),
+			("booking_type", "Type"),
+			("status", "Status"),
+			("client", "Client"),
+			("client_name", "Client Name"),
+			("photographer", "Photographer"),
+			("package", "Package"),
+			("total_amount", "Total Amount"),
+			("total_amount_package", "Package Amount"),
+			("paid_amount", "Paid Amount"),
+			("payment_status", "Payment Status"),
+		),
+	},
+	"GL Entries": {
+		"doctype": "GL Entry",
+		"date_field": "posting_date",
+		"filters": ("account", "party_type", "party", "reference_doctype", "reference_name"),
+		"order_by": "posting_date asc, name asc",
+		"columns": (
+			("posting_date", "Posting Date"),
+			("account", "Account"),
+			("party_type", "Party Type"),
+			("party", "Party"),
+			("debit", "Debit"),
+			("credit", "Credit"),
+			("against", "Against"),
+			("reference_doctype", "Reference Type"),
+			("reference_name", "Reference"),
+			("remarks", "Remarks"),
+			("name", "GL Entry"),
+		),
+	},
+}
+
+
+class BookingExport(Document):
+	pass
+
+
+# ============ API ============
+
+@frappe.whitelist()
+def start_export(export_type, file_format="CSV", filters=None):
+	"""
+	إنشاء سجل تصدير وتشغيله كمهمة خلفية
+
+	Args:
+		export_type: مفتاح في EXPORT_SOURCES (Bookings / GL Entries)
+		file_format: CSV أو XLSX
+		filters: {from_date, to_date, ...فلاتر المصدر}
+
+	Returns:
+		dict: {name} لمتابعة التقدم عبر booking_export_progress أو get_export_status
+	"""
+	source = get_source(export_type)
+	file_format = (file_format or "CSV").upper()
+	if file_format not in ("CSV", "XLSX"):
+		frappe.throw(_("صيغة غير مدعومة: {0}").format(file_format))
+	frappe.has_permission(source["doctype"], "export", throw=True)
+
+	if isinstance(filters, str):
+		filters = json.loads(filters or "{}")
+	filters = {key: value for key, value in (filters or {}).items() if value not in (None, "")}
+
+	export = frappe.get_doc({
+		"doctype": EXPORT_DOCTYPE,
+		"export_type": export_type,
+		"file_format": file_format,
+		"filters": json.dumps(filters, default=str),
+		"status": "Queued"
+	})
+	export.insert(ignore_permissions=True)
+
+	frappe.enqueue(
+		"re_studio_booking.re_studio_booking.doctype.booking_export.booking_export.run_export",
+		queue="long",
+		timeout=3600,
+		export_name=export.name,
+		enqueue_after_commit=True
+	)
+	return {"name": export.name}
+
+
+@frappe.whitelist()
+def get_export_status(name):
+	"""حالة التصدير ورابط الملف عند الانتهاء"""
+	export = frappe.get_doc(EXPORT_DOCTYPE, name)
+	export.check_permission("read")
+	return {
+		"name": export.name,
+		"status": export.status,
+		"progress": export.progress,
+		"row_count": export.row_count,
+		"file_url": export.file_url,
+		"error": export.error
+	}
+
+
+# ============ Background Job ============
+
+def run_export(export_name, chunk_size=CHUNK_SIZE):
+	"""
+	تنفيذ التصدير (المهمة الخلفية تعمل بنفس مستخدم من طلب التصدير)
+
+	الملف يُكتب مباشرة في private/files ثم يُسجل كـ File مرفق بسجل التصدير.
+	"""
+	export = frappe.get_doc(EXPORT_DOCTYPE, export_name)
+	source = get_source(export.export_type)
+	filters = json.loads(export.filters or "{}")
+	extension = export.file_format.lower()
+	file_name = "{0}_{1}.{2}".format(frappe.scrub(export.export_type), export.name, extension)
+	path = frappe.get_site_path("private", "files", file_name)
+
+	export.db_set({"status": "Running", "progress": 0, "error": None})
+	frappe.db.commit()
+
+	try:
+		total = count_rows(source, filters)
+		writer_class = XLSXExportWriter if extension == "xlsx" else CSVExportWriter
+		writer = writer_class(path, [_(label) for fieldname, label in source["columns"]])
+		written = 0
+		try:
+			for rows in iter_chunks(build_query(source, filters), chunk_size):
+				writer.write_rows(rows)
+				written += len(rows)
+				publish_export_progress(export, written, total)
+		finally:
+			writer.close()
+
+		file_doc = attach_export_file(export, file_name, path)
+		export.db_set({
+			"status": "Completed",
+			"progress": 100,
+			"row_count": written,
+			"file_url": file_doc.file_url,
+			"completed_on": now()
+		})
+		frappe.db.commit()
+	except Exception as e:
+		frappe.db.rollback()
+		if os.path.exists(path):
+			os.remove(path)
+		export.db_set({"status": "Failed", "error": str(e)})
+		frappe.db.commit()
+		frappe.log_error(title=_("فشل تصدير {0}").format(export.export_type), message=frappe.get_traceback())
+
+	publish_export_progress(export, cint(export.row_count), cint(export.row_count), done=True)
+
+
+def get_source(export_type):
+	source = EXPORT_SOURCES.get(export_type)
+	if not source:
+		frappe.throw(_("نوع تصدير غير معروف: {0}").format(export_type))
+	return source
+
+
+def get_list_filters(source, filters):
+	"""فلاتر frappe.get_list: نطاق التاريخ + الفلاتر المسموحة للمصدر فقط"""
+	date_field = source["date_field"]
+	list_filters = []
+	if filters.get("date_range"):
+		# نفس فترات صفحة تقرير الحجوزات (This Month، Last Month، Custom ...)
+		from re_studio_booking.re_studio_booking.page.booking_report_page.booking_report_page import get_date_filters
+
+		operator, value = get_date_filters(filters["date_range"], filters.get("start_date"), filters.get("end_date"))["booking_date"]
+		list_filters.append([date_field, operator, value])
+	if filters.get("from_date"):
+		list_filters.append([date_field, ">=", filters["from_date"]])
+	if filters.get("to_date"):
+		list_filters.append([date_field, "<=", filters["to_date"]])
+	for fieldname in source["filters"]:
+		if filters.get(fieldname) and filters[fieldname] != "All":
+			list_filters.append([fieldname, "=", filters[fieldname]])
+	return list_filters
+
+
+def build_query(source, filters):
+	"""نص الاستعلام مع شروط صلاحيات المستخدم (run=0 لا ينفذ الاستعلام)"""
+	return frappe.get_list(
+		source["doctype"],
+		fields=[fieldname for fieldname, label in source["columns"]],
+		filters=get_list_filters(source, filters),
+		order_by=source["order_by"],
+		limit_page_length=0,
+		run=0
+	)
+
+
+def count_rows(source, filters):
+	result = frappe.get_list(
+		source["doctype"],
+		fields=["count(*) as total"],
+		filters=get_list_filters(source, filters),
+		limit_page_length=0
+	)
+	return cint(result[0].total) if result else 0
+
+
+def iter_chunks(query, chunk_size):
+	"""
+	قراءة نتيجة الاستعلام بمؤشر من جهة الخادم (unbuffered) دفعة بعد دفعة
+
+	لا يمكن تنفيذ استعلامات أخرى على نفس الاتصال حتى تنتهي القراءة، لذلك
+	التقدم يُرسل عبر realtime فقط ويُحفظ في السجل بعد الانتهاء.
+	"""
+	with frappe.db.unbuffered_cursor():
+		rows = frappe.db.sql(query, as_iterator=True)
+		while True:
+			chunk = [format_row(row) for row in islice(rows, chunk_size)]
+			if not chunk:
+				break
+			yield chunk
+
+
+def format_row(row):
+	# Time تُرجع كـ timedelta؛ تُكتب كنص HH:MM:SS
+	return [str(value) if isinstance(value, datetime.timedelta) else value for value in row]
+
+
+def publish_export_progress(export, written, total, done=False):
+	frappe.publish_realtime(
+		PROGRESS_EVENT,
+		{
+			"name": export.name,
+			"status": export.status if done else "Running",
+			"progress": 100 if done else (written * 100.0 / total if total else 0),
+			"rows": written,
+			"total": total,
+			"file_url": export.file_url if done else None,
+			"error": export.error if done else None
+		},
+		user=export.owner
+	)
+
+
+def attach_export_file(export, file_name, path):
+	"""
+	تسجيل الملف المكتوب كـ File خاص مرفق بسجل التصدير
+
+	البصمة والحجم يُحسبان بقراءة الملف على أجزاء حتى لا يقرأه File كاملاً في الذاكرة.
+	"""
+	content_hash = hashlib.md5()
+	with open(path, "rb") as f:
+		for block in iter(lambda: f.read(1024 * 1024), b""):
+			content_hash.update(block)
+
+	file_doc = frappe.get_doc({
+		"doctype": "File",
+		"file_name": file_name,
+		"file_url": "/private/files/{0}".format(file_name),
+		"is_private": 1,
+		"attached_to_doctype": EXPORT_DOCTYPE,
+		"attached_to_name": export.name,
+		"file_size": os.path.getsize(path),
+		"content_hash": content_hash.hexdigest()
+	})
+	file_doc.flags.ignore_duplicate_entry_error = True
+	file_doc.insert(ignore_permissions=True)
+	return file_doc
+
+
+# ============ Writers ============
+
+class CSVExportWriter:
+	"""كتابة CSV تزايدية (utf-8-sig حتى يعرض Excel النص العربي)"""
+
+	def __init__(self, path, headers):
+		self.file = open(path, "w", newline="", encoding="utf-8-sig")
+		self.writer = csv.writer(self.file)
+		self.writer.writerow(headers)
+
+	def write_rows(self, rows):
+		self.writer.writerows(rows)
+
+	def close(self):
+		self.file.close()
+
+
+class XLSXExportWriter:
+	"""
+	كتابة XLSX تزايدية بوضع write_only في openpyxl: الصفوف تُكتب للملف المؤقت
+	مباشرة ولا تبقى في الذاكرة
+	"""
+
+	def __init__(self, path, headers):
+		from openpyxl import Workbook
+
+		self.path = path
+		self.headers = headers
+		self.workbook = Workbook(write_only=True)
+		self.sheet = None
+		self.sheet_rows = 0
+		self.add_sheet()
+
+	def add_sheet(self):
+		index = len(self.workbook.worksheets) + 1
+		self.sheet = self.workbook.create_sheet("Export" if index == 1 else "Export {0}".format(index))
+		self.sheet.append(self.headers)
+		self.sheet_rows = 0
+
+	def write_rows(self, rows):
+		for row in rows:
+			if self.sheet_rows >= XLSX_SHEET_ROWS:
+				self.add_sheet()
+			self.sheet.append(row)
+			self.sheet_rows += 1
+
+	def close(self):
+		self.workbook.save(self.path)
@@ -0,0 +1,44 @@
+# Copyright (c) 2025, Masar Digital Group and Contributors
+# See license.txt
+
+import csv
+import datetime
+import os
+import tempfile
+
+from frappe.tests.utils import FrappeTestCase
+
+from re_studio_booking.re_studio_booking.doctype.booking_export.booking_export import (
+	EXPORT_SOURCES,
+	CSVExportWriter,
+	format_row,
+	get_list_filters
+)
+
+
+class TestBookingExport(FrappeTestCase):
+	def test_csv_writer_appends_chunks(self):
+		with tempfile.TemporaryDirectory() as folder:
+			path = os.path.join(folder, "bookings.csv")
+			writer = CSVExportWriter(path, ["Booking", "Start Time"])
+			writer.write_rows([format_row(("B-1", datetime.timedelta(hours=10)))])
+			writer.write_rows([format_row(("B-2", datetime.timedelta(hours=11, minutes=30)))])
+			writer.close()
+
+			with open(path, newline="", encoding="utf-8-sig") as f:
+				rows = list(csv.reader(f))
+
+		self.assertEqual(rows, [["Booking", "Start Time"], ["B-1", "10:00:00"], ["B-2", "11:30:00"]])
+
+	def test_filters_are_limited_to_the_source(self):
+		filters = get_list_filters(EXPORT_SOURCES["GL Entries"], {
+			"from_date": "2030-01-01",
+			"to_date": "2030-12-31",
+			"account": "Cash",
+			"photographer": "P-1"
+		})
+		self.assertEqual(filters, [
+			["posting_date", ">=", "2030-01-01"],
+			["posting_date", "<=", "2030-12-31"],
+			["account", "=", "Cash"]
+		])
@@ -5,6 +5,12 @@ import frappe
 from frappe.model.document import Document
 from frappe.utils import flt, getdate, add_days, today
 
+from re_studio_booking.re_studio_booking.doctype.invoice_journal_batch.invoice_journal_batch import (
+	is_batch_entry,
+	is_consolidation_enabled,
+	reverse_invoice_in_batches
+)
+
 class BookingInvoice(Document):
 	def validate(self):
 		self.calculate_amounts()
@@ -162,30 +168,30 @@ class BookingInvoice(Document):
 		je = frappe.get_doc({
 			'doctype': 'Journal Entry',
 			'voucher_type': 'Journal Entry',
-			'naming_series': 'ACC-JV-.YYYY.-',
-			'company': self.company,
 			'posting_date': self.invoice_date or today(),
-			'user_remark': f'قيد محاسبي للفاتورة {self.name} - العميل: {self.client_name or "غير محدد"}',
-			'accounts': [
+			'remarks': f'قيد محاسبي للفاتورة {self.name} - العميل: {self.client_name or "غير محدد"}',
+			'entries': [
 				{
 					# المدين: حساب الخزينة/البنك
 					'account': self.debit_to,
-					'debit_in_account_currency': self.paid_amount,
-					'credit_in_account_currency': 0,
+					'debit': self.paid_amount,
+					'credit': 0,
+					'against': self.income_account,
 					'cost_center': self.cost_center,
-					'reference_type': 'Booking Invoice',
+					'reference_doctype': 'Booking Invoice',
 					'reference_name': self.name,
-					'user_remark': f'استلام مبلغ من الفاتورة {self.name}'
+					'remarks': f'استلام مبلغ من الفاتورة {self.name}'
 				},
 				{
 					# الدائن: حساب الإيرادات
 					'account': self.income_account,
-					'debit_in_account_currency': 0,
-					'credit_in_account_currency': self.paid_amount,
+					'debit': 0,
+					'credit': self.paid_amount,
+					'against': self.debit_to,
 					'cost_center': self.cost_center,
-					'reference_type': 'Booking Invoice',
+					'reference_doctype': 'Booking Invoice',
 					'reference_name': self.name,
-					'user_remark': f'إيرادات من الفاتورة {self.name}'
+					'remarks': f'إيرادات من الفاتورة {self.name}'
 				}
 			]
 		})
@@ -194,8 +200,8 @@ class BookingInvoice(Document):
 			je.insert()
 			je.submit()
 			
-			# حفظ رقم القيد في الفاتورة
-			self.db_set('journal_entry', je.name)
+			# حفظ رقم القيد والمبلغ المرحّل في الفاتورة
+			self.db_set({'journal_entry': je.name, 'posted_amount': self.paid_amount})
 			
 			frappe.msgprint(f"✅ تم إنشاء القيد المحاسبي {je.name} بنجاح", indicator='green')
 			return je.name
@@ -230,13 +236,22 @@ class BookingInvoice(Document):
 				self.phone = client_doc.mobile_no
 		
 		# إنشاء القيد المحاسبي تلقائياً إذا كانت الإعدادات المحاسبية مفعلة
-		if self.paid_amount > 0 and self.cost_center and self.debit_to and self.income_account:
+		# (في وضع الترحيل المجمّع يُرحّل مع فواتير اليوم في Invoice Journal Batch)
+		if self.paid_amount > 0 and self.cost_center and self.debit_to and self.income_account \
+				and not is_consolidation_enabled():
 			self.create_journal_entry()
 			
-	def on_cancel(self):
-		"""Actions on cancellation"""
-		# إلغاء القيد المحاسبي المرتبط
-		if self.journal_entry:
+	def on_update(self):
+		"""الفاتورة غير قابلة للاعتماد: الإلغاء هو تغيير الحالة إلى Cancelled"""
+		if self.status == "Cancelled" and self.has_value_changed("status"):
+			self.reverse_journal_entries()
+	
+	def reverse_journal_entries(self):
+		"""إلغاء القيد المحاسبي المرتبط، أو عكس مبلغ الفاتورة من قيود الدفعات المجمّعة"""
+		if reverse_invoice_in_batches(self):
+			# قيود مجمّعة لعدة فواتير: يُعكس مبلغ هذه الفاتورة فقط
+			return
+		if self.journal_entry and not is_batch_entry(self.journal_entry):
 			try:
 				je = frappe.get_doc("Journal Entry", self.journal_entry)
 				if je.docstatus == 1:  # Submitted
@@ -244,6 +259,10 @@ class BookingInvoice(Document):
 					frappe.msgprint(f"تم إلغاء القيد المحاسبي {self.journal_entry}")
 			except Exception as e:
 				frappe.log_error(f"خطأ في إلغاء القيد المحاسبي: {str(e)}")
+	
+	def on_cancel(self):
+		"""Actions on cancellation"""
+		self.reverse_journal_entries()
 		self.status = "Cancelled"
 		
 		# Remove invoice link from booking
@@ -4,8 +4,24 @@
 import frappe
 from frappe.model.document import Document
 from frappe import _
+from frappe.utils import cint, now
 from datetime import datetime
 
+from re_studio_booking.re_studio_booking.doctype.booking_notification_counter.booking_notification_counter import (
+	CACHE_TTL,
+	get_feed_cache_key,
+	get_unread,
+	increment_unread,
+	invalidate_user_cache,
+	lock_counter,
+	reset_unread
+)
+
+NOTIFICATION_FIELDS = ("title", "message", "notification_type", "booking", "priority")
+FEED_FIELDS = ("name", "title", "message", "notification_type", "priority", "status",
+	"created_date", "booking", "read_status", "creation")
+FEED_MAX_LIMIT = 100
+
 class BookingNotification(Document):
 	def validate(self):
 		"""Validate notification"""
@@ -15,11 +31,36 @@ class BookingNotification(Document):
 		if not self.created_date:
 			self.created_date = datetime.now()
 	
+	def before_insert(self):
+		"""Count the new notification in the user's unread counter
+		
+		Done before the row is written, so the counter row is locked before the
+		notification row, in the same order as mark_all_as_read (no deadlock).
+		"""
+		if not self.read_status:
+			increment_unread([self.user or frappe.session.user])
+	
 	def on_update(self):
 		"""Update read status when notification is read"""
 		if self.read_status and not self.read_date:
 			self.read_date = datetime.now()
 			self.status = "Read"
+		
+		before = self.get_doc_before_save()
+		if before and (before.read_status, before.user) != (self.read_status, self.user):
+			if not before.read_status:
+				increment_unread([before.user], step=-1)
+			if not self.read_status:
+				increment_unread([self.user])
+		
+		# Any change (e.g. archiving) shows in the cached feed
+		invalidate_user_cache([self.user])
+	
+	def on_trash(self):
+		"""Remove an unread notification from the user's counter"""
+		if not self.read_status:
+			increment_unread([self.user], step=-1)
+		invalidate_user_cache([self.user])
 
 @frappe.whitelist()
 def create_notification(title, message, notification_type, booking=None, user=None, priority="Medium"):
@@ -44,11 +85,45 @@ def create_notification(title, message, notification_type, booking=None, user=No
 	
 	return notification
 
+def create_notifications(users, title, message, notification_type, booking=None, priority="Medium"):
+	"""Create the same notification for many users
+	
+	All rows are written with one multi-row insert and the unread counters are
+	updated with one statement, instead of one insert (and its hooks) per user.
+	
+	Returns:
+		list: names of the created notifications
+	"""
+	users = [user for user in dict.fromkeys(users or []) if user]
+	if not users:
+		return []
+	
+	timestamp = now()
+	owner = frappe.session.user
+	values = {"title": title, "message": message, "notification_type": notification_type,
+		"booking": booking, "priority": priority or "Medium"}
+	names = [frappe.generate_hash(length=10) for user in users]
+	
+	# Counters first: same lock order as mark_all_as_read
+	increment_unread(users)
+	frappe.db.bulk_insert(
+		"Booking Notification",
+		["name", "creation", "modified", "owner", "modified_by", "user",
+			"status", "read_status", "created_date", *NOTIFICATION_FIELDS],
+		[
+			(name, timestamp, timestamp, owner, owner, user,
+				"Unread", 0, timestamp, *(values[field] for field in NOTIFICATION_FIELDS))
+			for name, user in zip(names, users)
+		]
+	)
+	
+	return names
+
 @frappe.whitelist()
 def get_user_notifications(user=None, limit=50):
 	"""Get notifications for a user"""
-	if not user:
-		user = frappe.session.user
+	if not user or user == frappe.session.user:
+		return get_notification_feed(limit=limit)["notifications"]
 	
 	notifications = frappe.get_all(
 		"Booking Notification",
@@ -60,18 +135,69 @@ def get_user_notifications(user=None, limit=50):
 	
 	return notifications
 
+@frappe.whitelist()
+def get_notification_feed(cursor=None, limit=20):
+	"""Notifications of the session user, newest first, one page at a time
+	
+	Pass the next_cursor of a page to get the following one (None on the last
+	page). The first page is kept in Redis until one of the user's notifications
+	changes, so polling the dropdown does not query the table.
+	
+	Returns:
+		dict: {notifications, next_cursor, unread_count}
+	"""
+	user = frappe.session.user
+	limit = min(max(cint(limit), 1), FEED_MAX_LIMIT)
+	
+	if cursor:
+		page = get_feed_page(user, limit, cursor)
+	else:
+		key = get_feed_cache_key(user)
+		pages = frappe.cache().get_value(key) or {}
+		page = pages.get(limit)
+		if page is None:
+			page = pages[limit] = get_feed_page(user, limit)
+			frappe.cache().set_value(key, pages, expires_in_sec=CACHE_TTL)
+	
+	return dict(page, unread_count=get_unread(user))
+
+def get_feed_page(user, limit, cursor=None):
+	"""One page of the feed, keyset on (creation, name) so deep pages cost the same as the first"""
+	values = {"user": user, "limit": limit + 1}
+	after_cursor = ""
+	if cursor:
+		values["creation"], values["name"] = parse_feed_cursor(cursor)
+		after_cursor = "AND (creation < %(creation)s OR (creation = %(creation)s AND name < %(name)s))"
+	
+	rows = frappe.db.sql("""
+		SELECT {fields}
+		FROM `tabBooking Notification`
+		WHERE user = %(user)s {after_cursor}
+		ORDER BY creation DESC, name DESC
+		LIMIT %(limit)s
+	""".format(fields=", ".join(FEED_FIELDS), after_cursor=after_cursor), values, as_dict=True)
+	
+	next_cursor = None
+	if len(rows) > limit:
+		rows = rows[:limit]
+		next_cursor = "{0}|{1}".format(rows[-1].creation, rows[-1].name)
+	
+	return {"notifications": rows, "next_cursor": next_cursor}
+
+def parse_feed_cursor(cursor):
+	"""next_cursor is "<creation>|<name>" of the last row of the previous page"""
+	creation, separator, name = (cursor or "").partition("|")
+	if not separator or not creation or not name:
+		frappe.throw(_("Invalid notification cursor"))
+	return creation, name
+
 @frappe.whitelist()
 def get_unread_count(user=None):
 	"""Get count of unread notifications for a user"""
 	if not user:
 		user = frappe.session.user
 	
-	count = frappe.db.count(
-		"Booking Notification",
-		filters={"user": user, "read_status": 0}
-	)
-	
-	return count
+	return get_unread(user)
 
 @frappe.whitelist()
 def mark_as_read(notification_name):
@@ -91,11 +217,14 @@ def mark_all_as_read(user=None):
 	if not user:
 		user = frappe.session.user
 	
-	frappe.db.sql("""
-		UPDATE `tabBooking Notification`
-		SET read_status = 1, read_date = %s, status = 'Read'
-		WHERE user = %s AND read_status = 0
-	""", (datetime.now(), user))
+	# Nothing unread: no need to touch the notifications table
+	if lock_counter(user):
+		frappe.db.sql("""
+			UPDATE `tabBooking Notification`
+			SET read_status = 1, read_date = %s, status = 'Read'
+			WHERE user = %s AND read_status = 0
+		""", (datetime.now(), user))
+		reset_unread(user)
 	
 	frappe.db.commit()
 	
@@ -110,9 +239,19 @@ def delete_notification(notification_name):
 	
 	return {"message": "Notification deleted"}
 
+def get_manager_users():
+	"""Users that receive manager notifications"""
+	return [user.name for user in frappe.get_all("User", filters={"role_profile_name": "Re Studio Manager"}, fields=["name"])]
+
 # Hooks for automatic notification creation
 def create_booking_notification(doc, method):
-	"""Create notification when booking is created/updated"""
+	"""Queue the manager notification when a booking is created/updated
+
+	The notifications are created by the Booking Email queue worker (one per
+	booking and notification type), not inside the request that saves the booking.
+	"""
+	from re_studio_booking.re_studio_booking.doctype.booking_email.booking_email import queue_manager_notification
+
 	if method == "on_submit" or method == "after_insert":
 		title = _("New Booking Created")
 		message = _("Booking {0} has been created for client {1}").format(doc.name, doc.client)
@@ -132,18 +271,16 @@ def create_booking_notification(doc, method):
 			priority = "High"
 		else:
 			return
+	else:
+		return
 	
-	# Create notification for all Re Studio Managers
-	managers = frappe.get_all("User", filters={"role_profile_name": "Re Studio Manager"}, fields=["name"])
-	for manager in managers:
-		create_notification(
-			title=title,
-			message=message,
-			notification_type=notification_type,
-			booking=doc.name,
-			user=manager.name,
-			priority=priority
-		)
+	queue_manager_notification(
+		booking=doc.name,
+		notification_type=notification_type,
+		title=title,
+		message=message,
+		priority=priority
+	)
 
 def create_payment_notification(doc, method):
 	"""Create notification when payment is received"""
@@ -154,13 +291,11 @@ def create_payment_notification(doc, method):
 		priority = "Medium"
 		
 		# Create notification for all Re Studio Managers
-		managers = frappe.get_all("User", filters={"role_profile_name": "Re Studio Manager"}, fields=["name"])
-		for manager in managers:
-			create_notification(
-				title=title,
-				message=message,
-				notification_type=notification_type,
-				booking=doc.booking,
-				user=manager.name,
-				priority=priority
-			)
\ No newline at end of file
+		create_notifications(
+			get_manager_users(),
+			title=title,
+			message=message,
+			notification_type=notification_type,
+			booking=doc.booking,
+			priority=priority
+		)
\ No newline at end of file
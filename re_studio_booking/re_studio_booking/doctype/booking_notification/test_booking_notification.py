@@ -0,0 +1,39 @@
+# Copyright (c) 2025, Re Studio and Contributors
+# See license.txt
+
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from re_studio_booking.re_studio_booking.doctype.booking_notification.booking_notification import (
+	get_feed_page,
+	parse_feed_cursor
+)
+
+
+class TestNotificationFeed(FrappeTestCase):
+	def make_rows(self, count):
+		return [
+			frappe._dict(name=f"N-{i}", creation=f"2030-01-01 10:00:0{9 - i}.000000")
+			for i in range(count)
+		]
+
+	def test_page_with_more_rows_has_cursor(self):
+		with patch.object(frappe.db, "sql", return_value=self.make_rows(3)) as sql:
+			page = get_feed_page("manager@example.com", 2)
+
+		self.assertEqual(sql.call_args[0][1]["limit"], 3)
+		self.assertEqual([row.name for row in page["notifications"]], ["N-0", "N-1"])
+		self.assertEqual(page["next_cursor"], "2030-01-01 10:00:08.000000|N-1")
+
+	def test_cursor_continues_after_last_row(self):
+		with patch.object(frappe.db, "sql", return_value=self.make_rows(1)) as sql:
+			page = get_feed_page("manager@example.com", 2, "2030-01-01 10:00:08.000000|N-1")
+
+		values = sql.call_args[0][1]
+		self.assertEqual((values["creation"], values["name"]), ("2030-01-01 10:00:08.000000", "N-1"))
+		self.assertIsNone(page["next_cursor"])
+
+	def test_invalid_cursor(self):
+		self.assertRaises(Exception, parse_feed_cursor, "2030-01-01")
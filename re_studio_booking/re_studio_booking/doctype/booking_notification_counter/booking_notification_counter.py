@@ -0,0 +1,162 @@
+# Copyright (c) 2025, Re Studio and contributors
+# For license information, please see license.txt
+
+"""
+Booking Notification Counter
+One row per user holding the number of unread Booking Notifications, so the
+unread badge is a primary key lookup instead of a count over the notifications.
+
+The counts (and the first page of each user's feed) are cached in Redis. Every
+change marks the user, and the user's cache entries are dropped after commit;
+the next read rebuilds them from the table.
+"""
+
+from collections import Counter
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import cint, now
+
+COUNTER_DOCTYPE = "Booking Notification Counter"
+
+UNREAD_CACHE_PREFIX = "re_studio_booking:notification_unread"
+FEED_CACHE_PREFIX = "re_studio_booking:notification_feed"
+
+# Upper bound on how long a value cached by a read racing a commit can stay stale
+CACHE_TTL = 3600
+
+
+class BookingNotificationCounter(Document):
+	pass
+
+
+def get_unread(user):
+	"""Unread notifications of the user from Redis, rebuilt from the counter row if missing"""
+	key = get_unread_cache_key(user)
+	cached = frappe.cache().get_value(key)
+	if cached is not None:
+		return cint(cached)
+
+	# No row means nothing unread
+	count = cint(frappe.db.get_value(COUNTER_DOCTYPE, user, "unread_count"))
+	frappe.cache().set_value(key, count, expires_in_sec=CACHE_TTL)
+	return count
+
+
+def increment_unread(users, step=1):
+	"""
+	Add step to the counter of every user in one statement
+
+	Args:
+		users: user names, a user listed twice is counted twice
+		step: 1 for new unread notifications, -1 for read / deleted ones
+	"""
+	counts = Counter(user for user in users if user)
+	if not counts:
+		return
+
+	timestamp = now()
+	owner = frappe.session.user
+	values = []
+	for user, count in counts.items():
+		values.extend([user, timestamp, timestamp, owner, owner, user, count * step])
+
+	placeholders = ", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(counts))
+	frappe.db.sql(f"""
+		INSERT INTO `tabBooking Notification Counter`
+			(name, creation, modified, owner, modified_by, user, unread_count)
+		VALUES {placeholders}
+		ON DUPLICATE KEY UPDATE
+			unread_count = GREATEST(CAST(unread_count AS SIGNED) + VALUES(unread_count), 0),
+			modified = VALUES(modified)
+	""", values)
+	invalidate_user_cache(counts)
+
+
+def lock_counter(user):
+	"""
+	Lock the user's counter row until the end of the transaction
+
+	Concurrent increments wait for the lock, so a notification created while
+	"mark all as read" runs cannot be lost between the UPDATE and the reset.
+
+	Returns:
+		int: the unread count
+	"""
+	increment_unread([user], step=0)
+	return cint(frappe.db.sql("""
+		SELECT unread_count FROM `tabBooking Notification Counter`
+		WHERE name = %s FOR UPDATE
+	""", (user,))[0][0])
+
+
+def reset_unread(user):
+	frappe.db.sql("""
+		UPDATE `tabBooking Notification Counter`
+		SET unread_count = 0, modified = %s
+		WHERE name = %s
+	""", (now(), user))
+	invalidate_user_cache([user])
+
+
+def rebuild_unread_counters():
+	"""Recount every user's unread notifications from Booking Notification"""
+	frappe.db.sql("DELETE FROM `tabBooking Notification Counter`")
+	frappe.db.sql("""
+		INSERT INTO `tabBooking Notification Counter`
+			(name, creation, modified, owner, modified_by, user, unread_count)
+		SELECT user, %(now)s, %(now)s, 'Administrator', 'Administrator', user, COUNT(*)
+		FROM `tabBooking Notification`
+		WHERE read_status = 0 AND IFNULL(user, '') != ''
+		GROUP BY user
+	""", {"now": now()})
+	clear_notification_cache()
+
+
+# ============ Redis Cache ============
+
+def get_unread_cache_key(user):
+	return f"{UNREAD_CACHE_PREFIX}:{user}"
+
+
+def get_feed_cache_key(user):
+	return f"{FEED_CACHE_PREFIX}:{user}"
+
+
+def invalidate_user_cache(users):
+	"""
+	Drop the cached count and feed of the users once the transaction commits
+
+	Dropping (instead of writing the new values) keeps Redis correct when the
+	transaction rolls back: nothing is touched and the old values stay valid.
+	"""
+	users = [user for user in users if user]
+	if not users:
+		return
+
+	pending = getattr(frappe.local, "notification_cache_users", None)
+	if pending is None:
+		pending = frappe.local.notification_cache_users = set()
+		frappe.db.after_commit.add(flush_user_cache)
+		frappe.db.after_rollback.add(discard_user_cache)
+	pending.update(users)
+
+
+def flush_user_cache():
+	users = getattr(frappe.local, "notification_cache_users", None)
+	frappe.local.notification_cache_users = None
+	if not users:
+		return
+
+	for user in users:
+		frappe.cache().delete_value([get_unread_cache_key(user), get_feed_cache_key(user)])
+
+
+def discard_user_cache():
+	frappe.local.notification_cache_users = None
+
+
+def clear_notification_cache():
+	"""Drop every cached count and feed (after a rebuild)"""
+	frappe.cache().delete_keys(UNREAD_CACHE_PREFIX)
+	frappe.cache().delete_keys(FEED_CACHE_PREFIX)
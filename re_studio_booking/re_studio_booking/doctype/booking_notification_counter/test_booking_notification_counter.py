@@ -0,0 +1,124 @@
+# Copyright (c) 2025, Re Studio and Contributors
+# See license.txt
+
+import threading
+import time
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from re_studio_booking.re_studio_booking.doctype.booking_notification.booking_notification import (
+	create_notification,
+	create_notifications,
+	delete_notification,
+	get_unread_count,
+	mark_all_as_read,
+	mark_as_read
+)
+from re_studio_booking.re_studio_booking.doctype.booking_notification_counter.booking_notification_counter import (
+	COUNTER_DOCTYPE,
+	increment_unread,
+	lock_counter,
+	reset_unread
+)
+
+
+class TestBookingNotificationCounter(FrappeTestCase):
+	"""Counter behaviour against the database
+
+	The cached counts are only dropped after commit, so every step commits and
+	tearDown removes what the test created.
+	"""
+
+	def setUp(self):
+		self.user = f"_test_notify_{frappe.generate_hash(length=6)}@example.com"
+		frappe.get_doc({
+			"doctype": "User",
+			"email": self.user,
+			"first_name": "_Test Notify",
+			"send_welcome_email": 0
+		}).insert(ignore_permissions=True)
+		frappe.db.commit()
+
+	def tearDown(self):
+		frappe.db.rollback()
+		frappe.db.delete("Booking Notification", {"user": self.user})
+		frappe.db.delete(COUNTER_DOCTYPE, {"name": self.user})
+		frappe.delete_doc("User", self.user, ignore_permissions=True, force=True)
+		frappe.db.commit()
+
+	def notify(self, title="Test"):
+		notification = create_notification(title, "Test message", "General", user=self.user)
+		frappe.db.commit()
+		return notification.name
+
+	def unread(self):
+		return get_unread_count(self.user)
+
+	def test_insert_read_and_delete_keep_the_count(self):
+		first, second, third = self.notify("1"), self.notify("2"), self.notify("3")
+		self.assertEqual(self.unread(), 3)
+
+		mark_as_read(first)
+		frappe.db.commit()
+		self.assertEqual(self.unread(), 2)
+
+		# deleting a read notification does not change the count, an unread one does
+		delete_notification(first)
+		delete_notification(second)
+		frappe.db.commit()
+		self.assertEqual(self.unread(), 1)
+
+		notification = frappe.get_doc("Booking Notification", third)
+		notification.read_status = 0
+		notification.title = "Edited"
+		notification.save(ignore_permissions=True)
+		frappe.db.commit()
+		self.assertEqual(self.unread(), 1)
+
+	def test_bulk_notifications_are_counted_once_per_user(self):
+		create_notifications([self.user, self.user, None], "Bulk", "Test message", "General")
+		frappe.db.commit()
+		self.assertEqual(self.unread(), 1)
+		self.assertEqual(frappe.db.count("Booking Notification", {"user": self.user, "read_status": 0}), 1)
+
+	def test_mark_all_as_read_resets_the_counter(self):
+		self.notify("1")
+		self.notify("2")
+		self.assertEqual(self.unread(), 2)
+
+		mark_all_as_read(self.user)
+		self.assertEqual(self.unread(), 0)
+		self.assertEqual(frappe.db.count("Booking Notification", {"user": self.user, "read_status": 0}), 0)
+
+		self.notify("3")
+		self.assertEqual(self.unread(), 1)
+
+	def test_increment_during_reset_waits_for_the_lock(self):
+		self.notify("1")
+		lock_counter(self.user)
+
+		def increment(site, started):
+			frappe.init(site=site)
+			frappe.connect()
+			try:
+				started.set()
+				increment_unread([self.user])
+				frappe.db.commit()
+			finally:
+				frappe.destroy()
+
+		started = threading.Event()
+		worker = threading.Thread(target=increment, args=(frappe.local.site, started))
+		worker.start()
+		started.wait()
+		time.sleep(0.5)
+		# the worker waits on the counter row held by this transaction
+		self.assertTrue(worker.is_alive())
+
+		reset_unread(self.user)
+		frappe.db.commit()
+		worker.join()
+
+		# the increment lands after the reset instead of being wiped by it
+		self.assertEqual(self.unread(), 1)
@@ -7,6 +7,8 @@ from frappe.utils import getdate, add_to_date, get_first_day, get_last_day
 from frappe.utils.data import cstr
 import json
 
+from re_studio_booking.re_studio_booking.doctype.booking_daily_rollup.booking_daily_rollup import get_rollup_totals
+
 class BookingReport(Document):
 	def validate(self):
 		self.validate_dates()
@@ -51,13 +53,13 @@ class BookingReport(Document):
 			order_by="booking_date, start_time"
 		)
 		
-		# Calculate summary statistics
+		# Calculate summary statistics (status counts from the daily rollup)
 		total_bookings = len(bookings)
-		status_counts = {}
-		
-		for booking in bookings:
-			status = booking.status
-			status_counts[status] = status_counts.get(status, 0) + 1
+		rollup_filters = {"status": self.status} if self.status and self.status != "All" else {}
+		status_counts = {
+			row.status: int(row.booking_count)
+			for row in get_rollup_totals(("status",), self.start_date, self.end_date, rollup_filters)
+		}
 		
 		# Convert dates/times to strings for JSON serialization
 		bookings_serializable = []
@@ -93,17 +95,17 @@ class BookingReport(Document):
 		filters["status"] = "Completed"
 		
 		# Get bookings grouped by photographer
-		photographer_bookings = frappe.db.sql("""
-			SELECT 
-				photographer, 
-				COUNT(*) as total_bookings,
-				SUM(TIMESTAMPDIFF(MINUTE, start_time, end_time)) as total_minutes
-			FROM `tabBooking`
-			WHERE booking_date BETWEEN %s AND %s
-			AND status = 'Completed'
-			GROUP BY photographer
-			ORDER BY total_bookings DESC
-		""", (self.start_date, self.end_date), as_dict=True)
+		photographer_bookings = [
+			frappe._dict(
+				photographer=row.photographer,
+				total_bookings=int(row.booking_count),
+				total_minutes=int(row.booked_minutes)
+			)
+			for row in get_rollup_totals(
+				("photographer",), self.start_date, self.end_date, {"status": "Completed"},
+				order_by="booking_count desc"
+			)
+		]
 		
 		# Save report data
 		self.report_data = json.dumps({
@@ -122,21 +124,27 @@ class BookingReport(Document):
 		filters = self.get_date_filters()
 		
 		# Get services grouped by popularity
-		service_popularity = frappe.db.sql("""
-			SELECT 
-				service, 
-				COUNT(*) as booking_count
-			FROM `tabBooking`
-			WHERE booking_date BETWEEN %s AND %s
-			GROUP BY service
-			ORDER BY booking_count DESC
-		""", (self.start_date, self.end_date), as_dict=True)
+		service_popularity = [
+			frappe._dict(service=row.service, booking_count=int(row.service_count))
+			for row in get_rollup_totals(
+				("service",), self.start_date, self.end_date, {"service": ("not in", [""])},
+				order_by="service_count desc"
+			)
+		]
 		
 		# Get service details
+		service_details = {
+			row.name: row
+			for row in frappe.get_all(
+				"Service",
+				filters={"name": ["in", [s.service for s in service_popularity] or [""]]},
+				fields=["name", "service_name_ar", "category"]
+			)
+		}
 		for service in service_popularity:
-			service_doc = frappe.get_doc("Service", service.service)
-			service["service_name"] = service_doc.service_name_ar
-			service["category"] = service_doc.category
+			details = service_details.get(service.service, {})
+			service["service_name"] = details.get("service_name_ar")
+			service["category"] = details.get("category")
 			
 		# Save report data
 		self.report_data = json.dumps({
@@ -157,17 +165,13 @@ class BookingReport(Document):
 		filters["status"] = "Completed"
 		
 		# Get revenue by service
-		revenue_by_service = frappe.db.sql("""
-			SELECT 
-				service, 
-				COUNT(*) as booking_count,
-				SUM(total_amount) as total_revenue
-			FROM `tabBooking`
-			WHERE booking_date BETWEEN %s AND %s
-			AND status = 'Completed'
-			GROUP BY service
-			ORDER BY total_revenue DESC
-		""", (self.start_date, self.end_date), as_dict=True)
+		revenue_by_service = [
+			frappe._dict(service=row.service, booking_count=row.service_count, total_revenue=row.revenue)
+			for row in get_rollup_totals(
+				("service",), self.start_date, self.end_date, {"status": "Completed"},
+				order_by="revenue desc"
+			)
+		]
 
 		# Ensure JSON-serializable types
 		for row in revenue_by_service:
@@ -6,6 +6,8 @@ import frappe
 from frappe.model.document import Document
 from frappe.utils import flt, nowdate, now_datetime
 
+from re_studio_booking.re_studio_booking.doctype.cost_center_ledger_entry.cost_center_ledger_entry import get_balance
+
 class CostCenter(Document):
 	def validate(self):
 		"""Validate Cost Center before saving"""
@@ -22,42 +24,20 @@ class CostCenter(Document):
 				frappe.throw(f"الحساب المحاسبي {self.default_account} هو حساب مجموعة ولا يمكن استخدامه")
 	
 	def calculate_balances(self):
-		"""Calculate current balances from all shifts"""
-		# Get all closed shifts
-		shifts = frappe.get_all(
+		"""Current balance and totals as maintained by the Cost Center Ledger (O(1) reads)"""
+		if self.is_new():
+			return
+		
+		balance = get_balance(self.name)
+		self.current_balance = balance["current_balance"]
+		self.total_in = balance["total_in"]
+		self.total_out = balance["total_out"]
+		self.last_shift = frappe.db.get_value(
 			"Shift",
-			filters={
-				"cost_center": self.name,
-				"status": ["in", ["Closed", "Handed Over"]]
-			},
-			fields=["name", "actual_closing_balance"]
+			{"cost_center": self.name, "status": ["in", ["Closed", "Handed Over"]]},
+			"name",
+			order_by="closed_on desc"
 		)
-		
-		if shifts:
-			# Get the last shift
-			last_shift = frappe.get_doc("Shift", shifts[-1].name)
-			self.current_balance = flt(last_shift.actual_closing_balance)
-			self.last_shift = last_shift.name
-		
-		# Calculate total in/out from all shift transactions
-		total_in = frappe.db.sql("""
-			SELECT SUM(st.amount)
-			FROM `tabShift Transaction` st
-			INNER JOIN `tabShift` s ON s.name = st.parent
-			WHERE s.cost_center = %s
-			AND st.trx_type IN ('Payment', 'Deposit', 'OpeningBalance')
-		""", (self.name,))[0][0] or 0
-		
-		total_out = frappe.db.sql("""
-			SELECT SUM(st.amount)
-			FROM `tabShift Transaction` st
-			INNER JOIN `tabShift` s ON s.name = st.parent
-			WHERE s.cost_center = %s
-			AND st.trx_type IN ('Refund', 'Expense', 'Withdrawal')
-		""", (self.name,))[0][0] or 0
-		
-		self.total_in = flt(total_in)
-		self.total_out = flt(total_out)
 	
 	def get_open_shift(self):
 		"""Get currently open shift for this cost center"""
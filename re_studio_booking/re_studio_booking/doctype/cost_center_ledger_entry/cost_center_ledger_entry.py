@@ -0,0 +1,356 @@
+# Copyright (c) 2025, Masar Digital Group and contributors
+# For license information, please see license.txt
+
+"""
+Cost Center Ledger Entry
+دفتر حركات الخزنة (إضافة فقط): كل معاملة وردية أو تحويل أو إقفال وردية يضيف صفاً
+بالرصيد الجاري وإجمالي الداخل والخارج حتى هذا الصف.
+
+- الإضافة تتم بعد قفل صف Cost Center (SELECT ... FOR UPDATE) فالإضافات المتزامنة
+  لنفس الخزنة تُنفذ بالترتيب ولا يضيع تحديث
+- current_balance / total_in / total_out في Cost Center تُحدّث في نفس المعاملة،
+  فقراءة الرصيد O(1)
+- check_cost_center_ledger يعيد بناء الدفتر من المعاملات الأصلية ويقارن
+"""
+
+import hashlib
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import flt, get_datetime, now, now_datetime
+
+LEDGER_DOCTYPE = "Cost Center Ledger Entry"
+
+IN_TYPES = ("Payment", "Deposit", "Transfer In")
+OUT_TYPES = ("Refund", "Expense", "Withdrawal", "Transfer Out")
+# الرصيد المُعلن (افتتاح الوردية) أو المعدود (إقفالها): الحركة = الفرق عن الرصيد الجاري
+SET_TYPES = ("Opening Balance", "Closing Adjustment")
+
+# نوع معاملة الوردية -> نوع حركة الدفتر
+TRX_ENTRY_TYPES = {"OpeningBalance": "Opening Balance"}
+
+LEDGER_FIELDS = (
+	"name", "creation", "modified", "owner", "modified_by",
+	"cost_center", "sequence", "posting_datetime", "entry_type", "reference_doctype", "reference_name", "shift",
+	"amount", "balance", "total_in", "total_out",
+)
+
+
+class CostCenterLedgerEntry(Document):
+	pass
+
+
+# ============ Events ============
+
+def get_entry_name(reference_doctype, reference_name, suffix=""):
+	"""اسم ثابت من المصدر: إعادة ترحيل نفس الحدث لا تضيف صفاً ثانياً"""
+	return hashlib.md5(f"{reference_doctype}\x1f{reference_name}\x1f{suffix}".encode()).hexdigest()
+
+
+def get_shift_transaction_event(shift, row):
+	return frappe._dict({
+		"name": get_entry_name("Shift Transaction", row.name),
+		"entry_type": TRX_ENTRY_TYPES.get(row.trx_type, row.trx_type),
+		"amount": flt(row.amount),
+		"posting_datetime": row.created_on or now_datetime(),
+		"reference_doctype": row.reference_doctype or "Shift",
+		"reference_name": row.reference_name or shift.name,
+		"shift": shift.name,
+	})
+
+
+def get_shift_closing_event(shift):
+	return frappe._dict({
+		"name": get_entry_name("Shift", shift.name, "closing"),
+		"entry_type": "Closing Adjustment",
+		"amount": flt(shift.actual_closing_balance),
+		"posting_datetime": shift.closed_on or now_datetime(),
+		"reference_doctype": "Shift",
+		"reference_name": shift.name,
+		"shift": shift.name,
+	})
+
+
+def get_transfer_events(transfer):
+	"""{cost_center: [event]} لطرفي التحويل"""
+	events = {}
+	for cost_center, entry_type, suffix in (
+		(transfer.from_cost_center, "Transfer Out", "out"),
+		(transfer.to_cost_center, "Transfer In", "in"),
+	):
+		events[cost_center] = [frappe._dict({
+			"name": get_entry_name("Cost Center Transfer", transfer.name, suffix),
+			"entry_type": entry_type,
+			"amount": flt(transfer.amount),
+			"posting_datetime": transfer.transfer_date or now_datetime(),
+			"reference_doctype": "Cost Center Transfer",
+			"reference_name": transfer.name,
+			"shift": None,
+		})]
+	return events
+
+
+def apply_events(state, events):
+	"""
+	صفوف الدفتر للأحداث بالترتيب، بدءاً من حالة الخزنة الحالية
+
+	Args:
+		state: {sequence, balance, total_in, total_out} (يُحدّث في مكانه)
+		events: أحداث get_*_event؛ amount موجب دائماً (للرصيد المُعلن: الرصيد نفسه)
+
+	Returns:
+		list: صفوف بحقول amount (بإشارة) و balance و total_in و total_out
+	"""
+	rows = []
+	for event in events:
+		amount = flt(event.amount)
+		if event.entry_type in SET_TYPES:
+			delta = flt(amount - state["balance"])
+		elif event.entry_type in OUT_TYPES:
+			delta = -amount
+			state["total_out"] = flt(state["total_out"] + amount)
+		elif event.entry_type in IN_TYPES:
+			delta = amount
+			state["total_in"] = flt(state["total_in"] + amount)
+		else:
+			frappe.throw(_("نوع حركة غير معروف: {0}").format(event.entry_type))
+
+		state["sequence"] += 1
+		state["balance"] = flt(state["balance"] + delta)
+		row = frappe._dict(event)
+		row.update({
+			"sequence": state["sequence"],
+			"amount": delta,
+			"balance": state["balance"],
+			"total_in": state["total_in"],
+			"total_out": state["total_out"],
+		})
+		rows.append(row)
+	return rows
+
+
+# ============ Posting ============
+
+def lock_cost_centers(cost_centers):
+	"""
+	قفل صفوف الخزن بترتيب الاسم (نفس الترتيب في كل العمليات فلا يحدث deadlock)
+
+	Returns:
+		dict: {cost_center: {sequence, balance, total_in, total_out}}
+	"""
+	names = sorted(set(filter(None, cost_centers)))
+	if not names:
+		return {}
+	rows = frappe.db.sql("""
+		SELECT name, current_balance, total_in, total_out
+		FROM `tabCost Center`
+		WHERE name IN %(names)s
+		ORDER BY name
+		FOR UPDATE
+	""", {"names": names}, as_dict=True)
+	sequences = dict(frappe.db.sql("""
+		SELECT cost_center, MAX(sequence)
+		FROM `tabCost Center Ledger Entry`
+		WHERE cost_center IN %(names)s
+		GROUP BY cost_center
+	""", {"names": names}))
+	return {
+		row.name: {
+			"sequence": int(sequences.get(row.name) or 0),
+			"balance": flt(row.current_balance),
+			"total_in": flt(row.total_in),
+			"total_out": flt(row.total_out),
+		}
+		for row in rows
+	}
+
+
+def post_events(events_by_cost_center):
+	"""
+	إضافة أحداث لدفاتر الخزن: قفل، تجاهل الأحداث المرحّلة مسبقاً، إدراج بجملة واحدة،
+	ثم تحديث أرصدة Cost Center
+
+	Args:
+		events_by_cost_center: {cost_center: [event]}
+	"""
+	events_by_cost_center = {cc: events for cc, events in events_by_cost_center.items() if cc and events}
+	if not events_by_cost_center:
+		return
+
+	states = lock_cost_centers(events_by_cost_center)
+	names = [event.name for events in events_by_cost_center.values() for event in events]
+	posted = set(frappe.db.sql_list(
+		"SELECT name FROM `tabCost Center Ledger Entry` WHERE name IN %(names)s", {"names": names}
+	))
+
+	timestamp = now()
+	user = frappe.session.user
+	values = []
+	for cost_center, events in events_by_cost_center.items():
+		if cost_center not in states:
+			continue
+		state = states[cost_center]
+		rows = apply_events(state, [event for event in events if event.name not in posted])
+		if not rows:
+			continue
+		for row in rows:
+			row.update({
+				"creation": timestamp, "modified": timestamp, "owner": user, "modified_by": user,
+				"cost_center": cost_center,
+			})
+			values.append(tuple(row.get(field) for field in LEDGER_FIELDS))
+		update_cost_center(cost_center, state)
+
+	if values:
+		frappe.db.bulk_insert(LEDGER_DOCTYPE, LEDGER_FIELDS, values)
+
+
+def update_cost_center(cost_center, state, **extra):
+	values = {
+		"name": cost_center,
+		"current_balance": state["balance"],
+		"total_in": state["total_in"],
+		"total_out": state["total_out"],
+		"modified": now(),
+	}
+	values.update(extra)
+	assignments = ", ".join(f"{field} = %({field})s" for field in values if field != "name")
+	frappe.db.sql(f"UPDATE `tabCost Center` SET {assignments} WHERE name = %(name)s", values)
+
+
+def post_shift(shift, rows=(), closing=False):
+	"""ترحيل صفوف معاملات جديدة للوردية و/أو إقفالها (الرصيد المعدود)"""
+	events = [get_shift_transaction_event(shift, row) for row in rows]
+	if closing:
+		events.append(get_shift_closing_event(shift))
+	post_events({shift.cost_center: events})
+
+
+def post_transfer(transfer):
+	"""ترحيل التحويل لطرفيه؛ كفاية الرصيد تُفحص بعد القفل فلا يمر تحويلان متزامنان بنفس الرصيد"""
+	states = lock_cost_centers([transfer.from_cost_center, transfer.to_cost_center])
+	# مرحّل مسبقاً (نفس الاسم الثابت): لا فحص رصيد ولا صفوف جديدة
+	if frappe.db.exists(LEDGER_DOCTYPE, get_entry_name("Cost Center Transfer", transfer.name, "out")):
+		return
+	balance = states.get(transfer.from_cost_center, {}).get("balance", 0.0)
+	if flt(balance) < flt(transfer.amount):
+		frappe.throw(_("رصيد الخزنة {0} غير كافٍ للتحويل").format(transfer.from_cost_center))
+	post_events(get_transfer_events(transfer))
+
+
+def get_balance(cost_center):
+	"""الرصيد الحالي وإجمالي الداخل والخارج (قراءة صف واحد)"""
+	balance = frappe.db.get_value(
+		"Cost Center", cost_center, ["current_balance", "total_in", "total_out"], as_dict=True
+	) or {}
+	return {
+		"current_balance": flt(balance.get("current_balance")),
+		"total_in": flt(balance.get("total_in")),
+		"total_out": flt(balance.get("total_out")),
+	}
+
+
+# ============ Consistency Check ============
+
+def get_history_events(cost_center):
+	"""كل أحداث الخزنة من المصادر الأصلية (الورديات، الإقفالات، التحويلات) بترتيب زمني"""
+	events = []
+	for row in frappe.db.sql("""
+		SELECT st.name, st.trx_type, st.amount, IFNULL(st.created_on, st.creation) AS created_on,
+			st.reference_doctype, st.reference_name, s.name AS shift
+		FROM `tabShift Transaction` st
+		INNER JOIN `tabShift` s ON s.name = st.parent
+		WHERE s.cost_center = %s AND st.parenttype = 'Shift'
+		ORDER BY created_on, st.idx
+	""", cost_center, as_dict=True):
+		events.append(get_shift_transaction_event(frappe._dict(name=row.shift), row))
+
+	for shift in frappe.db.sql("""
+		SELECT name, actual_closing_balance, closed_on
+		FROM `tabShift`
+		WHERE cost_center = %s AND status IN ('Closed', 'Handed Over') AND actual_closing_balance IS NOT NULL
+	""", cost_center, as_dict=True):
+		events.append(get_shift_closing_event(shift))
+
+	for transfer in frappe.db.sql("""
+		SELECT name, from_cost_center, to_cost_center, amount, transfer_date
+		FROM `tabCost Center Transfer`
+		WHERE status = 'Completed' AND (from_cost_center = %(cc)s OR to_cost_center = %(cc)s)
+	""", {"cc": cost_center}, as_dict=True):
+		events.extend(get_transfer_events(transfer).get(cost_center, []))
+
+	# ترتيب ثابت: الوقت ثم الإقفال بعد معاملات نفس اللحظة
+	events.sort(key=lambda event: (get_datetime(event.posting_datetime), event.entry_type == "Closing Adjustment"))
+	return events
+
+
+def check_cost_center_ledger(cost_center=None, repair=False):
+	"""
+	إعادة بناء الدفتر من المعاملات الأصلية ومقارنته بالدفتر المحفوظ وأرصدة Cost Center
+
+	Run:
+		bench --site <site> execute re_studio_booking.re_studio_booking.doctype.cost_center_ledger_entry.cost_center_ledger_entry.check_cost_center_ledger
+		bench --site <site> execute ...check_cost_center_ledger --kwargs "{'repair': True}"
+
+	Args:
+		cost_center: خزنة واحدة (افتراضياً الكل)
+		repair: استبدال الدفتر والأرصدة بالنسخة المعاد بناؤها عند وجود فرق
+
+	Returns:
+		list: [{cost_center, field, expected, actual}] الفروقات
+	"""
+	cost_centers = [cost_center] if cost_center else frappe.get_all("Cost Center", pluck="name")
+	differences = []
+	for name in cost_centers:
+		expected_state = {"sequence": 0, "balance": 0.0, "total_in": 0.0, "total_out": 0.0}
+		expected_rows = apply_events(expected_state, get_history_events(name))
+
+		stored = frappe.db.sql("""
+			SELECT COUNT(*) AS entries, SUM(amount) AS amount
+			FROM `tabCost Center Ledger Entry`
+			WHERE cost_center = %s
+		""", name, as_dict=True)[0]
+		current = get_balance(name)
+
+		checks = (
+			("entries", len(expected_rows), stored.entries or 0),
+			("ledger_balance", expected_state["balance"], flt(stored.amount)),
+			("current_balance", expected_state["balance"], current["current_balance"]),
+			("total_in", expected_state["total_in"], current["total_in"]),
+			("total_out", expected_state["total_out"], current["total_out"]),
+		)
+		cost_center_differences = [
+			{"cost_center": name, "field": field, "expected": expected, "actual": actual}
+			for field, expected, actual in checks
+			if abs(flt(expected) - flt(actual)) >= 0.005
+		]
+		differences.extend(cost_center_differences)
+
+		if repair and cost_center_differences:
+			rebuild_cost_center_ledger(name, expected_rows, expected_state)
+
+	return differences
+
+
+def rebuild_cost_center_ledger(cost_center, rows, state):
+	lock_cost_centers([cost_center])
+	frappe.db.sql("DELETE FROM `tabCost Center Ledger Entry` WHERE cost_center = %s", cost_center)
+	timestamp = now()
+	values = []
+	for row in rows:
+		row.update({
+			"creation": timestamp, "modified": timestamp, "owner": "Administrator", "modified_by": "Administrator",
+			"cost_center": cost_center,
+		})
+		values.append(tuple(row.get(field) for field in LEDGER_FIELDS))
+	if values:
+		frappe.db.bulk_insert(LEDGER_DOCTYPE, LEDGER_FIELDS, values)
+	update_cost_center(cost_center, state)
+
+
+@frappe.whitelist()
+def check_ledger(cost_center=None, repair=False):
+	"""فحص (وإصلاح) دفاتر الخزن لمدير النظام"""
+	frappe.only_for("System Manager")
+	return check_cost_center_ledger(cost_center, repair=frappe.parse_json(repair) if isinstance(repair, str) else repair)
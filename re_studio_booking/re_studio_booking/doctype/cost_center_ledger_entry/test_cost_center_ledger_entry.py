@@ -0,0 +1,128 @@
+# Copyright (c) 2025, Re Studio and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import now_datetime
+
+from re_studio_booking.re_studio_booking.doctype.cost_center_ledger_entry.cost_center_ledger_entry import (
+	LEDGER_DOCTYPE,
+	apply_events,
+	get_balance,
+	get_entry_name,
+	post_events
+)
+
+
+def event(entry_type, amount):
+	return frappe._dict(entry_type=entry_type, amount=amount)
+
+
+class TestCostCenterLedgerEntry(FrappeTestCase):
+	def test_running_balance_and_totals(self):
+		state = {"sequence": 4, "balance": 100.0, "total_in": 100.0, "total_out": 0.0}
+		rows = apply_events(state, [
+			event("Payment", 50),
+			event("Expense", 30),
+			event("Transfer In", 20),
+			event("Refund", 10),
+		])
+
+		self.assertEqual([row.sequence for row in rows], [5, 6, 7, 8])
+		self.assertEqual([row.amount for row in rows], [50, -30, 20, -10])
+		self.assertEqual([row.balance for row in rows], [150, 120, 140, 130])
+		self.assertEqual(rows[-1].total_in, 170)
+		self.assertEqual(rows[-1].total_out, 40)
+		self.assertEqual(state, {"sequence": 8, "balance": 130, "total_in": 170, "total_out": 40})
+
+	def test_set_balance_events_post_the_difference(self):
+		state = {"sequence": 0, "balance": 200.0, "total_in": 200.0, "total_out": 0.0}
+		rows = apply_events(state, [
+			event("Opening Balance", 250),
+			event("Payment", 100),
+			event("Closing Adjustment", 340),
+		])
+
+		self.assertEqual([row.amount for row in rows], [50, 100, -10])
+		self.assertEqual(state["balance"], 340)
+		# adjustments move the balance but not the in/out totals
+		self.assertEqual(state["total_in"], 300)
+		self.assertEqual(state["total_out"], 0)
+
+	def test_unknown_entry_type_is_rejected(self):
+		with self.assertRaises(frappe.ValidationError):
+			apply_events({"sequence": 0, "balance": 0.0, "total_in": 0.0, "total_out": 0.0}, [event("Bonus", 1)])
+
+	def test_entry_names_are_stable(self):
+		self.assertEqual(get_entry_name("Shift", "SH-1", "closing"), get_entry_name("Shift", "SH-1", "closing"))
+		self.assertNotEqual(
+			get_entry_name("Cost Center Transfer", "T-1", "in"),
+			get_entry_name("Cost Center Transfer", "T-1", "out")
+		)
+
+
+class TestCostCenterTransferPosting(FrappeTestCase):
+	"""Completing a Cost Center Transfer moves the balance through the ledger"""
+
+	def setUp(self):
+		if not frappe.db.exists("Currency", "SAR"):
+			frappe.get_doc({"doctype": "Currency", "currency_name": "SAR", "enabled": 1}).insert(ignore_permissions=True)
+		suffix = frappe.generate_hash(length=6)
+		self.source, self.target = (
+			frappe.get_doc({
+				"doctype": "Cost Center",
+				"cost_center_name": f"_Test Transfer {label} {suffix}",
+				"cost_center_type": "Cash",
+				"currency": "SAR"
+			}).insert(ignore_permissions=True).name
+			for label in ("From", "To")
+		)
+		post_events({self.source: [frappe._dict(
+			name=get_entry_name("Cost Center", self.source, "deposit"),
+			entry_type="Deposit",
+			amount=500,
+			posting_datetime=now_datetime(),
+			reference_doctype="Cost Center",
+			reference_name=self.source,
+			shift=None
+		)]})
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def make_transfer(self, amount):
+		return frappe.get_doc({
+			"doctype": "Cost Center Transfer",
+			"from_cost_center": self.source,
+			"to_cost_center": self.target,
+			"amount": amount,
+			"transfer_date": now_datetime(),
+			"status": "Draft"
+		}).insert(ignore_permissions=True)
+
+	def test_completed_transfer_moves_the_balance_once(self):
+		transfer = self.make_transfer(200)
+		# a draft is not posted
+		self.assertEqual(get_balance(self.target)["current_balance"], 0)
+
+		transfer.status = "Completed"
+		transfer.save(ignore_permissions=True)
+		self.assertEqual(get_balance(self.source), {"current_balance": 300, "total_in": 500, "total_out": 200})
+		self.assertEqual(get_balance(self.target), {"current_balance": 200, "total_in": 200, "total_out": 0})
+
+		# saving the completed transfer again does not post it twice
+		transfer.reload()
+		transfer.description = "Edited"
+		transfer.save(ignore_permissions=True)
+		self.assertEqual(frappe.db.count(LEDGER_DOCTYPE, {"reference_name": transfer.name}), 2)
+		self.assertEqual(get_balance(self.source)["current_balance"], 300)
+
+		transfer.amount = 100
+		with self.assertRaises(frappe.ValidationError):
+			transfer.save(ignore_permissions=True)
+
+	def test_transfer_above_the_balance_is_rejected(self):
+		transfer = self.make_transfer(600)
+		transfer.status = "Completed"
+		with self.assertRaises(frappe.ValidationError):
+			transfer.save(ignore_permissions=True)
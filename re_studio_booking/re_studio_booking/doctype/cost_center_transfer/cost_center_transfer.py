@@ -6,10 +6,13 @@ import frappe
 from frappe.model.document import Document
 from frappe.utils import flt, now_datetime
 
+from re_studio_booking.re_studio_booking.doctype.cost_center_ledger_entry.cost_center_ledger_entry import post_transfer
+
 class CostCenterTransfer(Document):
 	def validate(self):
 		"""Validate transfer before saving"""
 		self.validate_different_cost_centers()
+		self.validate_completed_transfer()
 		self.validate_sufficient_balance()
 		
 		if not self.transfer_date:
@@ -20,17 +23,31 @@ class CostCenterTransfer(Document):
 		if self.from_cost_center == self.to_cost_center:
 			frappe.throw("لا يمكن التحويل من وإلى نفس الخزنة")
 	
+	def validate_completed_transfer(self):
+		"""A completed transfer is already in both ledgers and cannot be changed"""
+		previous = self.get_doc_before_save()
+		if not previous or previous.status != "Completed":
+			return
+		for field in ("status", "from_cost_center", "to_cost_center", "amount"):
+			if self.has_value_changed(field):
+				frappe.throw("لا يمكن تعديل تحويل مكتمل")
+	
+	def is_completing(self):
+		"""True on the save that moves the transfer to Completed"""
+		return self.status == "Completed" and self.has_value_changed("status")
+	
 	def validate_sufficient_balance(self):
 		"""Check if from_cost_center has sufficient balance"""
-		if self.status == "Completed":
+		if self.is_completing():
 			from_cc = frappe.get_doc("Cost Center", self.from_cost_center)
 			if flt(from_cc.current_balance) < flt(self.amount):
 				frappe.throw(f"رصيد الخزنة {self.from_cost_center} غير كافٍ للتحويل")
 	
-	def on_submit(self):
-		"""Mark as completed and create journal entry"""
-		self.status = "Completed"
-		self.create_journal_entry()
+	def on_update(self):
+		"""Move the balance between the cost centers and create journal entry when the transfer is completed"""
+		if self.is_completing():
+			post_transfer(self)
+			self.create_journal_entry()
 	
 	def create_journal_entry(self):
 		"""Create journal entry for the transfer"""
@@ -45,20 +62,27 @@ class CostCenterTransfer(Document):
 			"doctype": "Journal Entry",
 			"voucher_type": "Journal Entry",
 			"posting_date": self.transfer_date,
-			"company": from_cc.company,
-			"user_remark": f"تحويل من {self.from_cost_center} إلى {self.to_cost_center} - {self.name}",
-			"accounts": [
+			"remarks": f"تحويل من {self.from_cost_center} إلى {self.to_cost_center} - {self.name}",
+			"entries": [
 				{
 					"account": from_cc.default_account,
-					"credit_in_account_currency": flt(self.amount)
+					"cost_center": self.from_cost_center,
+					"credit": flt(self.amount),
+					"against": to_cc.default_account,
+					"reference_doctype": "Cost Center Transfer",
+					"reference_name": self.name
 				},
 				{
 					"account": to_cc.default_account,
-					"debit_in_account_currency": flt(self.amount)
+					"cost_center": self.to_cost_center,
+					"debit": flt(self.amount),
+					"against": from_cc.default_account,
+					"reference_doctype": "Cost Center Transfer",
+					"reference_name": self.name
 				}
 			]
 		})
 		
 		je.insert()
-		self.journal_entry = je.name
-		self.save()
+		je.submit()
+		self.db_set("journal_entry", je.name)
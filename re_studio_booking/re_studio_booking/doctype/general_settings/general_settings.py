@@ -5,6 +5,8 @@ import frappe
 from frappe.model.document import Document
 from frappe import _
 
+from .general_settings_cache import clear_studio_settings_cache
+
 class GeneralSettings(Document):
 	"""General Settings DocType for Re Studio Booking"""
 	
@@ -14,6 +16,13 @@ class GeneralSettings(Document):
 		self.validate_currency_settings()
 		self.validate_booking_settings()
 	
+	def on_update(self):
+		"""Invalidate the cached settings snapshot and calendar capacity used by booking helpers"""
+		from re_studio_booking.re_studio_booking.doctype.booking.booking_availability import clear_calendar_capacity_cache
+
+		clear_studio_settings_cache()
+		clear_calendar_capacity_cache()
+	
 	def validate_business_hours(self):
 		"""Validate business hours"""
 		if self.business_start_time and self.business_end_time:
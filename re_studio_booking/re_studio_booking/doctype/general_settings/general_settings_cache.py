@@ -0,0 +1,157 @@
+# Copyright (c) 2025, Masar Digital Group and contributors
+# For license information, please see license.txt
+
+"""
+General Settings Snapshot
+نسخة مقروءة من General Settings مخزنة لكل طلب (frappe.local) وفي Redis
+حتى لا تتكرر قراءة الإعدادات عدة مرات أثناء حفظ الحجز الواحد
+"""
+
+import frappe
+from frappe.utils import cint, flt
+
+CACHE_KEY = "re_studio_booking:general_settings_snapshot"
+
+DEFAULT_DEPOSIT_PERCENTAGE = 30
+DEFAULT_WORKING_DAYS = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Saturday']
+DEFAULT_OPENING_TIME = '09:00:00'
+DEFAULT_CLOSING_TIME = '17:00:00'
+
+# أسماء الحقول البديلة (عربي / إنجليزي) كما تستخدمها دوال الحجز
+DEPOSIT_PERCENTAGE_KEYS = ('نسبة العربون (%)', 'deposit_percentage', 'نسبة_العربون_%')
+MINIMUM_BOOKING_AMOUNT_KEYS = ('الحد الأدنى لمبلغ الحجز', 'minimum_booking_amount', 'min_booking_amount')
+WORKING_DAY_FIELDS = (
+	('sunday_working', 'Sunday'),
+	('monday_working', 'Monday'),
+	('tuesday_working', 'Tuesday'),
+	('wednesday_working', 'Wednesday'),
+	('thursday_working', 'Thursday'),
+	('friday_working', 'Friday'),
+	('saturday_working', 'Saturday')
+)
+
+
+class StudioSettings:
+	"""
+	قيم General Settings التي يحتاجها مسار حفظ الحجز بعد التحويل لأنواعها
+
+	Attributes:
+		deposit_percentage: نسبة العربون من الإعدادات (None إذا لم تُحدد)
+		default_deposit_percentage: نسبة العربون الاحتياطية (None إذا لم تُحدد)
+		minimum_booking_amount: الحد الأدنى لمبلغ العربون (0 إذا لم يُحدد)
+		working_days: أسماء أيام العمل (Sunday, Monday, ...)
+		opening_time / closing_time: ساعات عمل الاستديو
+		business_start_time / business_end_time: حقول ساعات العمل في الإعدادات
+		time_slot_duration: مدة الفترة الزمنية بالدقائق
+		booking_buffer_time: وقت الفاصل بين الحجوزات بالدقائق
+	"""
+
+	__slots__ = (
+		'deposit_percentage', 'default_deposit_percentage', 'minimum_booking_amount',
+		'working_days', 'opening_time', 'closing_time',
+		'business_start_time', 'business_end_time',
+		'time_slot_duration', 'booking_buffer_time'
+	)
+
+	def __init__(self, **values):
+		self.deposit_percentage = values.get('deposit_percentage')
+		self.default_deposit_percentage = values.get('default_deposit_percentage')
+		self.minimum_booking_amount = flt(values.get('minimum_booking_amount') or 0)
+		self.working_days = list(values.get('working_days') or DEFAULT_WORKING_DAYS)
+		self.opening_time = values.get('opening_time') or DEFAULT_OPENING_TIME
+		self.closing_time = values.get('closing_time') or DEFAULT_CLOSING_TIME
+		self.business_start_time = values.get('business_start_time')
+		self.business_end_time = values.get('business_end_time')
+		self.time_slot_duration = cint(values.get('time_slot_duration') or 0)
+		self.booking_buffer_time = cint(values.get('booking_buffer_time') or 0)
+
+	@classmethod
+	def from_singles(cls, settings):
+		"""
+		بناء النسخة من ناتج frappe.db.get_singles_dict
+
+		Args:
+			settings: dict قيم General Settings (قد يكون فارغاً)
+		"""
+		settings = settings or {}
+
+		deposit_percentage = None
+		for key in DEPOSIT_PERCENTAGE_KEYS:
+			if settings.get(key) is not None:
+				deposit_percentage = flt(settings.get(key))
+				break
+
+		minimum_booking_amount = 0.0
+		for key in MINIMUM_BOOKING_AMOUNT_KEYS:
+			if settings.get(key) not in (None, ""):
+				minimum_booking_amount = flt(settings.get(key))
+				break
+
+		default_deposit_percentage = flt(settings.get('default_deposit_percentage')) or None
+
+		return cls(
+			deposit_percentage=deposit_percentage,
+			default_deposit_percentage=default_deposit_percentage,
+			minimum_booking_amount=minimum_booking_amount,
+			working_days=[day for field, day in WORKING_DAY_FIELDS if cint(settings.get(field))],
+			# opening_time / closing_time أسماء قديمة، وحقول النموذج الحالية business_start_time / business_end_time
+			opening_time=_time_str(settings.get('opening_time') or settings.get('business_start_time')),
+			closing_time=_time_str(settings.get('closing_time') or settings.get('business_end_time')),
+			business_start_time=_time_str(settings.get('business_start_time')),
+			business_end_time=_time_str(settings.get('business_end_time')),
+			time_slot_duration=settings.get('time_slot_duration'),
+			booking_buffer_time=settings.get('booking_buffer_time')
+		)
+
+	def as_dict(self):
+		return {field: getattr(self, field) for field in self.__slots__}
+
+	def get_business_hours(self):
+		"""ساعات العمل بنفس شكل get_studio_business_hours"""
+		return {
+			'opening_time': self.opening_time,
+			'closing_time': self.closing_time
+		}
+
+
+def _time_str(value):
+	return str(value) if value not in (None, "") else None
+
+
+def get_studio_settings_snapshot():
+	"""
+	نسخة الإعدادات الحالية: من frappe.local أولاً ثم Redis ثم قاعدة البيانات
+
+	Returns:
+		StudioSettings
+	"""
+	snapshot = getattr(frappe.local, 'studio_settings_snapshot', None)
+	if snapshot is not None:
+		return snapshot
+
+	cached = frappe.cache().get_value(CACHE_KEY)
+	if cached:
+		snapshot = StudioSettings(**cached)
+	else:
+		try:
+			snapshot = _load_snapshot()
+			frappe.cache().set_value(CACHE_KEY, snapshot.as_dict())
+		except Exception as e:
+			# لا نخزن القيم الافتراضية في Redis عند فشل القراءة
+			frappe.logger().error(f"Error loading General Settings snapshot: {str(e)}")
+			snapshot = StudioSettings()
+
+	frappe.local.studio_settings_snapshot = snapshot
+	return snapshot
+
+
+def _load_snapshot():
+	if not frappe.db.exists('DocType', 'General Settings'):
+		return StudioSettings()
+	return StudioSettings.from_singles(frappe.db.get_singles_dict('General Settings'))
+
+
+def clear_studio_settings_cache():
+	"""حذف النسخة المخزنة (Redis + الطلب الحالي) بعد تعديل General Settings"""
+	frappe.cache().delete_value(CACHE_KEY)
+	frappe.local.studio_settings_snapshot = None
@@ -4,6 +4,40 @@
 # import frappe
 from frappe.tests.utils import FrappeTestCase
 
+from re_studio_booking.re_studio_booking.doctype.general_settings.general_settings_cache import (
+	DEFAULT_WORKING_DAYS,
+	StudioSettings
+)
+
 
 class TestGeneralSettings(FrappeTestCase):
 	pass
+
+
+class TestStudioSettingsSnapshot(FrappeTestCase):
+	def test_defaults_when_settings_empty(self):
+		settings = StudioSettings.from_singles({})
+		self.assertIsNone(settings.deposit_percentage)
+		self.assertEqual(settings.minimum_booking_amount, 0)
+		self.assertEqual(settings.working_days, DEFAULT_WORKING_DAYS)
+		self.assertEqual(settings.get_business_hours(), {"opening_time": "09:00:00", "closing_time": "17:00:00"})
+
+	def test_key_fallbacks_and_string_values(self):
+		settings = StudioSettings.from_singles({
+			"deposit_percentage": "25",
+			"min_booking_amount": "150",
+			"friday_working": "1",
+			"sunday_working": "0",
+			"opening_time": "10:00:00"
+		})
+		self.assertEqual(settings.deposit_percentage, 25)
+		self.assertEqual(settings.minimum_booking_amount, 150)
+		self.assertEqual(settings.working_days, ["Friday"])
+		self.assertEqual(settings.opening_time, "10:00:00")
+
+	def test_round_trip_through_cache_dict(self):
+		settings = StudioSettings.from_singles({"نسبة العربون (%)": 40, "time_slot_duration": "30"})
+		restored = StudioSettings(**settings.as_dict())
+		self.assertEqual(restored.as_dict(), settings.as_dict())
+		self.assertEqual(restored.deposit_percentage, 40)
+		self.assertEqual(restored.time_slot_duration, 30)
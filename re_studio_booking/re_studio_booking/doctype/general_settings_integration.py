@@ -4,40 +4,12 @@
 import frappe
 from frappe import _
 
+from re_studio_booking.re_studio_booking.doctype.general_settings.general_settings_cache import get_studio_settings_snapshot
+
 @frappe.whitelist()
 def get_working_days_from_general_settings():
     """جلب أيام العمل من General Settings"""
-    try:
-        if not frappe.db.exists('DocType', 'General Settings'):
-            return get_default_working_days()
-        
-        settings = frappe.get_single('General Settings')
-        working_days = []
-        
-        # قراءة إعدادات أيام العمل من General Settings
-        days_mapping = {
-            'sunday_working': 'Sunday',
-            'monday_working': 'Monday', 
-            'tuesday_working': 'Tuesday',
-            'wednesday_working': 'Wednesday',
-            'thursday_working': 'Thursday',
-            'friday_working': 'Friday',
-            'saturday_working': 'Saturday'
-        }
-        
-        for field_name, day_name in days_mapping.items():
-            if hasattr(settings, field_name) and getattr(settings, field_name):
-                working_days.append(day_name)
-        
-        # إذا لم توجد إعدادات، استخدم الافتراضي
-        if not working_days:
-            working_days = get_default_working_days()
-        
-        return working_days
-        
-    except Exception as e:
-        frappe.logger().error(f"Error getting working days from General Settings: {str(e)}")
-        return get_default_working_days()
+    return list(get_studio_settings_snapshot().working_days)
 
 def get_default_working_days():
     """أيام العمل الافتراضية (بدون الجمعة إذا كان عطلة في General Settings)"""
@@ -46,22 +18,7 @@ def get_default_working_days():
 @frappe.whitelist()
 def get_business_hours_from_general_settings():
     """جلب ساعات العمل من General Settings"""
-    try:
-        if not frappe.db.exists('DocType', 'General Settings'):
-            return get_default_business_hours()
-        
-        settings = frappe.get_single('General Settings')
-        
-        business_hours = {
-            'opening_time': getattr(settings, 'opening_time', None) or '09:00:00',
-            'closing_time': getattr(settings, 'closing_time', None) or '17:00:00'
-        }
-        
-        return business_hours
-        
-    except Exception as e:
-        frappe.logger().error(f"Error getting business hours from General Settings: {str(e)}")
-        return get_default_business_hours()
+    return get_studio_settings_snapshot().get_business_hours()
 
 def get_default_business_hours():
     """ساعات العمل الافتراضية"""
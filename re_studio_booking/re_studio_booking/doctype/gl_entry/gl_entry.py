@@ -1,5 +1,20 @@
 import frappe
 from frappe.model.document import Document
 
+from re_studio_booking.re_studio_booking.doctype.account_balance_snapshot.account_balance_snapshot import apply_gl_entries
+from re_studio_booking.re_studio_booking.utils.bank_reconciliation import unmatch_gl_entries
+
 class GLEntry(Document):
-    pass
\ No newline at end of file
+    def on_update(self):
+        """Keep the monthly balance snapshots in step (replaces the previous values on edit)"""
+        before = self.get_doc_before_save()
+        if before:
+            apply_gl_entries([before], sign=-1)
+            if any(before.get(field) != self.get(field) for field in ("bank_account", "posting_date", "debit", "credit")):
+                # the bank statement match no longer holds
+                unmatch_gl_entries([self.name])
+        apply_gl_entries([self])
+
+    def on_trash(self):
+        apply_gl_entries([self], sign=-1)
+        unmatch_gl_entries([self.name])
\ No newline at end of file
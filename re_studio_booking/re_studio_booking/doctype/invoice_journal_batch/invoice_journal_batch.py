@@ -0,0 +1,330 @@
+# Copyright (c) 2025, Masar Digital Group and contributors
+# For license information, please see license.txt
+
+"""
+Invoice Journal Batch
+الترحيل المجمّع لمدفوعات الفواتير في نهاية اليوم (اختياري من General Settings):
+- الفواتير غير قابلة للاعتماد (docstatus يبقى 0)، فالفاتورة تُرحّل حين تخرج من Draft ولها مدفوعات
+- بدلاً من قيد يومية لكل فاتورة، قيد واحد لكل (تاريخ الترحيل، الشركة، مركز التكلفة، حساب المدين، حساب الإيرادات)
+- الفواتير المرحّلة تُسجل في جدول الدفعة بالمبلغ المرحّل، ويُحفظ في الفاتورة posted_amount
+  (مجموع ما رُحّل منها) ورقم آخر قيد في journal_entry
+- الدفعات اللاحقة على نفس الفاتورة تُرحّل بالفرق (paid_amount - posted_amount) في دفعة جديدة
+- إعادة التشغيل آمنة: الفواتير المرحّلة بالكامل لا تُختار مرة أخرى، واسم الدفعة ثابت لنفس المجموعة والمبالغ
+- العكس يلغي قيد الدفعة (قيود عكسية في GL) ويطرح مبالغها من posted_amount فتعود للترحيل
+"""
+
+import hashlib
+from collections import defaultdict
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import cint, flt, getdate, today
+
+BATCH_DOCTYPE = "Invoice Journal Batch"
+ITEM_DOCTYPE = "Invoice Journal Batch Item"
+GROUP_FIELDS = ("posting_date", "company", "cost_center", "debit_to", "income_account")
+
+
+class InvoiceJournalBatch(Document):
+	pass
+
+
+def is_consolidation_enabled():
+	return cint(frappe.db.get_single_value("General Settings", "consolidate_invoice_journals"))
+
+
+# ============ Posting ============
+
+def get_pending_invoices(posting_date=None, before=None):
+	"""
+	الفواتير المدفوعة (غير Draft وغير ملغاة) التي لم يُرحّل كامل مدفوعاتها؛ amount هو الفرق
+
+	Args:
+		posting_date: تاريخ فاتورة محدد
+		before: كل التواريخ قبل هذا التاريخ (للمهمة المجدولة)
+	"""
+	conditions = []
+	values = {}
+	if posting_date:
+		conditions.append("invoice_date = %(posting_date)s")
+		values["posting_date"] = getdate(posting_date)
+	if before:
+		conditions.append("invoice_date < %(before)s")
+		values["before"] = getdate(before)
+
+	return frappe.db.sql(f"""
+		SELECT name, invoice_date AS posting_date, company, cost_center, debit_to, income_account,
+			client_name, paid_amount - IFNULL(posted_amount, 0) AS amount
+		FROM `tabBooking Invoice`
+		WHERE docstatus < 2
+			AND status NOT IN ('Draft', 'Cancelled')
+			AND paid_amount - IFNULL(posted_amount, 0) >= 0.005
+			AND IFNULL(cost_center, '') != ''
+			AND IFNULL(debit_to, '') != ''
+			AND IFNULL(income_account, '') != ''
+			{"AND " + " AND ".join(conditions) if conditions else ""}
+		ORDER BY invoice_date, name
+	""", values, as_dict=True)
+
+
+def group_invoices(invoices):
+	"""{(posting_date, company, cost_center, debit_to, income_account): [invoices]}"""
+	groups = defaultdict(list)
+	for invoice in invoices:
+		groups[tuple(invoice.get(field) or "" for field in GROUP_FIELDS)].append(invoice)
+	return groups
+
+
+def get_batch_name(key, invoice_amounts):
+	"""اسم ثابت للدفعة: نفس المجموعة بنفس الفواتير والمبالغ تعطي نفس الاسم عند إعادة التشغيل"""
+	parts = [str(part) for part in key] + sorted(invoice_amounts)
+	return hashlib.md5("\x1f".join(parts).encode()).hexdigest()
+
+
+def post_invoice_journals(posting_date=None, before=None, commit=True):
+	"""
+	ترحيل الفواتير غير المرحّلة: قيد يومية واحد لكل مجموعة، وكل مجموعة في معاملة مستقلة
+
+	Returns:
+		dict: {"batches", "invoices"}
+	"""
+	result = {"batches": 0, "invoices": 0}
+	for key, invoices in group_invoices(get_pending_invoices(posting_date, before)).items():
+		try:
+			posted = post_batch(key, invoices)
+			if commit:
+				frappe.db.commit()
+		except Exception:
+			if not commit:
+				raise
+			frappe.db.rollback()
+			frappe.log_error(title=_("فشل ترحيل دفعة قيود الفواتير"), message=frappe.get_traceback())
+			continue
+		if posted:
+			result["batches"] += 1
+			result["invoices"] += posted
+	return result
+
+
+def post_batch(key, invoices):
+	"""
+	قيد واحد بسطرين (مدين: حساب المدين، دائن: الإيرادات) لمجموع المبالغ غير المرحّلة في المجموعة
+
+	Returns:
+		int: عدد الفواتير المرحّلة
+	"""
+	# قفل الفواتير وإعادة حساب الفرق: تشغيل آخر متزامن ينتظر ثم يجد الفرق صفراً
+	amounts = {
+		row.name: flt(row.amount, 2)
+		for row in frappe.db.sql("""
+			SELECT name, paid_amount - IFNULL(posted_amount, 0) AS amount
+			FROM `tabBooking Invoice`
+			WHERE name IN %(names)s
+			FOR UPDATE
+		""", {"names": [invoice.name for invoice in invoices]}, as_dict=True)
+	}
+	invoices = [invoice for invoice in invoices if amounts.get(invoice.name, 0) >= 0.005]
+	if not invoices:
+		return 0
+	for invoice in invoices:
+		invoice.amount = amounts[invoice.name]
+
+	group = frappe._dict(zip(GROUP_FIELDS, key))
+	total = flt(sum(invoice.amount for invoice in invoices), 2)
+	name = get_batch_name(key, [f"{invoice.name}:{invoice.amount}" for invoice in invoices])
+	remarks = _("مدفوعات {0} فاتورة بتاريخ {1} - {2}").format(len(invoices), group.posting_date, group.cost_center)
+
+	# الدفعة تُنشأ قبل القيد: سطور القيد تشير إليها (reference_name)
+	if frappe.db.exists(BATCH_DOCTYPE, name):
+		# دفعة معكوسة سابقاً لنفس الفواتير: تُعاد للترحيل بالقيد الجديد
+		frappe.db.set_value(BATCH_DOCTYPE, name, "status", "Posted")
+	else:
+		batch = frappe.get_doc({
+			"doctype": BATCH_DOCTYPE,
+			**group,
+			"status": "Posted",
+			"invoice_count": len(invoices),
+			"total_amount": total,
+			"invoices": [
+				{"invoice": invoice.name, "client_name": invoice.client_name, "amount": invoice.amount}
+				for invoice in invoices
+			]
+		})
+		batch.insert(ignore_permissions=True, set_name=name)
+
+	je = frappe.get_doc({
+		"doctype": "Journal Entry",
+		"voucher_type": "Journal Entry",
+		"posting_date": group.posting_date,
+		"remarks": remarks,
+		"entries": [
+			{
+				"account": group.debit_to,
+				"debit": total,
+				"against": group.income_account,
+				"cost_center": group.cost_center,
+				"reference_doctype": BATCH_DOCTYPE,
+				"reference_name": name
+			},
+			{
+				"account": group.income_account,
+				"credit": total,
+				"against": group.debit_to,
+				"cost_center": group.cost_center,
+				"reference_doctype": BATCH_DOCTYPE,
+				"reference_name": name
+			}
+		]
+	})
+	je.insert(ignore_permissions=True)
+	je.submit()
+	frappe.db.set_value(BATCH_DOCTYPE, name, "journal_entry", je.name)
+
+	# الصفوف مقفلة منذ حساب الفرق، فـ paid_amount هو نفسه المرحّل الآن
+	frappe.db.sql("""
+		UPDATE `tabBooking Invoice` SET journal_entry = %(journal_entry)s, posted_amount = paid_amount
+		WHERE name IN %(names)s
+	""", {"journal_entry": je.name, "names": [invoice.name for invoice in invoices]})
+	return len(invoices)
+
+
+# ============ Reversal ============
+
+def reverse_invoice_journals(posting_date, cost_center=None, commit=True):
+	"""
+	عكس دفعات تاريخ معين: إلغاء قيد كل دفعة وطرح مبالغها من الفواتير لتعود للترحيل
+
+	Returns:
+		dict: {"batches", "invoices"}
+	"""
+	filters = {"posting_date": getdate(posting_date), "status": "Posted"}
+	if cost_center:
+		filters["cost_center"] = cost_center
+
+	result = {"batches": 0, "invoices": 0}
+	for batch in frappe.get_all(BATCH_DOCTYPE, filters=filters, fields=["name", "journal_entry", "invoice_count"]):
+		reverse_batch(batch)
+		if commit:
+			frappe.db.commit()
+		result["batches"] += 1
+		result["invoices"] += cint(batch.invoice_count)
+	return result
+
+
+def reverse_batch(batch):
+	# الفواتير القائمة يُطرح منها مبلغ الدفعة لتعود للترحيل (الملغاة عُكست بقيد خاص بها)
+	frappe.db.sql(f"""
+		UPDATE `tabBooking Invoice` bi
+		INNER JOIN `tab{ITEM_DOCTYPE}` item ON item.invoice = bi.name AND item.parent = %(batch)s
+		SET bi.posted_amount = IFNULL(bi.posted_amount, 0) - item.amount,
+			bi.journal_entry = IF(bi.journal_entry = %(journal_entry)s, NULL, bi.journal_entry)
+		WHERE bi.docstatus < 2 AND bi.status != 'Cancelled'
+	""", {"batch": batch.name, "journal_entry": batch.journal_entry})
+
+	# قيود عكس الفواتير الملغاة تُلغى أيضاً، وإلا عُكست مبالغها مرتين
+	reversal_entries = frappe.get_all(
+		ITEM_DOCTYPE,
+		filters={"parent": batch.name, "reversal_entry": ["is", "set"]},
+		pluck="reversal_entry"
+	)
+	for journal_entry in [batch.journal_entry] + reversal_entries:
+		je = frappe.get_doc("Journal Entry", journal_entry)
+		if je.docstatus == 1:
+			je.cancel()
+	if reversal_entries:
+		frappe.db.sql(f"UPDATE `tab{ITEM_DOCTYPE}` SET reversal_entry = NULL WHERE parent = %s", batch.name)
+
+	frappe.db.set_value(BATCH_DOCTYPE, batch.name, "status", "Reversed")
+
+
+def is_batch_entry(journal_entry):
+	"""هل القيد قيد دفعة مجمّعة (وليس قيد فاتورة منفرد)"""
+	return bool(journal_entry) and bool(frappe.db.exists(BATCH_DOCTYPE, {"journal_entry": journal_entry}))
+
+
+def reverse_invoice_in_batches(invoice):
+	"""
+	إلغاء فاتورة رُحّلت ضمن دفعات: قيد عكسي لمبلغها في كل دفعة مرحّلة، فقيود الدفعات
+	تبقى صحيحة لباقي الفواتير. القيد يُحفظ في صف الفاتورة ليُلغى إذا عُكست الدفعة كاملة.
+
+	Returns:
+		list: قيود العكس المنشأة
+	"""
+	items = frappe.db.sql(f"""
+		SELECT item.name, item.parent, item.amount
+		FROM `tab{ITEM_DOCTYPE}` item
+		INNER JOIN `tab{BATCH_DOCTYPE}` batch ON batch.name = item.parent
+		WHERE item.invoice = %s AND batch.status = 'Posted'
+			AND IFNULL(item.reversal_entry, '') = '' AND item.amount > 0
+		FOR UPDATE
+	""", invoice.name, as_dict=True)
+	return [reverse_batch_item(invoice, item) for item in items]
+
+
+def reverse_batch_item(invoice, item):
+	je = frappe.get_doc({
+		"doctype": "Journal Entry",
+		"voucher_type": "Journal Entry",
+		"posting_date": today(),
+		"remarks": _("عكس مدفوعات الفاتورة الملغاة {0} من الدفعة {1}").format(invoice.name, item.parent),
+		"entries": [
+			{
+				"account": invoice.income_account,
+				"debit": flt(item.amount),
+				"against": invoice.debit_to,
+				"cost_center": invoice.cost_center,
+				"reference_doctype": "Booking Invoice",
+				"reference_name": invoice.name
+			},
+			{
+				"account": invoice.debit_to,
+				"credit": flt(item.amount),
+				"against": invoice.income_account,
+				"cost_center": invoice.cost_center,
+				"reference_doctype": "Booking Invoice",
+				"reference_name": invoice.name
+			}
+		]
+	})
+	je.insert(ignore_permissions=True)
+	je.submit()
+	frappe.db.set_value(ITEM_DOCTYPE, item.name, "reversal_entry", je.name, update_modified=False)
+	return je.name
+
+
+# ============ Scheduler / API ============
+
+def post_pending_invoice_journals():
+	"""المهمة اليومية: ترحيل كل الفواتير غير المرحّلة حتى أمس (عند تفعيل الترحيل المجمّع)"""
+	if is_consolidation_enabled():
+		post_invoice_journals(before=today())
+
+
+@frappe.whitelist()
+def enqueue_posting(posting_date):
+	"""ترحيل تاريخ معين كمهمة خلفية"""
+	frappe.only_for("System Manager")
+	frappe.enqueue(
+		"re_studio_booking.re_studio_booking.doctype.invoice_journal_batch.invoice_journal_batch.post_invoice_journals",
+		queue="long",
+		job_id=f"invoice_journal_batch::post::{posting_date}",
+		deduplicate=True,
+		posting_date=posting_date
+	)
+	return _("تمت جدولة ترحيل قيود {0}").format(posting_date)
+
+
+@frappe.whitelist()
+def enqueue_reversal(posting_date, cost_center=None):
+	"""عكس دفعات تاريخ معين كمهمة خلفية"""
+	frappe.only_for("System Manager")
+	frappe.enqueue(
+		"re_studio_booking.re_studio_booking.doctype.invoice_journal_batch.invoice_journal_batch.reverse_invoice_journals",
+		queue="long",
+		job_id=f"invoice_journal_batch::reverse::{posting_date}::{cost_center or ''}",
+		deduplicate=True,
+		posting_date=posting_date,
+		cost_center=cost_center
+	)
+	return _("تمت جدولة عكس قيود {0}").format(posting_date)
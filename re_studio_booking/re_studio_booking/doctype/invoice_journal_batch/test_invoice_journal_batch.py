@@ -0,0 +1,168 @@
+# Copyright (c) 2025, Re Studio and Contributors
+# See license.txt
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from re_studio_booking.re_studio_booking.doctype.invoice_journal_batch.invoice_journal_batch import (
+	get_batch_name,
+	group_invoices,
+	post_invoice_journals,
+	reverse_batch,
+	reverse_invoice_journals
+)
+
+POSTING_DATE = "2031-03-15"
+
+
+def invoice(name, cost_center="Main Desk", amount=100):
+	return frappe._dict(
+		name=name, posting_date="2030-01-31", company="Re Studio", cost_center=cost_center,
+		debit_to="Cash", income_account="Sales", client_name=None, paid_amount=amount
+	)
+
+
+class TestInvoiceJournalBatch(FrappeTestCase):
+	def test_invoices_grouped_per_desk_and_accounts(self):
+		groups = group_invoices([invoice("INV-1"), invoice("INV-2", "Branch Desk"), invoice("INV-3")])
+		self.assertEqual(len(groups), 2)
+		self.assertEqual(
+			[row.name for row in groups[("2030-01-31", "Re Studio", "Main Desk", "Cash", "Sales")]],
+			["INV-1", "INV-3"]
+		)
+
+	def test_batch_name_is_stable_for_a_rerun(self):
+		key = ("2030-01-31", "Re Studio", "Main Desk", "Cash", "Sales")
+		self.assertEqual(get_batch_name(key, ["INV-1", "INV-3"]), get_batch_name(key, ["INV-3", "INV-1"]))
+		self.assertNotEqual(get_batch_name(key, ["INV-1"]), get_batch_name(key, ["INV-1", "INV-3"]))
+
+
+def make_if_missing(doctype, name, **values):
+	if not frappe.db.exists(doctype, name):
+		frappe.get_doc({"doctype": doctype, **values}).insert(ignore_permissions=True)
+	return name
+
+
+class TestInvoiceJournalBatchPosting(FrappeTestCase):
+	"""Seeded Booking Invoices posted and reversed against the database"""
+
+	def setUp(self):
+		make_if_missing("Currency", "SAR", currency_name="SAR", enabled=1)
+		self.company = make_if_missing(
+			"Company", "_Test JE Batch Company",
+			company_name="_Test JE Batch Company", company_abbr="TJB", default_currency="SAR"
+		)
+		self.cost_center = make_if_missing(
+			"Cost Center", "_Test JE Batch Desk",
+			cost_center_name="_Test JE Batch Desk", cost_center_type="Cash", currency="SAR"
+		)
+		self.debit_to = make_if_missing(
+			"Account", "_Test JE Batch Cash", account_name="_Test JE Batch Cash", account_type="Asset", currency="SAR"
+		)
+		self.income_account = make_if_missing(
+			"Account", "_Test JE Batch Sales",
+			account_name="_Test JE Batch Sales", account_type="Income", currency="SAR"
+		)
+		self.paid = [self.seed_invoice("Paid", 300), self.seed_invoice("Partially Paid", 120.5)]
+		self.draft = self.seed_invoice("Draft", 50)
+
+	def tearDown(self):
+		frappe.db.rollback()
+
+	def seed_invoice(self, status, paid_amount):
+		# inserted directly: the fixture only needs the columns the posting job reads
+		invoice = frappe.get_doc({
+			"doctype": "Booking Invoice",
+			"name": f"_T-JEB-{frappe.generate_hash(length=8)}",
+			"client_name": "_Test Client",
+			"invoice_date": POSTING_DATE,
+			"status": status,
+			"total_amount": 300,
+			"paid_amount": paid_amount,
+			"company": self.company,
+			"cost_center": self.cost_center,
+			"debit_to": self.debit_to,
+			"income_account": self.income_account
+		})
+		invoice.db_insert()
+		return invoice.name
+
+	def test_paid_invoices_are_posted_in_one_journal_entry(self):
+		result = post_invoice_journals(posting_date=POSTING_DATE, commit=False)
+		self.assertEqual(result, {"batches": 1, "invoices": 2})
+
+		journal_entries = {
+			name: frappe.db.get_value("Booking Invoice", name, "journal_entry") for name in self.paid + [self.draft]
+		}
+		je_name = journal_entries[self.paid[0]]
+		self.assertTrue(je_name)
+		self.assertEqual(journal_entries[self.paid[1]], je_name)
+		self.assertFalse(journal_entries[self.draft])
+
+		je = frappe.get_doc("Journal Entry", je_name)
+		self.assertEqual(je.docstatus, 1)
+		self.assertEqual(je.total_debit, 420.5)
+		batch = frappe.get_doc("Invoice Journal Batch", je.entries[0].reference_name)
+		self.assertEqual(batch.journal_entry, je_name)
+		self.assertEqual(sorted(row.invoice for row in batch.invoices), sorted(self.paid))
+		self.assertEqual(frappe.db.count("GL Entry", {"voucher_no": je_name}), 2)
+
+		# a second run finds nothing left to post
+		self.assertEqual(post_invoice_journals(posting_date=POSTING_DATE, commit=False)["invoices"], 0)
+
+	def test_reversal_cancels_the_entry_and_releases_the_invoices(self):
+		post_invoice_journals(posting_date=POSTING_DATE, commit=False)
+		je_name = frappe.db.get_value("Booking Invoice", self.paid[0], "journal_entry")
+
+		result = reverse_invoice_journals(POSTING_DATE, cost_center=self.cost_center, commit=False)
+		self.assertEqual(result["invoices"], 2)
+		self.assertEqual(frappe.db.get_value("Journal Entry", je_name, "docstatus"), 2)
+		for name in self.paid:
+			self.assertFalse(frappe.db.get_value("Booking Invoice", name, "journal_entry"))
+			self.assertEqual(frappe.db.get_value("Booking Invoice", name, "posted_amount"), 0)
+
+	def test_later_payments_are_posted_as_the_difference(self):
+		post_invoice_journals(posting_date=POSTING_DATE, commit=False)
+		first_je = frappe.db.get_value("Booking Invoice", self.paid[1], "journal_entry")
+		frappe.db.set_value("Booking Invoice", self.paid[1], "paid_amount", 200)
+
+		self.assertEqual(post_invoice_journals(posting_date=POSTING_DATE, commit=False), {"batches": 1, "invoices": 1})
+		invoice = frappe.db.get_value("Booking Invoice", self.paid[1], ["journal_entry", "posted_amount"], as_dict=True)
+		self.assertNotEqual(invoice.journal_entry, first_je)
+		self.assertEqual(invoice.posted_amount, 200)
+		self.assertEqual(frappe.db.get_value("Journal Entry", invoice.journal_entry, "total_debit"), 79.5)
+
+		# reversing the first batch only takes back what that batch posted
+		first_batch = frappe.db.get_value("Invoice Journal Batch", {"journal_entry": first_je}, "name")
+		reverse_batch(frappe._dict(name=first_batch, journal_entry=first_je))
+		self.assertEqual(frappe.db.get_value("Booking Invoice", self.paid[1], "posted_amount"), 79.5)
+		self.assertEqual(frappe.db.get_value("Booking Invoice", self.paid[0], "posted_amount"), 0)
+
+	def test_cancelling_an_invoice_reverses_its_amount(self):
+		post_invoice_journals(posting_date=POSTING_DATE, commit=False)
+
+		invoice = frappe.get_doc("Booking Invoice", self.paid[0])
+		invoice.status = "Cancelled"
+		# seeded without client/booking records
+		invoice.flags.ignore_links = True
+		invoice.flags.ignore_mandatory = True
+		invoice.save(ignore_permissions=True)
+
+		reversal = frappe.db.get_value(
+			"Invoice Journal Batch Item", {"invoice": self.paid[0]}, "reversal_entry"
+		)
+		self.assertTrue(reversal)
+		je = frappe.get_doc("Journal Entry", reversal)
+		self.assertEqual(je.docstatus, 1)
+		self.assertEqual(je.total_debit, 300)
+		self.assertEqual(
+			{(row.account, row.debit, row.credit) for row in je.entries},
+			{(self.income_account, 300, 0), (self.debit_to, 0, 300)}
+		)
+
+		# saving the cancelled invoice again posts nothing more
+		invoice.reload()
+		invoice.flags.ignore_links = True
+		invoice.flags.ignore_mandatory = True
+		invoice.save(ignore_permissions=True)
+		self.assertEqual(frappe.db.count("Journal Entry Line", {"reference_name": self.paid[0], "docstatus": 1}), 2)
@@ -1,5 +1,38 @@
 import frappe
+from frappe import _
 from frappe.model.document import Document
+from frappe.utils import flt
+
+from re_studio_booking.re_studio_booking.utils.bank_reconciliation import unmatch_gl_entries
+from re_studio_booking.re_studio_booking.utils.gl_posting import delete_gl_entries, get_gl_rows, make_gl_entries
 
 class JournalEntry(Document):
-    pass
\ No newline at end of file
+    def validate(self):
+        if not self.entries:
+            frappe.throw(_("Add at least one entry"))
+
+        for row in self.entries:
+            row.debit, row.credit = flt(row.debit, 2), flt(row.credit, 2)
+            if row.debit < 0 or row.credit < 0:
+                frappe.throw(_("Row {0}: Debit and Credit cannot be negative").format(row.idx))
+            if row.debit and row.credit:
+                frappe.throw(_("Row {0}: Enter either a Debit or a Credit, not both").format(row.idx))
+
+        self.total_debit = flt(sum(row.debit for row in self.entries), 2)
+        self.total_credit = flt(sum(row.credit for row in self.entries), 2)
+        if self.total_debit != self.total_credit:
+            frappe.throw(
+                _("Total Debit ({0}) must equal Total Credit ({1})").format(self.total_debit, self.total_credit)
+            )
+
+    def on_submit(self):
+        make_gl_entries([self])
+
+    def on_cancel(self):
+        make_gl_entries([self], reversal=True)
+        # the voucher is reversed: its original rows no longer settle a bank statement line
+        unmatch_gl_entries([row.name for row in get_gl_rows([self])])
+
+    def on_trash(self):
+        # cancelled vouchers only: the original and reversal rows net to zero
+        delete_gl_entries([self.name])
\ No newline at end of file
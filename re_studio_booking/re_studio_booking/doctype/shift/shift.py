@@ -4,9 +4,22 @@
 
 import frappe
 from frappe.model.document import Document
-from frappe.utils import flt, now_datetime, get_datetime
+from frappe.utils import flt, now, now_datetime, get_datetime
 from frappe import _
 
+from re_studio_booking.re_studio_booking.doctype.cost_center_ledger_entry.cost_center_ledger_entry import post_shift
+
+# Transaction type -> Shift total column (OpeningBalance is not part of the totals)
+TOTAL_FIELDS = {
+	"Payment": "total_payments",
+	"Refund": "total_refunds",
+	"Expense": "total_expenses",
+	"Deposit": "total_deposits",
+	"Withdrawal": "total_withdrawals",
+}
+IN_TYPES = ("Payment", "Deposit")
+TOTAL_COLUMNS = tuple(TOTAL_FIELDS.values()) + ("net_total", "theoretical_closing_balance")
+
 class Shift(Document):
 	def before_insert(self):
 		"""Set default values before inserting"""
@@ -88,16 +101,23 @@ class Shift(Document):
 				self.closed_on = now_datetime()
 	
 	def on_update(self):
-		"""Update cost center balance after closing"""
-		if self.status == "Closed" and self.has_value_changed("status"):
-			self.update_cost_center_balance()
+		"""Append new transactions (and the counted closing balance) to the cost center ledger"""
+		self.update_cost_center_balance()
 	
 	def update_cost_center_balance(self):
-		"""Update cost center current balance"""
-		cost_center = frappe.get_doc("Cost Center", self.cost_center)
-		cost_center.current_balance = flt(self.actual_closing_balance)
-		cost_center.last_shift = self.name
-		cost_center.save(ignore_permissions=True)
+		"""Post rows added since the last save; the ledger skips anything already posted"""
+		before = self.get_doc_before_save()
+		posted_rows = {row.name for row in before.shift_transactions} if before else set()
+		new_rows = [row for row in self.shift_transactions if row.name not in posted_rows]
+		closing = self.status in ("Closed", "Handed Over") and (
+			not before or before.status not in ("Closed", "Handed Over")
+		)
+		if not new_rows and not closing:
+			return
+		
+		post_shift(self, new_rows, closing=closing)
+		if closing:
+			frappe.db.set_value("Cost Center", self.cost_center, "last_shift", self.name, update_modified=False)
 	
 	def can_add_transaction(self):
 		"""Check if transactions can be added"""
@@ -106,22 +126,131 @@ class Shift(Document):
 		return True, "OK"
 	
 	def add_transaction(self, trx_type, payment_method, amount, **kwargs):
-		"""Add a transaction to the shift"""
-		can_add, message = self.can_add_transaction()
-		if not can_add:
-			frappe.throw(_(message))
+		"""Add a transaction to the shift (one row insert, the shift is not re-saved)"""
+		row = post_shift_transaction(self.name, trx_type, payment_method, amount, **kwargs)
 		
-		row = self.append("shift_transactions", {
-			"trx_type": trx_type,
-			"payment_method": payment_method,
-			"amount": amount,
-			"reference_doctype": kwargs.get("reference_doctype"),
-			"reference_name": kwargs.get("reference_name"),
-			"party": kwargs.get("party"),
-			"description": kwargs.get("description"),
-			"created_by": frappe.session.user,
-			"created_on": now_datetime()
-		})
-		
-		self.save()
+		# Keep this instance in step with the database (a later save must not drop the row)
+		self.append("shift_transactions", row.as_dict())
+		for field, delta in get_total_increments(trx_type, amount).items():
+			self.set(field, flt(self.get(field)) + delta)
+		self.modified = frappe.db.get_value("Shift", self.name, "modified")
 		return row
+
+
+def get_total_increments(trx_type, amount):
+	"""
+	Changes to the Shift total columns for one transaction
+	
+	Returns:
+		dict: {column: delta}
+	"""
+	field = TOTAL_FIELDS.get(trx_type)
+	if not field:
+		return {}
+	amount = flt(amount)
+	net = amount if trx_type in IN_TYPES else -amount
+	return {field: amount, "net_total": net, "theoretical_closing_balance": net}
+
+
+def lock_shift(shift_name):
+	"""Lock the Shift row; concurrent postings to the same shift wait here"""
+	shift = frappe.db.get_value(
+		"Shift", shift_name, ["name", "status", "cost_center", "expected_opening_balance"] + list(TOTAL_COLUMNS),
+		as_dict=True, for_update=True
+	)
+	if not shift:
+		frappe.throw(_("الوردية {0} غير موجودة").format(shift_name))
+	return shift
+
+
+def post_shift_transaction(shift_name, trx_type, payment_method, amount, **kwargs):
+	"""
+	Append a transaction to an open shift without loading or saving the Shift document
+	
+	The Shift row is locked, one Shift Transaction row is inserted and the
+	totals are updated with increments in the same statement, so the cost does
+	not grow with the number of transactions and concurrent cashiers on the
+	same shift are serialized instead of overwriting each other.
+	
+	Returns:
+		Document: the inserted Shift Transaction row
+	"""
+	shift = lock_shift(shift_name)
+	if shift.status != "Open":
+		frappe.throw(_("لا يمكن إضافة معاملات لوردية بحالة {0}").format(shift.status))
+	
+	idx = frappe.db.sql("""
+		SELECT IFNULL(MAX(idx), 0)
+		FROM `tabShift Transaction`
+		WHERE parent = %s AND parenttype = 'Shift'
+	""", shift_name)[0][0]
+	
+	row = frappe.get_doc({
+		"doctype": "Shift Transaction",
+		"parent": shift_name,
+		"parenttype": "Shift",
+		"parentfield": "shift_transactions",
+		"idx": int(idx or 0) + 1,
+		"trx_type": trx_type,
+		"payment_method": payment_method,
+		"amount": flt(amount),
+		"reference_doctype": kwargs.get("reference_doctype"),
+		"reference_name": kwargs.get("reference_name"),
+		"party": kwargs.get("party"),
+		"description": kwargs.get("description"),
+		"created_by": frappe.session.user,
+		"created_on": now_datetime()
+	})
+	row.db_insert()
+	
+	increments = get_total_increments(trx_type, amount)
+	assignments = "".join(f"{field} = IFNULL({field}, 0) + %({field})s, " for field in increments)
+	frappe.db.sql(
+		f"UPDATE `tabShift` SET {assignments}modified = %(modified)s WHERE name = %(name)s",
+		dict(increments, modified=now(), name=shift_name)
+	)
+	
+	post_shift(shift, [row])
+	return row
+
+
+def get_expected_totals(shift):
+	"""Shift totals recomputed from its transaction rows (one aggregate query)"""
+	totals = dict.fromkeys(TOTAL_COLUMNS, 0.0)
+	totals["theoretical_closing_balance"] = flt(shift.expected_opening_balance)
+	for trx_type, amount in frappe.db.sql("""
+		SELECT trx_type, SUM(amount)
+		FROM `tabShift Transaction`
+		WHERE parent = %s AND parenttype = 'Shift'
+		GROUP BY trx_type
+	""", shift.name):
+		for field, delta in get_total_increments(trx_type, amount).items():
+			totals[field] = flt(totals[field] + delta)
+	return totals
+
+
+def reconcile_shift_totals(shift_name, repair=True):
+	"""
+	Compare the stored shift totals with the totals of its transaction rows
+	and (optionally) write the recomputed values back
+	
+	Returns:
+		list: [{field, expected, actual}] differences found
+	"""
+	shift = lock_shift(shift_name)
+	expected = get_expected_totals(shift)
+	differences = [
+		{"field": field, "expected": expected[field], "actual": flt(shift.get(field))}
+		for field in TOTAL_COLUMNS
+		if abs(expected[field] - flt(shift.get(field))) >= 0.005
+	]
+	if repair and differences:
+		frappe.db.set_value("Shift", shift_name, expected, update_modified=False)
+	return differences
+
+
+@frappe.whitelist()
+def reconcile_shift(shift_name, repair=True):
+	"""Recompute a shift's totals from its transactions"""
+	frappe.only_for("System Manager")
+	return reconcile_shift_totals(shift_name, repair=frappe.parse_json(repair) if isinstance(repair, str) else repair)
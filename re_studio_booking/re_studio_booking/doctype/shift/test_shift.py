@@ -0,0 +1,101 @@
+# Copyright (c) 2025, Re Studio and Contributors
+# See license.txt
+
+import threading
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+from frappe.utils import flt
+
+from re_studio_booking.re_studio_booking.doctype.shift.shift import (
+	get_total_increments,
+	post_shift_transaction,
+	reconcile_shift_totals
+)
+
+WORKERS = 4
+POSTS_PER_WORKER = 25
+
+
+class TestShift(FrappeTestCase):
+	def test_total_increments(self):
+		self.assertEqual(
+			get_total_increments("Payment", 100),
+			{"total_payments": 100, "net_total": 100, "theoretical_closing_balance": 100}
+		)
+		self.assertEqual(
+			get_total_increments("Expense", 40),
+			{"total_expenses": 40, "net_total": -40, "theoretical_closing_balance": -40}
+		)
+		self.assertEqual(get_total_increments("OpeningBalance", 500), {})
+
+
+class TestShiftConcurrentPosting(FrappeTestCase):
+	"""Parallel workers (own connection each) posting to one open shift"""
+
+	def setUp(self):
+		self.cost_center = frappe.get_doc({
+			"doctype": "Cost Center",
+			"cost_center_name": f"_Test Shift Posting {frappe.generate_hash(length=6)}",
+			"cost_center_type": "Cash",
+			"currency": "EGP",
+			"is_active": 1
+		}).insert(ignore_permissions=True)
+		self.shift = frappe.get_doc({
+			"doctype": "Shift",
+			"cost_center": self.cost_center.name,
+			"expected_opening_balance": 100,
+			"status": "Open"
+		}).insert(ignore_permissions=True)
+		# the workers use their own connections and only see committed rows
+		frappe.db.commit()
+
+	def tearDown(self):
+		frappe.db.rollback()
+		frappe.db.delete("Shift Transaction", {"parent": self.shift.name})
+		frappe.db.delete("Cost Center Ledger Entry", {"cost_center": self.cost_center.name})
+		frappe.db.delete("Shift", {"name": self.shift.name})
+		frappe.db.delete("Cost Center", {"name": self.cost_center.name})
+		frappe.db.commit()
+
+	def post_in_worker(self, site, errors):
+		frappe.init(site=site)
+		frappe.connect()
+		frappe.set_user("Administrator")
+		try:
+			for _ in range(POSTS_PER_WORKER):
+				post_shift_transaction(self.shift.name, "Payment", "Cash", 10)
+				frappe.db.commit()
+		except Exception as e:
+			errors.append(e)
+		finally:
+			frappe.destroy()
+
+	def test_parallel_posts_are_not_lost(self):
+		errors = []
+		threads = [
+			threading.Thread(target=self.post_in_worker, args=(frappe.local.site, errors))
+			for _ in range(WORKERS)
+		]
+		for thread in threads:
+			thread.start()
+		for thread in threads:
+			thread.join()
+		self.assertEqual(errors, [])
+
+		posts = WORKERS * POSTS_PER_WORKER
+		idx = frappe.get_all("Shift Transaction", filters={"parent": self.shift.name}, pluck="idx")
+		self.assertEqual(sorted(idx), list(range(1, posts + 1)))
+
+		shift = frappe.db.get_value(
+			"Shift", self.shift.name, ["total_payments", "net_total", "theoretical_closing_balance"], as_dict=True
+		)
+		self.assertEqual(flt(shift.total_payments), posts * 10)
+		self.assertEqual(flt(shift.net_total), posts * 10)
+		self.assertEqual(flt(shift.theoretical_closing_balance), 100 + posts * 10)
+		self.assertEqual(reconcile_shift_totals(self.shift.name, repair=False), [])
+
+		ledger = frappe.get_all(
+			"Cost Center Ledger Entry", filters={"cost_center": self.cost_center.name}, pluck="sequence"
+		)
+		self.assertEqual(sorted(ledger), list(range(1, posts + 1)))
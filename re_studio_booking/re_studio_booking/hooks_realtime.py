@@ -1,17 +1,112 @@
 import frappe
 
+from re_studio_booking.re_studio_booking.doctype.booking_daily_rollup.booking_daily_rollup import (
+	MEASURE_FIELDS,
+	diff_contributions,
+	get_booking_contributions
+)
+from re_studio_booking.re_studio_booking.utils.realtime_publisher import queue_realtime
+
+# Event the dashboards listen on; published to the doctype room of the changed document
+DASHBOARD_DELTA_EVENT = "re_studio_dashboard_delta"
+
+
+def on_booking_update(doc, method):
+	"""Publish the booking's change to the dashboard counters (same delta as Booking Daily Rollup)"""
+	delta = diff_contributions(
+		get_booking_contributions(doc),
+		get_booking_contributions(doc.get_doc_before_save())
+	)
+	publish_booking_delta(doc, delta)
+
+
+def on_booking_trash(doc, method):
+	"""Publish the removal of a deleted booking from the dashboard counters"""
+	publish_booking_delta(doc, diff_contributions({}, get_booking_contributions(doc)))
+
+
+def publish_booking_delta(doc, delta):
+	"""
+	Delta rows: one per (date, photographer, service, status) with signed measures,
+	so each client applies only the rows that fall in its own range / filters.
+	"""
+	if not delta:
+		return
+	rows = []
+	for (rollup_date, photographer, service, status), measures in delta.items():
+		row = {"date": rollup_date, "photographer": photographer, "service": service, "status": status}
+		row.update(zip(MEASURE_FIELDS, measures))
+		rows.append(row)
+	publish_dashboard_delta(doc, {"rows": rows})
+
+
 def on_service_update(doc, method):
-	"""Handle service updates"""
-	pass
+	"""Publish Service count changes (total / active / inactive)"""
+	publish_active_delta(doc, method)
+
 
 def validate_service_deactivation(doc, method):
 	"""Validate service deactivation"""
 	pass
 
+
 def on_service_package_update(doc, method):
-	"""Handle service package updates"""
-	pass
+	"""Publish Service Package count changes (total / active / inactive)"""
+	publish_active_delta(doc, method)
+
 
 def validate_package_deactivation(doc, method):
 	"""Validate package deactivation"""
 	pass
+
+
+def on_active_doc_trash(doc, method):
+	"""Publish the removal of a Service / Service Package from the counters"""
+	active = 1 if doc.get("is_active") else 0
+	publish_dashboard_delta(doc, {"total": -1, "active": -active, "inactive": active - 1})
+
+
+def publish_active_delta(doc, method):
+	# after_insert and on_update both fire on insert; on_update alone covers it
+	# (no doc before save means a new document)
+	if method == "after_insert":
+		return
+	before = doc.get_doc_before_save()
+	active = 1 if doc.get("is_active") else 0
+	if before is None:
+		delta = {"total": 1, "active": active, "inactive": 1 - active}
+	else:
+		was_active = 1 if before.get("is_active") else 0
+		if active == was_active:
+			return
+		delta = {"total": 0, "active": active - was_active, "inactive": was_active - active}
+	publish_dashboard_delta(doc, delta)
+
+
+def publish_dashboard_delta(doc, delta):
+	"""
+	Queue a delta for the doctype room. Repeated deltas of the same document are
+	merged and everything is sent once after commit (utils.realtime_publisher).
+	"""
+	delta.update({"doctype": doc.doctype, "name": doc.name})
+	queue_realtime(DASHBOARD_DELTA_EVENT, delta, doctype=doc.doctype, key=doc.name, merge=merge_dashboard_delta)
+
+
+def merge_dashboard_delta(old, new):
+	"""Deltas are additive: sum the counters and the rows with the same key"""
+	merged = {"doctype": old["doctype"], "name": old["name"]}
+	for field in ("total", "active", "inactive"):
+		if field in old or field in new:
+			merged[field] = old.get(field, 0) + new.get(field, 0)
+
+	if "rows" in old or "rows" in new:
+		rows = {}
+		for row in old.get("rows", []) + new.get("rows", []):
+			key = (row["date"], row["photographer"], row["service"], row["status"])
+			if key in rows:
+				for field in MEASURE_FIELDS:
+					rows[key][field] += row[field]
+			else:
+				rows[key] = dict(row)
+		merged["rows"] = [row for row in rows.values() if any(row[field] for field in MEASURE_FIELDS)]
+	return merged
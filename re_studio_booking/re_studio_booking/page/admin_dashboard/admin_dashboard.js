@@ -14,6 +14,8 @@ frappe.require([
 page.set_primary_action('تحديث البيانات', () => loadDashboardData(page), 'refresh');
 
 page.add_menu_item('تصدير التقرير', () => exportDashboardReport());
+page.add_menu_item('تصدير الحجوزات (CSV)', () => exportDashboardBookings('CSV'));
+page.add_menu_item('تصدير الحجوزات (Excel)', () => exportDashboardBookings('XLSX'));
 page.add_menu_item('طباعة', () => printDashboard());
 page.add_menu_item('عرض الإحصائيات الشهرية', () => showMonthlyStats());
 
@@ -45,6 +47,15 @@ $(frappe.render_template("admin_dashboard", {})).appendTo(page.body);
 // Load photographers for filter
 loadPhotographers(page);
 
+// Register for realtime deltas (admin_dashboard_utils.js)
+window.current_admin_dashboard = {
+page: page,
+filters: null,
+data: null,
+load_dashboard_data: () => loadDashboardData(page),
+apply_delta: applyDashboardDelta
+};
+
 // Load dashboard data
 loadDashboardData(page);
 }
@@ -82,6 +93,12 @@ if (photographer === 'All Photographers') {
 photographer = '';
 }
 
+window.current_admin_dashboard.filters = {
+start_date: dateRange[0],
+end_date: dateRange[1],
+photographer: photographer
+};
+
 // Call backend method
 frappe.call({
 method: "re_studio_booking.re_studio_booking.page.admin_dashboard.admin_dashboard.get_dashboard_data",
@@ -101,6 +118,8 @@ $('.dashboard-container').html('<div class="text-center text-muted" style="paddi
 }
 
 function renderDashboard(data) {
+window.current_admin_dashboard.data = data;
+
 // Generate HTML content for quick stats
 let quickStatsHTML = `
 <div class="row">
@@ -108,7 +127,7 @@ let quickStatsHTML = `
 <div class="stat-box" style="background: linear-gradient(to right, #00c6ff, #0072ff);">
 <div class="stat-icon"><i class="fa fa-calendar"></i></div>
 <div class="stat-details">
-<div class="stat-number">${data.quick_stats.total_bookings || 0}</div>
+<div class="stat-number" data-stat="total_bookings">${data.quick_stats.total_bookings || 0}</div>
 <div class="stat-label">إجمالي الحجوزات</div>
 </div>
 </div>
@@ -117,7 +136,7 @@ let quickStatsHTML = `
 <div class="stat-box" style="background: linear-gradient(to right, #ff9966, #ff5e62);">
 <div class="stat-icon"><i class="fa fa-clock-o"></i></div>
 <div class="stat-details">
-<div class="stat-number">${data.quick_stats.pending_bookings || 0}</div>
+<div class="stat-number" data-stat="pending_bookings">${data.quick_stats.pending_bookings || 0}</div>
 <div class="stat-label">الحجوزات المعلقة</div>
 </div>
 </div>
@@ -126,7 +145,7 @@ let quickStatsHTML = `
 <div class="stat-box" style="background: linear-gradient(to right, #11998e, #38ef7d);">
 <div class="stat-icon"><i class="fa fa-check-circle"></i></div>
 <div class="stat-details">
-<div class="stat-number">${data.quick_stats.confirmed_bookings || 0}</div>
+<div class="stat-number" data-stat="confirmed_bookings">${data.quick_stats.confirmed_bookings || 0}</div>
 <div class="stat-label">الحجوزات المؤكدة</div>
 </div>
 </div>
@@ -135,7 +154,7 @@ let quickStatsHTML = `
 <div class="stat-box" style="background: linear-gradient(to right, #834d9b, #d04ed6);">
 <div class="stat-icon"><i class="fa fa-money"></i></div>
 <div class="stat-details">
-<div class="stat-number">${frappe.format(data.quick_stats.total_revenue || 0, {fieldtype: 'Currency'})}</div>
+<div class="stat-number" data-stat="total_revenue">${frappe.format(data.quick_stats.total_revenue || 0, {fieldtype: 'Currency'})}</div>
 <div class="stat-label">إجمالي الإيرادات</div>
 </div>
 </div>
@@ -211,6 +230,52 @@ renderPhotographerPerformanceChart(data.photographer_performance);
 }, 100);
 }
 
+function applyDashboardDelta(delta) {
+// Booking deltas: signed rollup rows {date, photographer, service, status, booking_count, revenue, ...}
+let dashboard = window.current_admin_dashboard;
+if (!dashboard || !dashboard.data || !dashboard.filters || delta.doctype !== 'Booking') return;
+
+let filters = dashboard.filters;
+let stats = dashboard.data.quick_stats;
+let trends = dashboard.data.booking_trends;
+let changed = false;
+
+(delta.rows || []).forEach(function(row) {
+if (row.date < filters.start_date || row.date > filters.end_date) return;
+if (filters.photographer && row.photographer !== filters.photographer) return;
+
+let bookings = row.booking_count || 0;
+let revenue = row.revenue || 0;
+
+stats.total_bookings = (stats.total_bookings || 0) + bookings;
+if (row.status === 'Pending') stats.pending_bookings = (stats.pending_bookings || 0) + bookings;
+if (row.status === 'Confirmed') stats.confirmed_bookings = (stats.confirmed_bookings || 0) + bookings;
+if (row.status === 'Confirmed' || row.status === 'Completed') stats.total_revenue = (stats.total_revenue || 0) + revenue;
+
+let index = trends && trends.keys ? trends.keys.indexOf(getTrendBucketKey(row.date, trends.granularity)) : -1;
+if (index !== -1) {
+trends.bookings[index] += bookings;
+trends.revenue[index] += revenue;
+}
+changed = true;
+});
+
+if (!changed) return;
+
+$('[data-stat="total_bookings"]').text(stats.total_bookings || 0);
+$('[data-stat="pending_bookings"]').text(stats.pending_bookings || 0);
+$('[data-stat="confirmed_bookings"]').text(stats.confirmed_bookings || 0);
+$('[data-stat="total_revenue"]').html(frappe.format(stats.total_revenue || 0, {fieldtype: 'Currency'}));
+renderBookingRevenueChart(trends);
+}
+
+function getTrendBucketKey(date, granularity) {
+// Same buckets as utils/time_series.py (weeks start on Monday)
+if (granularity === 'weekly') return moment(date).isoWeekday(1).format('YYYY-MM-DD');
+if (granularity === 'monthly') return moment(date).startOf('month').format('YYYY-MM-DD');
+return date;
+}
+
 function generateRecentBookingsHTML(bookings) {
 let html = '';
 
@@ -355,6 +420,18 @@ link.click();
 });
 }
 
+function exportDashboardBookings(fileFormat) {
+// All bookings of the selected range, streamed to a file by a background job
+let dateRange = cur_page.page.fields_dict['النطاق الزمني'].get_value() || [];
+let photographer = cur_page.page.fields_dict['المصور'].get_value();
+
+re_studio_booking.startExport('Bookings', fileFormat, {
+from_date: dateRange[0],
+to_date: dateRange[1],
+photographer: photographer === 'All Photographers' ? '' : photographer
+});
+}
+
 function printDashboard() {
 window.print();
 }
@@ -2,9 +2,13 @@ import frappe
 from frappe import _
 import json
 from datetime import datetime, timedelta
-import calendar
+
+from re_studio_booking.re_studio_booking.doctype.booking_daily_rollup.booking_daily_rollup import get_rollup_totals
+from re_studio_booking.re_studio_booking.utils.response_cache import cached_response
+from re_studio_booking.re_studio_booking.utils.time_series import GRANULARITIES, build_series
 
 @frappe.whitelist()
+@cached_response(tags=("booking", "service", "photographer"))
 def get_dashboard_data(start_date=None, end_date=None, photographer=None):
     """Get all data required for the admin dashboard"""
     try:
@@ -44,196 +48,102 @@ def get_dashboard_data(start_date=None, end_date=None, photographer=None):
         return None
 
 def get_quick_stats(start_date, end_date, filters=None):
-    """Get quick stats for the dashboard"""
+    """Get quick stats for the dashboard (from Booking Daily Rollup)"""
     if not filters:
         filters = {}
     
-    date_filters = filters.copy()
-    date_filters.update({
-        "booking_date": ["between", [start_date, end_date]]
-    })
-    
-    # Get total bookings in date range
-    total_bookings = frappe.db.count("Booking", date_filters)
-    
-    # Get pending bookings in date range
-    pending_filters = date_filters.copy()
-    pending_filters.update({"status": "Pending"})
-    pending_bookings = frappe.db.count("Booking", pending_filters)
-    
-    # Get confirmed bookings in date range
-    confirmed_filters = date_filters.copy()
-    confirmed_filters.update({"status": "Confirmed"})
-    confirmed_bookings = frappe.db.count("Booking", confirmed_filters)
+    by_status = {
+        row.status: row
+        for row in get_rollup_totals(
+            group_by=("status",), from_date=start_date, to_date=end_date,
+            filters=_rollup_filters(filters)
+        )
+    }
     
-    # Get total revenue in date range
-    total_revenue = frappe.db.sql("""
-        SELECT IFNULL(SUM(amount), 0) as total_revenue
-        FROM `tabBooking`
-        WHERE booking_date BETWEEN %s AND %s
-        AND status IN ('Confirmed', 'Completed')
-        {photographer_filter}
-    """.format(
-        photographer_filter = "AND photographer = '%s'" % filters.get("photographer") if filters.get("photographer") else ""
-    ), (start_date, end_date), as_dict=True)[0].total_revenue
+    def count(*statuses):
+        return sum(int(by_status[s].booking_count) for s in statuses if s in by_status)
     
     return {
-        "total_bookings": total_bookings,
-        "pending_bookings": pending_bookings,
-        "confirmed_bookings": confirmed_bookings,
-        "total_revenue": total_revenue
+        "total_bookings": sum(int(row.booking_count) for row in by_status.values()),
+        "pending_bookings": count("Pending"),
+        "confirmed_bookings": count("Confirmed"),
+        "total_revenue": sum(float(by_status[s].revenue) for s in ("Confirmed", "Completed") if s in by_status)
     }
 
-def get_booking_trends(start_date, end_date, filters=None):
-    """Get booking and revenue trends for the chart"""
+def _rollup_filters(filters):
+    """Dashboard filters mapped to rollup key fields"""
+    rollup_filters = {}
+    if filters.get("photographer"):
+        rollup_filters["photographer"] = filters.get("photographer")
+    return rollup_filters
+
+def get_booking_trends(start_date, end_date, filters=None, granularity=None):
+    """Get booking and revenue trends for the chart
+
+    One daily rollup query, bucketed by `build_series` into daily / weekly /
+    monthly points (picked from the range length unless `granularity` is given).
+    """
     if not filters:
         filters = {}
-        
-    photographer_filter = ""
-    if filters.get("photographer"):
-        photographer_filter = "AND photographer = '{}'".format(filters.get("photographer"))
     
-    # Parse dates
-    start = datetime.strptime(start_date, "%Y-%m-%d")
-    end = datetime.strptime(end_date, "%Y-%m-%d")
-    
-    # Determine the grouping (day, week, month) based on date range
-    days_diff = (end - start).days
-    
-    if days_diff <= 31:
-        # Daily grouping for a month or less
-        date_format = "%Y-%m-%d"
-        group_by = "DATE(booking_date)"
-        date_label_format = "%d %b"
-    elif days_diff <= 90:
-        # Weekly grouping for 3 months or less
-        date_format = "%Y-%U"
-        group_by = "YEARWEEK(booking_date, 1)"
-        date_label_format = "Week %W"
-    else:
-        # Monthly grouping for more than 3 months
-        date_format = "%Y-%m"
-        group_by = "DATE_FORMAT(booking_date, '%Y-%m')"
-        date_label_format = "%b %Y"
-    
-    # Query for bookings and revenue trends
-    trends = frappe.db.sql("""
-        SELECT 
-            {group_by} as date_group,
-            COUNT(*) as booking_count,
-            IFNULL(SUM(amount), 0) as revenue
-        FROM 
-            `tabBooking` 
-        WHERE 
-            booking_date BETWEEN %s AND %s
-            {photographer_filter}
-        GROUP BY 
-            date_group
-        ORDER BY 
-            date_group
-    """.format(
-        group_by=group_by,
-        photographer_filter=photographer_filter
-    ), (start_date, end_date), as_dict=True)
-    
-    # Process results into chart format
-    labels = []
-    bookings = []
-    revenue = []
-    
-    # Create a complete date range with zeros for missing dates
-    if days_diff <= 31:
-        # Daily format
-        current = start
-        while current <= end:
-            current_str = current.strftime(date_format)
-            
-            # Find if there's data for this date
-            data_for_date = next((t for t in trends if t.date_group == current_str), None)
-            
-            labels.append(current.strftime(date_label_format))
-            bookings.append(data_for_date.booking_count if data_for_date else 0)
-            revenue.append(float(data_for_date.revenue) if data_for_date else 0)
-            
-            current += timedelta(days=1)
-    elif days_diff <= 90:
-        # Weekly format
-        current = start
-        while current <= end:
-            week_num = int(current.strftime("%U"))
-            year = current.strftime("%Y")
-            current_str = f"{year}-{week_num:02d}"
-            
-            # Find if there's data for this week
-            data_for_week = next((t for t in trends if t.date_group == current_str), None)
-            
-            labels.append(f"W{week_num}")
-            bookings.append(data_for_week.booking_count if data_for_week else 0)
-            revenue.append(float(data_for_week.revenue) if data_for_week else 0)
-            
-            # Move to next week
-            current += timedelta(days=7)
-    else:
-        # Monthly format
-        current_year = start.year
-        current_month = start.month
-        
-        while (current_year < end.year) or (current_year == end.year and current_month <= end.month):
-            current_str = f"{current_year}-{current_month:02d}"
-            
-            # Find if there's data for this month
-            data_for_month = next((t for t in trends if t.date_group == current_str), None)
-            
-            month_name = calendar.month_abbr[current_month]
-            labels.append(f"{month_name} {current_year}")
-            bookings.append(data_for_month.booking_count if data_for_month else 0)
-            revenue.append(float(data_for_month.revenue) if data_for_month else 0)
-            
-            # Move to next month
-            current_month += 1
-            if current_month > 12:
-                current_month = 1
-                current_year += 1
+    rows = get_rollup_totals(
+        group_by=("rollup_date",), from_date=start_date, to_date=end_date,
+        filters=_rollup_filters(filters)
+    )
+    series = build_series(
+        rows, start_date, end_date, granularity=granularity,
+        date_field="rollup_date", value_fields=("booking_count", "revenue")
+    )
     
     return {
-        "labels": labels,
-        "bookings": bookings,
-        "revenue": revenue
+        "granularity": series["granularity"],
+        "keys": series["keys"],
+        "labels": series["labels"],
+        "bookings": [int(value) for value in series["booking_count"]],
+        "revenue": [float(value) for value in series["revenue"]]
     }
 
+@frappe.whitelist()
+@cached_response(tags=("booking",))
+def get_trends(start_date=None, end_date=None, photographer=None, granularity=None):
+    """Booking and revenue trends for an arbitrary range and granularity (daily / weekly / monthly)"""
+    if not start_date:
+        start_date = frappe.utils.add_months(frappe.utils.today(), -1)
+    if not end_date:
+        end_date = frappe.utils.today()
+    if granularity and granularity not in GRANULARITIES:
+        frappe.throw(_("Granularity must be one of: {0}").format(", ".join(GRANULARITIES)))
+    
+    filters = {}
+    if photographer:
+        filters["photographer"] = photographer
+    
+    return get_booking_trends(str(start_date), str(end_date), filters, granularity)
+
 def get_service_distribution(start_date, end_date, filters=None):
     """Get service distribution data for the pie chart"""
     if not filters:
         filters = {}
-        
-    photographer_filter = ""
-    if filters.get("photographer"):
-        photographer_filter = "AND b.photographer = '{}'".format(filters.get("photographer"))
     
-    services = frappe.db.sql("""
-        SELECT 
-            s.service_name as service,
-            COUNT(b.name) as count
-        FROM 
-            `tabBooking` b
-        JOIN 
-            `tabService` s ON b.service = s.name
-        WHERE 
-            b.booking_date BETWEEN %s AND %s
-            {photographer_filter}
-        GROUP BY 
-            s.service_name
-        ORDER BY 
-            count DESC
-        LIMIT 6
-    """.format(photographer_filter=photographer_filter), (start_date, end_date), as_dict=True)
+    rollup_filters = _rollup_filters(filters)
+    rollup_filters["service"] = ("not in", [""])
+    services = get_rollup_totals(
+        group_by=("service",), from_date=start_date, to_date=end_date,
+        filters=rollup_filters, order_by="service_count desc", limit=6
+    )
+    service_names = dict(frappe.get_all(
+        "Service",
+        filters={"name": ["in", [s.service for s in services] or [""]]},
+        fields=["name", "service_name"],
+        as_list=True
+    ))
     
     labels = []
     values = []
     
     for service in services:
-        labels.append(service.service)
-        values.append(service.count)
+        labels.append(service_names.get(service.service) or service.service)
+        values.append(int(service.service_count))
     
     return {
         "labels": labels,
@@ -278,23 +188,24 @@ def get_recent_bookings(filters=None):
 
 def get_photographer_performance(start_date, end_date):
     """Get photographer performance data for the bar chart"""
-    photographers = frappe.db.sql("""
-        SELECT 
-            p.full_name as photographer,
-            COUNT(b.name) as bookings,
-            IFNULL(SUM(b.amount), 0) as revenue
-        FROM 
-            `tabBooking` b
-        JOIN 
-            `tabPhotographer` p ON b.photographer = p.name
-        WHERE
-            b.booking_date BETWEEN %s AND %s
-        GROUP BY 
-            p.full_name
-        ORDER BY 
-            bookings DESC
-        LIMIT 5
-    """, (start_date, end_date), as_dict=True)
+    rows = get_rollup_totals(
+        group_by=("photographer",), from_date=start_date, to_date=end_date,
+        filters={"photographer": ("not in", [""])}, order_by="booking_count desc", limit=5
+    )
+    full_names = dict(frappe.get_all(
+        "Photographer",
+        filters={"name": ["in", [r.photographer for r in rows] or [""]]},
+        fields=["name", "full_name"],
+        as_list=True
+    ))
+    photographers = [
+        frappe._dict(
+            photographer=full_names.get(r.photographer) or r.photographer,
+            bookings=int(r.booking_count),
+            revenue=r.revenue
+        )
+        for r in rows
+    ]
     
     labels = []
     bookings_data = []
@@ -5,7 +5,11 @@ import frappe
 from frappe.utils import getdate, add_to_date, nowdate
 import json
 
+from re_studio_booking.re_studio_booking.doctype.booking_daily_rollup.booking_daily_rollup import get_rollup_totals
+from re_studio_booking.re_studio_booking.utils.response_cache import cached_response
+
 @frappe.whitelist()
+@cached_response(tags=("booking", "service", "photographer"))
 def get_dashboard_data():
 	"""Get data for booking dashboard"""
 	today = nowdate()
@@ -19,39 +23,32 @@ def get_dashboard_data():
 	}
 
 def get_booking_stats(today):
-	"""Get booking statistics"""
-	# Today's bookings
-	today_bookings = frappe.db.count("Booking", {"booking_date": today})
+	"""Get booking statistics (from Booking Daily Rollup)"""
+	today_date = getdate(today)
+	start_of_week = getdate(add_to_date(today_date, days=-(today_date.weekday())))
+	end_of_week = getdate(add_to_date(start_of_week, days=6))
+	start_of_month = getdate(f"{today.split('-')[0]}-{today.split('-')[1]}-01")
+	end_of_month = getdate(add_to_date(start_of_month, months=1, days=-1))
 	
-	# This week's bookings
-	start_of_week = add_to_date(getdate(today), days=-(getdate(today).weekday()), hours=0, minutes=0, seconds=0)
-	end_of_week = add_to_date(start_of_week, days=6, hours=0, minutes=0, seconds=0)
-	this_week_bookings = frappe.db.count("Booking", {
-		"booking_date": ["between", [start_of_week, end_of_week]]
-	})
+	# One pass over the daily rows that cover today, this week and this month
+	daily = get_rollup_totals(
+		group_by=("rollup_date",),
+		from_date=min(start_of_week, start_of_month),
+		to_date=max(end_of_week, end_of_month)
+	)
 	
-	# This month's bookings
-	start_of_month = getdate(f"{today.split('-')[0]}-{today.split('-')[1]}-01")
-	end_of_month = add_to_date(start_of_month, months=1, days=-1)
-	this_month_bookings = frappe.db.count("Booking", {
-		"booking_date": ["between", [start_of_month, end_of_month]]
-	})
+	def count_between(start, end):
+		return sum(int(row.booking_count) for row in daily if start <= getdate(row.rollup_date) <= end)
 	
 	# Bookings by status
-	status_counts = frappe.db.sql("""
-		SELECT status, COUNT(*) as count
-		FROM `tabBooking`
-		GROUP BY status
-	""", as_dict=True)
-	
 	status_data = {}
-	for status in status_counts:
-		status_data[status.status] = status.count
+	for row in get_rollup_totals(group_by=("status",)):
+		status_data[row.status or None] = int(row.booking_count)
 		
 	return {
-		"today": today_bookings,
-		"this_week": this_week_bookings,
-		"this_month": this_month_bookings,
+		"today": count_between(today_date, today_date),
+		"this_week": count_between(start_of_week, end_of_week),
+		"this_month": count_between(start_of_month, end_of_month),
 		"status_counts": status_data
 	}
 
@@ -90,16 +87,13 @@ def get_photographer_stats():
 	active_photographers = frappe.db.count("Photographer", {"status": "Active"})
 	
 	# Get top photographers by bookings
-	top_photographers = frappe.db.sql("""
-		SELECT 
-			photographer, 
-			COUNT(*) as booking_count
-		FROM `tabBooking`
-		WHERE status = 'Completed'
-		GROUP BY photographer
-		ORDER BY booking_count DESC
-		LIMIT 5
-	""", as_dict=True)
+	top_photographers = [
+		frappe._dict(photographer=row.photographer, booking_count=int(row.booking_count))
+		for row in get_rollup_totals(
+			group_by=("photographer",), filters={"status": "Completed"},
+			order_by="booking_count desc", limit=5
+		)
+	]
 	
 	return {
 		"active_count": active_photographers,
@@ -112,20 +106,20 @@ def get_service_stats():
 	active_services = frappe.db.count("Service", {"is_active": 1})
 	
 	# Get top services by bookings
-	top_services = frappe.db.sql("""
-		SELECT 
-			service, 
-			COUNT(*) as booking_count
-		FROM `tabBooking`
-		GROUP BY service
-		ORDER BY booking_count DESC
-		LIMIT 5
-	""", as_dict=True)
+	top_services = [
+		frappe._dict(service=row.service, booking_count=int(row.service_count))
+		for row in get_rollup_totals(group_by=("service",), order_by="service_count desc", limit=5)
+	]
 	
 	# Get service details
+	service_names = dict(frappe.get_all(
+		"Service",
+		filters={"name": ["in", [s.service for s in top_services] or [""]]},
+		fields=["name", "service_name_ar"],
+		as_list=True
+	))
 	for service in top_services:
-		service_doc = frappe.get_doc("Service", service.service)
-		service["service_name"] = service_doc.service_name_ar
+		service["service_name"] = service_names.get(service.service)
 		
 	return {
 		"active_count": active_services,
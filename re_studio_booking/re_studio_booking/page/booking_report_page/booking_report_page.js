@@ -354,6 +354,15 @@ class BookingReportView {
 			me.export_report();
 		});
 		
+		// All bookings of the selected period (not only the loaded page), written by a background job
+		this.page.add_menu_item(__('تصدير كل الحجوزات (CSV)'), function() {
+			me.export_all_bookings('CSV');
+		});
+		
+		this.page.add_menu_item(__('تصدير كل الحجوزات (Excel)'), function() {
+			me.export_all_bookings('XLSX');
+		});
+		
 		this.page.add_menu_item(__('طباعة التقرير'), function() {
 			me.print_report();
 		});
@@ -937,6 +946,20 @@ class BookingReportView {
 		frappe.tools.downloadify(data, null, 'تقرير_الحجوزات');
 	}
 	
+	export_all_bookings(file_format) {
+		let filters = this.get_filters();
+		if (!this.validate_filters(filters)) {
+			return;
+		}
+		
+		re_studio_booking.startExport('Bookings', file_format, {
+			date_range: filters.date_range,
+			start_date: filters.start_date,
+			end_date: filters.end_date,
+			status: filters.status
+		});
+	}
+	
 	print_report() {
 		if (!this.report_data) {
 			frappe.msgprint(__('يرجى إنشاء التقرير أولاً'));
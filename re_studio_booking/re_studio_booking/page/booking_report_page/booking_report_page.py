@@ -7,7 +7,14 @@ from frappe.utils import getdate, add_days, add_months, get_first_day, get_last_
 from datetime import datetime, timedelta
 import json
 
+from re_studio_booking.re_studio_booking.doctype.booking_daily_rollup.booking_daily_rollup import (
+    get_booking_date_bounds,
+    get_rollup_totals
+)
+from re_studio_booking.re_studio_booking.utils.response_cache import cached_response
+
 @frappe.whitelist()
+@cached_response(tags=("booking", "service", "photographer"))
 def generate_report(report_type, date_range, start_date=None, end_date=None, status=None, photographer=None):
     """Generate booking report based on filters"""
     try:
@@ -88,20 +95,18 @@ def generate_booking_summary(filters, status=None):
         order_by='booking_date desc, start_time desc'
     )
     
-    # Calculate status counts
-    status_counts = {}
-    for booking in bookings:
-        if booking.status not in status_counts:
-            status_counts[booking.status] = 0
-        status_counts[booking.status] += 1
-    
-    # Get bookings by date for chart
-    bookings_by_date = {}
-    for booking in bookings:
-        date_str = booking.booking_date.strftime('%Y-%m-%d')
-        if date_str not in bookings_by_date:
-            bookings_by_date[date_str] = 0
-        bookings_by_date[date_str] += 1
+    # Status counts and bookings per date from the daily rollup
+    from_date, to_date = get_booking_date_bounds(filters)
+    rollup_filters = {'status': status} if status and status != 'All' else {}
+    status_counts = {
+        row.status: int(row.booking_count)
+        for row in get_rollup_totals(('status',), from_date, to_date, rollup_filters)
+    }
+    bookings_by_date = {
+        row.rollup_date.strftime('%Y-%m-%d'): int(row.booking_count)
+        for row in get_rollup_totals(('rollup_date',), from_date, to_date, rollup_filters, order_by='rollup_date desc')
+        if row.booking_count
+    }
     
     # Format for chart
     chart_data = {
@@ -121,50 +126,20 @@ def generate_booking_summary(filters, status=None):
 
 def generate_photographer_performance(filters, photographer=None):
     """Generate photographer performance report"""
-    # Add photographer filter if provided
+    # Completed bookings only, for accurate performance metrics
+    rollup_filters = {'status': 'Completed', 'photographer': ('not in', [''])}
     if photographer and photographer != 'All':
-        filters['photographer'] = photographer
-    
-    # Add completed status filter for accurate performance metrics
-    filters['status'] = 'Completed'
-    
-    # Get bookings
-    bookings = frappe.get_all(
-        'Booking',
-        filters=filters,
-        fields=[
-            'name', 'photographer', 'booking_date', 'start_time', 'end_time',
-            'service', 'status', 'total_amount'
-        ]
-    )
-    
-    # Calculate performance by photographer
-    performance = {}
-    for booking in bookings:
-        if not booking.photographer:
-            continue
-            
-        if booking.photographer not in performance:
-            performance[booking.photographer] = {
-                'photographer': booking.photographer,
-                'total_bookings': 0,
-                'total_minutes': 0
-            }
-        
-        # Calculate session duration in minutes
-        try:
-            start_dt = datetime.combine(booking.booking_date, datetime.strptime(booking.start_time, '%H:%M:%S').time())
-            end_dt = datetime.combine(booking.booking_date, datetime.strptime(booking.end_time, '%H:%M:%S').time())
-            duration = (end_dt - start_dt).total_seconds() / 60
-        except Exception:
-            duration = 0
-        
-        performance[booking.photographer]['total_bookings'] += 1
-        performance[booking.photographer]['total_minutes'] += duration
-    
-    # Convert to list and sort by total bookings
-    performance_list = list(performance.values())
-    performance_list.sort(key=lambda x: x['total_bookings'], reverse=True)
+        rollup_filters['photographer'] = photographer
+    
+    from_date, to_date = get_booking_date_bounds(filters)
+    performance_list = [
+        {
+            'photographer': row.photographer,
+            'total_bookings': int(row.booking_count),
+            'total_minutes': int(row.booked_minutes)
+        }
+        for row in get_rollup_totals(('photographer',), from_date, to_date, rollup_filters, order_by='booking_count desc')
+    ]
     
     # Calculate total hours for all photographers
     total_hours = sum(item['total_minutes'] for item in performance_list) / 60
@@ -177,22 +152,21 @@ def generate_photographer_performance(filters, photographer=None):
 
 def generate_service_popularity(filters):
     """Generate service popularity report"""
-    # Get bookings grouped by service
-    service_popularity = frappe.db.sql("""
-        SELECT service, COUNT(*) as booking_count
-        FROM `tabBooking`
-        WHERE {where_conditions}
-        GROUP BY service
-        ORDER BY booking_count DESC
-    """.format(
-        where_conditions=get_where_conditions(filters)
-    ), filters, as_dict=1)
+    # Bookings per service from the daily rollup
+    from_date, to_date = get_booking_date_bounds(filters)
+    service_popularity = [
+        frappe._dict(service=row.service, booking_count=int(row.service_count))
+        for row in get_rollup_totals(
+            ('service',), from_date, to_date, {'service': ('not in', [''])}, order_by='service_count desc'
+        )
+    ]
     
     # Get service details (Arabic name and category)
+    service_details = get_service_details([item.service for item in service_popularity])
     for item in service_popularity:
-        service_doc = frappe.get_doc('Service', item.service)
-        item.service_name = service_doc.service_name_ar
-        item.category = service_doc.category
+        details = service_details.get(item.service, {})
+        item.service_name = details.get('service_name_ar')
+        item.category = details.get('category')
     
     # Calculate total bookings
     total_bookings = sum(item.booking_count for item in service_popularity)
@@ -221,19 +195,12 @@ def generate_service_popularity(filters):
 
 def generate_revenue_report(filters):
     """Generate revenue report"""
-    # Add completed status filter for accurate revenue metrics
-    filters['status'] = 'Completed'
-    
-    # Get revenue by service
-    revenue_by_service = frappe.db.sql("""
-        SELECT service, COUNT(*) as booking_count, SUM(total_amount) as total_revenue
-        FROM `tabBooking`
-        WHERE {where_conditions}
-        GROUP BY service
-        ORDER BY total_revenue DESC
-    """.format(
-        where_conditions=get_where_conditions(filters)
-    ), filters, as_dict=1)
+    # Completed bookings only, for accurate revenue metrics
+    from_date, to_date = get_booking_date_bounds(filters)
+    revenue_by_service = [
+        frappe._dict(service=row.service, booking_count=int(row.service_count), total_revenue=float(row.revenue))
+        for row in get_rollup_totals(('service',), from_date, to_date, {'status': 'Completed'}, order_by='revenue desc')
+    ]
     
     # Calculate total revenue and bookings
     total_revenue = sum(item.total_revenue for item in revenue_by_service)
@@ -245,6 +212,19 @@ def generate_revenue_report(filters):
         'total_bookings': total_bookings
     }
 
+def get_service_details(services):
+    """Service Arabic name and category for many services in one query"""
+    if not services:
+        return {}
+    return {
+        row.name: row
+        for row in frappe.get_all(
+            'Service',
+            filters={'name': ['in', list(services)]},
+            fields=['name', 'service_name_ar', 'category']
+        )
+    }
+
 def get_where_conditions(filters):
     """Generate WHERE clause for SQL queries based on filters"""
     conditions = []
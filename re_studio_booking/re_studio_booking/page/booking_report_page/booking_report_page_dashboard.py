@@ -7,7 +7,15 @@ from frappe.utils import getdate, add_days, add_months, get_first_day, get_last_
 from datetime import datetime, timedelta
 import json
 
+from re_studio_booking.re_studio_booking.doctype.booking_daily_rollup.booking_daily_rollup import (
+    get_booking_date_bounds,
+    get_rollup_totals
+)
+from re_studio_booking.re_studio_booking.page.booking_report_page.booking_report_page import get_service_details
+from re_studio_booking.re_studio_booking.utils.response_cache import cached_response
+
 @frappe.whitelist()
+@cached_response(tags=("booking", "service", "photographer"))
 def get_dashboard_data(date_range):
     """Get dashboard data for booking reports"""
     try:
@@ -79,15 +87,7 @@ def get_date_filters(date_range):
 
 def get_booking_data(filters):
     """Get booking data for dashboard"""
-    # Get all bookings within date range
-    bookings = frappe.get_all(
-        'Booking',
-        filters=filters,
-        fields=[
-            'name', 'customer_name', 'booking_date', 'start_time', 'end_time',
-            'service', 'photographer', 'status', 'total_amount'
-        ]
-    )
+    from_date, to_date = get_booking_date_bounds(filters)
     
     # Calculate status counts
     status_counts = {
@@ -96,77 +96,61 @@ def get_booking_data(filters):
         'Cancelled': 0
     }
     
-    for booking in bookings:
-        if booking.status in status_counts:
-            status_counts[booking.status] += 1
-        else:
-            status_counts[booking.status] = 1
+    for row in get_rollup_totals(('status',), from_date, to_date):
+        status_counts[row.status] = status_counts.get(row.status, 0) + int(row.booking_count)
     
     return {
-        'total_bookings': len(bookings),
+        'total_bookings': sum(status_counts.values()),
         'status_counts': status_counts
     }
 
 def get_photographer_performance(filters):
     """Get photographer performance data for dashboard"""
-    # Add completed status filter for accurate performance metrics
-    completed_filters = filters.copy()
-    completed_filters['status'] = 'Completed'
-    
-    # Get bookings grouped by photographer
-    photographer_performance = frappe.db.sql("""
-        SELECT photographer, COUNT(*) as total_bookings, 
-        SUM(TIME_TO_SEC(TIMEDIFF(end_time, start_time)) / 60) as total_minutes
-        FROM `tabBooking`
-        WHERE {where_conditions}
-        GROUP BY photographer
-        ORDER BY total_bookings DESC
-        LIMIT 10
-    """.format(
-        where_conditions=get_where_conditions(completed_filters)
-    ), completed_filters, as_dict=1)
-    
-    return photographer_performance
+    # Completed bookings only, for accurate performance metrics
+    from_date, to_date = get_booking_date_bounds(filters)
+    return [
+        frappe._dict(
+            photographer=row.photographer,
+            total_bookings=int(row.booking_count),
+            total_minutes=int(row.booked_minutes)
+        )
+        for row in get_rollup_totals(
+            ('photographer',), from_date, to_date, {'status': 'Completed'},
+            order_by='booking_count desc', limit=10
+        )
+    ]
 
 def get_service_popularity(filters):
     """Get service popularity data for dashboard"""
-    # Get bookings grouped by service
-    service_popularity = frappe.db.sql("""
-        SELECT service, COUNT(*) as booking_count
-        FROM `tabBooking`
-        WHERE {where_conditions}
-        GROUP BY service
-        ORDER BY booking_count DESC
-        LIMIT 5
-    """.format(
-        where_conditions=get_where_conditions(filters)
-    ), filters, as_dict=1)
+    from_date, to_date = get_booking_date_bounds(filters)
+    service_popularity = [
+        frappe._dict(service=row.service, booking_count=int(row.service_count))
+        for row in get_rollup_totals(
+            ('service',), from_date, to_date, {'service': ('not in', [''])},
+            order_by='service_count desc', limit=5
+        )
+    ]
     
     # Get service details (Arabic name and category)
+    service_details = get_service_details([item.service for item in service_popularity])
     for item in service_popularity:
-        service_doc = frappe.get_doc('Service', item.service)
-        item.service_name = service_doc.service_name_ar
-        item.category = service_doc.category
+        details = service_details.get(item.service, {})
+        item.service_name = details.get('service_name_ar')
+        item.category = details.get('category')
     
     return service_popularity
 
 def get_revenue_data(filters):
     """Get revenue data for dashboard"""
-    # Add completed status filter for accurate revenue metrics
-    completed_filters = filters.copy()
-    completed_filters['status'] = 'Completed'
-    
-    # Get revenue by service
-    revenue_by_service = frappe.db.sql("""
-        SELECT service, COUNT(*) as booking_count, SUM(total_amount) as total_revenue
-        FROM `tabBooking`
-        WHERE {where_conditions}
-        GROUP BY service
-        ORDER BY total_revenue DESC
-        LIMIT 5
-    """.format(
-        where_conditions=get_where_conditions(completed_filters)
-    ), completed_filters, as_dict=1)
+    # Completed bookings only, for accurate revenue metrics
+    from_date, to_date = get_booking_date_bounds(filters)
+    revenue_by_service = [
+        frappe._dict(service=row.service, booking_count=int(row.service_count), total_revenue=float(row.revenue))
+        for row in get_rollup_totals(
+            ('service',), from_date, to_date, {'status': 'Completed'},
+            order_by='revenue desc', limit=5
+        )
+    ]
     
     # Calculate total revenue
     total_revenue = sum(item.total_revenue for item in revenue_by_service)
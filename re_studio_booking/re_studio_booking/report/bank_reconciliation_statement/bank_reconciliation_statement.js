@@ -19,4 +19,80 @@ frappe.query_reports["Bank Reconciliation Statement"] = {
             options: "Bank Account",
         },
     ],
+    onload: function (report) {
+        const method = "re_studio_booking.re_studio_booking.utils.bank_reconciliation";
+
+        report.page.add_inner_button(__("Import Statement"), () => {
+            const dialog = new frappe.ui.Dialog({
+                title: __("Import Bank Statement"),
+                fields: [
+                    {
+                        fieldname: "bank_account",
+                        label: __("Bank Account"),
+                        fieldtype: "Link",
+                        options: "Bank Account",
+                        reqd: 1,
+                        default: report.get_values().bank_account,
+                    },
+                    {
+                        fieldname: "file_url",
+                        label: __("Statement File (CSV / OFX)"),
+                        fieldtype: "Attach",
+                        reqd: 1,
+                    },
+                    {
+                        fieldname: "date_tolerance",
+                        label: __("Date Tolerance (Days)"),
+                        fieldtype: "Int",
+                        default: 3,
+                    },
+                    {
+                        fieldname: "amount_tolerance",
+                        label: __("Amount Tolerance"),
+                        fieldtype: "Currency",
+                        default: 0,
+                    },
+                ],
+                primary_action_label: __("Import and Reconcile"),
+                primary_action: (values) => {
+                    frappe.call({
+                        method: `${method}.import_bank_statement`,
+                        args: values,
+                        callback: () => {
+                            dialog.hide();
+                            frappe.show_alert({ message: __("Statement import queued"), indicator: "blue" });
+                        },
+                    });
+                },
+            });
+            dialog.show();
+        });
+
+        report.page.add_inner_button(__("Reconcile"), () => {
+            const bank_account = report.get_values().bank_account;
+            if (!bank_account) {
+                frappe.msgprint(__("Select a Bank Account first"));
+                return;
+            }
+            frappe.call({
+                method: `${method}.reconcile`,
+                args: { bank_account: bank_account },
+                freeze: true,
+                callback: (r) => show_result(r.message),
+            });
+        });
+
+        const show_result = (result) => {
+            if (result.error) {
+                frappe.msgprint({ title: __("Import Failed"), message: result.error, indicator: "red" });
+                return;
+            }
+            frappe.msgprint(
+                __("Matched {0} of {1} unmatched lines ({2} left)", [result.matched, result.lines, result.unmatched])
+            );
+            report.refresh();
+        };
+
+        frappe.realtime.on("bank_reconciliation_progress", show_result);
+    },
 };
\ No newline at end of file
@@ -1,4 +1,8 @@
 import frappe
+from frappe import _
+from frappe.utils import flt
+
+from re_studio_booking.re_studio_booking.doctype.account_balance_snapshot.account_balance_snapshot import get_balances_before
 
 def execute(filters=None):
     filters = filters or {}
@@ -8,33 +12,60 @@ def execute(filters=None):
         {"label": "Bank Account", "fieldname": "bank_account", "fieldtype": "Data", "width": 200},
         {"label": "Debit", "fieldname": "debit", "fieldtype": "Currency", "width": 120},
         {"label": "Credit", "fieldname": "credit", "fieldtype": "Currency", "width": 120},
+        {"label": "Balance", "fieldname": "balance", "fieldtype": "Currency", "width": 130},
         {"label": "Remarks", "fieldname": "remarks", "fieldtype": "Text", "width": 200},
+        {"label": "Statement Line", "fieldname": "statement_line", "fieldtype": "Link", "options": "Bank Statement Line", "width": 140},
     ]
 
     conditions = []
     values = {}
 
     if filters.get("from_date"):
-        conditions.append("posting_date >= %(from_date)s")
+        conditions.append("gle.posting_date >= %(from_date)s")
         values["from_date"] = filters["from_date"]
     if filters.get("to_date"):
-        conditions.append("posting_date <= %(to_date)s")
+        conditions.append("gle.posting_date <= %(to_date)s")
         values["to_date"] = filters["to_date"]
     if filters.get("bank_account"):
-        conditions.append("bank_account = %(bank_account)s")
+        conditions.append("gle.bank_account = %(bank_account)s")
         values["bank_account"] = filters["bank_account"]
 
     where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
 
     data = frappe.db.sql(
         f"""
-        SELECT posting_date, bank_account, debit, credit, remarks
-        FROM `tabGL Entry`
+        SELECT gle.posting_date, gle.bank_account, gle.debit, gle.credit, gle.remarks,
+            bsl.name AS statement_line
+        FROM `tabGL Entry` gle
+        LEFT JOIN `tabBank Statement Line` bsl ON bsl.gl_entry = gle.name
         {where_clause}
-        ORDER BY posting_date ASC, name ASC
+        ORDER BY gle.posting_date ASC, gle.name ASC
         """,
         values,
         as_dict=True,
     )
 
+    balance = 0.0
+    if filters.get("from_date"):
+        # Balance before the period from the monthly snapshots (O(months), not O(entries))
+        opening = get_balances_before(
+            filters["from_date"], {"bank_account": filters.get("bank_account")}, group_by=()
+        ).get((), {"debit": 0.0, "credit": 0.0})
+        balance = opening["debit"] - opening["credit"]
+        data.insert(0, {
+            "posting_date": filters["from_date"],
+            "bank_account": filters.get("bank_account"),
+            "debit": opening["debit"],
+            "credit": opening["credit"],
+            "balance": balance,
+            "remarks": _("Opening Balance"),
+        })
+        entries = data[1:]
+    else:
+        entries = data
+
+    for row in entries:
+        balance += flt(row["debit"]) - flt(row["credit"])
+        row["balance"] = balance
+
     return columns, data
\ No newline at end of file
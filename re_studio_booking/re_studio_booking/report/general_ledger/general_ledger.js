@@ -18,5 +18,67 @@ frappe.query_reports["General Ledger"] = {
             fieldtype: "Link",
             options: "Account",
         },
+        {
+            fieldname: "party_type",
+            label: "Party Type",
+            fieldtype: "Link",
+            options: "DocType",
+        },
+        {
+            fieldname: "party",
+            label: "Party",
+            fieldtype: "Dynamic Link",
+            options: "party_type",
+        },
+        {
+            fieldname: "group_by",
+            label: "Group By",
+            fieldtype: "Select",
+            options: ["", "Account", "Party", "Voucher"],
+        },
     ],
+    formatter: function (value, row, column, data, default_formatter) {
+        value = default_formatter(value, row, column, data);
+        if (data && data.is_opening) {
+            value = `<b>${value}</b>`;
+        }
+        return value;
+    },
+    onload: function (report) {
+        // Next page of entries, continuing after the last entry row (keyset pagination)
+        report.page.add_inner_button(__("Load More"), () => {
+            const last_row = (report.data || []).filter((row) => row.gl_entry).pop();
+            if (!last_row) return;
+
+            frappe.call({
+                method: "re_studio_booking.re_studio_booking.report.general_ledger.general_ledger.get_next_page",
+                args: {
+                    filters: report.get_values(),
+                    last_row: last_row,
+                },
+                freeze: true,
+                callback: (r) => {
+                    const rows = (r.message && r.message.rows) || [];
+                    if (!rows.length) {
+                        frappe.show_alert({ message: __("No more entries"), indicator: "blue" });
+                        return;
+                    }
+                    report.data = report.data.concat(rows);
+                    report.datatable.refresh(report.data);
+                    if (!r.message.next_cursor) {
+                        frappe.show_alert({ message: __("All entries loaded"), indicator: "green" });
+                    }
+                },
+            });
+        });
+
+        // Large ranges: stream the entries to a file in the background
+        ["CSV", "XLSX"].forEach((file_format) => {
+            report.page.add_inner_button(
+                __("Export {0}", [file_format]),
+                () => re_studio_booking.startExport("GL Entries", file_format, report.get_values()),
+                __("Background Export")
+            );
+        });
+    },
 };
\ No newline at end of file
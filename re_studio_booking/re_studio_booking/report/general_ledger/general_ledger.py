@@ -1,4 +1,10 @@
+import json
+
 import frappe
+from frappe import _
+
+from re_studio_booking.re_studio_booking.utils.ledger import PAGE_SIZE, cursor_from_row, get_ledger_page
+
 
 def execute(filters=None):
     filters = filters or {}
@@ -10,37 +16,34 @@ def execute(filters=None):
         {"label": "Party", "fieldname": "party", "fieldtype": "Data", "width": 180},
         {"label": "Debit", "fieldname": "debit", "fieldtype": "Currency", "width": 120},
         {"label": "Credit", "fieldname": "credit", "fieldtype": "Currency", "width": 120},
+        {"label": "Balance", "fieldname": "balance", "fieldtype": "Currency", "width": 130},
         {"label": "Against", "fieldname": "against", "fieldtype": "Data", "width": 180},
         {"label": "Reference Type", "fieldname": "reference_doctype", "fieldtype": "Data", "width": 140},
         {"label": "Reference", "fieldname": "reference_name", "fieldtype": "Data", "width": 140},
         {"label": "Remarks", "fieldname": "remarks", "fieldtype": "Text", "width": 200},
+        {"label": "GL Entry", "fieldname": "gl_entry", "fieldtype": "Link", "options": "GL Entry", "width": 120},
     ]
 
-    conditions = []
-    values = {}
-
-    if filters.get("from_date"):
-        conditions.append("posting_date >= %(from_date)s")
-        values["from_date"] = filters["from_date"]
-    if filters.get("to_date"):
-        conditions.append("posting_date <= %(to_date)s")
-        values["to_date"] = filters["to_date"]
-    if filters.get("account"):
-        conditions.append("account = %(account)s")
-        values["account"] = filters["account"]
-
-    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
-
-    data = frappe.db.sql(
-        f"""
-        SELECT posting_date, account, party_type, party, debit, credit,
-               against, reference_doctype, reference_name, remarks
-        FROM `tabGL Entry`
-        {where_clause}
-        ORDER BY posting_date ASC, name ASC
-        """,
-        values,
-        as_dict=True,
-    )
-
-    return columns, data
\ No newline at end of file
+    # First page only; the report view loads the next pages with get_next_page
+    page = get_ledger_page(filters, page_size=PAGE_SIZE)
+
+    message = None
+    if page["next_cursor"]:
+        message = _("Showing the first {0} entries. Use Load More for the next page.").format(PAGE_SIZE)
+
+    # Totals of a partial page are misleading; the balance column carries the result
+    return columns, page["rows"], message, None, None, True
+
+
+@frappe.whitelist()
+def get_next_page(filters, last_row):
+    """
+    The page after last_row (the last ledger entry row shown)
+
+    Returns:
+        dict: {"rows", "next_cursor"} as returned by utils.ledger.get_ledger_page
+    """
+    frappe.has_permission("GL Entry", "read", throw=True)
+    filters = frappe._dict(json.loads(filters) if isinstance(filters, str) else filters)
+    last_row = frappe._dict(json.loads(last_row) if isinstance(last_row, str) else last_row)
+    return get_ledger_page(filters, cursor=cursor_from_row(last_row, filters.get("group_by")))
@@ -0,0 +1,29 @@
+frappe.query_reports["Trial Balance"] = {
+    filters: [
+        {
+            fieldname: "from_date",
+            label: "From Date",
+            fieldtype: "Date",
+            default: frappe.datetime.month_start(),
+            reqd: 1,
+        },
+        {
+            fieldname: "to_date",
+            label: "To Date",
+            fieldtype: "Date",
+            default: frappe.datetime.month_end(),
+            reqd: 1,
+        },
+        {
+            fieldname: "cost_center",
+            label: "Cost Center",
+            fieldtype: "Link",
+            options: "Cost Center",
+        },
+        {
+            fieldname: "show_zero_values",
+            label: "Show Zero Values",
+            fieldtype: "Check",
+        },
+    ],
+};
\ No newline at end of file
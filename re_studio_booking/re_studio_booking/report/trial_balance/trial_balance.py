@@ -0,0 +1,49 @@
+import frappe
+from frappe import _
+from frappe.utils import flt
+
+from re_studio_booking.re_studio_booking.doctype.account_balance_snapshot.account_balance_snapshot import (
+    get_balances_as_of,
+    get_balances_before,
+)
+
+
+def execute(filters=None):
+    filters = filters or {}
+    if not filters.get("from_date") or not filters.get("to_date"):
+        frappe.throw(_("From Date and To Date are required"))
+
+    columns = [
+        {"label": "Account", "fieldname": "account", "fieldtype": "Link", "options": "Account", "width": 220},
+        {"label": "Opening (Dr)", "fieldname": "opening_debit", "fieldtype": "Currency", "width": 130},
+        {"label": "Opening (Cr)", "fieldname": "opening_credit", "fieldtype": "Currency", "width": 130},
+        {"label": "Debit", "fieldname": "debit", "fieldtype": "Currency", "width": 130},
+        {"label": "Credit", "fieldname": "credit", "fieldtype": "Currency", "width": 130},
+        {"label": "Closing (Dr)", "fieldname": "closing_debit", "fieldtype": "Currency", "width": 130},
+        {"label": "Closing (Cr)", "fieldname": "closing_credit", "fieldtype": "Currency", "width": 130},
+    ]
+
+    # Two aggregate queries over the monthly snapshots; period movement = closing - opening
+    snapshot_filters = {"cost_center": filters.get("cost_center")}
+    opening = get_balances_before(filters["from_date"], snapshot_filters)
+    closing = get_balances_as_of(filters["to_date"], snapshot_filters)
+
+    data = []
+    for key in sorted(set(opening) | set(closing)):
+        before = opening.get(key, {"debit": 0.0, "credit": 0.0})
+        after = closing.get(key, {"debit": 0.0, "credit": 0.0})
+        opening_balance = before["debit"] - before["credit"]
+        closing_balance = after["debit"] - after["credit"]
+        row = {
+            "account": key[0],
+            "opening_debit": max(opening_balance, 0.0),
+            "opening_credit": max(-opening_balance, 0.0),
+            "debit": flt(after["debit"] - before["debit"]),
+            "credit": flt(after["credit"] - before["credit"]),
+            "closing_debit": max(closing_balance, 0.0),
+            "closing_credit": max(-closing_balance, 0.0),
+        }
+        if filters.get("show_zero_values") or any(abs(value) >= 0.005 for value in list(row.values())[1:]):
+            data.append(row)
+
+    return columns, data
@@ -0,0 +1,78 @@
+# Unit Tests for the bank reconciliation engine (utils/bank_reconciliation.py)
+
+import datetime
+import unittest
+
+from re_studio_booking.re_studio_booking.utils import bank_reconciliation
+
+
+def line(name, transaction_date, amount, reference=""):
+    return {"name": name, "transaction_date": transaction_date, "amount": amount, "reference": reference}
+
+
+def entry(name, posting_date, amount, reference=None):
+    return {"name": name, "posting_date": posting_date, "amount": amount, "reference": reference}
+
+
+class TestStatementParsing(unittest.TestCase):
+    def test_csv_with_deposit_and_withdrawal_columns(self):
+        content = (
+            "Date,Description,Reference,Withdrawal,Deposit\n"
+            "2030-01-02,Studio rent,CHQ 101,\"1,500.00\",\n"
+            "2030-01-03,Booking payment,INV-7,,250.5\n"
+            ",,,,\n"
+        )
+        transactions = bank_reconciliation.parse_statement(content, "statement.csv")
+        self.assertEqual(len(transactions), 2)
+        self.assertEqual(transactions[0]["transaction_date"], datetime.date(2030, 1, 2))
+        self.assertEqual(transactions[0]["amount"], -1500.0)
+        self.assertEqual(transactions[1]["amount"], 250.5)
+        self.assertEqual(transactions[1]["reference"], "INV-7")
+
+    def test_sgml_ofx(self):
+        content = (
+            "OFXHEADER:100\n<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>\n"
+            "<STMTTRN>\n<TRNTYPE>DEBIT\n<DTPOSTED>20300105120000\n<TRNAMT>-40.00\n<FITID>F1\n<NAME>Fuel\n"
+            "<STMTTRN>\n<TRNTYPE>CREDIT\n<DTPOSTED>20300106\n<TRNAMT>100\n<FITID>F2\n<CHECKNUM>55\n"
+            "</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>"
+        )
+        transactions = bank_reconciliation.parse_statement(content, "statement.ofx")
+        self.assertEqual([t["amount"] for t in transactions], [-40.0, 100.0])
+        self.assertEqual([t["reference"] for t in transactions], ["F1", "55"])
+        self.assertEqual(transactions[0]["transaction_date"], datetime.date(2030, 1, 5))
+
+    def test_bracketed_amount_is_negative(self):
+        self.assertEqual(bank_reconciliation.parse_amount("(1,234.50)"), -1234.5)
+
+
+class TestMatchLines(unittest.TestCase):
+    def test_reference_match_wins_over_closer_date(self):
+        lines = [line("L1", "2030-01-10", 100, "inv 7")]
+        entries = [entry("GL-1", "2030-01-10", 100), entry("GL-2", "2030-01-20", 100, "INV7")]
+        self.assertEqual(bank_reconciliation.match_lines(lines, entries), [("L1", "GL-2", "Reference")])
+
+    def test_closest_date_within_window(self):
+        lines = [line("L1", "2030-01-10", 100)]
+        entries = [entry("GL-1", "2030-01-07", 100), entry("GL-2", "2030-01-11", 100), entry("GL-3", "2030-01-10", 99)]
+        self.assertEqual(bank_reconciliation.match_lines(lines, entries), [("L1", "GL-2", "Amount and Date")])
+
+    def test_outside_window_is_not_matched(self):
+        lines = [line("L1", "2030-01-10", 100)]
+        entries = [entry("GL-1", "2030-01-20", 100)]
+        self.assertEqual(bank_reconciliation.match_lines(lines, entries, date_tolerance=3), [])
+
+    def test_each_entry_is_matched_once(self):
+        lines = [line("L1", "2030-01-10", 100), line("L2", "2030-01-10", 100), line("L3", "2030-01-10", 100)]
+        entries = [entry("GL-1", "2030-01-09", 100), entry("GL-2", "2030-01-11", 100)]
+        matches = bank_reconciliation.match_lines(lines, entries)
+        self.assertEqual(len(matches), 2)
+        self.assertEqual({match[1] for match in matches}, {"GL-1", "GL-2"})
+
+    def test_amount_tolerance(self):
+        lines = [line("L1", "2030-01-10", 100.02)]
+        entries = [entry("GL-1", "2030-01-10", 100)]
+        self.assertEqual(bank_reconciliation.match_lines(lines, entries), [])
+        self.assertEqual(
+            bank_reconciliation.match_lines(lines, entries, amount_tolerance=0.05),
+            [("L1", "GL-1", "Amount and Date")],
+        )
@@ -0,0 +1,136 @@
+# Unit Tests for the GL posting engine (utils/gl_posting.py)
+
+import unittest
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from re_studio_booking.re_studio_booking.utils import gl_posting
+from re_studio_booking.re_studio_booking.utils.bank_reconciliation import reconcile_bank_account
+
+
+def journal_entry(name, *lines):
+    return frappe._dict(
+        name=name, posting_date="2030-01-31", remarks=f"JE {name}",
+        entries=[
+            frappe._dict(name=f"{name}-{i}", account=account, debit=debit, credit=credit, remarks=None)
+            for i, (account, debit, credit) in enumerate(lines)
+        ],
+    )
+
+
+class TestGLPosting(unittest.TestCase):
+    def test_one_insert_for_all_vouchers(self):
+        vouchers = [
+            journal_entry("JE-1", ("Cash", 100, 0), ("Sales", 0, 100)),
+            journal_entry("JE-2", ("Cash", 40, 0), ("Sales", 0, 40), ("Rounding", 0, 0)),
+        ]
+        with patch.object(frappe.db, "bulk_insert", create=True) as bulk_insert, \
+                patch.object(gl_posting, "apply_gl_entries") as apply_gl_entries:
+            self.assertEqual(gl_posting.make_gl_entries(vouchers), 4)
+
+        bulk_insert.assert_called_once()
+        doctype, fields, values = bulk_insert.call_args[0]
+        self.assertEqual(doctype, "GL Entry")
+        self.assertEqual(len(values), 4)
+        voucher_no = fields.index("voucher_no")
+        self.assertEqual([row[voucher_no] for row in values], ["JE-1", "JE-1", "JE-2", "JE-2"])
+        apply_gl_entries.assert_called_once()
+
+    def test_reversal_swaps_debit_and_credit(self):
+        je = journal_entry("JE-1", ("Cash", 100, 0), ("Sales", 0, 100))
+        original = gl_posting.get_gl_rows([je])
+        reversal = gl_posting.get_gl_rows([je], reversal=True)
+
+        self.assertEqual([(row.debit, row.credit) for row in reversal], [(0.0, 100.0), (100.0, 0.0)])
+        self.assertTrue(all(row.is_reversal for row in reversal))
+        # reversal rows get their own names; re-posting reuses the original ones
+        self.assertFalse({row.name for row in original} & {row.name for row in reversal})
+        self.assertEqual([row.name for row in original], [row.name for row in gl_posting.get_gl_rows([je])])
+
+
+def make_if_missing(doctype, name, **values):
+    if not frappe.db.exists(doctype, name):
+        frappe.get_doc({"doctype": doctype, **values}).insert(ignore_permissions=True)
+    return name
+
+
+class TestGLPostingBankMatches(FrappeTestCase):
+    """Bank statement lines are released when their GL Entries are reversed or deleted"""
+
+    POSTING_DATE = "2031-05-10"
+
+    def setUp(self):
+        make_if_missing("Currency", "SAR", currency_name="SAR", enabled=1)
+        self.bank = make_if_missing(
+            "Account", "_Test GL Bank", account_name="_Test GL Bank", account_type="Asset", currency="SAR"
+        )
+        self.sales = make_if_missing(
+            "Account", "_Test GL Sales", account_name="_Test GL Sales", account_type="Income", currency="SAR"
+        )
+        self.bank_account = f"_T-GL-{frappe.generate_hash(length=8)}"
+        # inserted directly: the Bank master is not needed here
+        frappe.get_doc({
+            "doctype": "Bank Account", "account_number": self.bank_account, "account_name": "_Test GL Bank",
+            "currency": "SAR", "is_active": 1,
+        }).db_insert()
+
+    def tearDown(self):
+        frappe.db.rollback()
+
+    def submit_journal_entry(self, amount):
+        je = frappe.get_doc({
+            "doctype": "Journal Entry",
+            "voucher_type": "Journal Entry",
+            "posting_date": self.POSTING_DATE,
+            "entries": [
+                {"account": self.bank, "bank_account": self.bank_account, "debit": amount},
+                {"account": self.sales, "credit": amount},
+            ],
+        })
+        je.insert(ignore_permissions=True)
+        je.submit()
+        return je
+
+    def match_line(self, je):
+        gl_entry = frappe.db.get_value(
+            "GL Entry", {"voucher_no": je.name, "bank_account": self.bank_account, "is_reversal": 0}, "name"
+        )
+        line = frappe.get_doc({
+            "doctype": "Bank Statement Line", "bank_account": self.bank_account,
+            "transaction_date": self.POSTING_DATE, "amount": je.total_debit,
+            "status": "Matched", "match_type": "Amount and Date", "gl_entry": gl_entry,
+        })
+        line.db_insert()
+        return line.name
+
+    def line_state(self, line):
+        return tuple(frappe.db.get_value("Bank Statement Line", line, ["status", "gl_entry"]))
+
+    def test_cancel_releases_the_line_and_reconcile_skips_the_voucher(self):
+        je = self.submit_journal_entry(250)
+        line = self.match_line(je)
+
+        je.cancel()
+        self.assertEqual(self.line_state(line), ("Unmatched", None))
+
+        # the reversed voucher's rows are not offered again
+        self.assertEqual(reconcile_bank_account(self.bank_account)["matched"], 0)
+        self.assertEqual(self.line_state(line), ("Unmatched", None))
+
+    def test_deleted_entries_release_the_line(self):
+        je = self.submit_journal_entry(80)
+        line = self.match_line(je)
+
+        gl_posting.delete_gl_entries([je.name])
+        self.assertEqual(self.line_state(line), ("Unmatched", None))
+
+    def test_repost_keeps_matches_of_submitted_vouchers(self):
+        je = self.submit_journal_entry(120)
+        line = self.match_line(je)
+        gl_entry = self.line_state(line)[1]
+
+        gl_posting.repost_gl_entries(self.POSTING_DATE, self.POSTING_DATE, commit=False)
+        self.assertEqual(self.line_state(line), ("Matched", gl_entry))
+        self.assertTrue(frappe.db.exists("GL Entry", gl_entry))
@@ -0,0 +1,146 @@
+# Unit Tests for the invoice status recomputation (utils/invoice_status.py)
+
+import unittest
+from unittest.mock import patch
+
+import frappe
+from frappe.tests.utils import FrappeTestCase
+
+from re_studio_booking.re_studio_booking.utils import invoice_status
+
+
+def invoice(name, status, new_status):
+    return frappe._dict(name=name, status=status, new_status=new_status)
+
+
+class TestInvoiceStatus(unittest.TestCase):
+    def test_only_changed_invoices_are_updated_per_status(self):
+        rows = [
+            invoice("INV-1", "Partially Paid", "Overdue"),
+            invoice("INV-2", "Submitted", "Overdue"),
+            invoice("INV-3", "Paid", "Paid"),
+            invoice("INV-4", "Overdue", "Paid"),
+        ]
+        with patch.object(frappe.db, "sql") as sql:
+            transitions = invoice_status.update_statuses(rows)
+
+        self.assertEqual(sql.call_count, 3)
+        updates = {
+            (call[0][1]["old_status"], call[0][1]["status"]): call[0][1]["names"] for call in sql.call_args_list
+        }
+        self.assertEqual(updates, {
+            ("Partially Paid", "Overdue"): ["INV-1"],
+            ("Submitted", "Overdue"): ["INV-2"],
+            ("Overdue", "Paid"): ["INV-4"],
+        })
+        self.assertEqual(transitions[("Partially Paid", "Overdue")], 1)
+        self.assertNotIn(("Paid", "Paid"), transitions)
+
+    def test_chunks_continue_after_the_last_name(self):
+        chunks = [
+            [invoice("INV-1", "Submitted", "Overdue"), invoice("INV-2", "Paid", "Paid")],
+            [invoice("INV-3", "Partially Paid", "Partially Paid")],
+        ]
+        with patch.object(invoice_status, "get_status_chunk", side_effect=chunks) as get_chunk, \
+                patch.object(frappe.db, "sql"), \
+                patch.object(frappe, "publish_realtime", create=True) as publish:
+            summary = invoice_status.recompute_invoice_statuses(chunk_size=2, today="2030-01-10", commit=False)
+
+        self.assertEqual([call[0][0] for call in get_chunk.call_args_list], ["", "INV-2"])
+        self.assertEqual(summary["checked"], 3)
+        self.assertEqual(summary["updated"], 1)
+        self.assertEqual(summary["transitions"], [{"from": "Submitted", "to": "Overdue", "count": 1}])
+        self.assertEqual(summary["by_status"], {"Overdue": 1, "Paid": 1, "Partially Paid": 1})
+        publish.assert_called_once_with(invoice_status.SUMMARY_EVENT, summary)
+
+
+class TestInvoiceStatusDatabase(FrappeTestCase):
+    """recompute_invoice_statuses against real invoices and payment rows"""
+
+    TODAY = "2030-01-10"
+
+    def setUp(self):
+        self.prefix = f"_Test INV-STATUS-{frappe.generate_hash(length=6)}"
+
+    def tearDown(self):
+        frappe.db.rollback()
+
+    def seed_invoice(self, suffix, status, total_amount, paid_amount=0, due_date=None, payments=()):
+        name = f"{self.prefix}-{suffix}"
+        frappe.get_doc({
+            "doctype": "Booking Invoice",
+            "name": name,
+            "client": "_Test Client",
+            "client_name": "_Test Client",
+            "booking": "_Test Booking",
+            "invoice_date": "2030-01-01",
+            "due_date": due_date,
+            "status": status,
+            "total_amount": total_amount,
+            "paid_amount": paid_amount,
+        }).db_insert()
+        for idx, (date, amount) in enumerate(payments, 1):
+            frappe.get_doc({
+                "doctype": "Payment Table",
+                "parent": name,
+                "parenttype": "Booking Invoice",
+                "parentfield": "payment_table",
+                "idx": idx,
+                "date": date,
+                "paid_amount": amount,
+            }).db_insert()
+        return name
+
+    def test_statuses_are_written_to_the_database(self):
+        unpaid = self.seed_invoice("UNPAID", "Submitted", 500, due_date="2030-01-05")
+        partial = self.seed_invoice(
+            "PARTIAL", "Partially Paid", 500, paid_amount=200,
+            payments=[("2030-01-02", 100), ("2030-01-07", 100)],
+        )
+        recent = self.seed_invoice(
+            "RECENT", "Partially Paid", 500, paid_amount=100, payments=[("2030-01-09", 100)],
+        )
+        paid = self.seed_invoice("PAID", "Overdue", 500, paid_amount=500, payments=[("2030-01-08", 500)])
+        draft = self.seed_invoice("DRAFT", "Draft", 500, due_date="2030-01-05")
+
+        summary = invoice_status.recompute_invoice_statuses(today=self.TODAY, commit=False, publish=False)
+
+        statuses = dict(frappe.db.sql(
+            "SELECT name, status FROM `tabBooking Invoice` WHERE name LIKE %s", (self.prefix + "%",)
+        ))
+        self.assertEqual(statuses, {
+            unpaid: "Overdue",
+            partial: "Overdue",
+            recent: "Partially Paid",
+            paid: "Paid",
+            draft: "Draft",
+        })
+        self.assertGreaterEqual(summary["checked"], 5)
+        self.assertGreaterEqual(summary["updated"], 3)
+
+        # a second run finds nothing left to change for these invoices
+        modified = dict(frappe.db.sql(
+            "SELECT name, modified FROM `tabBooking Invoice` WHERE name LIKE %s", (self.prefix + "%",)
+        ))
+        invoice_status.recompute_invoice_statuses(today=self.TODAY, commit=False, publish=False)
+        self.assertEqual(dict(frappe.db.sql(
+            "SELECT name, modified FROM `tabBooking Invoice` WHERE name LIKE %s", (self.prefix + "%",)
+        )), modified)
+
+    def test_invoice_changed_after_the_select_keeps_its_status(self):
+        unpaid = self.seed_invoice("UNPAID", "Submitted", 500, due_date="2030-01-05")
+        cancelled = self.seed_invoice("CANCELLED", "Partially Paid", 500, paid_amount=100,
+            payments=[("2030-01-02", 100)])
+        rows = [
+            row for row in invoice_status.get_status_chunk(self.prefix, self.TODAY, 1000)
+            if row.name.startswith(self.prefix)
+        ]
+        self.assertEqual({row.name: row.new_status for row in rows}, {unpaid: "Overdue", cancelled: "Overdue"})
+
+        # paid and cancelled by other requests between the SELECT and the UPDATE
+        frappe.db.set_value("Booking Invoice", unpaid, {"status": "Paid", "paid_amount": 500})
+        frappe.db.set_value("Booking Invoice", cancelled, "status", "Cancelled")
+        invoice_status.update_statuses(rows)
+
+        self.assertEqual(frappe.db.get_value("Booking Invoice", unpaid, "status"), "Paid")
+        self.assertEqual(frappe.db.get_value("Booking Invoice", cancelled, "status"), "Cancelled")
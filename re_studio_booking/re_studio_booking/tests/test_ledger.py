@@ -0,0 +1,68 @@
+# Unit Tests for the GL ledger engine (utils/ledger.py)
+
+import unittest
+from unittest.mock import patch
+
+import frappe
+
+from re_studio_booking.re_studio_booking.utils import ledger
+
+
+def entry(name, account, posting_date, debit=0, credit=0):
+    return frappe._dict(
+        name=name, account=account, posting_date=posting_date, debit=debit, credit=credit,
+        party_type=None, party=None, against=None, reference_doctype=None, reference_name=None, remarks=None,
+    )
+
+
+class TestLedgerPage(unittest.TestCase):
+    filters = {"from_date": "2030-01-01", "to_date": "2030-12-31", "group_by": "Account"}
+
+    def test_openings_and_running_balance_per_group(self):
+        entries = [
+            entry("GL-1", "Bank", "2030-01-02", debit=100),
+            entry("GL-2", "Bank", "2030-01-03", credit=30),
+            entry("GL-3", "Cash", "2030-01-02", debit=10),
+        ]
+        openings = {("Bank",): {"debit": 500, "credit": 200}}
+        with patch.object(ledger, "fetch_entries", return_value=entries), \
+                patch.object(ledger, "get_opening_balances", return_value=openings) as get_openings:
+            page = ledger.get_ledger_page(self.filters, page_size=10)
+
+        # One aggregate call for every group starting in the page
+        get_openings.assert_called_once()
+        self.assertEqual(get_openings.call_args[0][2], [("Bank",), ("Cash",)])
+        self.assertEqual(
+            [(row.get("gl_entry"), row.balance) for row in page["rows"]],
+            [(None, 300), ("GL-1", 400), ("GL-2", 370), (None, 0), ("GL-3", 10)],
+        )
+        self.assertIsNone(page["next_cursor"])
+
+    def test_cursor_carries_the_balance(self):
+        first = [entry("GL-1", "Bank", "2030-01-02", debit=100), entry("GL-2", "Bank", "2030-01-03", debit=5)]
+        with patch.object(ledger, "fetch_entries", return_value=first), \
+                patch.object(ledger, "get_opening_balances", return_value={}):
+            page = ledger.get_ledger_page(self.filters, page_size=1)
+
+        cursor = page["next_cursor"]
+        self.assertEqual(cursor, {"key": ["Bank"], "posting_date": "2030-01-02", "name": "GL-1", "balance": 100})
+        self.assertEqual(ledger.cursor_from_row(page["rows"][-1], "Account"), cursor)
+
+        second = [entry("GL-2", "Bank", "2030-01-03", debit=5)]
+        with patch.object(ledger, "fetch_entries", return_value=second), \
+                patch.object(ledger, "get_opening_balances", return_value={}) as get_openings:
+            page = ledger.get_ledger_page(self.filters, cursor=cursor, page_size=1)
+
+        # The continued group has no new opening row
+        self.assertEqual(get_openings.call_args[0][2], [])
+        self.assertEqual([(row.gl_entry, row.balance) for row in page["rows"]], [("GL-2", 105)])
+
+    def test_keyset_condition(self):
+        values = {}
+        condition = ledger.keyset_condition(["account", "posting_date", "name"], ["Bank", "2030-01-02", "GL-1"], values)
+        self.assertEqual(
+            condition,
+            "((account > %(cursor_0)s) OR (account = %(cursor_0)s AND posting_date > %(cursor_1)s)"
+            " OR (account = %(cursor_0)s AND posting_date = %(cursor_1)s AND name > %(cursor_2)s))",
+        )
+        self.assertEqual(values, {"cursor_0": "Bank", "cursor_1": "2030-01-02", "cursor_2": "GL-1"})
@@ -0,0 +1,41 @@
+# Unit Tests for the realtime publisher metrics (utils/realtime_publisher.py)
+
+import threading
+import unittest
+
+from re_studio_booking.re_studio_booking.utils import realtime_publisher
+
+WORKERS = 8
+FLUSHES_PER_WORKER = 50
+
+
+class TestRealtimeMetrics(unittest.TestCase):
+    def setUp(self):
+        realtime_publisher.get_realtime_metrics(reset=True)
+
+    def tearDown(self):
+        realtime_publisher.get_realtime_metrics(reset=True)
+
+    def test_concurrent_flushes_are_all_counted(self):
+        metrics = {"queued": 3, "coalesced": 1, "emitted": 2, "flushes": 1}
+
+        def flush():
+            for _ in range(FLUSHES_PER_WORKER):
+                realtime_publisher._record_metrics(metrics)
+
+        threads = [threading.Thread(target=flush) for _ in range(WORKERS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        flushes = WORKERS * FLUSHES_PER_WORKER
+        self.assertEqual(
+            realtime_publisher.get_realtime_metrics(),
+            {field: count * flushes for field, count in metrics.items()},
+        )
+
+    def test_reset_returns_totals_and_clears_them(self):
+        realtime_publisher._record_metrics({"queued": 2, "coalesced": 0, "emitted": 1, "flushes": 1})
+        self.assertEqual(realtime_publisher.get_realtime_metrics(reset=True)["queued"], 2)
+        self.assertEqual(realtime_publisher.get_realtime_metrics(), dict.fromkeys(realtime_publisher.METRIC_FIELDS, 0))
@@ -0,0 +1,392 @@
+# Copyright (c) 2025, Masar Digital Group and contributors
+# For license information, please see license.txt
+
+# Bank reconciliation engine
+#
+# Statement files (CSV / OFX) are imported into Bank Statement Line, one row per
+# transaction, named by a hash of its content so re-importing a file is a no-op.
+# Matching works on the unmatched lines only: the open GL Entries of the bank
+# account in the date range are indexed in dictionaries by (reference, amount)
+# and by amount, so every line is matched with hash lookups plus a bisect in a
+# small date-sorted bucket instead of a scan of all entries. Matches are stored
+# on the statement line (gl_entry is unique), so a GL Entry is never matched
+# twice and later runs skip everything already reconciled.
+
+import csv
+import hashlib
+import io
+import re
+from bisect import bisect_left
+from collections import defaultdict
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, cint, flt, getdate, now
+
+STATEMENT_DOCTYPE = "Bank Statement Line"
+PROGRESS_EVENT = "bank_reconciliation_progress"
+DATE_TOLERANCE = 3
+UPDATE_CHUNK_SIZE = 1000
+
+STATEMENT_FIELDS = (
+    "name", "bank_account", "transaction_date", "amount", "reference", "description", "source_file", "status",
+)
+
+# Accepted CSV headers (lower case) for each statement column
+CSV_COLUMNS = {
+    "transaction_date": ("date", "transaction date", "posting date", "value date"),
+    "amount": ("amount",),
+    "deposit": ("deposit", "credit", "money in"),
+    "withdrawal": ("withdrawal", "debit", "money out"),
+    "reference": ("reference", "ref", "cheque", "cheque number", "transaction id"),
+    "description": ("description", "narration", "details", "memo"),
+}
+
+OFX_TRANSACTION = re.compile(r"<STMTTRN>(.*?)(?:</STMTTRN>|(?=<STMTTRN>)|(?=</BANKTRANLIST>))", re.S | re.I)
+OFX_TAG = re.compile(r"<([A-Z0-9.]+)>([^<\r\n]*)", re.I)
+
+
+# ============ Parsing ============
+
+def parse_statement(content, file_name=None):
+    """
+    Statement transactions from a CSV or OFX file
+
+    Returns:
+        list: [{"transaction_date", "amount", "reference", "description"}]
+    """
+    if isinstance(content, bytes):
+        content = content.decode("utf-8-sig", errors="replace")
+    if (file_name or "").lower().endswith((".ofx", ".qfx")) or "<OFX>" in content[:4096].upper():
+        return parse_ofx(content)
+    return parse_csv(content)
+
+
+def parse_csv(content):
+    reader = csv.reader(io.StringIO(content.lstrip("\ufeff")))
+    header = next(reader, None)
+    if not header:
+        return []
+
+    positions = {}
+    labels = [label.strip().lower() for label in header]
+    for column, names in CSV_COLUMNS.items():
+        for i, label in enumerate(labels):
+            if label in names:
+                positions[column] = i
+                break
+
+    if "transaction_date" not in positions or not ("amount" in positions or "deposit" in positions or "withdrawal" in positions):
+        frappe.throw(_("The statement needs a date column and an amount (or deposit / withdrawal) column"))
+
+    def value(row, column):
+        i = positions.get(column)
+        return row[i].strip() if i is not None and i < len(row) else ""
+
+    transactions = []
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        if "amount" in positions:
+            amount = parse_amount(value(row, "amount"))
+        else:
+            amount = parse_amount(value(row, "deposit")) - parse_amount(value(row, "withdrawal"))
+        transactions.append({
+            "transaction_date": getdate(value(row, "transaction_date")),
+            "amount": amount,
+            "reference": value(row, "reference"),
+            "description": value(row, "description"),
+        })
+    return transactions
+
+
+def parse_ofx(content):
+    """OFX 1.x (SGML, tags without closing tags) and 2.x (XML) bank transactions"""
+    transactions = []
+    for block in OFX_TRANSACTION.findall(content):
+        tags = {tag.upper(): text.strip() for tag, text in OFX_TAG.findall(block)}
+        if not tags.get("DTPOSTED") or not tags.get("TRNAMT"):
+            continue
+        posted = tags["DTPOSTED"][:8]
+        transactions.append({
+            "transaction_date": getdate(f"{posted[:4]}-{posted[4:6]}-{posted[6:8]}"),
+            "amount": parse_amount(tags["TRNAMT"]),
+            "reference": tags.get("CHECKNUM") or tags.get("REFNUM") or tags.get("FITID") or "",
+            "description": " ".join(filter(None, (tags.get("NAME"), tags.get("MEMO")))),
+        })
+    return transactions
+
+
+def parse_amount(text):
+    """1,234.50 / (1,234.50) / -1234.5 -> float"""
+    text = (text or "").strip().replace(",", "").replace(" ", "")
+    if text.startswith("(") and text.endswith(")"):
+        text = "-" + text[1:-1]
+    return flt(text)
+
+
+# ============ Import ============
+
+def import_statement(bank_account, transactions, source_file=None):
+    """
+    Insert statement transactions as Bank Statement Line rows
+
+    Lines already imported (same content hash) are ignored, so the same file or
+    overlapping exports can be imported again safely.
+
+    Returns:
+        int: number of new lines
+    """
+    timestamp = now()
+    user = frappe.session.user
+    occurrences = defaultdict(int)
+    rows = []
+    for transaction in transactions:
+        key = (
+            bank_account, str(transaction["transaction_date"]), amount_key(transaction["amount"]),
+            normalize_reference(transaction.get("reference")), (transaction.get("description") or "").strip(),
+        )
+        # identical lines on the same day are different transactions
+        occurrences[key] += 1
+        name = hashlib.md5("\x1f".join(map(str, key + (occurrences[key],))).encode()).hexdigest()
+        rows.append((
+            name, timestamp, timestamp, user, user, bank_account, transaction["transaction_date"],
+            flt(transaction["amount"]), transaction.get("reference") or "", transaction.get("description") or "",
+            source_file, "Unmatched",
+        ))
+
+    if not rows:
+        return 0
+
+    before = frappe.db.count(STATEMENT_DOCTYPE, {"bank_account": bank_account})
+    frappe.db.bulk_insert(
+        STATEMENT_DOCTYPE,
+        ["name", "creation", "modified", "owner", "modified_by"] + list(STATEMENT_FIELDS[1:]),
+        rows,
+        ignore_duplicates=True,
+    )
+    return frappe.db.count(STATEMENT_DOCTYPE, {"bank_account": bank_account}) - before
+
+
+# ============ Matching ============
+
+def amount_key(amount):
+    """Amounts are compared in cents"""
+    return int(round(flt(amount) * 100))
+
+
+def normalize_reference(reference):
+    return re.sub(r"\s+", "", reference or "").upper()
+
+
+def match_lines(lines, entries, date_tolerance=DATE_TOLERANCE, amount_tolerance=0):
+    """
+    Match statement lines to GL Entries (pure, no database access)
+
+    1. Same reference and amount, closest date
+    2. Amount within amount_tolerance and date within date_tolerance days,
+       closest date first, then closest amount
+
+    Args:
+        lines: [{"name", "transaction_date", "amount", "reference"}]
+        entries: [{"name", "posting_date", "amount", "reference"}] (amount = debit - credit)
+
+    Returns:
+        list: [(line name, GL Entry name, match type)]
+    """
+    date_tolerance = cint(date_tolerance)
+    cents_tolerance = abs(amount_key(amount_tolerance))
+
+    by_reference = defaultdict(list)
+    by_amount = defaultdict(list)
+    for i, entry in enumerate(entries):
+        day = getdate(entry["posting_date"]).toordinal()
+        cents = amount_key(entry["amount"])
+        reference = normalize_reference(entry.get("reference"))
+        if reference:
+            by_reference[(reference, cents)].append((day, i))
+        by_amount[cents].append((day, i))
+    for bucket in by_amount.values():
+        bucket.sort()
+
+    def take(cents, item):
+        bucket = by_amount[cents]
+        del bucket[bisect_left(bucket, item)]
+
+    matches = []
+    remaining = []
+    used = set()
+    for line in lines:
+        day = getdate(line["transaction_date"]).toordinal()
+        cents = amount_key(line["amount"])
+        reference = normalize_reference(line.get("reference"))
+        candidates = [item for item in by_reference.get((reference, cents), ()) if item[1] not in used] if reference else ()
+        if candidates:
+            item = min(candidates, key=lambda candidate: abs(candidate[0] - day))
+            used.add(item[1])
+            take(cents, item)
+            matches.append((line["name"], entries[item[1]]["name"], "Reference"))
+        else:
+            remaining.append((day, cents, line))
+
+    remaining.sort(key=lambda row: row[0])
+    for day, cents, line in remaining:
+        best = None
+        for candidate_cents in range(cents - cents_tolerance, cents + cents_tolerance + 1):
+            bucket = by_amount.get(candidate_cents)
+            if not bucket:
+                continue
+            # used entries are removed from the buckets, so the closest open
+            # entries are the neighbours of the line date
+            position = bisect_left(bucket, (day, -1))
+            for item in bucket[max(position - 1, 0):position + 1]:
+                distance = abs(item[0] - day)
+                if distance > date_tolerance:
+                    continue
+                rank = (distance, abs(candidate_cents - cents), item[0])
+                if best is None or rank < best[0]:
+                    best = (rank, candidate_cents, item)
+        if best:
+            rank, candidate_cents, item = best
+            used.add(item[1])
+            take(candidate_cents, item)
+            matches.append((line["name"], entries[item[1]]["name"], "Amount and Date"))
+
+    return matches
+
+
+def reconcile_bank_account(bank_account, date_tolerance=DATE_TOLERANCE, amount_tolerance=0):
+    """
+    Match the unmatched statement lines of a bank account to its open GL Entries
+    (rows of reversed vouchers are not open)
+
+    Returns:
+        dict: {"lines", "matched", "unmatched"}
+    """
+    date_tolerance = cint(date_tolerance)
+    lines = frappe.db.sql(
+        """
+        SELECT name, transaction_date, amount, reference
+        FROM `tabBank Statement Line`
+        WHERE bank_account = %s AND status = 'Unmatched'
+        """,
+        bank_account,
+        as_dict=True,
+    )
+    if not lines:
+        return {"lines": 0, "matched": 0, "unmatched": 0}
+
+    dates = [getdate(line.transaction_date) for line in lines]
+    entries = frappe.db.sql(
+        """
+        SELECT gle.name, gle.posting_date, gle.debit - gle.credit AS amount, gle.reference_name AS reference
+        FROM `tabGL Entry` gle
+        LEFT JOIN `tabBank Statement Line` bsl ON bsl.gl_entry = gle.name
+        WHERE gle.bank_account = %(bank_account)s
+            AND gle.posting_date BETWEEN %(from_date)s AND %(to_date)s
+            AND bsl.name IS NULL
+            AND IFNULL(gle.is_reversal, 0) = 0
+            AND NOT EXISTS (
+                SELECT 1 FROM `tabGL Entry` rev
+                WHERE rev.voucher_type = gle.voucher_type AND rev.voucher_no = gle.voucher_no AND rev.is_reversal = 1
+            )
+        """,
+        {
+            "bank_account": bank_account,
+            "from_date": add_days(min(dates), -date_tolerance),
+            "to_date": add_days(max(dates), date_tolerance),
+        },
+        as_dict=True,
+    )
+
+    matches = match_lines(lines, entries, date_tolerance, amount_tolerance)
+    save_matches(matches)
+    return {"lines": len(lines), "matched": len(matches), "unmatched": len(lines) - len(matches)}
+
+
+def save_matches(matches):
+    """Store matches with one UPDATE per chunk (CASE on the line name)"""
+    timestamp = now()
+    for start in range(0, len(matches), UPDATE_CHUNK_SIZE):
+        chunk = matches[start:start + UPDATE_CHUNK_SIZE]
+        values = {"now": timestamp, "user": frappe.session.user, "names": [line for line, entry, match_type in chunk]}
+        entry_cases = []
+        type_cases = []
+        for i, (line, entry, match_type) in enumerate(chunk):
+            values[f"line_{i}"] = line
+            values[f"entry_{i}"] = entry
+            values[f"type_{i}"] = match_type
+            entry_cases.append(f"WHEN %(line_{i})s THEN %(entry_{i})s")
+            type_cases.append(f"WHEN %(line_{i})s THEN %(type_{i})s")
+        frappe.db.sql(
+            f"""
+            UPDATE `tabBank Statement Line`
+            SET status = 'Matched',
+                gl_entry = CASE name {" ".join(entry_cases)} END,
+                match_type = CASE name {" ".join(type_cases)} END,
+                matched_on = %(now)s,
+                modified = %(now)s,
+                modified_by = %(user)s
+            WHERE name IN %(names)s AND status = 'Unmatched'
+            """,
+            values,
+        )
+
+
+def unmatch_gl_entries(gl_entries):
+    """Return the lines matched to deleted / changed GL Entries to the unmatched pool"""
+    if gl_entries:
+        frappe.db.sql(
+            """
+            UPDATE `tabBank Statement Line`
+            SET status = 'Unmatched', gl_entry = NULL, match_type = NULL, matched_on = NULL
+            WHERE gl_entry IN %(gl_entries)s
+            """,
+            {"gl_entries": list(gl_entries)},
+        )
+
+
+# ============ API ============
+
+@frappe.whitelist()
+def import_bank_statement(bank_account, file_url, date_tolerance=DATE_TOLERANCE, amount_tolerance=0):
+    """Import a statement file (File attachment) and reconcile in a background job"""
+    frappe.only_for("System Manager")
+    if not frappe.db.exists("Bank Account", bank_account):
+        frappe.throw(_("Bank Account {0} not found").format(bank_account))
+    frappe.enqueue(
+        "re_studio_booking.re_studio_booking.utils.bank_reconciliation.run_import",
+        queue="long",
+        timeout=3600,
+        bank_account=bank_account,
+        file_url=file_url,
+        date_tolerance=cint(date_tolerance),
+        amount_tolerance=flt(amount_tolerance),
+        user=frappe.session.user,
+        enqueue_after_commit=True,
+    )
+    return {"queued": True}
+
+
+@frappe.whitelist()
+def reconcile(bank_account, date_tolerance=DATE_TOLERANCE, amount_tolerance=0):
+    """Match the remaining unmatched lines again (e.g. after new GL Entries were posted)"""
+    frappe.only_for("System Manager")
+    return reconcile_bank_account(bank_account, date_tolerance, flt(amount_tolerance))
+
+
+def run_import(bank_account, file_url, date_tolerance=DATE_TOLERANCE, amount_tolerance=0, user=None):
+    result = {"bank_account": bank_account}
+    try:
+        file_doc = frappe.get_doc("File", {"file_url": file_url})
+        transactions = parse_statement(file_doc.get_content(), file_doc.file_name)
+        result["imported"] = import_statement(bank_account, transactions, file_doc.file_name)
+        result.update(reconcile_bank_account(bank_account, date_tolerance, amount_tolerance))
+        frappe.db.commit()
+    except Exception as e:
+        frappe.db.rollback()
+        result["error"] = str(e)
+        frappe.log_error(title=_("Bank statement import failed"), message=frappe.get_traceback())
+
+    frappe.publish_realtime(PROGRESS_EVENT, result, user=user or frappe.session.user)
+    return result
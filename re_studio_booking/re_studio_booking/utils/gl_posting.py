@@ -0,0 +1,198 @@
+# Copyright (c) 2025, Masar Digital Group and contributors
+# For license information, please see license.txt
+
+# GL posting engine for Journal Entry
+#
+# Submitting a Journal Entry writes one GL Entry per line with a single
+# multi-row INSERT (frappe.db.bulk_insert), and cancelling writes the reversal
+# rows (debit and credit swapped) the same way. Rows bypass the GL Entry
+# document hooks, so the balance snapshots are updated here with one upsert per
+# batch. GL Entry names are derived from the voucher line, so a re-post writes
+# the same names back and links to them (bank statement matches) survive;
+# deleted rows that are not written back release their bank statement lines.
+
+import hashlib
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt, now
+
+from re_studio_booking.re_studio_booking.doctype.account_balance_snapshot.account_balance_snapshot import apply_gl_entries
+from re_studio_booking.re_studio_booking.utils.bank_reconciliation import unmatch_gl_entries
+
+VOUCHER_TYPE = "Journal Entry"
+REPOST_CHUNK_SIZE = 500
+
+LINE_FIELDS = (
+    "account", "party_type", "party", "bank_account", "cost_center", "against", "reference_doctype", "reference_name",
+)
+
+GL_FIELDS = (
+    "name", "creation", "modified", "owner", "modified_by", "posting_date", "debit", "credit",
+) + LINE_FIELDS + ("voucher_type", "voucher_no", "is_reversal", "remarks")
+
+
+def get_gl_name(voucher_no, line_name, is_reversal=0):
+    return hashlib.md5(f"{VOUCHER_TYPE}\x1f{voucher_no}\x1f{line_name}\x1f{cint(is_reversal)}".encode()).hexdigest()
+
+
+def get_gl_rows(journal_entries, reversal=False):
+    """
+    GL Entry rows for Journal Entries (documents or dicts with an `entries` list)
+
+    Args:
+        reversal: swap debit and credit (rows written on cancel)
+    """
+    rows = []
+    for je in journal_entries:
+        for line in je.entries:
+            debit, credit = flt(line.debit), flt(line.credit)
+            if not debit and not credit:
+                continue
+            row = frappe._dict({field: line.get(field) for field in LINE_FIELDS})
+            row.update({
+                "name": get_gl_name(je.name, line.name, reversal),
+                "posting_date": je.posting_date,
+                "debit": credit if reversal else debit,
+                "credit": debit if reversal else credit,
+                "voucher_type": VOUCHER_TYPE,
+                "voucher_no": je.name,
+                "is_reversal": 1 if reversal else 0,
+                "remarks": _("Reversal of {0}").format(je.name) if reversal else (line.remarks or je.remarks),
+            })
+            rows.append(row)
+    return rows
+
+
+def make_gl_entries(journal_entries, reversal=False):
+    """Post (or reverse) Journal Entries: one multi-row insert for all their lines"""
+    rows = get_gl_rows(journal_entries, reversal)
+    insert_gl_rows(rows)
+    return len(rows)
+
+
+def insert_gl_rows(rows):
+    if not rows:
+        return
+    timestamp = now()
+    user = frappe.session.user
+    values = []
+    for row in rows:
+        row.update({"creation": timestamp, "modified": timestamp, "owner": user, "modified_by": user})
+        values.append(tuple(row.get(field) for field in GL_FIELDS))
+    frappe.db.bulk_insert("GL Entry", GL_FIELDS, values)
+    apply_gl_entries(rows)
+
+
+def delete_gl_entries(voucher_nos, keep=()):
+    """
+    Remove the GL Entries of vouchers (and take them out of the balance snapshots)
+
+    Args:
+        keep: names about to be written back (re-post); their bank statement
+            matches are left in place, every other deleted row is unmatched
+    """
+    if not voucher_nos:
+        return
+    values = {"voucher_type": VOUCHER_TYPE, "voucher_nos": list(voucher_nos)}
+    condition = "voucher_type = %(voucher_type)s AND voucher_no IN %(voucher_nos)s"
+    rows = frappe.db.sql(
+        f"""
+        SELECT name, posting_date, account, cost_center, party_type, party, bank_account, debit, credit
+        FROM `tabGL Entry`
+        WHERE {condition}
+        """,
+        values,
+        as_dict=True,
+    )
+    apply_gl_entries(rows, sign=-1)
+    frappe.db.sql(f"DELETE FROM `tabGL Entry` WHERE {condition}", values)
+    unmatch_gl_entries([row.name for row in rows if row.name not in keep])
+
+
+# ============ Re-post ============
+
+def repost_gl_entries(from_date, to_date, chunk_size=REPOST_CHUNK_SIZE, commit=True):
+    """
+    Rebuild the GL Entries of submitted and cancelled Journal Entries in a date range
+
+    Vouchers are read in (posting_date, name) chunks with a keyset condition;
+    each chunk is deleted, re-posted with one multi-row insert (plus reversal
+    rows for cancelled vouchers) and committed.
+
+    Run:
+        bench --site <site> execute re_studio_booking.re_studio_booking.utils.gl_posting.repost_gl_entries --kwargs "{'from_date': '2025-01-01', 'to_date': '2025-01-31'}"
+
+    Returns:
+        dict: {"vouchers", "gl_entries"}
+    """
+    chunk_size = max(cint(chunk_size) or REPOST_CHUNK_SIZE, 1)
+    last = None
+    vouchers = 0
+    gl_entries = 0
+    while True:
+        values = {"from_date": from_date, "to_date": to_date, "limit": chunk_size}
+        keyset = ""
+        if last:
+            values.update({"last_date": last.posting_date, "last_name": last.name})
+            keyset = "AND (posting_date > %(last_date)s OR (posting_date = %(last_date)s AND name > %(last_name)s))"
+        journal_entries = frappe.db.sql(
+            f"""
+            SELECT name, posting_date, remarks, docstatus
+            FROM `tabJournal Entry`
+            WHERE docstatus > 0 AND posting_date BETWEEN %(from_date)s AND %(to_date)s {keyset}
+            ORDER BY posting_date, name
+            LIMIT %(limit)s
+            """,
+            values,
+            as_dict=True,
+        )
+        if not journal_entries:
+            break
+
+        by_name = {je.name: je for je in journal_entries}
+        for je in journal_entries:
+            je.entries = []
+        for line in frappe.db.sql(
+            f"""
+            SELECT parent, name, debit, credit, remarks, {", ".join(LINE_FIELDS)}
+            FROM `tabJournal Entry Line`
+            WHERE parenttype = %(parenttype)s AND parent IN %(parents)s
+            ORDER BY parent, idx
+            """,
+            {"parenttype": VOUCHER_TYPE, "parents": list(by_name)},
+            as_dict=True,
+        ):
+            by_name[line.parent].entries.append(line)
+
+        rows = get_gl_rows(journal_entries)
+        # matches survive on the rows of submitted vouchers only (cancel unmatched the others)
+        keep = {row.name for row in get_gl_rows([je for je in journal_entries if je.docstatus == 1])}
+        rows += get_gl_rows([je for je in journal_entries if je.docstatus == 2], reversal=True)
+        delete_gl_entries(list(by_name), keep=keep)
+        insert_gl_rows(rows)
+
+        vouchers += len(journal_entries)
+        gl_entries += len(rows)
+        last = journal_entries[-1]
+        if commit:
+            frappe.db.commit()
+        if len(journal_entries) < chunk_size:
+            break
+
+    return {"vouchers": vouchers, "gl_entries": gl_entries}
+
+
+@frappe.whitelist()
+def repost(from_date, to_date):
+    """Queue a GL re-post for a date range"""
+    frappe.only_for("System Manager")
+    frappe.enqueue(
+        "re_studio_booking.re_studio_booking.utils.gl_posting.repost_gl_entries",
+        queue="long",
+        timeout=7200,
+        from_date=from_date,
+        to_date=to_date,
+        enqueue_after_commit=True,
+    )
+    return {"queued": True}
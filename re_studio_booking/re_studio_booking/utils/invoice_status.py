@@ -0,0 +1,145 @@
+# Copyright (c) 2025, Masar Digital Group and contributors
+# For license information, please see license.txt
+
+# Scheduled Booking Invoice status recomputation
+#
+# BookingInvoice.update_invoice_status only runs when an invoice is saved, so
+# "Overdue" depends on someone re-saving it. This job applies the same rules to
+# every open invoice with SQL: invoices are read in name order with a keyset
+# condition, the new status of a whole chunk comes from one SELECT (the last
+# payment date is a correlated MAX over Payment Table on its parent index) and
+# the changed invoices are written with one UPDATE per (old, new) status. The
+# UPDATE only matches invoices still in the status that was read, so one paid
+# or cancelled in between keeps its new status.
+
+from collections import Counter, defaultdict
+
+import frappe
+from frappe import _
+from frappe.utils import cint, getdate, now, nowdate
+
+CHUNK_SIZE = 1000
+SUMMARY_EVENT = "invoice_status_updated"
+
+# Same rules as BookingInvoice.update_invoice_status
+STATUS_EXPRESSION = """
+    CASE
+        WHEN bi.status = 'Draft' AND IFNULL(bi.paid_amount, 0) <= 0 THEN bi.status
+        WHEN IFNULL(bi.paid_amount, 0) >= bi.total_amount THEN 'Paid'
+        WHEN IFNULL(bi.paid_amount, 0) > 0 THEN
+            CASE
+                WHEN DATEDIFF(%(today)s, (
+                    SELECT MAX(pt.date)
+                    FROM `tabPayment Table` pt
+                    WHERE pt.parent = bi.name AND pt.parenttype = 'Booking Invoice' AND pt.paid_amount > 0
+                )) > 1 THEN 'Overdue'
+                ELSE 'Partially Paid'
+            END
+        WHEN bi.due_date IS NOT NULL AND bi.due_date < %(today)s THEN 'Overdue'
+        ELSE bi.status
+    END
+"""
+
+
+def get_status_chunk(last_name, today, chunk_size):
+    """Current and recomputed status of the next chunk of open invoices"""
+    return frappe.db.sql(
+        f"""
+        SELECT bi.name, bi.status, {STATUS_EXPRESSION} AS new_status
+        FROM `tabBooking Invoice` bi
+        WHERE bi.name > %(last_name)s
+            AND bi.docstatus < 2
+            AND bi.status != 'Cancelled'
+            AND bi.total_amount > 0
+        ORDER BY bi.name
+        LIMIT %(limit)s
+        """,
+        {"last_name": last_name, "today": today, "limit": chunk_size},
+        as_dict=True,
+    )
+
+
+def update_statuses(rows):
+    """
+    Write the changed statuses, one UPDATE per (old status, new status)
+
+    Returns:
+        Counter: {(old status, new status): invoices}
+    """
+    by_transition = defaultdict(list)
+    for row in rows:
+        if row.new_status != row.status:
+            by_transition[(row.status, row.new_status)].append(row.name)
+
+    timestamp = now()
+    for (old_status, status), names in by_transition.items():
+        frappe.db.sql(
+            """
+            UPDATE `tabBooking Invoice`
+            SET status = %(status)s, modified = %(modified)s
+            WHERE name IN %(names)s AND status = %(old_status)s
+            """,
+            {"status": status, "old_status": old_status, "modified": timestamp, "names": names},
+        )
+    return Counter({transition: len(names) for transition, names in by_transition.items()})
+
+
+def recompute_invoice_statuses(chunk_size=CHUNK_SIZE, today=None, commit=True, publish=True):
+    """
+    Recompute the status of all open Booking Invoices in chunks
+
+    Run:
+        bench --site <site> execute re_studio_booking.re_studio_booking.utils.invoice_status.recompute_invoice_statuses
+
+    Returns:
+        dict: {"checked", "updated", "transitions": [{"from", "to", "count"}], "by_status": {status: count}}
+    """
+    chunk_size = max(cint(chunk_size) or CHUNK_SIZE, 1)
+    today = getdate(today or nowdate())
+    last_name = ""
+    checked = 0
+    transitions = Counter()
+    by_status = Counter()
+    while True:
+        rows = get_status_chunk(last_name, today, chunk_size)
+        if not rows:
+            break
+        transitions.update(update_statuses(rows))
+        by_status.update(row.new_status for row in rows)
+        checked += len(rows)
+        last_name = rows[-1].name
+        if commit:
+            frappe.db.commit()
+        if len(rows) < chunk_size:
+            break
+
+    summary = {
+        "date": str(today),
+        "checked": checked,
+        "updated": sum(transitions.values()),
+        "transitions": [
+            {"from": old, "to": new, "count": count} for (old, new), count in sorted(transitions.items())
+        ],
+        "by_status": dict(by_status),
+    }
+    if publish:
+        frappe.publish_realtime(SUMMARY_EVENT, summary)
+    return summary
+
+
+def update_invoice_statuses():
+    """Daily scheduler entry"""
+    recompute_invoice_statuses()
+
+
+@frappe.whitelist()
+def recompute():
+    """Queue a status recomputation of all open invoices"""
+    frappe.only_for("System Manager")
+    frappe.enqueue(
+        "re_studio_booking.re_studio_booking.utils.invoice_status.recompute_invoice_statuses",
+        queue="long",
+        job_id="recompute_invoice_statuses",
+        deduplicate=True,
+    )
+    return _("Invoice status recomputation queued")
@@ -0,0 +1,257 @@
+# Copyright (c) 2025, Masar Digital Group and contributors
+# For license information, please see license.txt
+
+# Ledger engine for GL Entry
+#
+# Entries are read one page at a time in (group, posting_date, name) order with
+# a keyset condition, so page N costs the same as page 1. The opening balance of
+# every group that starts in a page comes from one aggregate query (over the
+# monthly Account Balance Snapshot rows when the grouping and filters allow it),
+# and the running balance is carried from row to row (and from page to page in
+# the cursor).
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt
+
+from re_studio_booking.re_studio_booking.doctype.account_balance_snapshot.account_balance_snapshot import (
+    KEY_FIELDS as SNAPSHOT_FIELDS,
+    get_balances_before,
+)
+
+PAGE_SIZE = 500
+MAX_PAGE_SIZE = 5000
+
+# Group by option -> GL Entry columns forming the group key
+GROUP_BY_COLUMNS = {
+    "": (),
+    "Account": ("account",),
+    "Party": ("party_type", "party"),
+    "Voucher": ("reference_doctype", "reference_name"),
+}
+
+ENTRY_FIELDS = (
+    "name", "posting_date", "account", "party_type", "party", "debit", "credit",
+    "against", "reference_doctype", "reference_name", "remarks",
+)
+
+# Group columns that are never empty (compared without IFNULL so their index is used)
+REQUIRED_COLUMNS = ("account",)
+
+# Filters applied to both the entries and the opening balances
+EQUALITY_FILTERS = ("account", "party_type", "party", "reference_doctype", "reference_name")
+
+
+def get_group_columns(group_by):
+    if group_by not in GROUP_BY_COLUMNS:
+        frappe.throw(_("Invalid group by: {0}").format(group_by))
+    return GROUP_BY_COLUMNS[group_by]
+
+
+def column_expression(column):
+    return column if column in REQUIRED_COLUMNS else f"IFNULL({column}, '')"
+
+
+def get_conditions(filters, values):
+    """WHERE conditions shared by entries and openings (date range not included)"""
+    conditions = []
+    for fieldname in EQUALITY_FILTERS:
+        if filters.get(fieldname):
+            conditions.append(f"{fieldname} = %({fieldname})s")
+            values[fieldname] = filters[fieldname]
+    return conditions
+
+
+def get_ledger_page(filters, cursor=None, page_size=PAGE_SIZE):
+    """
+    One page of ledger rows with opening and running balances
+
+    Args:
+        filters: from_date, to_date, group_by and the EQUALITY_FILTERS
+        cursor: {"key": [...group values], "posting_date", "name", "balance"} of the
+            last entry of the previous page (None for the first page)
+        page_size: entries per page (opening rows are not counted)
+
+    Returns:
+        dict: {"rows": [...], "next_cursor": cursor or None on the last page}
+    """
+    group_columns = get_group_columns(filters.get("group_by") or "")
+    page_size = min(max(cint(page_size) or PAGE_SIZE, 1), MAX_PAGE_SIZE)
+    entries = fetch_entries(filters, group_columns, cursor, page_size + 1)
+
+    has_more = len(entries) > page_size
+    entries = entries[:page_size]
+
+    # Groups that start in this page need their opening balance
+    continued_key = tuple(cursor["key"]) if cursor else None
+    new_keys = [()] if not cursor and not group_columns else []
+    for entry in entries:
+        key = get_group_key(entry, group_columns)
+        if group_columns and key != continued_key and key not in new_keys:
+            new_keys.append(key)
+    openings = get_opening_balances(filters, group_columns, new_keys)
+
+    rows = []
+    current_key = continued_key
+    balance = flt(cursor["balance"]) if cursor else 0.0
+    if not cursor and not group_columns:
+        # One opening row for the whole selection
+        rows.append(make_opening_row(filters, group_columns, (), openings.get(())))
+
+    for entry in entries:
+        key = get_group_key(entry, group_columns)
+        if key != current_key:
+            current_key = key
+            opening = openings.get(key)
+            if group_columns:
+                rows.append(make_opening_row(filters, group_columns, key, opening))
+            balance = opening_balance(opening)
+        balance += flt(entry.debit) - flt(entry.credit)
+        entry.balance = balance
+        entry.gl_entry = entry.pop("name")
+        rows.append(entry)
+
+    next_cursor = None
+    if has_more:
+        last = entries[-1]
+        next_cursor = {
+            "key": list(current_key),
+            "posting_date": str(last.posting_date),
+            "name": last.gl_entry,
+            "balance": balance,
+        }
+
+    return {"rows": rows, "next_cursor": next_cursor}
+
+
+def fetch_entries(filters, group_columns, cursor, limit):
+    """Entries of the period after the cursor, in (group, posting_date, name) order"""
+    values = {"limit": limit}
+    conditions = get_conditions(filters, values)
+    if filters.get("from_date"):
+        conditions.append("posting_date >= %(from_date)s")
+        values["from_date"] = filters["from_date"]
+    if filters.get("to_date"):
+        conditions.append("posting_date <= %(to_date)s")
+        values["to_date"] = filters["to_date"]
+
+    order_columns = [column_expression(column) for column in group_columns] + ["posting_date", "name"]
+    if cursor:
+        cursor_values = list(cursor["key"]) + [cursor["posting_date"], cursor["name"]]
+        conditions.append(keyset_condition(order_columns, cursor_values, values))
+
+    where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return frappe.db.sql(
+        f"""
+        SELECT {", ".join(ENTRY_FIELDS)}
+        FROM `tabGL Entry`
+        {where_clause}
+        ORDER BY {", ".join(order_columns)}
+        LIMIT %(limit)s
+        """,
+        values,
+        as_dict=True,
+    )
+
+
+def keyset_condition(columns, cursor_values, values):
+    """
+    (c1, c2, ...) > (v1, v2, ...) written as OR-ed prefixes, which the
+    optimizer can use on the composite indexes:
+    c1 > v1 OR (c1 = v1 AND c2 > v2) OR ...
+    """
+    clauses = []
+    for i, column in enumerate(columns):
+        parts = []
+        for j in range(i):
+            values[f"cursor_{j}"] = cursor_values[j]
+            parts.append(f"{columns[j]} = %(cursor_{j})s")
+        values[f"cursor_{i}"] = cursor_values[i]
+        parts.append(f"{column} > %(cursor_{i})s")
+        clauses.append("(" + " AND ".join(parts) + ")")
+    return "(" + " OR ".join(clauses) + ")"
+
+
+def get_opening_balances(filters, group_columns, keys):
+    """
+    Debit / credit totals before from_date for the given group keys, one aggregate query
+
+    Returns:
+        dict: {group key tuple: {"debit", "credit"}}
+    """
+    if not filters.get("from_date") or not keys:
+        return {}
+
+    snapshot_filters = {fieldname: filters.get(fieldname) for fieldname in EQUALITY_FILTERS if filters.get(fieldname)}
+    if set(group_columns) <= set(SNAPSHOT_FIELDS) and set(snapshot_filters) <= set(SNAPSHOT_FIELDS):
+        # O(months): snapshot rows before the month of from_date + that month's entries
+        return get_balances_before(
+            filters["from_date"],
+            snapshot_filters,
+            group_by=group_columns,
+            keys=[key for key in keys if key] if group_columns else None,
+        )
+
+    # Voucher grouping / filters are not part of the snapshot key: sum the entries
+    values = {"from_date": filters["from_date"]}
+    conditions = get_conditions(filters, values)
+    conditions.append("posting_date < %(from_date)s")
+
+    key_columns = [column_expression(column) for column in group_columns]
+    if key_columns:
+        key_list = [key for key in keys if key]
+        if not key_list:
+            return {}
+        values["group_keys"] = key_list if len(key_columns) > 1 else [key[0] for key in key_list]
+        key_expression = f"({', '.join(key_columns)})" if len(key_columns) > 1 else key_columns[0]
+        conditions.append(f"{key_expression} IN %(group_keys)s")
+
+    select_key = ", ".join(f"{column} AS key_{i}" for i, column in enumerate(key_columns))
+    rows = frappe.db.sql(
+        f"""
+        SELECT {select_key + ", " if select_key else ""}SUM(debit) AS debit, SUM(credit) AS credit
+        FROM `tabGL Entry`
+        WHERE {" AND ".join(conditions)}
+        {"GROUP BY " + ", ".join(key_columns) if key_columns else ""}
+        """,
+        values,
+        as_dict=True,
+    )
+    return {
+        tuple(row[f"key_{i}"] for i in range(len(key_columns))): {"debit": flt(row.debit), "credit": flt(row.credit)}
+        for row in rows
+    }
+
+
+def cursor_from_row(row, group_by):
+    """Cursor continuing after a ledger row (the last entry row of a page)"""
+    group_columns = get_group_columns(group_by or "")
+    if not row.get("gl_entry"):
+        frappe.throw(_("The last row is not a ledger entry"))
+    return {
+        "key": list(get_group_key(row, group_columns)),
+        "posting_date": str(row.get("posting_date")),
+        "name": row.get("gl_entry"),
+        "balance": flt(row.get("balance")),
+    }
+
+
+def get_group_key(entry, group_columns):
+    return tuple(entry.get(column) or "" for column in group_columns)
+
+
+def opening_balance(opening):
+    return flt(opening["debit"]) - flt(opening["credit"]) if opening else 0.0
+
+
+def make_opening_row(filters, group_columns, key, opening):
+    row = frappe._dict(dict(zip(group_columns, key)))
+    row.update({
+        "posting_date": filters.get("from_date"),
+        "remarks": _("Opening Balance"),
+        "debit": flt(opening["debit"]) if opening else 0.0,
+        "credit": flt(opening["credit"]) if opening else 0.0,
+        "balance": opening_balance(opening),
+        "is_opening": 1,
+    })
+    return row
@@ -239,6 +239,79 @@ def create_performance_indexes():
         except Exception as e:
             print(f"❌ Error creating index {index_name}: {str(e)}")
 
+# Composite indexes tailored to availability checks, dashboards and reports
+# (table, index name, columns)
+COMPOSITE_INDEXES = [
+    ("tabBooking", "booking_date_status_idx", ("booking_date", "status")),
+    ("tabBooking", "booking_photographer_date_idx", ("photographer", "booking_date")),
+    ("tabBooking", "booking_date_time_idx", ("booking_date", "start_time", "end_time")),
+    ("tabPackage Booking Date", "pbd_date_time_idx", ("booking_date", "start_time", "end_time")),
+    ("tabPackage Booking Date", "parent", ("parent",)),
+    ("tabGL Entry", "gle_account_posting_date_idx", ("account", "posting_date")),
+    ("tabGL Entry", "gle_party_posting_date_idx", ("party_type", "party", "posting_date")),
+    ("tabGL Entry", "gle_reference_idx", ("reference_doctype", "reference_name")),
+    ("tabShift Transaction", "parent", ("parent",)),
+    ("tabShift Transaction", "shift_trx_parent_type_idx", ("parent", "trx_type")),
+    ("tabBooking Notification", "notification_user_status_idx", ("user", "status")),
+    ("tabBooking Notification", "notification_booking_idx", ("booking",)),
+    ("tabBooking Notification", "notification_user_creation_idx", ("user", "creation")),
+    ("tabAccount Balance Snapshot", "balance_snapshot_account_period_idx", ("account", "period_start")),
+    ("tabGL Entry", "gle_bank_account_posting_date_idx", ("bank_account", "posting_date")),
+    ("tabGL Entry", "gle_voucher_idx", ("voucher_type", "voucher_no")),
+    ("tabJournal Entry", "je_docstatus_posting_date_idx", ("docstatus", "posting_date")),
+    ("tabCost Center Ledger Entry", "cc_ledger_sequence_idx", ("cost_center", "sequence")),
+    ("tabShift", "shift_cost_center_closed_idx", ("cost_center", "status", "closed_on")),
+    ("tabBank Statement Line", "statement_line_account_status_idx", ("bank_account", "status", "transaction_date")),
+]
+
+def get_index_columns(table, index_name):
+    """Return the ordered column list of an existing index (empty if missing)"""
+    rows = frappe.db.sql(f"SHOW INDEX FROM `{table}` WHERE Key_name = %s", (index_name,), as_dict=True)
+    return tuple(row.Column_name for row in sorted(rows, key=lambda r: r.Seq_in_index))
+
+def ensure_composite_indexes(indexes=None):
+    """
+    Create or repair the composite indexes in COMPOSITE_INDEXES.
+    An index with the same name but different columns is dropped and rebuilt;
+    an index whose columns are already covered by another index with the same
+    leading columns is skipped.
+    """
+    for table, index_name, columns in (indexes or COMPOSITE_INDEXES):
+        if not frappe.db.table_exists(table.replace("tab", "", 1)):
+            continue
+
+        existing = get_index_columns(table, index_name)
+        if existing == tuple(columns):
+            continue
+
+        if existing:
+            frappe.db.sql_ddl(f"ALTER TABLE `{table}` DROP INDEX `{index_name}`")
+        elif _is_covered_by_other_index(table, columns):
+            continue
+
+        column_list = ", ".join(f"`{column}`" for column in columns)
+        frappe.db.sql_ddl(f"ALTER TABLE `{table}` ADD INDEX `{index_name}` ({column_list})")
+        print(f"✅ Created index {index_name} on {table} ({', '.join(columns)})")
+
+def drop_composite_indexes(indexes=None):
+    """Drop the indexes in COMPOSITE_INDEXES (used by the index benchmark)"""
+    for table, index_name, columns in (indexes or COMPOSITE_INDEXES):
+        if index_name == "parent":
+            continue
+        if get_index_columns(table, index_name):
+            frappe.db.sql_ddl(f"ALTER TABLE `{table}` DROP INDEX `{index_name}`")
+
+def _is_covered_by_other_index(table, columns):
+    rows = frappe.db.sql(f"SHOW INDEX FROM `{table}`", as_dict=True)
+    indexes = {}
+    for row in rows:
+        indexes.setdefault(row.Key_name, []).append((row.Seq_in_index, row.Column_name))
+    for parts in indexes.values():
+        index_columns = tuple(column for _, column in sorted(parts))
+        if index_columns[:len(columns)] == tuple(columns):
+            return True
+    return False
+
 # Background job for cache warming
 def warm_dashboard_cache():
     """Warm up dashboard cache in background"""
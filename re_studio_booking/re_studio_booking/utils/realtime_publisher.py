@@ -0,0 +1,115 @@
+# Copyright (c) 2024, Masar Digital Group and contributors
+# For license information, please see license.txt
+
+# Buffered realtime publisher
+#
+# Events are collected per request / background job in frappe.local, repeated
+# events for the same key are merged, and everything is published once after the
+# transaction commits (one message per event and room). Rolled back
+# transactions publish nothing.
+
+import frappe
+
+METRICS_KEY = "re_studio_booking:realtime_metrics"
+METRIC_FIELDS = ("queued", "coalesced", "emitted", "flushes")
+
+
+def queue_realtime(event, message, doctype=None, user=None, key=None, merge=None):
+    """
+    Buffer a realtime event until the current transaction commits
+
+    Args:
+        event: realtime event name
+        message: dict payload
+        doctype: publish to this doctype's room
+        user: publish to this user only (neither doctype nor user = all users of the site)
+        key: events with the same (event, room, key) are coalesced
+            (default: one entry per message)
+        merge: merge(old, new) -> message used when coalescing;
+            without it the newest message replaces the older one
+
+    On flush every (event, room) group is sent as one message: the single
+    message when all events share a key, otherwise {"batch": [...]}.
+    """
+    buffer = _get_buffer()
+    group = buffer["groups"].setdefault((event, doctype, user), {})
+    key = key if key is not None else object()
+    buffer["metrics"]["queued"] += 1
+
+    if key in group:
+        buffer["metrics"]["coalesced"] += 1
+        group[key] = merge(group[key], message) if merge else message
+    else:
+        group[key] = message
+
+
+def flush_realtime():
+    """Publish every buffered group (called after commit)"""
+    buffer = getattr(frappe.local, "realtime_buffer", None)
+    frappe.local.realtime_buffer = None
+    if not buffer:
+        return
+
+    metrics = buffer["metrics"]
+    for (event, doctype, user), group in buffer["groups"].items():
+        messages = list(group.values())
+        if not messages:
+            continue
+        message = messages[0] if len(messages) == 1 else {"doctype": doctype, "batch": messages}
+        frappe.publish_realtime(event, message, doctype=doctype, user=user)
+        metrics["emitted"] += 1
+    metrics["flushes"] = 1
+
+    _record_metrics(metrics)
+    if metrics["coalesced"]:
+        frappe.logger().info(
+            f"Realtime flush: {metrics['queued']} events queued, {metrics['coalesced']} coalesced, "
+            f"{metrics['emitted']} messages emitted"
+        )
+
+
+def discard_realtime():
+    """Drop buffered events (called after rollback)"""
+    frappe.local.realtime_buffer = None
+
+
+def _get_buffer():
+    buffer = getattr(frappe.local, "realtime_buffer", None)
+    if buffer is None:
+        buffer = frappe.local.realtime_buffer = {
+            "groups": {},
+            "metrics": dict.fromkeys(METRIC_FIELDS, 0)
+        }
+        frappe.db.after_commit.add(flush_realtime)
+        frappe.db.after_rollback.add(discard_realtime)
+    return buffer
+
+
+def _record_metrics(metrics):
+    """Add one flush's counts to the site totals in Redis (atomic HINCRBY per field)"""
+    try:
+        cache = frappe.cache()
+        key = cache.make_key(METRICS_KEY)
+        pipe = cache.pipeline()
+        for field in METRIC_FIELDS:
+            if metrics.get(field):
+                pipe.hincrby(key, field, metrics[field])
+        pipe.execute()
+    except Exception as e:
+        frappe.logger().error(f"Error recording realtime metrics: {str(e)}")
+
+
+@frappe.whitelist()
+def get_realtime_metrics(reset=False):
+    """Totals since the last reset: queued, coalesced, emitted, flushes"""
+    frappe.only_for("System Manager")
+    cache = frappe.cache()
+    key = cache.make_key(METRICS_KEY)
+    pipe = cache.pipeline()
+    pipe.hgetall(key)
+    if frappe.utils.cint(reset):
+        # read and reset in one MULTI, so no flush lands between them
+        pipe.delete(key)
+    stored = pipe.execute()[0] or {}
+    totals = {field.decode() if isinstance(field, bytes) else field: int(value) for field, value in stored.items()}
+    return {field: totals.get(field, 0) for field in METRIC_FIELDS}
@@ -0,0 +1,123 @@
+# Copyright (c) 2024, Masar Digital Group and contributors
+# For license information, please see license.txt
+
+# Response cache for read-only whitelisted endpoints (dashboards / reports)
+
+import hashlib
+import json
+from functools import wraps
+
+import frappe
+
+CACHE_PREFIX = "re_studio_booking:response"
+TAG_VERSION_PREFIX = "re_studio_booking:response_tag"
+DEFAULT_TTL = 300
+
+# Tags invalidated when a document of the doctype changes (wired in hooks.py doc_events)
+DOCTYPE_TAGS = {
+    "Booking": ("booking",),
+    "Service": ("service",),
+    "Service Package": ("service",),
+    "Photographer": ("photographer",),
+}
+
+
+def cached_response(tags=(), ttl=DEFAULT_TTL, per_user=True):
+    """
+    Cache the return value of a read endpoint in Redis
+
+    The key is built from the function path, the arguments, today's date,
+    the session user (per_user) and the current version of every tag, so
+    bumping a tag version (invalidate_tags) makes all its entries unreachable
+    without scanning Redis. Error responses (None, {"error": ...} or
+    {"success": False}) are not cached.
+
+    Use below @frappe.whitelist():
+
+        @frappe.whitelist()
+        @cached_response(tags=("booking", "service"), ttl=300)
+        def get_dashboard_data(...):
+
+    Args:
+        tags: tags the response depends on (see DOCTYPE_TAGS)
+        ttl: expiry in seconds
+        per_user: keep a separate entry per user, so results filtered by the
+            user's permissions are never served to another user
+    """
+    tags = tuple(tags)
+
+    def decorator(fn):
+        path = f"{fn.__module__}.{fn.__qualname__}"
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if frappe.flags.in_test or frappe.flags.skip_response_cache:
+                return fn(*args, **kwargs)
+
+            cache_key = make_cache_key(path, args, kwargs, tags, per_user)
+            cached = frappe.cache().get_value(cache_key)
+            if cached is not None:
+                return cached
+
+            result = fn(*args, **kwargs)
+            if is_cacheable(result):
+                frappe.cache().set_value(cache_key, result, expires_in_sec=ttl)
+            return result
+
+        wrapper.cache_tags = tags
+        return wrapper
+
+    return decorator
+
+
+def is_cacheable(result):
+    if result is None:
+        return False
+    if isinstance(result, dict) and ("error" in result or result.get("success") is False):
+        return False
+    return True
+
+
+def make_cache_key(path, args, kwargs, tags=(), per_user=True):
+    """Cache key for one call (arguments + scope + tag versions)"""
+    signature = json.dumps(
+        {
+            "args": args,
+            "kwargs": kwargs,
+            "today": frappe.utils.today(),
+            "user": frappe.session.user if per_user else None,
+            "tags": [get_tag_version(tag) for tag in tags],
+        },
+        sort_keys=True,
+        default=str,
+    )
+    digest = hashlib.md5(signature.encode()).hexdigest()
+    return f"{CACHE_PREFIX}:{path}:{digest}"
+
+
+def get_tag_version(tag):
+    """Current version token of a tag (created on first use)"""
+    key = f"{TAG_VERSION_PREFIX}:{tag}"
+    version = frappe.cache().get_value(key)
+    if version is None:
+        version = frappe.generate_hash(length=10)
+        frappe.cache().set_value(key, version)
+    return version
+
+
+def invalidate_tags(*tags):
+    """Make every cached response that depends on one of the tags stale"""
+    for tag in tags:
+        frappe.cache().set_value(f"{TAG_VERSION_PREFIX}:{tag}", frappe.generate_hash(length=10))
+
+
+def invalidate_response_cache(doc, method=None):
+    """doc_events handler: invalidate the tags of the document's doctype"""
+    tags = DOCTYPE_TAGS.get(doc.doctype)
+    if tags:
+        invalidate_tags(*tags)
+
+
+def clear_response_cache():
+    """Drop every cached response (e.g. after a migration or a rollup rebuild)"""
+    frappe.cache().delete_keys(CACHE_PREFIX)
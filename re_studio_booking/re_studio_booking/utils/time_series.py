@@ -0,0 +1,115 @@
+# Time series helpers for Re Studio Booking dashboards
+
+import calendar
+from datetime import date, datetime, timedelta
+
+DAILY = "daily"
+WEEKLY = "weekly"
+MONTHLY = "monthly"
+GRANULARITIES = (DAILY, WEEKLY, MONTHLY)
+
+
+def to_date(value):
+    """Normalize a date / datetime / 'YYYY-MM-DD' string to a date"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def pick_granularity(start, end):
+    """Default granularity for a range: daily up to a month, weekly up to 3 months, then monthly"""
+    days = (to_date(end) - to_date(start)).days
+    if days <= 31:
+        return DAILY
+    if days <= 90:
+        return WEEKLY
+    return MONTHLY
+
+
+def bucket_start(day, granularity):
+    """First day of the bucket that contains `day` (weeks start on Monday)"""
+    if granularity == WEEKLY:
+        return day - timedelta(days=day.weekday())
+    if granularity == MONTHLY:
+        return day.replace(day=1)
+    return day
+
+
+def next_bucket(start, granularity):
+    if granularity == WEEKLY:
+        return start + timedelta(days=7)
+    if granularity == MONTHLY:
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def iter_buckets(start, end, granularity):
+    """Every bucket start from the bucket of `start` to the bucket of `end`"""
+    current = bucket_start(to_date(start), granularity)
+    last = bucket_start(to_date(end), granularity)
+    while current <= last:
+        yield current
+        current = next_bucket(current, granularity)
+
+
+def bucket_label(start, granularity):
+    if granularity == WEEKLY:
+        return f"W{start.isocalendar()[1]}"
+    if granularity == MONTHLY:
+        return f"{calendar.month_abbr[start.month]} {start.year}"
+    return start.strftime("%d %b")
+
+
+def build_series(rows, start, end, granularity=None, date_field="date", value_fields=("value",)):
+    """
+    Aggregate dated rows into buckets and fill the gaps with zeros.
+
+    Rows are summed into a dict keyed by bucket start, so the cost is
+    O(rows + buckets) for any range and granularity.
+
+    Args:
+        rows: iterable of dicts with `date_field` and the `value_fields`
+        start / end: range (inclusive)
+        granularity: daily / weekly / monthly (default: pick_granularity)
+        date_field: name of the date key in every row
+        value_fields: names of the numeric keys to sum
+
+    Returns:
+        dict: {"granularity", "keys": [ISO bucket starts], "labels": [...],
+            <value field>: [...] for every value field}
+    """
+    granularity = granularity if granularity in GRANULARITIES else pick_granularity(start, end)
+    range_start = to_date(start)
+    range_end = to_date(end)
+
+    index = {}
+    for row in rows:
+        day = to_date(row[date_field])
+        if day < range_start or day > range_end:
+            continue
+        key = bucket_start(day, granularity)
+        totals = index.get(key)
+        if totals is None:
+            totals = index[key] = [0] * len(value_fields)
+        for i, field in enumerate(value_fields):
+            totals[i] += row[field] or 0
+
+    empty = [0] * len(value_fields)
+    series = {
+        "granularity": granularity,
+        "keys": [],
+        "labels": []
+    }
+    columns = [[] for _ in value_fields]
+    for bucket in iter_buckets(range_start, range_end, granularity):
+        totals = index.get(bucket, empty)
+        series["keys"].append(bucket.isoformat())
+        series["labels"].append(bucket_label(bucket, granularity))
+        for i, value in enumerate(totals):
+            columns[i].append(value)
+
+    for field, column in zip(value_fields, columns):
+        series[field] = column
+    return series